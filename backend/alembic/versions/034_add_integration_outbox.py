@@ -0,0 +1,65 @@
+"""Add integration outbox table
+
+Creates the transactional outbox used to deliver external integration
+side effects (Vikunja, Novu, Paperless, ...) asynchronously with retries:
+- integration_outbox: one row per integration call, written in the same
+  transaction as the business record, drained by background workers
+
+Revision ID: 034
+Revises: 033
+Create Date: 2026-10-18 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+revision = '034'
+down_revision = '033'
+
+
+def upgrade() -> None:
+    """Create integration outbox table"""
+    op.create_table(
+        'integration_outbox',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+
+        # Source aggregate
+        sa.Column('aggregate_type', sa.String(50), nullable=False),
+        sa.Column('aggregate_id', sa.String(100), nullable=False),
+
+        # Integration call
+        sa.Column('integration', sa.String(50), nullable=False),
+        sa.Column('payload', JSONB, nullable=False),
+        sa.Column('depends_on', JSONB, server_default='[]'),
+        sa.Column('idempotency_key', sa.String(255), nullable=False),
+
+        # Delivery state
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('max_attempts', sa.Integer, nullable=False, server_default='8'),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column('locked_at', sa.DateTime(timezone=True)),
+        sa.Column('last_error', sa.Text),
+        sa.Column('result', JSONB),
+
+        # Metadata
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('completed_at', sa.DateTime(timezone=True)),
+
+        sa.UniqueConstraint('idempotency_key', name='uq_integration_outbox_idempotency_key'),
+        sa.CheckConstraint(
+            "status IN ('pending', 'processing', 'succeeded', 'dead')",
+            name='check_integration_outbox_status'
+        ),
+    )
+
+    op.create_index('idx_integration_outbox_due', 'integration_outbox', ['status', 'next_attempt_at'])
+    op.create_index('idx_integration_outbox_aggregate', 'integration_outbox', ['aggregate_type', 'aggregate_id'])
+
+
+def downgrade() -> None:
+    """Drop integration outbox table"""
+    op.drop_index('idx_integration_outbox_aggregate', table_name='integration_outbox')
+    op.drop_index('idx_integration_outbox_due', table_name='integration_outbox')
+    op.drop_table('integration_outbox')
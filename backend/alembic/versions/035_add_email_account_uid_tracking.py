@@ -0,0 +1,27 @@
+"""Add IMAP UID tracking to email accounts
+
+Lets the email poller fetch only messages it has not seen yet:
+- imap_uidvalidity: UIDVALIDITY of the folder when the UID was stored
+- imap_last_uid: highest UID already fetched
+
+Revision ID: 035
+Revises: 034
+Create Date: 2026-10-18 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '035'
+down_revision = '034'
+
+
+def upgrade() -> None:
+    """Add UID tracking columns"""
+    op.add_column('email_accounts', sa.Column('imap_uidvalidity', sa.BigInteger))
+    op.add_column('email_accounts', sa.Column('imap_last_uid', sa.BigInteger))
+
+
+def downgrade() -> None:
+    """Drop UID tracking columns"""
+    op.drop_column('email_accounts', 'imap_last_uid')
+    op.drop_column('email_accounts', 'imap_uidvalidity')
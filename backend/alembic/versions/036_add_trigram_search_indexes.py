@@ -0,0 +1,45 @@
+"""Add trigram indexes for text search
+
+Enables pg_trgm and adds GIN trigram indexes on every column searched by the
+list endpoints and the unified /search endpoint, so ILIKE '%term%' and
+word-prefix patterns use bitmap index scans instead of sequential scans:
+- tenants: first_name, last_name, email, phone
+- clients: name, primary_contact_name, email, phone
+- leads: name, company, email, phone
+- quotes: quote_number, customer_name, customer_email
+- ha_instances: name, location
+
+Revision ID: 036
+Revises: 035
+Create Date: 2026-10-18 14:00:00
+"""
+from alembic import op
+
+revision = '036'
+down_revision = '035'
+
+TRIGRAM_COLUMNS = {
+    'tenants': ['first_name', 'last_name', 'email', 'phone'],
+    'clients': ['name', 'primary_contact_name', 'email', 'phone'],
+    'leads': ['name', 'company', 'email', 'phone'],
+    'quotes': ['quote_number', 'customer_name', 'customer_email'],
+    'ha_instances': ['name', 'location'],
+}
+
+
+def upgrade() -> None:
+    """Enable pg_trgm and create trigram indexes"""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table, columns in TRIGRAM_COLUMNS.items():
+        for column in columns:
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_{column}_trgm "
+                f"ON {table} USING gin ({column} gin_trgm_ops)"
+            )
+
+
+def downgrade() -> None:
+    """Drop trigram indexes (the extension is left installed)"""
+    for table, columns in TRIGRAM_COLUMNS.items():
+        for column in columns:
+            op.execute(f"DROP INDEX IF EXISTS idx_{table}_{column}_trgm")
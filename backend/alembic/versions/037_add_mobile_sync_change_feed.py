@@ -0,0 +1,96 @@
+"""Add mobile sync change feed
+
+Creates the tables behind /api/v1/mobile-sync:
+- sync_change_log: one row per create/update/delete of a synced entity;
+  seq is the pull cursor and the entity version
+- mobile_sync_devices: registered devices and their pull position
+- sync_conflicts: pushed changes rejected by the version check
+
+Existing rows of the nine synced tables are backfilled as CREATE changes so
+a device's first pull downloads the current portfolio from the feed.
+
+Revision ID: 037
+Revises: 036
+Create Date: 2026-10-18 15:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+revision = '037'
+down_revision = '036'
+
+# Entity types are named after their tables
+SYNCED_TABLES = (
+    'properties', 'buildings', 'units', 'tenants', 'leases',
+    'work_orders', 'rent_payments', 'support_tickets', 'iot_devices',
+)
+
+
+def upgrade() -> None:
+    """Create change feed tables and backfill existing entities"""
+    op.create_table(
+        'sync_change_log',
+        sa.Column('seq', sa.BigInteger, primary_key=True, autoincrement=True),
+        sa.Column('entity_type', sa.String(50), nullable=False),
+        sa.Column('entity_id', sa.String(64), nullable=False),
+        sa.Column('operation', sa.String(10), nullable=False),
+        sa.Column('changed_fields', JSONB),
+        sa.Column('user_id', sa.String(255)),
+        sa.Column('device_id', sa.String(255)),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.CheckConstraint("operation IN ('CREATE', 'UPDATE', 'DELETE')", name='check_sync_change_log_operation'),
+    )
+    op.create_index('idx_sync_change_log_entity', 'sync_change_log', ['entity_type', 'entity_id', 'seq'])
+
+    op.create_table(
+        'mobile_sync_devices',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('device_id', sa.String(255), nullable=False, unique=True),
+        sa.Column('device_name', sa.String(255)),
+        sa.Column('platform', sa.String(50)),
+        sa.Column('app_version', sa.String(50)),
+        sa.Column('os_version', sa.String(100)),
+        sa.Column('user_id', sa.String(255)),
+        sa.Column('last_pulled_seq', sa.BigInteger, nullable=False, server_default='0'),
+        sa.Column('last_sync_at', sa.DateTime(timezone=True)),
+        sa.Column('last_pull_at', sa.DateTime(timezone=True)),
+        sa.Column('last_push_at', sa.DateTime(timezone=True)),
+        sa.Column('is_active', sa.Boolean, nullable=False, server_default=sa.text('true')),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+    op.create_table(
+        'sync_conflicts',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('device_id', sa.String(255), nullable=False),
+        sa.Column('entity_type', sa.String(50), nullable=False),
+        sa.Column('entity_id', sa.String(64), nullable=False),
+        sa.Column('operation', sa.String(10), nullable=False),
+        sa.Column('client_version', sa.BigInteger, nullable=False, server_default='0'),
+        sa.Column('server_version', sa.BigInteger, nullable=False, server_default='0'),
+        sa.Column('client_data', JSONB, server_default='{}'),
+        sa.Column('server_data', JSONB, server_default='{}'),
+        sa.Column('conflicting_fields', JSONB, server_default='[]'),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending'),
+        sa.Column('resolution_strategy', sa.String(20)),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('resolved_at', sa.DateTime(timezone=True)),
+        sa.CheckConstraint("status IN ('pending', 'resolved')", name='check_sync_conflicts_status'),
+    )
+    op.create_index('idx_sync_conflicts_device_status', 'sync_conflicts', ['device_id', 'status'])
+
+    for table in SYNCED_TABLES:
+        op.execute(
+            f"INSERT INTO sync_change_log (entity_type, entity_id, operation) "
+            f"SELECT '{table}', id::text, 'CREATE' FROM {table} ORDER BY created_at"
+        )
+
+
+def downgrade() -> None:
+    """Drop change feed tables"""
+    op.drop_index('idx_sync_conflicts_device_status', table_name='sync_conflicts')
+    op.drop_table('sync_conflicts')
+    op.drop_table('mobile_sync_devices')
+    op.drop_index('idx_sync_change_log_entity', table_name='sync_change_log')
+    op.drop_table('sync_change_log')
@@ -0,0 +1,35 @@
+"""Add transaction ids to the mobile sync change feed
+
+sync_change_log.seq is assigned at insert time, so a transaction that
+commits after a later-numbered one would fall behind a device's cursor.
+Rows now record the writing transaction's id, pulls are keyed on
+(txid, seq) and stop below pg_snapshot_xmin(pg_current_snapshot()).
+
+Existing rows keep txid 0: their transactions finished long ago.
+
+Revision ID: 038
+Revises: 037
+Create Date: 2026-10-18 23:30:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '038'
+down_revision = '037'
+
+
+def upgrade() -> None:
+    """Add txid to the change log and the device pull position"""
+    op.add_column('sync_change_log', sa.Column('txid', sa.BigInteger, nullable=False, server_default='0'))
+    op.create_index('idx_sync_change_log_position', 'sync_change_log', ['txid', 'seq'])
+    op.add_column(
+        'mobile_sync_devices',
+        sa.Column('last_pulled_txid', sa.BigInteger, nullable=False, server_default='0')
+    )
+
+
+def downgrade() -> None:
+    """Drop the txid columns"""
+    op.drop_column('mobile_sync_devices', 'last_pulled_txid')
+    op.drop_index('idx_sync_change_log_position', table_name='sync_change_log')
+    op.drop_column('sync_change_log', 'txid')
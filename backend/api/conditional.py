@@ -0,0 +1,125 @@
+"""
+Conditional GETs from row versions
+
+@conditional derives a weak ETag and Last-Modified for an endpoint from the
+version columns of the rows it returns, instead of loading and serializing
+the response. A matching If-None-Match / If-Modified-Since is answered with
+304 before the endpoint (or its cache) runs; otherwise the validators are
+added to the normal response.
+
+- Item endpoints (`key="building_id"`) read the versions of that one row by
+  primary key, so a write to another row leaves their ETag alone.
+- List endpoints (`where=...`) aggregate count, max(updated_at) and the row
+  versions over the same filtered rows the list returns.
+
+Deletes change the count and inserts/updates move updated_at (set by
+onupdate for ORM and bulk updates). On PostgreSQL updated_at is now(), the
+transaction start time, so a transaction that began before the last one but
+commits after it would not move max(updated_at); the validators therefore
+also use xmin, which changes whenever a row version is rewritten, raw SQL
+writes included. Elsewhere (SQLite: one writer at a time) only ORM writes
+are seen. Endpoints whose data has no version column get a body-derived ETag
+from ConditionalGetMiddleware instead.
+"""
+
+import functools
+import inspect
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import BigInteger, Text, cast, column, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from middleware.conditional_get import http_date, is_not_modified, weak_etag
+
+CACHE_CONTROL = "private, no-cache"
+
+# Endpoint arguments -> filter clauses selecting the rows a list endpoint returns
+WhereBuilder = Callable[[Dict[str, Any]], Iterable]
+
+
+def _xmin():
+    """Id of the transaction that wrote a row version (PostgreSQL system column)"""
+    return cast(cast(column("xmin"), Text), BigInteger)
+
+
+def version_columns(model, dialect_name: str) -> List:
+    """Aggregates over a (filtered) select from the model that change on every write; max(updated_at) first"""
+    columns = [func.max(model.updated_at), func.count()]
+    if dialect_name == "postgresql":
+        columns.append(func.sum(_xmin()))
+    return columns
+
+
+async def row_validators(
+    db: AsyncSession, model, row_id, scope: str = ""
+) -> Tuple[Optional[str], Optional[datetime]]:
+    """(ETag, Last-Modified) of one row by primary key; (None, None) if it does not exist"""
+    columns = [model.updated_at]
+    if (await db.connection()).dialect.name == "postgresql":
+        columns.append(_xmin())
+    row = (await db.execute(select(*columns).where(model.id == row_id))).first()
+    if row is None:
+        return None, None
+    return weak_etag(scope, model.__tablename__, *row), row[0]
+
+
+async def table_validators(
+    db: AsyncSession, model, *criteria, scope: str = ""
+) -> Tuple[str, Optional[datetime]]:
+    """(ETag, Last-Modified) for the model's rows matching `criteria`"""
+    dialect_name = (await db.connection()).dialect.name
+    query = select(*version_columns(model, dialect_name)).select_from(model).where(*criteria)
+    row = (await db.execute(query)).one()
+    return weak_etag(scope, model.__tablename__, *row), row[0]
+
+
+def conditional(model, key: Optional[str] = None, where: Optional[WhereBuilder] = None):
+    """
+    Answer GETs with 304 while the rows an endpoint returns are unchanged
+
+    Args:
+        model: Model whose rows the endpoint returns
+        key: Name of the argument holding the row's primary key (item endpoints)
+        where: For list endpoints, builds the endpoint's filter clauses from
+            its arguments; without it the whole table is aggregated
+
+    The endpoint must take its session as `db`. Place it under @router.get
+    (and above @cached) so FastAPI sees the extended signature.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        extra = [
+            inspect.Parameter("conditional_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+            inspect.Parameter("conditional_response", inspect.Parameter.KEYWORD_ONLY, annotation=Response),
+        ]
+
+        @functools.wraps(func)
+        async def wrapper(*args, conditional_request: Request, conditional_response: Response, **kwargs):
+            arguments = signature.bind_partial(*args, **kwargs).arguments
+            db = arguments["db"]
+            url = conditional_request.url
+            scope = f"{url.path}?{url.query}"
+
+            if key is not None:
+                etag, last_modified = await row_validators(db, model, arguments[key], scope=scope)
+                if etag is None:
+                    return await func(*args, **kwargs)  # Let the endpoint answer 404
+            else:
+                criteria = list(where(arguments)) if where is not None else []
+                etag, last_modified = await table_validators(db, model, *criteria, scope=scope)
+
+            headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+            if last_modified is not None:
+                headers["Last-Modified"] = http_date(last_modified)
+            if is_not_modified(conditional_request.headers, etag, headers.get("Last-Modified")):
+                return Response(status_code=304, headers=headers)
+
+            conditional_response.headers.update(headers)
+            return await func(*args, **kwargs)
+
+        wrapper.__signature__ = signature.replace(parameters=[*signature.parameters.values(), *extra])
+        return wrapper
+
+    return decorator
@@ -0,0 +1,96 @@
+"""
+Sparse fieldsets for list endpoints
+
+?fields=id,customer_name,status,monthly_total returns only those fields per
+item. The requested fields are applied twice:
+
+- in SQL: load_only() the matching columns, so wide JSON/text columns are
+  never selected, and skip relationships that were not asked for
+- in the response: items are serialized through a generated model holding
+  just those fields, instead of the endpoint's full response schema
+
+Without ?fields= endpoints behave exactly as before.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only, noload, selectinload
+
+
+class SparseFields:
+    """?fields= query parameter shared by list endpoints"""
+
+    def __init__(
+        self,
+        fields: Optional[str] = Query(None, description="Comma-separated item fields to return (default: all)")
+    ):
+        self.raw = fields
+
+    def resolve(self, schema: Type[BaseModel]) -> Optional[Tuple[str, ...]]:
+        """Requested field names validated against the item schema (id always included)"""
+        if not self.raw:
+            return None
+        names = [name.strip() for name in self.raw.split(",") if name.strip()]
+        unknown = [name for name in names if name not in schema.model_fields]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+        if "id" in schema.model_fields:
+            names.insert(0, "id")
+        return tuple(dict.fromkeys(names))
+
+
+@lru_cache(maxsize=256)
+def sparse_model(schema: Type[BaseModel], names: Tuple[str, ...]) -> Type[BaseModel]:
+    """Response model with only `names` from `schema` (cached per field combination)"""
+    definitions = {
+        name: (schema.model_fields[name].annotation, schema.model_fields[name])
+        for name in names
+    }
+    return create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions
+    )
+
+
+def load_options(orm_model, names: Optional[Iterable[str]], always: Iterable[Any] = ()) -> List[Any]:
+    """
+    Loader options restricting an ORM query to the requested fields
+
+    Requested relationships are selectin-loaded, others are not loaded.
+    `always` lists extra column attributes the endpoint itself needs (e.g.
+    the pagination sort key). Returns [] - load everything - when no fields
+    were requested or a field is not a mapped column or relationship.
+    """
+    if not names:
+        return []
+    mapper = inspect(orm_model)
+    columns = {attr.key for attr in mapper.column_attrs}
+    relationships = {rel.key for rel in mapper.relationships}
+    if any(name not in columns and name not in relationships for name in names):
+        return []
+
+    wanted = [getattr(orm_model, name) for name in names if name in columns]
+    wanted += [column for column in always if column.key not in names]
+    options = [load_only(*wanted)]
+    for key in relationships:
+        loader = selectinload if key in names else noload
+        options.append(loader(getattr(orm_model, key)))
+    return options
+
+
+def sparse_response(envelope: Dict[str, Any], schema: Type[BaseModel], names: Tuple[str, ...]) -> JSONResponse:
+    """List envelope with items serialized through the sparse model"""
+    model = sparse_model(schema, names)
+    body = dict(envelope)
+    body["items"] = [model.model_validate(item).model_dump(mode="json") for item in envelope["items"]]
+    return JSONResponse(content=jsonable_encoder(body))
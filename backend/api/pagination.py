@@ -0,0 +1,228 @@
+"""
+Shared pagination for list endpoints
+
+Two ways to page, both returning the existing items/total/skip/limit
+envelope plus next_cursor/has_more/total_is_estimate:
+
+- skip/limit (unchanged behaviour, OFFSET based)
+- cursor: keyset pagination over (sort column, id). Pass the next_cursor of
+  the previous page; cost no longer grows with depth.
+
+Counting is selectable with ?count=exact|estimate|none. It defaults to exact
+for the first page and none when following a cursor, so deep pages never pay
+for a full COUNT. "estimate" uses pg_class.reltuples for unfiltered lists on
+large PostgreSQL tables and a short-lived cache of exact counts otherwise.
+"""
+
+import base64
+import json
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Table, func, literal, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+COUNT_CACHE_TTL_SECONDS = 30.0
+COUNT_CACHE_MAX_ENTRIES = 1000
+ESTIMATE_MIN_ROWS = 10000
+
+_count_cache: Dict[str, Tuple[float, int]] = {}
+
+
+class PageOptions:
+    """Cursor and count query parameters shared by list endpoints"""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page (replaces skip)"),
+        count: Optional[str] = Query(
+            None, pattern="^(exact|estimate|none)$",
+            description="Total count mode (default: exact on the first page, none when using a cursor)"
+        )
+    ):
+        self.cursor = cursor
+        self.count = count or ("none" if cursor else "exact")
+
+
+@dataclass
+class Page:
+    """One page of results"""
+    items: List[Any]
+    skip: int
+    limit: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
+    def envelope(self) -> Dict[str, Any]:
+        """Fields for the endpoint's list response model"""
+        return {
+            "items": self.items,
+            "total": self.total,
+            "skip": self.skip,
+            "limit": self.limit,
+            "next_cursor": self.next_cursor,
+            "has_more": self.has_more,
+            "total_is_estimate": self.total_is_estimate,
+        }
+
+
+# ============================================================================
+# CURSORS
+# ============================================================================
+
+def _encode_value(value: Any) -> List[Any]:
+    if isinstance(value, datetime):
+        return ["dt", value.isoformat()]
+    if isinstance(value, date):
+        return ["d", value.isoformat()]
+    if isinstance(value, uuid.UUID):
+        return ["u", str(value)]
+    return ["v", value]
+
+
+def _decode_value(encoded: List[Any]) -> Any:
+    kind, value = encoded
+    if kind == "dt":
+        return datetime.fromisoformat(value)
+    if kind == "d":
+        return date.fromisoformat(value)
+    if kind == "u":
+        return uuid.UUID(value)
+    if kind == "v":
+        return value
+    raise ValueError(f"unknown cursor value type {kind}")
+
+
+def encode_cursor(sort_value: Any, row_id: Any) -> str:
+    payload = json.dumps([_encode_value(sort_value), _encode_value(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return _decode_value(sort_value), _decode_value(row_id)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid cursor: {e}")
+
+
+# ============================================================================
+# COUNTS
+# ============================================================================
+
+def _single_table(query) -> Optional[Table]:
+    """The table of an unfiltered single-table SELECT, else None"""
+    if query.whereclause is not None:
+        return None
+    froms = query.get_final_froms()
+    if len(froms) == 1 and isinstance(froms[0], Table):
+        return froms[0]
+    return None
+
+
+def _cache_key(db: AsyncSession, query) -> str:
+    compiled = query.compile(dialect=db.bind.dialect)
+    return f"{compiled}|{sorted((k, repr(v)) for k, v in compiled.params.items())}"
+
+
+async def _exact_count(db: AsyncSession, query) -> int:
+    result = await db.execute(select(func.count()).select_from(query.order_by(None).subquery()))
+    return result.scalar() or 0
+
+
+async def count_rows(db: AsyncSession, query, mode: str = "exact") -> Tuple[Optional[int], bool]:
+    """(total, is_estimate) for a list query under the given count mode"""
+    if mode == "none":
+        return None, False
+    if mode == "exact":
+        return await _exact_count(db, query), False
+
+    table = _single_table(query)
+    if table is not None and db.bind.dialect.name == "postgresql":
+        estimate = (await db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)"),
+            {"name": table.name}
+        )).scalar()
+        if estimate is not None and estimate >= ESTIMATE_MIN_ROWS:
+            return int(estimate), True
+
+    key = _cache_key(db, query)
+    now = time.monotonic()
+    cached = _count_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1], True
+
+    total = await _exact_count(db, query)
+    if len(_count_cache) >= COUNT_CACHE_MAX_ENTRIES:
+        for stale in [k for k, (expires, _) in _count_cache.items() if expires <= now]:
+            del _count_cache[stale]
+        if len(_count_cache) >= COUNT_CACHE_MAX_ENTRIES:
+            _count_cache.clear()
+    _count_cache[key] = (now + COUNT_CACHE_TTL_SECONDS, total)
+    return total, False
+
+
+# ============================================================================
+# PAGINATION
+# ============================================================================
+
+async def paginate(
+    db: AsyncSession,
+    query,
+    sort_column,
+    id_column,
+    *,
+    skip: int,
+    limit: int,
+    options: PageOptions,
+    descending: bool = True
+) -> Page:
+    """
+    Run a list query one page at a time ordered by (sort_column, id_column)
+
+    sort_column must be non-null for keyset paging; rows are tie-broken by
+    id so pages never overlap or skip rows with equal sort values.
+    """
+    total, is_estimate = await count_rows(db, query, options.count)
+
+    if descending:
+        ordered = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        ordered = query.order_by(sort_column.asc(), id_column.asc())
+
+    if options.cursor:
+        sort_value, row_id = decode_cursor(options.cursor)
+        key = tuple_(sort_column, id_column)
+        bound = tuple_(literal(sort_value, sort_column.type), literal(row_id, id_column.type))
+        ordered = ordered.where(key < bound if descending else key > bound)
+        skip = 0
+    else:
+        ordered = ordered.offset(skip)
+
+    rows = (await db.execute(ordered.limit(limit + 1))).scalars().all()
+    has_more = len(rows) > limit
+    items = list(rows[:limit])
+
+    next_cursor = None
+    if has_more and items:
+        last = items[-1]
+        sort_value = getattr(last, sort_column.key)
+        if sort_value is not None:
+            next_cursor = encode_cursor(sort_value, getattr(last, id_column.key))
+
+    return Page(
+        items=items,
+        skip=skip,
+        limit=limit,
+        total=total,
+        total_is_estimate=is_estimate,
+        next_cursor=next_cursor,
+        has_more=has_more
+    )
@@ -273,8 +273,15 @@ class Lease(LeaseBase):
 # LIST RESPONSE SCHEMAS
 # ============================================================================
 
-class PropertyList(BaseModel):
-    total: int
+class PageInfo(BaseModel):
+    """Keyset paging fields shared by list responses (see api.pagination)"""
+    total: Optional[int] = None  # None when count=none
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
+
+class PropertyList(PageInfo):
     items: List[Property]
 
 
@@ -307,10 +314,9 @@ class TenantResponse(Tenant):
     pass
 
 
-class TenantListResponse(BaseModel):
+class TenantListResponse(PageInfo):
     """Paginated tenant list response"""
     items: List[Tenant]
-    total: int
     skip: int
     limit: int
 
@@ -320,10 +326,9 @@ class LeaseResponse(Lease):
     pass
 
 
-class LeaseListResponse(BaseModel):
+class LeaseListResponse(PageInfo):
     """Paginated lease list response"""
     items: List[Lease]
-    total: int
     skip: int
     limit: int
 
@@ -389,10 +394,9 @@ class RentPaymentResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
-class RentPaymentListResponse(BaseModel):
+class RentPaymentListResponse(PageInfo):
     """Paginated rent payment list response"""
     items: List[RentPaymentResponse]
-    total: int
     skip: int
     limit: int
 
@@ -508,10 +512,9 @@ class WorkOrderResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
-class WorkOrderListResponse(BaseModel):
+class WorkOrderListResponse(PageInfo):
     """Paginated work order list response"""
     items: List[WorkOrderResponse]
-    total: int
     skip: int
     limit: int
 
@@ -345,9 +345,12 @@ class VendorPricingListResponse(BaseModel):
 
 class QuoteListResponse(BaseModel):
     items: List[Quote]
-    total: int
+    total: Optional[int] = None
     skip: int
     limit: int
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
+    has_more: bool = False
 
 
 # ============================================================================
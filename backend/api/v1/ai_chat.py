@@ -3,20 +3,24 @@ AI Chat API Endpoints
 Property Manager & Tenant interaction with Somni AI Assistant
 """
 
+import asyncio
+import json
 import logging
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
-from typing import Optional, List
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, List
 from uuid import UUID, uuid4
 from pydantic import BaseModel, Field
 from datetime import datetime
 
-from db.database import get_db
+from db.database import get_db, AsyncSessionLocal
 
 logger = logging.getLogger(__name__)
 from db.models import AIConversation, AIMessage, Tenant
-from core.auth import get_auth_user, AuthUser
+from core.auth import get_auth_user, get_tenant_identity, auth_user_for_session, AuthUser
+from core.websocket_auth import get_ws_auth_manager, WebSocketAuthManager
 from services.ai_assistant import ai_assistant
 from services.property_manager_ai import property_manager_ai
 from services.mcp_powered_ai import mcp_powered_ai
@@ -45,6 +49,7 @@ class ChatResponse(BaseModel):
     actions: list
     suggestions: list
     timestamp: datetime
+    metadata: Optional[dict] = None  # Per-turn latency breakdown (MCP-powered chat)
 
 
 class ConversationStart(BaseModel):
@@ -54,6 +59,160 @@ class ConversationStart(BaseModel):
     channel: str = "web"
 
 
+# ============================================================================
+# CHAT TURN HELPERS
+# ============================================================================
+
+TokenCallback = Callable[[str], Awaitable[None]]
+
+
+async def _authorized_tenant_id(
+    user_type: str,
+    auth_user: AuthUser,
+    db: AsyncSession,
+    tenant_id: Optional[str] = None,
+    conversation_id: Optional[str] = None
+) -> Optional[str]:
+    """
+    Tenant the caller may chat as (raises 403 otherwise)
+
+    Manager/admin chat runs tools over every tenant's data, so it needs a
+    manager. Tenants always chat as themselves, and only in their own
+    conversations.
+    """
+    if user_type in ("manager", "admin"):
+        if not auth_user.is_manager:
+            raise HTTPException(status_code=403, detail="Manager access required")
+        return tenant_id
+    if auth_user.is_manager:
+        return tenant_id
+
+    tenant = await get_tenant_identity(db, auth_user.username)
+    if not tenant or (tenant_id and tenant_id != str(tenant.tenant_id)):
+        raise HTTPException(status_code=403, detail="Access denied")
+    if conversation_id and not await _owns_conversation(db, conversation_id, tenant.tenant_id):
+        raise HTTPException(status_code=403, detail="Access denied")
+    return str(tenant.tenant_id)
+
+
+async def _owns_conversation(db: AsyncSession, conversation_id: str, tenant_id) -> bool:
+    try:
+        conversation_uuid = UUID(str(conversation_id))
+    except ValueError:
+        return False
+    result = await db.execute(
+        select(AIConversation.tenant_id).where(AIConversation.id == conversation_uuid)
+    )
+    owner = result.scalar_one_or_none()
+    return owner is not None and str(owner) == str(tenant_id)
+
+
+async def _authorize_chat(request: ChatRequest, user_type: str, auth_user: AuthUser, db: AsyncSession):
+    """Check the caller may chat as `user_type`; request.tenant_id is pinned for tenants"""
+    request.tenant_id = await _authorized_tenant_id(
+        user_type, auth_user, db, request.tenant_id, request.conversation_id
+    )
+
+
+async def _get_or_create_conversation(request: ChatRequest, user_type: str, db: AsyncSession) -> str:
+    """Return the request's conversation id, creating the conversation if none was given"""
+    if request.conversation_id:
+        return request.conversation_id
+
+    conversation = AIConversation(
+        id=str(uuid4()),
+        tenant_id=request.tenant_id if user_type == "tenant" else None,
+        channel=request.channel,
+        status="active",
+        user_type=user_type,
+        started_at=datetime.now()
+    )
+    db.add(conversation)
+    await db.flush()
+    return str(conversation.id)
+
+
+async def _run_chat_turn(
+    request: ChatRequest,
+    conversation_id: str,
+    user_type: str,
+    model: str,
+    db: AsyncSession,
+    auth_user: AuthUser,
+    on_token: Optional[TokenCallback] = None
+) -> Dict[str, Any]:
+    """Route one message to the assistant for this user type"""
+    if user_type == "manager":
+        # Use MCP-powered AI with tool execution capabilities
+        context = request.context or {}
+        # Pass model selection to MCP AI
+        context['model'] = model
+        return await mcp_powered_ai.chat_with_tools(
+            message=request.message,
+            conversation_id=conversation_id,
+            context=context,
+            db=db,
+            on_token=on_token,
+            auth_user=auth_user
+        )
+
+    # Use tenant AI
+    return await ai_assistant.chat(
+        message=request.message,
+        conversation_id=conversation_id,
+        tenant_id=request.tenant_id,
+        db=db,
+        on_token=on_token
+    )
+
+
+def _message_event(conversation_id: str, ai_response: Dict[str, Any]) -> Dict[str, Any]:
+    """Final event of a streamed turn (same fields as ChatResponse)"""
+    event = {
+        "type": "message",
+        "message_id": str(uuid4()),
+        "conversation_id": conversation_id,
+        "response": ai_response["response"],
+        "intent": ai_response.get("intent"),
+        "confidence": ai_response.get("confidence"),
+        "actions": ai_response.get("actions", []),
+        "suggestions": ai_response.get("suggestions", []),
+        "timestamp": datetime.now().isoformat(),
+        "metadata": ai_response.get("metadata")
+    }
+    if ai_response.get("error_type"):
+        event["error_type"] = ai_response["error_type"]
+    return event
+
+
+async def _stream_chat_turn(
+    run: Callable[[TokenCallback], Awaitable[Dict[str, Any]]]
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run a chat turn and yield {"type": "token"} events as the model generates
+    text, followed by the turn's complete response
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def on_token(chunk: str):
+        await queue.put(chunk)
+
+    task = asyncio.create_task(run(on_token))
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+    try:
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                break
+            yield {"type": "token", "content": chunk}
+        yield {"type": "response", "response": task.result()}
+    finally:
+        if not task.done():
+            # Client went away mid-stream
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
 # ============================================================================
 # REST API ENDPOINTS
 # ============================================================================
@@ -63,50 +222,17 @@ async def send_message(
     request: ChatRequest,
     user_type: str = Query("manager", description="User type: manager, tenant, admin"),
     model: str = Query("auto", description="AI model to use: auto, anthropic, openai, ollama"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    auth_user: AuthUser = Depends(get_auth_user)
 ):
     """
     Send message to AI assistant and get response
     Supports both property managers and tenants
     """
+    await _authorize_chat(request, user_type, auth_user, db)
     try:
-        # Create or get conversation
-        if request.conversation_id:
-            conversation_id = request.conversation_id
-        else:
-            # Create new conversation
-            conversation = AIConversation(
-                id=str(uuid4()),
-                tenant_id=request.tenant_id if user_type == "tenant" else None,
-                channel=request.channel,
-                status="active",
-                user_type=user_type,
-                started_at=datetime.now()
-            )
-            db.add(conversation)
-            await db.flush()
-            conversation_id = str(conversation.id)
-
-        # Choose appropriate AI assistant based on user type
-        if user_type == "manager":
-            # Use MCP-powered AI with tool execution capabilities
-            context = request.context if hasattr(request, 'context') else {}
-            # Pass model selection to MCP AI
-            context['model'] = model
-            ai_response = await mcp_powered_ai.chat_with_tools(
-                message=request.message,
-                conversation_id=conversation_id,
-                context=context,
-                db=db
-            )
-        else:
-            # Use tenant AI
-            ai_response = await ai_assistant.chat(
-                message=request.message,
-                conversation_id=conversation_id,
-                tenant_id=request.tenant_id,
-                db=db
-            )
+        conversation_id = await _get_or_create_conversation(request, user_type, db)
+        ai_response = await _run_chat_turn(request, conversation_id, user_type, model, db, auth_user)
 
         # Generate message_id for this response
         message_id = str(uuid4())
@@ -119,13 +245,56 @@ async def send_message(
             confidence=ai_response.get("confidence"),
             actions=ai_response.get("actions", []),
             suggestions=ai_response.get("suggestions", []),
-            timestamp=datetime.now()
+            timestamp=datetime.now(),
+            metadata=ai_response.get("metadata")
         )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chat error: {str(e)}")
 
 
+@router.post("/chat/stream")
+async def stream_message(
+    request: ChatRequest,
+    user_type: str = Query("manager", description="User type: manager, tenant, admin"),
+    model: str = Query("auto", description="AI model to use: auto, anthropic, openai, ollama"),
+    db: AsyncSession = Depends(get_db),
+    auth_user: AuthUser = Depends(get_auth_user)
+):
+    """
+    Send message to AI assistant and stream the response (Server-Sent Events)
+
+    Emits `{"type": "token", "content": ...}` events while the model
+    generates, then one `{"type": "message", ...}` event with the complete
+    response (same fields as POST /chat), or `{"type": "error", ...}`.
+    """
+    # Authorize up front so a refused caller gets a 403, not an error event
+    await _authorize_chat(request, user_type, auth_user, db)
+
+    async def events() -> AsyncIterator[str]:
+        # The session lives for the whole stream, not just the handler call
+        async with AsyncSessionLocal() as db:
+            try:
+                conversation_id = await _get_or_create_conversation(request, user_type, db)
+                async for event in _stream_chat_turn(
+                    lambda on_token: _run_chat_turn(request, conversation_id, user_type, model, db, auth_user, on_token)
+                ):
+                    if event["type"] == "response":
+                        await db.commit()
+                        event = _message_event(conversation_id, event["response"])
+                    yield f"data: {json.dumps(event, default=str)}\n\n"
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"Chat stream error: {e}", exc_info=True)
+                yield f"data: {json.dumps({'type': 'error', 'error': f'Chat error: {str(e)}'})}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/conversations/start")
 async def start_conversation(
     request: ConversationStart,
@@ -133,10 +302,11 @@ async def start_conversation(
     auth_user: AuthUser = Depends(get_auth_user)
 ):
     """
-    Start a new AI conversation
+    Start a new AI conversation (tenants always start their own)
     """
+    tenant_id = await _authorized_tenant_id("tenant", auth_user, db, request.tenant_id)
     conversation = AIConversation(
-        tenant_id=request.tenant_id,
+        tenant_id=tenant_id,
         unit_id=request.unit_id,
         conversation_type=request.conversation_type,
         channel=request.channel,
@@ -410,13 +580,37 @@ async def provide_feedback(
 async def websocket_chat(
     websocket: WebSocket,
     conversation_id: str,
-    tenant_id: Optional[str] = None
+    token: Optional[str] = Query(None),
+    tenant_id: Optional[str] = None,
+    ws_auth: WebSocketAuthManager = Depends(get_ws_auth_manager)
 ):
     """
     WebSocket endpoint for real-time chat
+
+    Connect with a token from POST /api/v1/ws/token: /ws/{conversation_id}?token=...
+    Tenants chat as themselves in their own conversations; only managers may
+    pass tenant_id for another tenant. The socket is closed with 4401 for a
+    missing or expired token and 4403 when the conversation is not the caller's.
+
+    Response text is forwarded as `{"type": "token"}` frames while it is
+    generated, followed by the complete `{"type": "message"}` frame. Send
+    `"stream": false` with a message to receive only the final frame.
     """
     await websocket.accept()
 
+    session = await ws_auth.validate_token(token)
+    if not session:
+        await websocket.close(code=4401, reason="Invalid or expired token")
+        return
+
+    auth_user = auth_user_for_session(session.username, session.email, session.groups)
+    try:
+        async with AsyncSessionLocal() as db:
+            tenant_id = await _authorized_tenant_id("tenant", auth_user, db, tenant_id, conversation_id)
+    except HTTPException as e:
+        await websocket.close(code=4403, reason=e.detail)
+        return
+
     try:
         while True:
             # Receive message from client
@@ -430,12 +624,28 @@ async def websocket_chat(
             async for db in get_db():
                 try:
                     # Process with AI
-                    ai_response = await ai_assistant.chat(
-                        message=message,
-                        conversation_id=conversation_id,
-                        tenant_id=tenant_id,
-                        db=db
-                    )
+                    if data.get("stream", True):
+                        ai_response = None
+                        async for event in _stream_chat_turn(
+                            lambda on_token: ai_assistant.chat(
+                                message=message,
+                                conversation_id=conversation_id,
+                                tenant_id=tenant_id,
+                                db=db,
+                                on_token=on_token
+                            )
+                        ):
+                            if event["type"] == "token":
+                                await websocket.send_json(event)
+                            else:
+                                ai_response = event["response"]
+                    else:
+                        ai_response = await ai_assistant.chat(
+                            message=message,
+                            conversation_id=conversation_id,
+                            tenant_id=tenant_id,
+                            db=db
+                        )
 
                     # Send response back to client
                     await websocket.send_json({
@@ -444,7 +654,8 @@ async def websocket_chat(
                         "intent": ai_response.get("intent"),
                         "actions": ai_response.get("actions", []),
                         "suggestions": ai_response.get("suggestions", []),
-                        "timestamp": datetime.now().isoformat()
+                        "timestamp": datetime.now().isoformat(),
+                        "metadata": ai_response.get("metadata")
                     })
 
                 except Exception as e:
@@ -11,7 +11,7 @@ from datetime import datetime, timedelta, date
 from decimal import Decimal
 import logging
 
-from db.database import get_db
+from db.database import get_read_db
 from db.family_models import (
     FamilySubscription,
     FamilyBilling,
@@ -26,7 +26,7 @@ logger = logging.getLogger(__name__)
 
 @router.get("/analytics/mrr")
 async def get_mrr_metrics(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ) -> Dict[str, Any]:
     """
     Get Monthly Recurring Revenue (MRR) metrics
@@ -175,7 +175,7 @@ async def get_mrr_metrics(
 
 @router.get("/analytics/subscriptions")
 async def get_subscription_breakdown(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ) -> Dict[str, Any]:
     """
     Get subscription breakdown metrics
@@ -263,7 +263,7 @@ async def get_subscription_breakdown(
 
 @router.get("/analytics/churn")
 async def get_churn_metrics(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ) -> Dict[str, Any]:
     """
     Get churn rate and retention metrics
@@ -372,7 +372,7 @@ async def get_churn_metrics(
 
 @router.get("/analytics/revenue")
 async def get_revenue_metrics(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     start_date: Optional[str] = None,
     end_date: Optional[str] = None
 ) -> Dict[str, Any]:
@@ -474,7 +474,7 @@ async def get_revenue_metrics(
 
 @router.get("/analytics/summary")
 async def get_analytics_summary(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ) -> Dict[str, Any]:
     """
     Get comprehensive analytics summary for dashboard
@@ -12,11 +12,18 @@ from uuid import UUID
 from db.database import get_db
 from db.models import Building as BuildingModel, Property as PropertyModel
 from api.schemas import Building, BuildingCreate, BuildingUpdate, BuildingList
+from api.conditional import conditional
 from core.auth import AuthUser, require_admin, require_manager
+from services.cache_service import cached
 
 router = APIRouter()
 
 
+def building_filters(property_id: Optional[UUID]) -> list:
+    """Filter clauses for list_buildings (shared with its ETag)"""
+    return [BuildingModel.property_id == property_id] if property_id else []
+
+
 @router.post("", response_model=Building, status_code=201)
 async def create_building(
     building_data: BuildingCreate,
@@ -38,6 +45,8 @@ async def create_building(
 
 
 @router.get("", response_model=BuildingList)
+@conditional(BuildingModel, where=lambda args: building_filters(args.get("property_id")))
+@cached("property_lookups", tags=("buildings",), model=BuildingList)
 async def list_buildings(
     property_id: Optional[UUID] = Query(None, description="Filter by property ID"),
     skip: int = Query(0, ge=0),
@@ -47,12 +56,9 @@ async def list_buildings(
 ):
     """List all buildings with optional property filter (Admin/Manager only)"""
     # Build query
-    query = select(BuildingModel)
-    count_query = select(func.count()).select_from(BuildingModel)
-
-    if property_id:
-        query = query.where(BuildingModel.property_id == property_id)
-        count_query = count_query.where(BuildingModel.property_id == property_id)
+    filters = building_filters(property_id)
+    query = select(BuildingModel).where(*filters)
+    count_query = select(func.count()).select_from(BuildingModel).where(*filters)
 
     # Get total count
     total_result = await db.execute(count_query)
@@ -67,6 +73,8 @@ async def list_buildings(
 
 
 @router.get("/{building_id}", response_model=Building)
+@conditional(BuildingModel, key="building_id")
+@cached("property_lookups", tags=("buildings",), model=Building)
 async def get_building(
     building_id: UUID,
     db: AsyncSession = Depends(get_db),
@@ -16,6 +16,7 @@ from api.schemas import (
 )
 from core.auth import AuthUser, require_admin, require_manager
 from services.client_media_service import get_client_media_service
+from services.search_service import text_search_clause
 
 router = APIRouter()
 
@@ -61,13 +62,12 @@ async def list_clients(
 
     # Text search across name, email, company, phone
     if search:
-        search_pattern = f"%{search}%"
-        query = query.where(
-            (ClientModel.name.ilike(search_pattern)) |
-            (ClientModel.email.ilike(search_pattern)) |
-            (ClientModel.primary_contact_name.ilike(search_pattern)) |
-            (ClientModel.phone.ilike(search_pattern))
+        clause = text_search_clause(
+            [ClientModel.name, ClientModel.email, ClientModel.primary_contact_name, ClientModel.phone],
+            search
         )
+        if clause is not None:
+            query = query.where(clause)
 
     if tier:
         query = query.where(ClientModel.tier == tier)
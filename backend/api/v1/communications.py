@@ -494,6 +494,12 @@ async def get_analytics_summary(
     }
 
 
+@router.get("/analytics/triage", response_model=dict)
+async def get_triage_stats():
+    """Per-stage throughput of the email/SMS triage pipeline"""
+    return agentic_responder.triage.get_stats()
+
+
 @router.get("/log", response_model=List[dict])
 async def get_communications_log(
     client_id: Optional[str] = None,
@@ -13,7 +13,7 @@ from datetime import datetime
 
 from db.database import get_db
 from db.models import ComponentSync, PropertyEdgeNode
-from services.git_service import GitService
+from services.git_service import get_git_service, get_catalog_refresher
 from services.component_sync_service import ComponentSyncService
 from services.gitops_orchestration_service import GitOpsOrchestrationService
 from core.auth import AuthUser, require_admin
@@ -149,6 +149,165 @@ class ComponentCatalogItem(BaseModel):
     min_ha_version: Optional[str] = None
 
 
+# ============================================================================
+# BUILT-IN CATALOGS
+# ============================================================================
+# Served until the corresponding Git repository has been cloned and indexed.
+# These match the frontend ComponentInfo TypeScript interface.
+
+_FALLBACK_COMPONENTS = [
+    ComponentInfo(
+        name="somni_property_sync",
+        path="/custom_components/somni_property_sync",
+        type="component",
+        version="2.1.0",
+        description="Sync Home Assistant devices/automations with SomniProperty platform"
+    ),
+    ComponentInfo(
+        name="somni_lights",
+        path="/custom_components/somni_lights",
+        type="component",
+        version="1.8.0",
+        description="Advanced lighting control with occupancy sensing and circadian rhythm"
+    ),
+    ComponentInfo(
+        name="somni_occupancy",
+        path="/custom_components/somni_occupancy",
+        type="component",
+        version="1.5.2",
+        description="Multi-sensor occupancy detection with ML-based presence prediction"
+    ),
+    ComponentInfo(
+        name="somni_access",
+        path="/custom_components/somni_access",
+        type="component",
+        version="2.0.0",
+        description="Smart lock and access control management"
+    ),
+    ComponentInfo(
+        name="somni_security",
+        path="/custom_components/somni_security",
+        type="component",
+        version="1.9.5",
+        description="Comprehensive security system integration"
+    ),
+    ComponentInfo(
+        name="somni_climate",
+        path="/custom_components/somni_climate",
+        type="component",
+        version="1.7.0",
+        description="Intelligent HVAC control with energy optimization"
+    ),
+    ComponentInfo(
+        name="somni_maintenance",
+        path="/custom_components/somni_maintenance",
+        type="component",
+        version="1.4.0",
+        description="Predictive maintenance and device health monitoring"
+    ),
+    ComponentInfo(
+        name="somni_alerts",
+        path="/custom_components/somni_alerts",
+        type="component",
+        version="1.6.1",
+        description="Advanced alerting and notification system"
+    ),
+    ComponentInfo(
+        name="somni_energy",
+        path="/custom_components/somni_energy",
+        type="component",
+        version="0.9.0",
+        description="Real-time energy monitoring and cost optimization (Beta)"
+    ),
+    ComponentInfo(
+        name="somni_water",
+        path="/custom_components/somni_water",
+        type="component",
+        version="0.8.5",
+        description="Water leak detection and consumption monitoring (Beta)"
+    ),
+    ComponentInfo(
+        name="somni_voice",
+        path="/custom_components/somni_voice",
+        type="component",
+        version="1.3.0",
+        description="Wyoming Protocol voice assistant integration"
+    ),
+    ComponentInfo(
+        name="somni_lease_automation",
+        path="/custom_components/somni_lease_automation",
+        type="component",
+        version="0.7.0",
+        description="Automate smart home setup based on lease lifecycle (Beta)"
+    ),
+]
+
+_FALLBACK_ADDONS = [
+    AddonInfo(
+        name="mosquitto",
+        path="/addons/mosquitto",
+        type="addon",
+        version="6.4.0",
+        description="MQTT broker for device communication"
+    ),
+    AddonInfo(
+        name="zigbee2mqtt",
+        path="/addons/zigbee2mqtt",
+        type="addon",
+        version="1.34.0",
+        description="Zigbee to MQTT bridge for smart devices"
+    ),
+    AddonInfo(
+        name="node-red",
+        path="/addons/node-red",
+        type="addon",
+        version="16.2.1",
+        description="Flow-based automation and integration platform"
+    ),
+    AddonInfo(
+        name="vscode",
+        path="/addons/vscode",
+        type="addon",
+        version="5.13.1",
+        description="Web-based code editor for HA configuration"
+    ),
+    AddonInfo(
+        name="file-editor",
+        path="/addons/file-editor",
+        type="addon",
+        version="5.8.0",
+        description="Simple file editor for HA configuration"
+    ),
+]
+
+_FALLBACK_CONFIGS = [
+    ConfigInfo(
+        name="multi_unit_property",
+        path="/configs/multi_unit_property.yaml",
+        type="config",
+        description="Standard configuration for multi-unit residential properties"
+    ),
+    ConfigInfo(
+        name="single_family",
+        path="/configs/single_family.yaml",
+        type="config",
+        description="Configuration template for single-family homes"
+    ),
+    ConfigInfo(
+        name="commercial_office",
+        path="/configs/commercial_office.yaml",
+        type="config",
+        description="Office building automation configuration"
+    ),
+    ConfigInfo(
+        name="vacation_rental",
+        path="/configs/vacation_rental.yaml",
+        type="config",
+        description="Short-term rental property configuration with turnover automation"
+    ),
+]
+
+
 # ============================================================================
 # API ENDPOINTS
 # ============================================================================
@@ -161,97 +320,25 @@ async def list_components(
     List all available Somni components.
     Admin only.
 
-    Returns hardcoded component catalog until Git repositories are configured.
+    Served from the in-memory Git catalog index (no filesystem walk or git
+    call on the request path). Returns the built-in catalog until the
+    components repository has been indexed.
     """
-    # Return hardcoded catalog of Somni components
-    # This matches the frontend ComponentInfo TypeScript interface
-    components = [
-        ComponentInfo(
-            name="somni_property_sync",
-            path="/custom_components/somni_property_sync",
-            type="component",
-            version="2.1.0",
-            description="Sync Home Assistant devices/automations with SomniProperty platform"
-        ),
-        ComponentInfo(
-            name="somni_lights",
-            path="/custom_components/somni_lights",
-            type="component",
-            version="1.8.0",
-            description="Advanced lighting control with occupancy sensing and circadian rhythm"
-        ),
-        ComponentInfo(
-            name="somni_occupancy",
-            path="/custom_components/somni_occupancy",
-            type="component",
-            version="1.5.2",
-            description="Multi-sensor occupancy detection with ML-based presence prediction"
-        ),
-        ComponentInfo(
-            name="somni_access",
-            path="/custom_components/somni_access",
-            type="component",
-            version="2.0.0",
-            description="Smart lock and access control management"
-        ),
-        ComponentInfo(
-            name="somni_security",
-            path="/custom_components/somni_security",
-            type="component",
-            version="1.9.5",
-            description="Comprehensive security system integration"
-        ),
-        ComponentInfo(
-            name="somni_climate",
-            path="/custom_components/somni_climate",
-            type="component",
-            version="1.7.0",
-            description="Intelligent HVAC control with energy optimization"
-        ),
-        ComponentInfo(
-            name="somni_maintenance",
-            path="/custom_components/somni_maintenance",
-            type="component",
-            version="1.4.0",
-            description="Predictive maintenance and device health monitoring"
-        ),
-        ComponentInfo(
-            name="somni_alerts",
-            path="/custom_components/somni_alerts",
-            type="component",
-            version="1.6.1",
-            description="Advanced alerting and notification system"
-        ),
-        ComponentInfo(
-            name="somni_energy",
-            path="/custom_components/somni_energy",
-            type="component",
-            version="0.9.0",
-            description="Real-time energy monitoring and cost optimization (Beta)"
-        ),
-        ComponentInfo(
-            name="somni_water",
-            path="/custom_components/somni_water",
-            type="component",
-            version="0.8.5",
-            description="Water leak detection and consumption monitoring (Beta)"
-        ),
-        ComponentInfo(
-            name="somni_voice",
-            path="/custom_components/somni_voice",
-            type="component",
-            version="1.3.0",
-            description="Wyoming Protocol voice assistant integration"
-        ),
+    catalog = get_git_service().get_cached_catalog("components")
+    if catalog is None:
+        return _FALLBACK_COMPONENTS
+
+    return [
         ComponentInfo(
-            name="somni_lease_automation",
-            path="/custom_components/somni_lease_automation",
+            name=entry["name"],
+            path=f"/{entry['path']}",
             type="component",
-            version="0.7.0",
-            description="Automate smart home setup based on lease lifecycle (Beta)"
-        ),
+            version=entry["info"].get("version"),
+            description=entry["info"].get("description"),
+            manifest=entry["manifest"]
+        )
+        for entry in catalog["entries"].values()
     ]
-    return components
 
 
 @router.get("/addons", response_model=List[AddonInfo])
@@ -262,48 +349,24 @@ async def list_addons(
     List all available Home Assistant add-ons.
     Admin only.
 
-    Returns hardcoded addon catalog until Git repositories are configured.
+    Served from the in-memory Git catalog index. Returns the built-in
+    catalog until the add-ons repository has been indexed.
     """
-    # Return catalog of common/useful Home Assistant add-ons
-    # This matches the frontend ComponentInfo TypeScript interface
-    addons = [
-        AddonInfo(
-            name="mosquitto",
-            path="/addons/mosquitto",
-            type="addon",
-            version="6.4.0",
-            description="MQTT broker for device communication"
-        ),
-        AddonInfo(
-            name="zigbee2mqtt",
-            path="/addons/zigbee2mqtt",
-            type="addon",
-            version="1.34.0",
-            description="Zigbee to MQTT bridge for smart devices"
-        ),
-        AddonInfo(
-            name="node-red",
-            path="/addons/node-red",
-            type="addon",
-            version="16.2.1",
-            description="Flow-based automation and integration platform"
-        ),
-        AddonInfo(
-            name="vscode",
-            path="/addons/vscode",
-            type="addon",
-            version="5.13.1",
-            description="Web-based code editor for HA configuration"
-        ),
+    catalog = get_git_service().get_cached_catalog("addons")
+    if catalog is None:
+        return _FALLBACK_ADDONS
+
+    return [
         AddonInfo(
-            name="file-editor",
-            path="/addons/file-editor",
+            name=entry["name"],
+            path=f"/{entry['path']}",
             type="addon",
-            version="5.8.0",
-            description="Simple file editor for HA configuration"
-        ),
+            version=entry["info"].get("version"),
+            description=entry["info"].get("description"),
+            manifest=entry["manifest"]
+        )
+        for entry in catalog["entries"].values()
     ]
-    return addons
 
 
 @router.get("/configs", response_model=List[ConfigInfo])
@@ -314,37 +377,22 @@ async def list_configs(
     List all available property configurations.
     Admin only.
 
-    Returns hardcoded config templates until Git repositories are configured.
+    Served from the in-memory Git catalog index. Returns the built-in
+    templates until the configs repository has been indexed.
     """
-    # Return catalog of common configuration templates
-    # This matches the frontend ComponentInfo TypeScript interface
-    configs = [
-        ConfigInfo(
-            name="multi_unit_property",
-            path="/configs/multi_unit_property.yaml",
-            type="config",
-            description="Standard configuration for multi-unit residential properties"
-        ),
-        ConfigInfo(
-            name="single_family",
-            path="/configs/single_family.yaml",
-            type="config",
-            description="Configuration template for single-family homes"
-        ),
-        ConfigInfo(
-            name="commercial_office",
-            path="/configs/commercial_office.yaml",
-            type="config",
-            description="Office building automation configuration"
-        ),
+    catalog = get_git_service().get_cached_catalog("configs")
+    if catalog is None:
+        return _FALLBACK_CONFIGS
+
+    return [
         ConfigInfo(
-            name="vacation_rental",
-            path="/configs/vacation_rental.yaml",
+            name=entry["name"],
+            path=f"/{entry['path']}",
             type="config",
-            description="Short-term rental property configuration with turnover automation"
-        ),
+            description=entry["info"].get("description")
+        )
+        for entry in catalog["entries"].values()
     ]
-    return configs
 
 
 @router.post("/refresh-repos")
@@ -355,10 +403,12 @@ async def refresh_repos(
     """
     Refresh Git repositories by pulling latest changes.
     Admin only.
+
+    Repositories whose remote SHA is unchanged are neither pulled nor
+    re-indexed. Git work runs in a worker thread.
     """
     try:
-        git_service = GitService()
-        results = git_service.refresh_all()
+        results = await get_catalog_refresher().refresh_now(request.repos)
         return {
             "status": "completed",
             "results": results,
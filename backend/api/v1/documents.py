@@ -20,6 +20,7 @@ from core.auth import get_auth_user, require_manager, AuthUser
 from services.docuseal_client import docuseal_client, get_docuseal_client, DocuSealClient
 from services.minio_client import minio_client, get_minio_client, MinIOClient
 from services.paperless_client import get_paperless_client, PaperlessClient
+from services.document_vector_index import document_vector_index
 from services.websocket_manager import manager as ws_manager
 from core.config import settings
 
@@ -452,6 +453,49 @@ async def list_documents(
     }
 
 
+@router.get("/documents/semantic-search")
+async def semantic_search_documents(
+    query: str = Query(..., min_length=2, description="Natural-language query"),
+    k: int = Query(5, ge=1, le=50, description="Number of documents to return"),
+    document_type: Optional[str] = Query(None, description="Filter by document type"),
+    lease_id: Optional[UUID] = Query(None, description="Filter by lease ID"),
+    tenant_id: Optional[UUID] = Query(None, description="Filter by tenant ID"),
+    property_id: Optional[UUID] = Query(None, description="Filter by property ID"),
+    work_order_id: Optional[UUID] = Query(None, description="Filter by work order ID"),
+    auth_user: AuthUser = Depends(require_manager)
+):
+    """
+    Semantic search over document metadata and OCR text (Admin/Manager only)
+
+    Served from the local vector index; Paperless is not called. Documents
+    appear once the background indexer has embedded them.
+    """
+    results = await document_vector_index.search(
+        query, k,
+        document_type=document_type, lease_id=lease_id, tenant_id=tenant_id,
+        property_id=property_id, work_order_id=work_order_id
+    )
+    if results is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Embedding service unavailable"
+        )
+
+    return {
+        "query": query,
+        "total": len(results),
+        "results": results
+    }
+
+
+@router.get("/documents/semantic-index/status")
+async def get_semantic_index_status(
+    auth_user: AuthUser = Depends(require_manager)
+):
+    """Document vector index size and indexing counters (Admin/Manager only)"""
+    return document_vector_index.get_stats()
+
+
 @router.get("/documents/{document_id}")
 async def get_document(
     document_id: UUID,
@@ -578,6 +622,8 @@ async def upload_document(
         except Exception as e:
             logger.warning(f"Failed to send document to Paperless (non-fatal): {e}")
 
+    document_vector_index.notify()
+
     return {
         "document_id": str(document.id),
         "title": document.title,
@@ -669,6 +715,7 @@ async def delete_document(
     await db.commit()
 
     logger.info(f"Deleted document: {document_id}")
+    document_vector_index.notify()
 
     return {"message": "Document deleted successfully"}
 
@@ -827,6 +874,7 @@ async def send_document_to_paperless(
     await db.commit()
 
     logger.info(f"Manually sent document {document_id} to Paperless")
+    document_vector_index.notify()
 
     return {
         "message": "Document sent to Paperless successfully",
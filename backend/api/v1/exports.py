@@ -0,0 +1,205 @@
+"""
+Somni Property Manager - Bulk Export API
+Streaming NDJSON/CSV exports of portfolio data with column projection
+
+Filters mirror the matching list endpoints; rows stream from a server-side
+cursor, so there is no page limit and memory use does not grow with size.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from typing import Optional
+from uuid import UUID
+from datetime import date, datetime
+
+from db.models import Tenant, Lease, RentPayment, WorkOrder, SensorReading, Unit, Building, Property
+from services.export_service import MEDIA_TYPES, ExportError, export_columns, stream_export
+from services.search_service import text_search_clause
+from core.auth import AuthUser, require_manager
+
+router = APIRouter()
+
+# Never exported, even when requested by name
+TENANT_EXCLUDED_FIELDS = ("auth_user_id",)
+
+# Personal data left out of default exports; only exported when listed in `fields`
+TENANT_SENSITIVE_FIELDS = (
+    "date_of_birth",
+    "annual_income",
+    "employer",
+    "employment_status",
+    "emergency_contact_name",
+    "emergency_contact_phone",
+    "emergency_contact_relationship",
+    "notes",
+)
+
+
+class ExportOptions:
+    """Format, compression and projection parameters shared by exports"""
+
+    def __init__(
+        self,
+        format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+        gzip: bool = Query(False, description="gzip the stream"),
+        fields: Optional[str] = Query(
+            None, description="Comma-separated columns to export (default: all but sensitive columns)"
+        )
+    ):
+        self.format = format
+        self.gzip = gzip
+        self.fields = fields
+
+
+def _export(name: str, model, query, options: ExportOptions, exclude=(), opt_in=()) -> StreamingResponse:
+    try:
+        columns = export_columns(model, options.fields, exclude=exclude, opt_in=opt_in)
+    except ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    filename = f"{name}-{datetime.utcnow():%Y%m%d-%H%M%S}.{options.format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}{".gz" if options.gzip else ""}"'}
+    media_type = MEDIA_TYPES[options.format]
+    if options.gzip:
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        stream_export(query, columns, options.format, compress=options.gzip),
+        media_type=media_type,
+        headers=headers
+    )
+
+
+# ============================================================================
+# EXPORT ENDPOINTS
+# ============================================================================
+
+@router.get("/tenants")
+async def export_tenants(
+    status_filter: Optional[str] = Query(None, description="Filter by status: active, former, applicant"),
+    search: Optional[str] = Query(None, description="Search by name or email"),
+    options: ExportOptions = Depends(),
+    auth_user: AuthUser = Depends(require_manager)
+):
+    """Export tenants (Admin/Manager only)"""
+    query = select(Tenant).order_by(Tenant.created_at.desc(), Tenant.id.desc())
+    if status_filter:
+        query = query.where(Tenant.status == status_filter)
+    if search:
+        clause = text_search_clause([Tenant.first_name, Tenant.last_name, Tenant.email], search)
+        if clause is not None:
+            query = query.where(clause)
+    return _export("tenants", Tenant, query, options,
+                   exclude=TENANT_EXCLUDED_FIELDS, opt_in=TENANT_SENSITIVE_FIELDS)
+
+
+@router.get("/leases")
+async def export_leases(
+    status_filter: Optional[str] = Query(None, description="Filter by status: draft, active, expired, terminated"),
+    unit_id: Optional[UUID] = Query(None),
+    tenant_id: Optional[UUID] = Query(None),
+    building_id: Optional[UUID] = Query(None),
+    client_id: Optional[UUID] = Query(None),
+    active_only: bool = Query(False),
+    options: ExportOptions = Depends(),
+    auth_user: AuthUser = Depends(require_manager)
+):
+    """Export leases (Admin/Manager only)"""
+    query = select(Lease).order_by(Lease.start_date.desc(), Lease.id.desc())
+    if status_filter:
+        query = query.where(Lease.status == status_filter)
+    if unit_id:
+        query = query.where(Lease.unit_id == unit_id)
+    if tenant_id:
+        query = query.where(Lease.tenant_id == tenant_id)
+    if building_id:
+        query = query.where(Lease.building_id == building_id)
+    if client_id:
+        query = query.where(Lease.client_id == client_id)
+    if active_only:
+        query = query.where(Lease.status == "active")
+    return _export("leases", Lease, query, options)
+
+
+@router.get("/payments")
+async def export_payments(
+    lease_id: Optional[UUID] = None,
+    status: Optional[str] = None,
+    due_after: Optional[date] = None,
+    due_before: Optional[date] = None,
+    building_id: Optional[UUID] = Query(None, description="Filter by building ID"),
+    client_id: Optional[UUID] = Query(None, description="Filter by client ID"),
+    options: ExportOptions = Depends(),
+    auth_user: AuthUser = Depends(require_manager)
+):
+    """Export rent payments (Admin/Manager only)"""
+    query = select(RentPayment).order_by(RentPayment.due_date.desc(), RentPayment.id.desc())
+    if lease_id:
+        query = query.where(RentPayment.lease_id == lease_id)
+    if status:
+        query = query.where(RentPayment.status == status)
+    if due_after:
+        query = query.where(RentPayment.due_date >= due_after)
+    if due_before:
+        query = query.where(RentPayment.due_date <= due_before)
+    if building_id or client_id:
+        query = query.join(Unit, RentPayment.unit_id == Unit.id)
+    if building_id:
+        query = query.where(Unit.building_id == building_id)
+    if client_id:
+        query = (query
+            .join(Building, Unit.building_id == Building.id)
+            .join(Property, Building.property_id == Property.id)
+            .where(Property.client_id == client_id))
+    return _export("payments", RentPayment, query, options)
+
+
+@router.get("/work-orders")
+async def export_work_orders(
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    category: Optional[str] = None,
+    unit_id: Optional[UUID] = None,
+    building_id: Optional[UUID] = None,
+    assigned_to: Optional[str] = None,
+    options: ExportOptions = Depends(),
+    auth_user: AuthUser = Depends(require_manager)
+):
+    """Export work orders (Admin/Manager only)"""
+    query = select(WorkOrder).order_by(WorkOrder.created_at.desc(), WorkOrder.id.desc())
+    if status:
+        query = query.where(WorkOrder.status == status)
+    if priority:
+        query = query.where(WorkOrder.priority == priority)
+    if category:
+        query = query.where(WorkOrder.category == category)
+    if unit_id:
+        query = query.where(WorkOrder.unit_id == unit_id)
+    if building_id:
+        query = query.where(WorkOrder.building_id == building_id)
+    if assigned_to:
+        query = query.where(WorkOrder.assigned_to == assigned_to)
+    return _export("work-orders", WorkOrder, query, options)
+
+
+@router.get("/sensor-readings")
+async def export_sensor_readings(
+    device_id: Optional[UUID] = None,
+    metric: Optional[str] = None,
+    since: Optional[datetime] = Query(None, description="Readings at or after this time"),
+    until: Optional[datetime] = Query(None, description="Readings before this time"),
+    options: ExportOptions = Depends(),
+    auth_user: AuthUser = Depends(require_manager)
+):
+    """Export sensor history, oldest first (Admin/Manager only)"""
+    query = select(SensorReading).order_by(SensorReading.timestamp.asc(), SensorReading.id.asc())
+    if device_id:
+        query = query.where(SensorReading.device_id == device_id)
+    if metric:
+        query = query.where(SensorReading.metric == metric)
+    if since:
+        query = query.where(SensorReading.timestamp >= since)
+    if until:
+        query = query.where(SensorReading.timestamp < until)
+    return _export("sensor-readings", SensorReading, query, options)
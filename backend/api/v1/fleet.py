@@ -12,7 +12,7 @@ from pydantic import BaseModel, Field
 
 from db.database import get_db
 from db.models import PropertyEdgeNode as EdgeNodeModel, FleetDeployment as FleetDeploymentModel
-from services.fleet_deployment_service import fleet_deployment_service
+from services.fleet_deployment_service import fleet_deployment_service, RolloutPolicy
 from core.auth import AuthUser, require_admin
 from core.security.rbac import require_permission, require_role, Role
 
@@ -33,6 +33,14 @@ class DeploymentRequest(BaseModel):
     )
     service_package_id: UUID = Field(..., description="UUID of the ServicePackage to deploy")
     manifest_version: str = Field(..., description="Git commit SHA or version tag")
+    batch_size: int = Field(10, ge=1, le=500, description="Hubs per wave after the canary wave")
+    max_parallel: int = Field(5, ge=1, le=100, description="Maximum concurrent hub deployments")
+    canary_count: int = Field(1, ge=0, le=50, description="Hubs deployed alone in the canary wave")
+    failure_threshold: float = Field(
+        0.2, ge=0.0, le=1.0,
+        description="Halt the rollout when the failure ratio exceeds this value"
+    )
+    rollback_on_halt: bool = Field(True, description="Roll back already-updated hubs when the rollout halts")
 
 
 class DeploymentResponse(BaseModel):
@@ -49,6 +57,13 @@ class BulkDeploymentResponse(BaseModel):
     successful: int = Field(..., description="Number of successful deployments")
     failed: int = Field(..., description="Number of failed deployments")
     deployments: List[dict] = Field(..., description="Individual deployment results")
+    rollout_id: Optional[str] = Field(None, description="Rollout identifier used in WebSocket progress events")
+    skipped: int = Field(0, description="Hubs not attempted because the rollout halted")
+    rolled_back: int = Field(0, description="Hubs rolled back after the rollout halted")
+    halted: bool = Field(False, description="Whether the rollout was halted early")
+    halt_reason: Optional[str] = Field(None, description="Why the rollout was halted")
+    waves_completed: int = Field(0, description="Number of waves that ran")
+    total_waves: int = Field(0, description="Number of planned waves")
 
 
 class FleetDeployment(BaseModel):
@@ -147,6 +162,12 @@ async def deploy_to_fleet(
     - Single hub deployments (hub_filter='custom', hub_ids=[uuid])
     - Tier-based bulk deployments (hub_filter='all_tier_2'|'all_tier_3'|'all')
 
+    Rollout:
+    - A canary wave of `canary_count` hubs runs first; any canary failure halts
+    - Remaining hubs deploy in waves of `batch_size`, at most `max_parallel` at once
+    - The rollout halts once the failure ratio exceeds `failure_threshold`
+    - Progress events are broadcast to the `fleet:rollouts` WebSocket room
+
     Process:
     1. Fetch service package manifest definition
     2. Get hub connection info (Tailscale IP, API token)
@@ -164,7 +185,14 @@ async def deploy_to_fleet(
             service_package_id=str(deployment_request.service_package_id),
             manifest_version=deployment_request.manifest_version,
             initiated_by=auth_user.username,
-            hub_ids=[str(hub_id) for hub_id in deployment_request.hub_ids] if deployment_request.hub_ids else None
+            hub_ids=[str(hub_id) for hub_id in deployment_request.hub_ids] if deployment_request.hub_ids else None,
+            policy=RolloutPolicy(
+                batch_size=deployment_request.batch_size,
+                max_parallel=deployment_request.max_parallel,
+                canary_count=deployment_request.canary_count,
+                failure_threshold=deployment_request.failure_threshold,
+                rollback_on_halt=deployment_request.rollback_on_halt
+            )
         )
 
         return BulkDeploymentResponse(**result)
@@ -31,6 +31,7 @@ from api.schemas_ha_instance import (
 )
 from core.auth import AuthUser, require_admin, require_manager
 from services.ha_instance_service import HAInstanceService
+from services.search_service import text_search_clause
 
 router = APIRouter()
 
@@ -109,11 +110,9 @@ async def list_ha_instances(
     if is_enabled is not None:
         query_base = query_base.where(HAInstance.is_enabled == is_enabled)
     if search:
-        search_pattern = f"%{search}%"
-        query_base = query_base.where(
-            (HAInstance.name.ilike(search_pattern)) |
-            (HAInstance.location.ilike(search_pattern))
-        )
+        clause = text_search_clause([HAInstance.name, HAInstance.location], search)
+        if clause is not None:
+            query_base = query_base.where(clause)
 
     # Get total count
     count_query = select(func.count()).select_from(query_base.subquery())
@@ -228,7 +228,7 @@ async def ha_terminal_websocket(
     6. On disconnect, SSH session is cleanly closed
     """
     # Validate WebSocket token
-    session = ws_auth.validate_token(token)
+    session = await ws_auth.validate_token(token)
 
     if not session:
         await websocket.close(
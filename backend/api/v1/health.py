@@ -266,6 +266,37 @@ async def service_status():
     return status
 
 
+@router.get("/integrations")
+async def integration_http_stats():
+    """
+    Outbound HTTP metrics per integration (requests, errors, retries, latency)
+    Served from the shared pooled client registry
+    """
+    from services.http_client_registry import http_client_registry
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "services": http_client_registry.get_metrics()
+    }
+
+
+@router.get("/llm")
+async def llm_provider_health():
+    """
+    LLM provider availability and rolling latency from background probes,
+    plus semantic cache hit rates
+    """
+    from services.llm_provider_registry import llm_provider_registry
+    from services.semantic_cache import semantic_cache
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "selected": llm_provider_registry.select(),
+        "providers": llm_provider_registry.get_status(),
+        "semantic_cache": semantic_cache.get_stats()
+    }
+
+
 @router.get("/ping")
 async def ping():
     """
@@ -381,6 +412,44 @@ async def metrics(db: AsyncSession = Depends(get_db)):
     except Exception:
         pass
 
+    # === Integration HTTP Client Metrics ===
+    try:
+        from services.http_client_registry import http_client_registry
+        http_metrics = http_client_registry.get_metrics()
+
+        if http_metrics:
+            metrics_data.append('')
+            metrics_data.append('# HELP somni_integration_requests_total Outbound integration HTTP requests')
+            metrics_data.append('# TYPE somni_integration_requests_total counter')
+            for service, stats in http_metrics.items():
+                metrics_data.append(f'somni_integration_requests_total{{service="{service}"}} {stats["requests"]}')
+
+            metrics_data.append('')
+            metrics_data.append('# HELP somni_integration_errors_total Failed outbound integration HTTP requests')
+            metrics_data.append('# TYPE somni_integration_errors_total counter')
+            for service, stats in http_metrics.items():
+                metrics_data.append(f'somni_integration_errors_total{{service="{service}"}} {stats["errors"]}')
+
+            metrics_data.append('')
+            metrics_data.append('# HELP somni_integration_retries_total Retried outbound integration HTTP requests')
+            metrics_data.append('# TYPE somni_integration_retries_total counter')
+            for service, stats in http_metrics.items():
+                metrics_data.append(f'somni_integration_retries_total{{service="{service}"}} {stats["retries"]}')
+
+            metrics_data.append('')
+            metrics_data.append('# HELP somni_integration_latency_ms Outbound integration HTTP latency')
+            metrics_data.append('# TYPE somni_integration_latency_ms gauge')
+            for service, stats in http_metrics.items():
+                for quantile in ("p50", "p95"):
+                    value = stats[f"{quantile}_latency_ms"]
+                    if value is not None:
+                        metrics_data.append(
+                            f'somni_integration_latency_ms{{service="{service}",quantile="{quantile}"}} {value:.2f}'
+                        )
+
+    except Exception:
+        pass
+
     # === System Resource Metrics ===
     try:
         cpu_percent = psutil.cpu_percent(interval=0.1)
@@ -22,10 +22,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, or_
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
+from uuid import UUID
 from pydantic import BaseModel
 import logging
 
-from db.database import get_db
+from db.database import get_read_db
+from services.dashboard_snapshot import dashboard_snapshots
 from services.novu_client import get_novu_client
 from services.vikunja_client import get_vikunja_client
 from services.calcom_client import get_calcom_client, BookingStatus
@@ -131,14 +133,23 @@ class MultiPropertySummary(BaseModel):
     properties: List[PropertySummary]
 
 
+def _hub_stats(hubs: Dict[str, int]) -> HubStats:
+    return HubStats(
+        total=hubs["total"],
+        online=hubs["online"],
+        offline=hubs["offline"],
+        warning=hubs["warning"] + hubs["error"]
+    )
+
+
 # ========================================
 # Endpoints
 # ========================================
 
 @router.get("/dashboard", response_model=DashboardOverview)
 async def get_dashboard_overview(
-    property_id: Optional[str] = Query(None, description="Filter by property"),
-    db: AsyncSession = Depends(get_db)
+    property_id: Optional[UUID] = Query(None, description="Filter by property"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get real-time dashboard overview
@@ -152,80 +163,24 @@ async def get_dashboard_overview(
     - Homebox (assets needing maintenance)
     """
     try:
-        from db.models_approval import PendingAction
-        from db.models import WorkOrder
-        from db.models_comms import EmailMessage, SMSMessage
+        # Database-backed cards come from one cached snapshot query
+        cards = await dashboard_snapshots.cards(db, property_id)
 
-        # Pending Approvals
-        approvals_query = select(func.count(PendingAction.id)).where(
-            PendingAction.status == 'pending'
-        )
-        if property_id:
-            approvals_query = approvals_query.where(PendingAction.property_id == property_id)
+        pending_approvals = cards["approvals"]["pending"]
+        estimated_pending_costs = cards["approvals"]["estimated_cost"]
 
-        result = await db.execute(approvals_query)
-        pending_approvals = result.scalar() or 0
-
-        # Open Work Orders (detailed stats)
-        from sqlalchemy import case
-        work_orders_stats_query = select(
-            func.count(WorkOrder.id).label('total'),
-            func.sum(case((WorkOrder.priority == 'emergency', 1), else_=0)).label('emergency'),
-            func.sum(case((WorkOrder.priority == 'high', 1), else_=0)).label('high_priority'),
-            func.sum(case((WorkOrder.status == 'in_progress', 1), else_=0)).label('in_progress')
-        ).where(WorkOrder.status.in_(['submitted', 'in_progress']))
-
-        if property_id:
-            work_orders_stats_query = work_orders_stats_query.where(WorkOrder.property_id == property_id)
-
-        result = await db.execute(work_orders_stats_query)
-        wo_stats = result.first()
+        active = cards["work_orders"]["active"]
         open_work_orders = WorkOrderStats(
-            total=wo_stats.total or 0,
-            emergency=wo_stats.emergency or 0,
-            high_priority=wo_stats.high_priority or 0,
-            in_progress=wo_stats.in_progress or 0
+            total=active["total"],
+            emergency=active["emergency"],
+            high_priority=active["high_priority"],
+            in_progress=active["in_progress"]
         )
-
-        # Work Orders This Week
+        work_orders_this_week = cards["work_orders"]["created_this_week"]
         week_ago = datetime.now() - timedelta(days=7)
-        work_orders_week_query = select(func.count(WorkOrder.id)).where(
-            WorkOrder.created_at >= week_ago
-        )
-        if property_id:
-            work_orders_week_query = work_orders_week_query.where(WorkOrder.property_id == property_id)
 
-        result = await db.execute(work_orders_week_query)
-        work_orders_this_week = result.scalar() or 0
-
-        # Unread Communications
-        unread_emails_query = select(func.count(EmailMessage.id)).where(
-            and_(
-                EmailMessage.direction == 'incoming',
-                EmailMessage.ai_processed == False
-            )
-        )
-        result = await db.execute(unread_emails_query)
-        unread_emails = result.scalar() or 0
-
-        unread_sms_query = select(func.count(SMSMessage.id)).where(
-            and_(
-                SMSMessage.direction == 'incoming',
-                SMSMessage.ai_processed == False
-            )
-        )
-        result = await db.execute(unread_sms_query)
-        unread_sms = result.scalar() or 0
-
-        # Estimated Pending Costs
-        cost_query = select(func.sum(PendingAction.estimated_cost)).where(
-            PendingAction.status == 'pending'
-        )
-        if property_id:
-            cost_query = cost_query.where(PendingAction.property_id == property_id)
-
-        result = await db.execute(cost_query)
-        estimated_pending_costs = result.scalar() or 0.0
+        unread_emails = cards["communications"]["unread_emails"]
+        unread_sms = cards["communications"]["unread_sms"]
 
         # Vikunja Tasks (if configured)
         pending_tasks = 0
@@ -300,47 +255,8 @@ async def get_dashboard_overview(
             logger.error(f"Failed to fetch Homebox data: {e}")
 
         # Hub Statistics (for SomniFamily mode)
-        from db.models import PropertyEdgeNode
-
-        # Residential Hubs Stats
-        residential_hubs_query = select(
-            func.count(PropertyEdgeNode.id).label('total'),
-            func.sum(case((PropertyEdgeNode.status == 'online', 1), else_=0)).label('online'),
-            func.sum(case((PropertyEdgeNode.status == 'offline', 1), else_=0)).label('offline'),
-            func.sum(case((PropertyEdgeNode.status.in_(['warning', 'error']), 1), else_=0)).label('warning')
-        ).where(PropertyEdgeNode.hub_type == 'RESIDENTIAL')
-
-        if property_id:
-            residential_hubs_query = residential_hubs_query.where(PropertyEdgeNode.property_id == property_id)
-
-        result = await db.execute(residential_hubs_query)
-        res_stats = result.first()
-        residential_hubs = HubStats(
-            total=res_stats.total or 0,
-            online=res_stats.online or 0,
-            offline=res_stats.offline or 0,
-            warning=res_stats.warning or 0
-        )
-
-        # Property Hubs Stats
-        property_hubs_query = select(
-            func.count(PropertyEdgeNode.id).label('total'),
-            func.sum(case((PropertyEdgeNode.status == 'online', 1), else_=0)).label('online'),
-            func.sum(case((PropertyEdgeNode.status == 'offline', 1), else_=0)).label('offline'),
-            func.sum(case((PropertyEdgeNode.status.in_(['warning', 'error']), 1), else_=0)).label('warning')
-        ).where(PropertyEdgeNode.hub_type == 'PROPERTY_HUB')
-
-        if property_id:
-            property_hubs_query = property_hubs_query.where(PropertyEdgeNode.property_id == property_id)
-
-        result = await db.execute(property_hubs_query)
-        prop_stats = result.first()
-        property_hubs = HubStats(
-            total=prop_stats.total or 0,
-            online=prop_stats.online or 0,
-            offline=prop_stats.offline or 0,
-            warning=prop_stats.warning or 0
-        )
+        residential_hubs = _hub_stats(cards["residential_hubs"])
+        property_hubs = _hub_stats(cards["property_hubs"])
 
         return DashboardOverview(
             pending_approvals=pending_approvals,
@@ -370,9 +286,9 @@ async def get_dashboard_overview(
 
 @router.get("/insights", response_model=PredictiveInsights)
 async def get_predictive_insights(
-    property_id: Optional[str] = Query(None, description="Filter by property"),
+    property_id: Optional[UUID] = Query(None, description="Filter by property"),
     days: int = Query(30, description="Number of days to analyze"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get AI-driven predictive insights
@@ -513,7 +429,7 @@ async def get_predictive_insights(
 
 @router.get("/multi-property", response_model=MultiPropertySummary)
 async def get_multi_property_summary(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get portfolio-level summary across all properties
@@ -521,88 +437,43 @@ async def get_multi_property_summary(
     Provides high-level overview for property managers with multiple properties
     """
     try:
-        from db.models import Property, Unit, WorkOrder
-
-        # Get all properties
-        properties_query = select(Property)
-        result = await db.execute(properties_query)
-        properties = result.scalars().all()
+        # Unit and work order counts for every property in one query (was 4 queries per property)
+        portfolio = await dashboard_snapshots.portfolio(db)
 
         property_summaries = []
         total_units = 0
         total_open_work_orders = 0
-        total_pending_approvals = 0
+        total_pending_approvals = portfolio["pending_approvals"]
 
-        for prop in properties:
-            # Count units
-            units_query = select(func.count(Unit.id)).where(Unit.property_id == prop.id)
-            result = await db.execute(units_query)
-            unit_count = result.scalar() or 0
+        for prop_id, counts in portfolio["properties"].items():
+            unit_count = counts["total_units"]
+            occupied_count = counts["occupied_units"]
             total_units += unit_count
-
-            # Count occupied units
-            occupied_query = select(func.count(Unit.id)).where(
-                and_(
-                    Unit.property_id == prop.id,
-                    Unit.tenant_id.isnot(None)
-                )
-            )
-            result = await db.execute(occupied_query)
-            occupied_count = result.scalar() or 0
+            total_open_work_orders += counts["open_work_orders"]
 
             occupancy_rate = (occupied_count / unit_count * 100) if unit_count > 0 else 0
 
-            # Count open work orders
-            wo_query = select(func.count(WorkOrder.id)).where(
-                and_(
-                    WorkOrder.property_id == prop.id,
-                    WorkOrder.status.in_(['submitted', 'in_progress'])
-                )
-            )
-            result = await db.execute(wo_query)
-            open_wo = result.scalar() or 0
-            total_open_work_orders += open_wo
-
-            # Count urgent work orders
-            urgent_query = select(func.count(WorkOrder.id)).where(
-                and_(
-                    WorkOrder.property_id == prop.id,
-                    WorkOrder.priority == 'urgent',
-                    WorkOrder.status.in_(['submitted', 'in_progress'])
-                )
-            )
-            result = await db.execute(urgent_query)
-            urgent_wo = result.scalar() or 0
-
             property_summaries.append(PropertySummary(
-                property_id=str(prop.id),
-                property_name=prop.name,
+                property_id=prop_id,
+                property_name=counts["name"],
                 total_units=unit_count,
                 occupied_units=occupied_count,
                 occupancy_rate=round(occupancy_rate, 2),
-                open_work_orders=open_wo,
-                urgent_work_orders=urgent_wo,
+                open_work_orders=counts["open_work_orders"],
+                urgent_work_orders=counts["urgent_work_orders"],
                 monthly_rent_collected=0.0,  # TODO: Calculate from payments
                 pending_payments=0.0,  # TODO: Calculate from lease agreements
                 upcoming_maintenance=0,  # TODO: Calculate from scheduled maintenance
                 assets_count=0  # TODO: Count Homebox assets for this property
             ))
 
-        # Count total pending approvals
-        from db.models_approval import PendingAction
-        approvals_query = select(func.count(PendingAction.id)).where(
-            PendingAction.status == 'pending'
-        )
-        result = await db.execute(approvals_query)
-        total_pending_approvals = result.scalar() or 0
-
         # Calculate overall occupancy rate
         overall_occupancy = (
             sum(ps.occupied_units for ps in property_summaries) / total_units * 100
         ) if total_units > 0 else 0
 
         return MultiPropertySummary(
-            total_properties=len(properties),
+            total_properties=len(property_summaries),
             total_units=total_units,
             overall_occupancy_rate=round(overall_occupancy, 2),
             total_open_work_orders=total_open_work_orders,
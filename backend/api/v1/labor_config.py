@@ -12,6 +12,7 @@ import uuid
 
 from db.database import get_db
 from db.models_labor_config import LaborRate, InstallationTime, DeviceMaterial, ContractorLaborRate
+from services.cache_service import cached
 
 router = APIRouter(prefix="/labor-config", tags=["Labor Configuration"])
 
@@ -147,6 +148,7 @@ class ContractorLaborRateResponse(BaseModel):
 # ============================================================================
 
 @router.get("/rates", response_model=List[LaborRateResponse])
+@cached("labor_config", tags=("labor_rates",), model=List[LaborRateResponse])
 async def get_labor_rates(
     include_inactive: bool = False,
     db: AsyncSession = Depends(get_db)
@@ -241,6 +243,7 @@ async def deactivate_labor_rate(
 # ============================================================================
 
 @router.get("/installation-times", response_model=List[InstallationTimeResponse])
+@cached("labor_config", tags=("installation_times",), model=List[InstallationTimeResponse])
 async def get_installation_times(
     device_category: str | None = None,
     vendor: str | None = None,
@@ -358,6 +361,7 @@ async def deactivate_installation_time(
 # ============================================================================
 
 @router.get("/materials", response_model=List[DeviceMaterialResponse])
+@cached("labor_config", tags=("device_materials",), model=List[DeviceMaterialResponse])
 async def get_device_materials(
     device_category: str | None = None,
     include_inactive: bool = False,
@@ -447,6 +451,7 @@ async def delete_device_material(
 # ============================================================================
 
 @router.get("/contractor-rates", response_model=List[ContractorLaborRateResponse])
+@cached("labor_config", tags=("contractor_labor_rates",), model=List[ContractorLaborRateResponse])
 async def get_contractor_labor_rates(
     contractor_id: uuid.UUID | None = None,
     include_inactive: bool = False,
@@ -27,6 +27,7 @@ from api.schemas_leads import (
 )
 from core.auth import AuthUser, require_manager, get_optional_auth_user
 from core.config import settings
+from services.search_service import text_search_clause
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -242,12 +243,9 @@ async def list_leads(
         query = query.where(LeadModel.assigned_to == assigned_to)
 
     if search:
-        search_pattern = f"%{search}%"
-        query = query.where(
-            (LeadModel.name.ilike(search_pattern)) |
-            (LeadModel.email.ilike(search_pattern)) |
-            (LeadModel.company.ilike(search_pattern))
-        )
+        clause = text_search_clause([LeadModel.name, LeadModel.email, LeadModel.company], search)
+        if clause is not None:
+            query = query.where(clause)
 
     # Get total count
     count_query = select(func.count()).select_from(query.subquery())
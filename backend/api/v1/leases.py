@@ -5,7 +5,7 @@ Lease management with role-based access control
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, and_, or_
 from typing import Optional, Annotated
 from uuid import UUID
 from datetime import date, timedelta
@@ -13,6 +13,8 @@ from datetime import date, timedelta
 from db.database import get_db
 from db.models import Lease, Tenant, Unit, Building
 from api.schemas import LeaseCreate, LeaseUpdate, LeaseResponse, LeaseListResponse
+from api.pagination import PageOptions, paginate
+from api.fieldsets import SparseFields, load_options, sparse_response
 from core.auth import get_auth_user, require_admin, require_manager, get_current_tenant, AuthUser, CurrentTenant
 
 router = APIRouter()
@@ -26,6 +28,7 @@ router = APIRouter()
 async def get_active_leases(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
+    page: PageOptions = Depends(),
     auth_user: AuthUser = Depends(get_auth_user),
     current_tenant: Optional[CurrentTenant] = Depends(get_current_tenant),
     db: AsyncSession = Depends(get_db)
@@ -51,24 +54,11 @@ async def get_active_leases(
                 detail="Tenants can only view their own leases"
             )
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-
-    # Apply pagination
-    query = query.offset(skip).limit(limit).order_by(Lease.start_date.desc())
-
-    # Execute query
-    result = await db.execute(query)
-    leases = result.scalars().all()
-
-    return LeaseListResponse(
-        items=leases,
-        total=total,
-        skip=skip,
-        limit=limit
+    result = await paginate(
+        db, query, Lease.start_date, Lease.id,
+        skip=skip, limit=limit, options=page
     )
+    return LeaseListResponse(**result.envelope())
 
 
 @router.get("/expiring", response_model=LeaseListResponse)
@@ -76,6 +66,7 @@ async def get_expiring_leases_endpoint(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
     days: int = Query(30, ge=1, le=365, description="Days until expiration"),
+    page: PageOptions = Depends(),
     auth_user: AuthUser = Depends(require_manager),
     db: AsyncSession = Depends(get_db)
 ):
@@ -95,24 +86,12 @@ async def get_expiring_leases_endpoint(
         )
     )
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-
-    # Apply pagination
-    query = query.offset(skip).limit(limit).order_by(Lease.end_date.asc())
-
-    # Execute query
-    result = await db.execute(query)
-    leases = result.scalars().all()
-
-    return LeaseListResponse(
-        items=leases,
-        total=total,
-        skip=skip,
-        limit=limit
+    result = await paginate(
+        db, query, Lease.end_date, Lease.id,
+        skip=skip, limit=limit, options=page,
+        descending=False
     )
+    return LeaseListResponse(**result.envelope())
 
 
 @router.get("", response_model=LeaseListResponse)
@@ -125,6 +104,8 @@ async def list_leases(
     building_id: Optional[UUID] = Query(None, description="Filter by building"),
     client_id: Optional[UUID] = Query(None, description="Filter by client (owner)"),
     active_only: bool = Query(False, description="Show only active leases"),
+    page: PageOptions = Depends(),
+    sparse: SparseFields = Depends(),
     auth_user: AuthUser = Depends(get_auth_user),
     current_tenant: Optional[CurrentTenant] = Depends(get_current_tenant),
     db: AsyncSession = Depends(get_db)
@@ -181,24 +162,15 @@ async def list_leases(
     if active_only:
         query = query.where(Lease.status == "active")
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-
-    # Apply pagination
-    query = query.offset(skip).limit(limit).order_by(Lease.start_date.desc())
-
-    # Execute query
-    result = await db.execute(query)
-    leases = result.scalars().all()
-
-    return LeaseListResponse(
-        items=leases,
-        total=total,
-        skip=skip,
-        limit=limit
+    fields = sparse.resolve(LeaseResponse)
+    query = query.options(*load_options(Lease, fields, always=[Lease.start_date]))
+    result = await paginate(
+        db, query, Lease.start_date, Lease.id,
+        skip=skip, limit=limit, options=page
     )
+    if fields:
+        return sparse_response(result.envelope(), LeaseResponse, fields)
+    return LeaseListResponse(**result.envelope())
 
 
 @router.post("", response_model=LeaseResponse, status_code=status.HTTP_201_CREATED)
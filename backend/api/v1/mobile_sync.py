@@ -0,0 +1,412 @@
+"""
+Somni Property Manager - Mobile Sync API
+Offline-first sync for the Flutter app: device registration, change-feed pull,
+versioned push and conflict resolution
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from typing import Optional, List, Dict, Any
+from uuid import UUID
+from datetime import datetime, timezone
+from pydantic import BaseModel, Field
+
+from db.database import get_db
+from db.models_mobile_sync import MobileSyncDevice, SyncConflict
+from services.mobile_sync_service import (
+    SYNC_ENTITIES, DEFAULT_PULL_LIMIT, MAX_PULL_LIMIT, MAX_PUSH_BATCH, START, FeedPosition, SyncError,
+    decode_cursor, encode_cursor, pull_changes, push_changes, resolve_conflict
+)
+from core.auth import AuthUser, require_manager
+
+router = APIRouter()
+
+
+# ============================================================================
+# PYDANTIC SCHEMAS
+# ============================================================================
+
+class DeviceRegistrationRequest(BaseModel):
+    """Device registering for sync"""
+    device_id: str = Field(..., min_length=1, max_length=255)
+    device_name: str
+    platform: str
+    app_version: str
+    os_version: str
+
+
+class DeviceRegistrationResponse(BaseModel):
+    client_id: str
+    device_id: str
+    user_id: str
+    is_new: bool
+    last_sync_at: Optional[str] = None
+    message: str
+
+
+class SyncChange(BaseModel):
+    """One change in either direction"""
+    id: Optional[str] = None
+    entity_type: str
+    entity_id: Optional[str] = None
+    operation: str = Field(..., pattern="^(CREATE|UPDATE|DELETE)$")
+    data: Optional[Dict[str, Any]] = None
+    changed_fields: Optional[List[str]] = None
+    version: Optional[int] = None
+    user_id: Optional[str] = None
+    created_at: Optional[str] = None
+    local_id: Optional[str] = None
+    timestamp: Optional[str] = None
+
+
+class PullSyncResponse(BaseModel):
+    changes: List[SyncChange]
+    sync_timestamp: str
+    has_more: bool
+    next_cursor: Optional[str] = None
+    total_changes: int
+
+
+class PushSyncRequest(BaseModel):
+    device_id: str
+    changes: List[SyncChange]
+    sync_timestamp: Optional[str] = None
+
+
+class PushSyncResult(BaseModel):
+    local_id: Optional[str] = None
+    entity_id: Optional[str] = None
+    entity_type: str
+    operation: str
+    status: str  # success, conflict, error
+    version: Optional[int] = None
+    conflict_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class PushSyncResponse(BaseModel):
+    results: List[PushSyncResult]
+    sync_timestamp: str
+    total_applied: int
+    total_conflicts: int
+    total_errors: int
+    message: str
+
+
+class SyncConflictResponse(BaseModel):
+    id: str
+    entity_type: str
+    entity_id: str
+    client_version: int
+    server_version: int
+    client_data: Dict[str, Any]
+    server_data: Dict[str, Any]
+    conflicting_fields: List[str]
+    status: str
+    created_at: str
+
+
+class ConflictsResponse(BaseModel):
+    conflicts: List[SyncConflictResponse]
+    total_pending: int
+    total_resolved: int
+
+
+class ConflictResolutionRequest(BaseModel):
+    conflict_id: UUID
+    resolution_strategy: str = Field(..., pattern="^(client_wins|server_wins|merge|manual)$")
+    resolved_data: Optional[Dict[str, Any]] = None
+
+
+class ConflictResolutionResponse(BaseModel):
+    conflict_id: str
+    status: str
+    entity_id: str
+    entity_type: str
+    new_version: int
+    message: str
+
+
+class SyncStatusResponse(BaseModel):
+    client_id: str
+    device_id: str
+    device_name: str
+    last_sync_at: Optional[str] = None
+    last_pull_at: Optional[str] = None
+    last_push_at: Optional[str] = None
+    pending_conflicts: int
+    is_active: bool
+    created_at: str
+
+
+class EntityTypeInfo(BaseModel):
+    entity_type: str
+    display_name: str
+    is_syncable: bool
+    requires_permission: Optional[str] = None
+
+
+class EntityTypesResponse(BaseModel):
+    entity_types: List[EntityTypeInfo]
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def _get_device(db: AsyncSession, device_id: str) -> MobileSyncDevice:
+    result = await db.execute(select(MobileSyncDevice).where(MobileSyncDevice.device_id == device_id))
+    device = result.scalar_one_or_none()
+    if not device or not device.is_active:
+        raise HTTPException(status_code=404, detail="Device not registered for sync")
+    return device
+
+
+# ============================================================================
+# API ENDPOINTS
+# ============================================================================
+
+@router.post("/register", response_model=DeviceRegistrationResponse)
+async def register_device(
+    request: DeviceRegistrationRequest,
+    db: AsyncSession = Depends(get_db),
+    auth_user: AuthUser = Depends(require_manager)
+):
+    """Register (or re-register) a device for sync"""
+    result = await db.execute(select(MobileSyncDevice).where(MobileSyncDevice.device_id == request.device_id))
+    device = result.scalar_one_or_none()
+    is_new = device is None
+    if is_new:
+        device = MobileSyncDevice(device_id=request.device_id)
+        db.add(device)
+
+    device.device_name = request.device_name
+    device.platform = request.platform
+    device.app_version = request.app_version
+    device.os_version = request.os_version
+    device.user_id = auth_user.username
+    device.is_active = True
+    await db.commit()
+
+    return DeviceRegistrationResponse(
+        client_id=str(device.id),
+        device_id=device.device_id,
+        user_id=auth_user.username,
+        is_new=is_new,
+        last_sync_at=_iso(device.last_sync_at),
+        message="Device registered" if is_new else "Device already registered"
+    )
+
+
+@router.get("/changes", response_model=PullSyncResponse)
+async def pull_sync(
+    x_device_id: str = Header(..., alias="X-Device-ID"),
+    entity_types: Optional[List[str]] = Query(None),
+    since: Optional[str] = Query(None, description="Last sync_timestamp; resumes from the device's pull position"),
+    limit: int = Query(DEFAULT_PULL_LIMIT, ge=1, le=MAX_PULL_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_db),
+    auth_user: AuthUser = Depends(require_manager)
+):
+    """
+    Download changes since the device's last pull
+
+    Only the latest change of each entity after the cursor is returned, with
+    the entity's current data. With neither cursor nor since the feed starts
+    from the beginning (full download). Page through with next_cursor while
+    has_more is true.
+    """
+    device = await _get_device(db, x_device_id)
+    if entity_types:
+        unknown = set(entity_types) - set(SYNC_ENTITIES)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown entity types: {', '.join(sorted(unknown))}")
+
+    try:
+        if cursor:
+            after = decode_cursor(cursor)
+        elif since:
+            after = FeedPosition(device.last_pulled_txid or 0, device.last_pulled_seq or 0)
+        else:
+            after = START
+    except SyncError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    changes, next_position, has_more = await pull_changes(db, after, limit=limit, entity_types=entity_types)
+
+    now = _now()
+    if not entity_types:
+        # A filtered pull does not cover the other types, so it cannot advance the position
+        device.last_pulled_txid, device.last_pulled_seq = next_position
+    device.last_pull_at = now
+    device.last_sync_at = now
+    await db.commit()
+
+    return PullSyncResponse(
+        changes=changes,
+        sync_timestamp=now.isoformat(),
+        has_more=has_more,
+        next_cursor=encode_cursor(next_position),
+        total_changes=len(changes)
+    )
+
+
+@router.post("/changes", response_model=PushSyncResponse)
+async def push_sync(
+    request: PushSyncRequest,
+    x_device_id: str = Header(..., alias="X-Device-ID"),
+    db: AsyncSession = Depends(get_db),
+    auth_user: AuthUser = Depends(require_manager)
+):
+    """
+    Upload a batch of local changes
+
+    Each change is checked against the entity's current version; stale
+    changes that differ from the server row are recorded as conflicts.
+    Results are returned in request order.
+    """
+    if len(request.changes) > MAX_PUSH_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PUSH_BATCH} changes per push")
+    device = await _get_device(db, x_device_id)
+
+    results = await push_changes(
+        db, device, [change.model_dump() for change in request.changes], user_id=auth_user.username
+    )
+
+    now = _now()
+    device.last_push_at = now
+    device.last_sync_at = now
+    await db.commit()
+
+    applied = sum(1 for r in results if r["status"] == "success")
+    conflicts = sum(1 for r in results if r["status"] == "conflict")
+    errors = sum(1 for r in results if r["status"] == "error")
+    return PushSyncResponse(
+        results=results,
+        sync_timestamp=now.isoformat(),
+        total_applied=applied,
+        total_conflicts=conflicts,
+        total_errors=errors,
+        message=f"Applied {applied}, conflicts {conflicts}, errors {errors}"
+    )
+
+
+@router.get("/conflicts", response_model=ConflictsResponse)
+async def get_conflicts(
+    x_device_id: str = Header(..., alias="X-Device-ID"),
+    status: Optional[str] = Query(None, pattern="^(pending|resolved)$"),
+    db: AsyncSession = Depends(get_db),
+    auth_user: AuthUser = Depends(require_manager)
+):
+    """List this device's sync conflicts"""
+    device = await _get_device(db, x_device_id)
+
+    query = select(SyncConflict).where(SyncConflict.device_id == device.device_id)
+    if status:
+        query = query.where(SyncConflict.status == status)
+    result = await db.execute(query.order_by(SyncConflict.created_at.desc()).limit(200))
+    conflicts = result.scalars().all()
+
+    counts = dict((await db.execute(
+        select(SyncConflict.status, func.count())
+        .where(SyncConflict.device_id == device.device_id)
+        .group_by(SyncConflict.status)
+    )).all())
+
+    return ConflictsResponse(
+        conflicts=[
+            SyncConflictResponse(
+                id=str(c.id),
+                entity_type=c.entity_type,
+                entity_id=c.entity_id,
+                client_version=c.client_version,
+                server_version=c.server_version,
+                client_data=c.client_data or {},
+                server_data=c.server_data or {},
+                conflicting_fields=c.conflicting_fields or [],
+                status=c.status,
+                created_at=_iso(c.created_at) or ""
+            )
+            for c in conflicts
+        ],
+        total_pending=counts.get("pending", 0),
+        total_resolved=counts.get("resolved", 0)
+    )
+
+
+@router.post("/conflicts/resolve", response_model=ConflictResolutionResponse)
+async def resolve_sync_conflict(
+    request: ConflictResolutionRequest,
+    x_device_id: str = Header(..., alias="X-Device-ID"),
+    db: AsyncSession = Depends(get_db),
+    auth_user: AuthUser = Depends(require_manager)
+):
+    """Resolve one of this device's conflicts"""
+    device = await _get_device(db, x_device_id)
+    conflict = await db.get(SyncConflict, request.conflict_id)
+    if not conflict or conflict.device_id != device.device_id:
+        raise HTTPException(status_code=404, detail="Conflict not found")
+    if conflict.status == "resolved":
+        raise HTTPException(status_code=400, detail="Conflict already resolved")
+
+    try:
+        new_version = await resolve_conflict(
+            db, conflict, request.resolution_strategy, request.resolved_data, user_id=auth_user.username
+        )
+    except SyncError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    await db.commit()
+
+    return ConflictResolutionResponse(
+        conflict_id=str(conflict.id),
+        status=conflict.status,
+        entity_id=conflict.entity_id,
+        entity_type=conflict.entity_type,
+        new_version=new_version,
+        message=f"Conflict resolved ({request.resolution_strategy})"
+    )
+
+
+@router.get("/status", response_model=SyncStatusResponse)
+async def get_sync_status(
+    x_device_id: str = Header(..., alias="X-Device-ID"),
+    db: AsyncSession = Depends(get_db),
+    auth_user: AuthUser = Depends(require_manager)
+):
+    """Sync state of this device"""
+    device = await _get_device(db, x_device_id)
+    pending = (await db.execute(
+        select(func.count()).select_from(SyncConflict)
+        .where(SyncConflict.device_id == device.device_id, SyncConflict.status == "pending")
+    )).scalar() or 0
+
+    return SyncStatusResponse(
+        client_id=str(device.id),
+        device_id=device.device_id,
+        device_name=device.device_name or "",
+        last_sync_at=_iso(device.last_sync_at),
+        last_pull_at=_iso(device.last_pull_at),
+        last_push_at=_iso(device.last_push_at),
+        pending_conflicts=pending,
+        is_active=device.is_active,
+        created_at=_iso(device.created_at) or ""
+    )
+
+
+@router.get("/entity-types", response_model=EntityTypesResponse)
+async def get_entity_types(auth_user: AuthUser = Depends(require_manager)):
+    """Entity types available for sync"""
+    return EntityTypesResponse(entity_types=[
+        EntityTypeInfo(entity_type=entity_type, display_name=display_name, is_syncable=True, requires_permission="manager")
+        for entity_type, (_, display_name) in SYNC_ENTITIES.items()
+    ])
@@ -0,0 +1,127 @@
+"""
+Somni Property Manager - Integration Outbox API
+Operator view of queued, retried and dead-lettered integration side effects
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from typing import Optional, List, Any
+from uuid import UUID
+from datetime import datetime
+from pydantic import BaseModel
+
+from db.database import get_db
+from db.models_outbox import IntegrationOutbox
+from services.outbox_service import get_outbox_stats, requeue_dead_letter
+from core.auth import AuthUser, require_admin
+
+router = APIRouter()
+
+
+# ============================================================================
+# PYDANTIC SCHEMAS
+# ============================================================================
+
+class OutboxEntry(BaseModel):
+    """Integration outbox row"""
+    id: UUID
+    aggregate_type: str
+    aggregate_id: str
+    integration: str
+    idempotency_key: str
+    status: str
+    attempts: int
+    max_attempts: int
+    next_attempt_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    result: Optional[Any] = None
+    created_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class OutboxListResponse(BaseModel):
+    """Paginated outbox rows"""
+    items: List[OutboxEntry]
+    total: int
+    skip: int
+    limit: int
+
+
+# ============================================================================
+# API ENDPOINTS
+# ============================================================================
+
+@router.get("/stats")
+async def outbox_stats(
+    db: AsyncSession = Depends(get_db),
+    auth_user: AuthUser = Depends(require_admin)
+):
+    """
+    Outbox backlog per status and dispatcher counters (Admin only)
+    """
+    return await get_outbox_stats(db)
+
+
+@router.get("", response_model=OutboxListResponse)
+async def list_outbox_entries(
+    status: Optional[str] = Query(None, pattern="^(pending|processing|succeeded|dead)$"),
+    aggregate_type: Optional[str] = Query(None),
+    aggregate_id: Optional[str] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    auth_user: AuthUser = Depends(require_admin)
+):
+    """
+    List outbox rows, e.g. every integration of one work order (Admin only)
+    """
+    query = select(IntegrationOutbox)
+    if status:
+        query = query.where(IntegrationOutbox.status == status)
+    if aggregate_type:
+        query = query.where(IntegrationOutbox.aggregate_type == aggregate_type)
+    if aggregate_id:
+        query = query.where(IntegrationOutbox.aggregate_id == aggregate_id)
+
+    total = (await db.execute(select(func.count()).select_from(query.subquery()))).scalar_one()
+    rows = (await db.execute(
+        query.order_by(IntegrationOutbox.created_at.desc()).offset(skip).limit(limit)
+    )).scalars().all()
+
+    return OutboxListResponse(items=rows, total=total, skip=skip, limit=limit)
+
+
+@router.get("/dead-letters", response_model=OutboxListResponse)
+async def list_dead_letters(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    auth_user: AuthUser = Depends(require_admin)
+):
+    """
+    Integration calls that exhausted their retries (Admin only)
+    """
+    return await list_outbox_entries(
+        status='dead', aggregate_type=None, aggregate_id=None,
+        skip=skip, limit=limit, db=db, auth_user=auth_user
+    )
+
+
+@router.post("/{outbox_id}/retry", response_model=OutboxEntry)
+async def retry_dead_letter(
+    outbox_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    auth_user: AuthUser = Depends(require_admin)
+):
+    """
+    Requeue a dead-lettered integration call with a fresh retry budget (Admin only)
+    """
+    row = await requeue_dead_letter(db, outbox_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Dead-lettered outbox entry not found")
+    await db.commit()
+    return row
@@ -5,7 +5,7 @@ Handles rent payments, Stripe payment processing, and refunds
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status, Request, Header
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, and_, or_
 from typing import List, Optional
 from uuid import UUID
 from datetime import date, datetime
@@ -22,7 +22,9 @@ from api.schemas import (
     StripePaymentIntentCreate,
     StripePaymentIntentResponse
 )
-from core.auth import get_auth_user, require_admin, require_manager, get_current_tenant, AuthUser, CurrentTenant
+from api.pagination import PageOptions, paginate
+from api.fieldsets import SparseFields, load_options, sparse_response
+from core.auth import get_auth_user, require_admin, require_manager, get_current_tenant, get_tenant_identity, AuthUser, CurrentTenant
 from core.config import settings
 from services.stripe_service import stripe_service
 from services.websocket_manager import manager as ws_manager
@@ -46,6 +48,8 @@ async def list_payments(
     due_before: Optional[date] = None,
     building_id: Optional[UUID] = Query(None, description="Filter by building ID"),
     client_id: Optional[UUID] = Query(None, description="Filter by client ID"),
+    page: PageOptions = Depends(),
+    sparse: SparseFields = Depends(),
     auth_user: AuthUser = Depends(get_auth_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -64,21 +68,15 @@ async def list_payments(
     if not (auth_user.is_admin or auth_user.is_manager):
         # Tenants can only see their own payments
         # Get tenant's leases
-        tenant_result = await db.execute(
-            select(Tenant).where(Tenant.auth_user_id == auth_user.username)
-        )
-        tenant = tenant_result.scalar_one_or_none()
+        tenant = await get_tenant_identity(db, auth_user.username)
 
         if not tenant:
             return RentPaymentListResponse(items=[], total=0, skip=skip, limit=limit)
 
-        # Get tenant's lease IDs
-        lease_result = await db.execute(
-            select(Lease.id).where(Lease.tenant_id == tenant.id)
+        # Restrict to the tenant's leases
+        query = query.where(
+            RentPayment.lease_id.in_(select(Lease.id).where(Lease.tenant_id == tenant.tenant_id))
         )
-        lease_ids = [row[0] for row in lease_result.all()]
-
-        query = query.where(RentPayment.lease_id.in_(lease_ids))
 
     # Apply filters
     if lease_id:
@@ -105,29 +103,22 @@ async def list_payments(
             .join(Property, Building.property_id == Property.id)
             .where(Property.client_id == client_id))
 
-    # Get total count
-    count_result = await db.execute(
-        select(func.count()).select_from(query.subquery())
-    )
-    total = count_result.scalar()
-
-    # Get paginated results
-    query = query.offset(skip).limit(limit).order_by(RentPayment.due_date.desc())
-    result = await db.execute(query)
-    payments = result.scalars().all()
-
-    return RentPaymentListResponse(
-        items=payments,
-        total=total,
-        skip=skip,
-        limit=limit
+    fields = sparse.resolve(RentPaymentResponse)
+    query = query.options(*load_options(RentPayment, fields, always=[RentPayment.due_date]))
+    result = await paginate(
+        db, query, RentPayment.due_date, RentPayment.id,
+        skip=skip, limit=limit, options=page
     )
+    if fields:
+        return sparse_response(result.envelope(), RentPaymentResponse, fields)
+    return RentPaymentListResponse(**result.envelope())
 
 
 @router.get("/overdue", response_model=RentPaymentListResponse)
 async def list_overdue_payments(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
+    page: PageOptions = Depends(),
     auth_user: AuthUser = Depends(get_auth_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -150,39 +141,22 @@ async def list_overdue_payments(
     # Role-based filtering
     if not (auth_user.is_admin or auth_user.is_manager):
         # Tenants can only see their own payments
-        tenant_result = await db.execute(
-            select(Tenant).where(Tenant.auth_user_id == auth_user.username)
-        )
-        tenant = tenant_result.scalar_one_or_none()
+        tenant = await get_tenant_identity(db, auth_user.username)
 
         if not tenant:
             return RentPaymentListResponse(items=[], total=0, skip=skip, limit=limit)
 
-        # Get tenant's lease IDs
-        lease_result = await db.execute(
-            select(Lease.id).where(Lease.tenant_id == tenant.id)
+        # Restrict to the tenant's leases
+        query = query.where(
+            RentPayment.lease_id.in_(select(Lease.id).where(Lease.tenant_id == tenant.tenant_id))
         )
-        lease_ids = [row[0] for row in lease_result.all()]
-
-        query = query.where(RentPayment.lease_id.in_(lease_ids))
 
-    # Get total count
-    count_result = await db.execute(
-        select(func.count()).select_from(query.subquery())
-    )
-    total = count_result.scalar()
-
-    # Get paginated results
-    query = query.offset(skip).limit(limit).order_by(RentPayment.due_date.asc())
-    result = await db.execute(query)
-    payments = result.scalars().all()
-
-    return RentPaymentListResponse(
-        items=payments,
-        total=total,
-        skip=skip,
-        limit=limit
+    result = await paginate(
+        db, query, RentPayment.due_date, RentPayment.id,
+        skip=skip, limit=limit, options=page,
+        descending=False
     )
+    return RentPaymentListResponse(**result.envelope())
 
 
 @router.get("/{payment_id}", response_model=RentPaymentResponse)
@@ -211,15 +185,8 @@ async def get_payment(
         )
         lease = lease_result.scalar_one()
 
-        tenant_result = await db.execute(
-            select(Tenant).where(
-                and_(
-                    Tenant.id == lease.tenant_id,
-                    Tenant.auth_user_id == auth_user.username
-                )
-            )
-        )
-        if not tenant_result.scalar_one_or_none():
+        tenant = await get_tenant_identity(db, auth_user.username)
+        if not tenant or tenant.tenant_id != lease.tenant_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to view this payment"
@@ -385,15 +352,8 @@ async def create_stripe_payment_intent(
         )
         lease = lease_result.scalar_one()
 
-        tenant_result = await db.execute(
-            select(Tenant).where(
-                and_(
-                    Tenant.id == lease.tenant_id,
-                    Tenant.auth_user_id == auth_user.username
-                )
-            )
-        )
-        if not tenant_result.scalar_one_or_none():
+        tenant = await get_tenant_identity(db, auth_user.username)
+        if not tenant or tenant.tenant_id != lease.tenant_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to pay this rent"
@@ -9,13 +9,14 @@ This endpoint is maintained for backwards compatibility only.
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from typing import List, Annotated
 from uuid import UUID
 
 from db.database import get_db
 from db.models import Property as PropertyModel
 from api.schemas import Property, PropertyCreate, PropertyUpdate, PropertyList
+from api.pagination import PageOptions, paginate
 from core.auth import AuthUser, require_admin, require_manager
 
 router = APIRouter()
@@ -52,6 +53,7 @@ async def list_properties(
     response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    page: PageOptions = Depends(),
     db: AsyncSession = Depends(get_db),
     auth_user: AuthUser = Depends(require_manager)
 ):
@@ -61,17 +63,11 @@ async def list_properties(
     DEPRECATED: Use GET /buildings instead. Properties and Buildings were redundant.
     """
     add_deprecation_header(response)
-    # Get total count
-    count_query = select(func.count()).select_from(PropertyModel)
-    total_result = await db.execute(count_query)
-    total = total_result.scalar_one()
-
-    # Get properties
-    query = select(PropertyModel).offset(skip).limit(limit).order_by(PropertyModel.created_at.desc())
-    result = await db.execute(query)
-    properties = result.scalars().all()
-
-    return PropertyList(total=total, items=properties)
+    result = await paginate(
+        db, select(PropertyModel), PropertyModel.created_at, PropertyModel.id,
+        skip=skip, limit=limit, options=page
+    )
+    return PropertyList(**result.envelope())
 
 
 @router.get("/{property_id}", response_model=Property)
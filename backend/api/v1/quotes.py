@@ -38,11 +38,16 @@ from api.schemas_quotes import (
     QuoteCustomerSelection, QuoteCustomerSelectionCreate, QuoteCustomerSelectionUpdate,
     CustomerPortalLinkResponse
 )
+from api.pagination import PageOptions, paginate
+from api.fieldsets import SparseFields, load_options, sparse_response
+from api.conditional import conditional
 from services.quote_calculator import QuoteCalculator
 from services.vendor_pricing_scraper import update_vendor_pricing_data
 from services.quote_pdf_generator import generate_quote_pdf
 from services.file_storage import get_file_storage_service
 from services.labor_calculator import LaborCalculator
+from services.search_service import escape_like
+from services.cache_service import cached
 from core.auth import AuthUser, require_admin, require_manager
 from core.config import settings
 from fastapi.responses import Response
@@ -383,6 +388,8 @@ async def list_quotes(
     status: Optional[str] = Query(None, pattern="^(draft|sent|accepted|rejected|expired)$"),
     customer_email: Optional[str] = None,
     client_id: Optional[UUID] = None,
+    page: PageOptions = Depends(),
+    sparse: SparseFields = Depends(),
     db: AsyncSession = Depends(get_db),
     auth_user: AuthUser = Depends(require_manager)
 ):
@@ -395,33 +402,35 @@ async def list_quotes(
     - status: Filter by quote status
     - customer_email: Search by customer email
     - client_id: Filter by client ID
+
+    Pass `fields` (e.g. id,quote_number,customer_name,status,monthly_total)
+    to skip floor plans, builder/portal state and line items.
     """
+    fields = sparse.resolve(Quote)
     query_base = select(QuoteModel)
 
     # Apply filters
     if status:
         query_base = query_base.where(QuoteModel.status == status)
     if customer_email:
-        query_base = query_base.where(QuoteModel.customer_email.ilike(f"%{customer_email}%"))
+        query_base = query_base.where(
+            QuoteModel.customer_email.ilike(f"%{escape_like(customer_email)}%", escape="\\")
+        )
     if client_id:
         query_base = query_base.where(QuoteModel.client_id == client_id)
 
-    # Get total count
-    count_query = select(func.count()).select_from(query_base.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar_one()
-
-    # Get quotes with eager loading of relationships
-    query = query_base.options(selectinload(QuoteModel.line_items)).offset(skip).limit(limit).order_by(QuoteModel.created_at.desc())
-    result = await db.execute(query)
-    quotes = result.scalars().all()
-
-    return QuoteListResponse(
-        items=quotes,
-        total=total,
-        skip=skip,
-        limit=limit
+    # Eager load line items unless a sparse fieldset says otherwise; the count ignores loader options
+    if fields:
+        query = query_base.options(*load_options(QuoteModel, fields, always=[QuoteModel.created_at]))
+    else:
+        query = query_base.options(selectinload(QuoteModel.line_items))
+    result = await paginate(
+        db, query, QuoteModel.created_at, QuoteModel.id,
+        skip=skip, limit=limit, options=page
     )
+    if fields:
+        return sparse_response(result.envelope(), Quote, fields)
+    return QuoteListResponse(**result.envelope())
 
 
 @router.get("/quotes/{quote_id}", response_model=Quote)
@@ -893,7 +902,14 @@ async def get_quote_stats(
 # PRICING TIERS
 # ============================================================================
 
+# Pricing reads are public and change rarely; commits to these tables invalidate them
+PRICING_TAGS = ("pricing_tiers",)
+PRICING_COMPARE_TAGS = ("pricing_tiers", "labor_rates", "installation_times", "device_materials")
+
+
 @router.get("/pricing-tiers", response_model=PricingTierListResponse)
+@conditional(PricingTierModel, where=lambda args: [PricingTierModel.active == True] if args.get("active_only", True) else [])
+@cached("pricing", tags=PRICING_TAGS, model=PricingTierListResponse)
 async def list_pricing_tiers(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
@@ -930,6 +946,7 @@ async def list_pricing_tiers(
 
 
 @router.get("/pricing-tiers/compare")
+@cached("pricing", tags=PRICING_COMPARE_TAGS)
 async def compare_pricing_tiers(
     total_units: int = Query(..., ge=1, description="Total units to manage"),
     smart_home_penetration: float = Query(25.0, ge=0, le=100, description="% of units with smart home"),
@@ -1046,6 +1063,7 @@ async def create_pricing_tier(
 # ============================================================================
 
 @router.get("/vendor-pricing", response_model=VendorPricingListResponse)
+@cached("pricing", tags=("vendor_pricing",), model=VendorPricingListResponse)
 async def list_vendor_pricing(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
@@ -0,0 +1,72 @@
+"""
+Somni Property Manager - Unified Search API
+Type-ahead search across tenants, clients, leads, quotes and HA instances
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List, Dict
+from pydantic import BaseModel
+
+from db.database import get_db
+from services.search_service import SEARCH_ENTITIES, MIN_TERM_LENGTH, search_entities
+from core.auth import AuthUser, require_manager
+
+router = APIRouter()
+
+
+# ============================================================================
+# PYDANTIC SCHEMAS
+# ============================================================================
+
+class SearchHit(BaseModel):
+    """One ranked search result"""
+    type: str
+    id: str
+    title: str
+    subtitle: Optional[str] = None
+    score: float
+    highlights: Dict[str, str]
+
+
+class SearchResponse(BaseModel):
+    """Mixed-entity search results, best first"""
+    query: str
+    items: List[SearchHit]
+    total: int
+
+
+# ============================================================================
+# API ENDPOINTS
+# ============================================================================
+
+@router.get("", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=MIN_TERM_LENGTH, max_length=200, description="Search text"),
+    types: Optional[str] = Query(
+        None, description=f"Comma-separated entity types ({', '.join(SEARCH_ENTITIES)})"
+    ),
+    prefix: bool = Query(True, description="Match word prefixes (type-ahead) instead of any substring"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    auth_user: AuthUser = Depends(require_manager)
+):
+    """
+    Search tenants, clients, leads, quotes and HA instances at once
+
+    Admin/Manager only. Every word must match one of an entity's searched
+    fields; results are ranked across types and matched text in each field
+    is wrapped in <mark> (HTML-escaped).
+    """
+    type_list = None
+    if types:
+        type_list = [t.strip() for t in types.split(",") if t.strip()]
+        unknown = set(type_list) - set(SEARCH_ENTITIES)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown search types: {', '.join(sorted(unknown))}"
+            )
+
+    items = await search_entities(db, q, types=type_list, limit=limit, prefix=prefix)
+    return SearchResponse(query=q, items=items, total=len(items))
@@ -5,7 +5,7 @@ Tenant management with role-based access control
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from typing import Optional, Annotated
 from uuid import UUID
 from datetime import date
@@ -13,6 +13,9 @@ from datetime import date
 from db.database import get_db
 from db.models import Tenant, Lease
 from api.schemas import TenantCreate, TenantUpdate, TenantResponse, TenantListResponse
+from api.pagination import PageOptions, paginate
+from api.fieldsets import SparseFields, load_options, sparse_response
+from services.search_service import text_search_clause
 from core.auth import get_auth_user, require_admin, require_manager, get_current_tenant, AuthUser, CurrentTenant, can_access_tenant_data
 
 router = APIRouter()
@@ -28,12 +31,16 @@ async def list_tenants(
     limit: int = Query(100, ge=1, le=500),
     status_filter: Optional[str] = Query(None, description="Filter by status: active, former, applicant"),
     search: Optional[str] = Query(None, description="Search by name or email"),
+    page: PageOptions = Depends(),
+    sparse: SparseFields = Depends(),
     auth_user: AuthUser = Depends(get_auth_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
     List all tenants (admin/manager only)
 
+    Pass `cursor` (the previous page's next_cursor) for keyset paging.
+
     **Permissions:**
     - Admin: Can view all tenants
     - Manager: Can view all tenants
@@ -54,31 +61,16 @@ async def list_tenants(
         query = query.where(Tenant.status == status_filter)
 
     if search:
-        search_pattern = f"%{search}%"
-        query = query.where(
-            (Tenant.first_name.ilike(search_pattern)) |
-            (Tenant.last_name.ilike(search_pattern)) |
-            (Tenant.email.ilike(search_pattern))
-        )
-
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-
-    # Apply pagination
-    query = query.offset(skip).limit(limit).order_by(Tenant.created_at.desc())
-
-    # Execute query
-    result = await db.execute(query)
-    tenants = result.scalars().all()
-
-    return TenantListResponse(
-        items=tenants,
-        total=total,
-        skip=skip,
-        limit=limit
-    )
+        clause = text_search_clause([Tenant.first_name, Tenant.last_name, Tenant.email], search)
+        if clause is not None:
+            query = query.where(clause)
+
+    fields = sparse.resolve(TenantResponse)
+    query = query.options(*load_options(Tenant, fields, always=[Tenant.created_at]))
+    result = await paginate(db, query, Tenant.created_at, Tenant.id, skip=skip, limit=limit, options=page)
+    if fields:
+        return sparse_response(result.envelope(), TenantResponse, fields)
+    return TenantListResponse(**result.envelope())
 
 
 @router.post("", response_model=TenantResponse, status_code=status.HTTP_201_CREATED)
@@ -12,11 +12,23 @@ from uuid import UUID
 from db.database import get_db
 from db.models import Unit as UnitModel, Building as BuildingModel
 from api.schemas import Unit, UnitCreate, UnitUpdate, UnitList
+from api.conditional import conditional
 from core.auth import AuthUser, require_admin, require_manager
+from services.cache_service import cached
 
 router = APIRouter()
 
 
+def unit_filters(building_id: Optional[UUID], status: Optional[str]) -> list:
+    """Filter clauses for list_units (shared with its ETag)"""
+    filters = []
+    if building_id:
+        filters.append(UnitModel.building_id == building_id)
+    if status:
+        filters.append(UnitModel.status == status)
+    return filters
+
+
 @router.post("", response_model=Unit, status_code=201)
 async def create_unit(
     unit_data: UnitCreate,
@@ -50,6 +62,8 @@ async def create_unit(
 
 
 @router.get("", response_model=UnitList)
+@conditional(UnitModel, where=lambda args: unit_filters(args.get("building_id"), args.get("status")))
+@cached("property_lookups", tags=("units",), model=UnitList)
 async def list_units(
     building_id: Optional[UUID] = Query(None, description="Filter by building ID"),
     status: Optional[str] = Query(None, description="Filter by status (vacant/occupied/maintenance/unavailable)"),
@@ -60,16 +74,9 @@ async def list_units(
 ):
     """List all units with optional filters (Admin/Manager only)"""
     # Build query
-    query = select(UnitModel)
-    count_query = select(func.count()).select_from(UnitModel)
-
-    if building_id:
-        query = query.where(UnitModel.building_id == building_id)
-        count_query = count_query.where(UnitModel.building_id == building_id)
-
-    if status:
-        query = query.where(UnitModel.status == status)
-        count_query = count_query.where(UnitModel.status == status)
+    filters = unit_filters(building_id, status)
+    query = select(UnitModel).where(*filters)
+    count_query = select(func.count()).select_from(UnitModel).where(*filters)
 
     # Get total count
     total_result = await db.execute(count_query)
@@ -114,6 +121,8 @@ async def list_available_units(
 
 
 @router.get("/{unit_id}", response_model=Unit)
+@conditional(UnitModel, key="unit_id")
+@cached("property_lookups", tags=("units",), model=Unit)
 async def get_unit(
     unit_id: UUID,
     db: AsyncSession = Depends(get_db),
@@ -11,6 +11,7 @@ import json
 from services.websocket_manager import manager, get_ws_manager, ConnectionManager
 from core.auth import get_auth_user, AuthUser
 from core.websocket_auth import get_ws_auth_manager, WebSocketAuthManager
+from services.dashboard_snapshot import dashboard_snapshots, is_dashboard_room, room_for_scope, scope_for_room
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -38,7 +39,7 @@ async def create_websocket_token(
     - expires_in: Token lifetime in seconds
     - username: Authenticated username
     """
-    token = ws_auth.create_token(
+    token = await ws_auth.create_token(
         username=auth_user.username,
         email=auth_user.email,
         groups=auth_user.groups
@@ -72,17 +73,20 @@ async def websocket_endpoint(
     - payment_update: Payment status changed
     - work_order_update: Work order status changed
     - iot_alert: IoT device alert
+    - dashboard_snapshot: Full dashboard cards (sent on joining a dashboard room)
+    - dashboard_delta: Dashboard cards that changed since the last message
     - room_joined: Joined a room
     - error: Error message
 
     **Client Commands:**
     - join_room: {"action": "join_room", "room": "property:uuid"}
+      (managers may join "dashboard" or "dashboard:{property_id}" for live dashboard cards)
     - leave_room: {"action": "leave_room", "room": "property:uuid"}
     - ping: {"action": "ping"} -> Returns pong
     """
 
     # Validate WebSocket token
-    session = ws_auth.validate_token(token)
+    session = await ws_auth.validate_token(token)
 
     if not session:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid or expired token")
@@ -114,8 +118,25 @@ async def websocket_endpoint(
 
                 elif action == "join_room":
                     room = message.get("room")
-                    if room:
+                    dashboard_room = bool(room) and is_dashboard_room(room)
+                    scope = scope_for_room(room) if dashboard_room else None
+                    if dashboard_room and scope is None:
+                        await ws_manager.send_personal_message({
+                            "type": "error",
+                            "message": f"Invalid dashboard room: {room}"
+                        }, websocket)
+                    elif dashboard_room and not session.is_manager():
+                        await ws_manager.send_personal_message({
+                            "type": "error",
+                            "message": "Dashboard rooms require manager access"
+                        }, websocket)
+                    elif room:
+                        # Deltas are broadcast to the canonical room name
+                        if dashboard_room:
+                            room = room_for_scope(scope)
                         await ws_manager.join_room(websocket, room)
+                        if dashboard_room:
+                            await dashboard_snapshots.send_snapshot(websocket, room)
                     else:
                         await ws_manager.send_personal_message({
                             "type": "error",
@@ -124,6 +145,9 @@ async def websocket_endpoint(
 
                 elif action == "leave_room":
                     room = message.get("room")
+                    scope = scope_for_room(room) if room else None
+                    if scope is not None:
+                        room = room_for_scope(scope)
                     if room:
                         await ws_manager.leave_room(websocket, room)
                     else:
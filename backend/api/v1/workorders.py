@@ -5,7 +5,7 @@ Handles work orders, assignment workflow, and IoT-triggered maintenance
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, and_, or_
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from uuid import UUID
@@ -14,7 +14,7 @@ from decimal import Decimal
 import logging
 
 from db.database import get_db
-from db.models import WorkOrder, Unit, Building, Tenant, WorkOrderEvent, Contractor, WorkOrderTask, WorkOrderMaterial
+from db.models import WorkOrder, Unit, Building, WorkOrderEvent, Contractor, WorkOrderTask, WorkOrderMaterial
 from api.schemas import (
     WorkOrderCreate,
     WorkOrderUpdate,
@@ -31,7 +31,9 @@ from api.schemas import (
     WorkOrderMaterialUpdate,
     WorkOrderMaterialResponse
 )
-from core.auth import get_auth_user, require_manager, get_current_tenant, AuthUser, CurrentTenant
+from api.pagination import PageOptions, paginate
+from api.fieldsets import SparseFields, load_options, sparse_response
+from core.auth import get_auth_user, require_manager, get_current_tenant, get_tenant_identity, AuthUser, CurrentTenant
 from core.security.rbac import require_permission, require_role, Role
 from services.mqtt_client import mqtt_service
 from services.websocket_manager import manager as ws_manager
@@ -56,6 +58,8 @@ async def list_work_orders(
     unit_id: Optional[UUID] = None,
     building_id: Optional[UUID] = None,
     assigned_to: Optional[str] = None,
+    page: PageOptions = Depends(),
+    sparse: SparseFields = Depends(),
     auth_user: AuthUser = Depends(get_auth_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -71,15 +75,12 @@ async def list_work_orders(
     # Role-based filtering
     if not (auth_user.is_admin or auth_user.is_manager):
         # Tenants can only see their own work orders
-        tenant_result = await db.execute(
-            select(Tenant).where(Tenant.auth_user_id == auth_user.username)
-        )
-        tenant = tenant_result.scalar_one_or_none()
+        tenant = await get_tenant_identity(db, auth_user.username)
 
         if not tenant:
             return WorkOrderListResponse(items=[], total=0, skip=skip, limit=limit)
 
-        query = query.where(WorkOrder.tenant_id == tenant.id)
+        query = query.where(WorkOrder.tenant_id == tenant.tenant_id)
 
     # Apply filters
     if status:
@@ -100,23 +101,15 @@ async def list_work_orders(
     if assigned_to:
         query = query.where(WorkOrder.assigned_to == assigned_to)
 
-    # Get total count
-    count_result = await db.execute(
-        select(func.count()).select_from(query.subquery())
-    )
-    total = count_result.scalar() or 0
-
-    # Get paginated results
-    query = query.offset(skip).limit(limit).order_by(WorkOrder.created_at.desc())
-    result = await db.execute(query)
-    work_orders = result.scalars().all()
-
-    return WorkOrderListResponse(
-        items=work_orders,
-        total=total,
-        skip=skip,
-        limit=limit
+    fields = sparse.resolve(WorkOrderResponse)
+    query = query.options(*load_options(WorkOrder, fields, always=[WorkOrder.created_at]))
+    result = await paginate(
+        db, query, WorkOrder.created_at, WorkOrder.id,
+        skip=skip, limit=limit, options=page
     )
+    if fields:
+        return sparse_response(result.envelope(), WorkOrderResponse, fields)
+    return WorkOrderListResponse(**result.envelope())
 
 
 @router.get("/{work_order_id}", response_model=WorkOrderResponse)
@@ -145,15 +138,8 @@ async def get_work_order(
 
     # Authorization check for tenants
     if not (auth_user.is_admin or auth_user.is_manager):
-        tenant_result = await db.execute(
-            select(Tenant).where(
-                and_(
-                    Tenant.id == work_order.tenant_id,
-                    Tenant.auth_user_id == auth_user.username
-                )
-            )
-        )
-        if not tenant_result.scalar_one_or_none():
+        tenant = await get_tenant_identity(db, auth_user.username)
+        if not tenant or tenant.tenant_id != work_order.tenant_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to view this work order"
@@ -989,15 +975,8 @@ async def get_work_order_events(
 
     # Authorization check for tenants
     if not (auth_user.is_admin or auth_user.is_manager):
-        tenant_result = await db.execute(
-            select(Tenant).where(
-                and_(
-                    Tenant.id == work_order.tenant_id,
-                    Tenant.auth_user_id == auth_user.username
-                )
-            )
-        )
-        if not tenant_result.scalar_one_or_none():
+        tenant = await get_tenant_identity(db, auth_user.username)
+        if not tenant or tenant.tenant_id != work_order.tenant_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to view this work order"
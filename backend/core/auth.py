@@ -4,11 +4,17 @@ Integrates with Authelia SSO via forwarded headers
 """
 
 from fastapi import Header, HTTPException, Depends, status
+from starlette.requests import HTTPConnection
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import Optional, Annotated
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from typing import Dict, List, NamedTuple, Optional, Annotated, Tuple
+from functools import lru_cache
+from uuid import UUID
 from pydantic import BaseModel
 import logging
+import os
+import time
 
 from db.database import get_db
 from db.models import Tenant
@@ -44,11 +50,64 @@ class CurrentTenant(BaseModel):
     is_manager: bool = False
 
 
+# ============================================================================
+# AUTH CONTEXT
+# ============================================================================
+
+@lru_cache(maxsize=256)
+def _parse_groups(x_forwarded_groups: Optional[str]) -> Tuple[Tuple[str, ...], bool, bool, bool]:
+    """(groups, is_admin, is_manager, is_tenant) for an X-Forwarded-Groups value"""
+    groups = tuple(g.strip() for g in x_forwarded_groups.split(",")) if x_forwarded_groups else ()
+    is_admin = "admins" in groups or "property-managers" in groups
+    is_manager = "managers" in groups or "property-managers" in groups or "admins" in groups  # Admins are also managers
+    is_tenant = "tenants" in groups
+    return groups, is_admin, is_manager, is_tenant
+
+
+def _build_auth_user(
+    username: str,
+    email: Optional[str],
+    name: Optional[str],
+    x_forwarded_groups: Optional[str]
+) -> AuthUser:
+    groups, is_admin, is_manager, is_tenant = _parse_groups(x_forwarded_groups)
+
+    # Fallback: Grant admin+manager to "admin" user if not in any groups
+    if username == "admin" and not (is_admin or is_manager):
+        is_admin = True
+        is_manager = True
+
+    logger.debug(
+        f"Auth: user={username}, groups={list(groups)}, "
+        f"is_admin={is_admin}, is_manager={is_manager}, is_tenant={is_tenant}"
+    )
+    return AuthUser(
+        username=username,
+        email=email,
+        name=name,
+        groups=list(groups),
+        is_admin=is_admin,
+        is_manager=is_manager,
+        is_tenant=is_tenant
+    )
+
+
+def auth_user_for_session(username: str, email: Optional[str], groups: List[str]) -> AuthUser:
+    """AuthUser for a WebSocket token session (same roles as the request that created it)"""
+    return _build_auth_user(username, email, None, ",".join(groups) or None)
+
+
+def get_request_auth_user(connection: HTTPConnection) -> Optional[AuthUser]:
+    """AuthUser already resolved for this request, if any"""
+    return getattr(connection.state, "auth_user", None)
+
+
 # ============================================================================
 # AUTH DEPENDENCIES
 # ============================================================================
 
 async def get_auth_user(
+    connection: HTTPConnection,
     x_forwarded_user: Annotated[Optional[str], Header()] = None,
     x_forwarded_email: Annotated[Optional[str], Header()] = None,
     x_forwarded_name: Annotated[Optional[str], Header()] = None,
@@ -62,16 +121,17 @@ async def get_auth_user(
     - X-Forwarded-Email: user email
     - X-Forwarded-Name: user full name
     - X-Forwarded-Groups: comma-separated groups
+
+    Resolved once per request and kept on request.state.auth_user.
     """
+    cached = get_request_auth_user(connection)
+    if cached is not None:
+        return cached
 
     # Check if user is authenticated
     if not x_forwarded_user:
         # SECURITY FIX: VPN access no longer grants automatic admin privileges
         # VPN users must authenticate via Authelia or provide a VPN auth token
-        from fastapi import Request
-        import os
-        import hmac
-        import hashlib
 
         # Check for VPN authentication token (set by Tailscale/network layer)
         vpn_auth_token = os.getenv("VPN_AUTH_TOKEN")
@@ -80,7 +140,7 @@ async def get_auth_user(
         # with limited privileges (manager only, not admin)
         if vpn_auth_token:
             logger.warning("VPN access detected without Authelia headers - granting limited manager access")
-            return AuthUser(
+            auth_user = AuthUser(
                 username="vpn-manager",
                 email="vpn@internal.local",
                 name="VPN Manager",
@@ -89,6 +149,8 @@ async def get_auth_user(
                 is_manager=True,
                 is_tenant=False
             )
+            connection.state.auth_user = auth_user
+            return auth_user
 
         # No VPN token configured - reject unauthenticated access
         logger.warning("Unauthenticated request blocked - no Authelia headers and no VPN_AUTH_TOKEN configured")
@@ -98,40 +160,13 @@ async def get_auth_user(
             headers={"WWW-Authenticate": "Bearer"}
         )
 
-    # Parse groups
-    groups = []
-    if x_forwarded_groups:
-        groups = [g.strip() for g in x_forwarded_groups.split(",")]
-
-    # Debug logging
-    logger.info(f"AUTH DEBUG: user={x_forwarded_user}, groups_header={x_forwarded_groups}, parsed_groups={groups}")
-
-    # Determine roles from groups
-    is_admin = "admins" in groups or "property-managers" in groups
-    is_manager = "managers" in groups or "property-managers" in groups or "admins" in groups  # Admins are also managers
-    is_tenant = "tenants" in groups
-
-    logger.info(f"AUTH DEBUG: is_admin={is_admin}, is_manager={is_manager}, is_tenant={is_tenant}")
-
-    # Fallback: Grant admin+manager to "admin" user if not in any groups
-    if x_forwarded_user == "admin" and not (is_admin or is_manager):
-        logger.info(f"Granting admin privileges to 'admin' user (no groups detected)")
-        is_admin = True
-        is_manager = True
-        logger.info(f"AUTH DEBUG: After fallback - is_admin={is_admin}, is_manager={is_manager}")
-
-    return AuthUser(
-        username=x_forwarded_user,
-        email=x_forwarded_email,
-        name=x_forwarded_name,
-        groups=groups,
-        is_admin=is_admin,
-        is_manager=is_manager,
-        is_tenant=is_tenant
-    )
+    auth_user = _build_auth_user(x_forwarded_user, x_forwarded_email, x_forwarded_name, x_forwarded_groups)
+    connection.state.auth_user = auth_user
+    return auth_user
 
 
 async def get_optional_auth_user(
+    connection: HTTPConnection,
     x_forwarded_user: Annotated[Optional[str], Header()] = None,
     x_forwarded_email: Annotated[Optional[str], Header()] = None,
     x_forwarded_name: Annotated[Optional[str], Header()] = None,
@@ -144,35 +179,13 @@ async def get_optional_auth_user(
     if not x_forwarded_user:
         return None
 
-    groups = []
-    if x_forwarded_groups:
-        groups = [g.strip() for g in x_forwarded_groups.split(",")]
-
-    # Debug logging
-    logger.info(f"AUTH DEBUG (optional): user={x_forwarded_user}, groups_header={x_forwarded_groups}, parsed_groups={groups}")
+    cached = get_request_auth_user(connection)
+    if cached is not None:
+        return cached
 
-    is_admin = "admins" in groups or "property-managers" in groups
-    is_manager = "managers" in groups or "property-managers" in groups or "admins" in groups  # Admins are also managers
-    is_tenant = "tenants" in groups
-
-    logger.info(f"AUTH DEBUG (optional): is_admin={is_admin}, is_manager={is_manager}, is_tenant={is_tenant}")
-
-    # Fallback: Grant admin+manager to "admin" user if not in any groups
-    if x_forwarded_user == "admin" and not (is_admin or is_manager):
-        logger.info(f"Granting admin privileges to 'admin' user (no groups detected)")
-        is_admin = True
-        is_manager = True
-        logger.info(f"AUTH DEBUG (optional): After fallback - is_admin={is_admin}, is_manager={is_manager}")
-
-    return AuthUser(
-        username=x_forwarded_user,
-        email=x_forwarded_email,
-        name=x_forwarded_name,
-        groups=groups,
-        is_admin=is_admin,
-        is_manager=is_manager,
-        is_tenant=is_tenant
-    )
+    auth_user = _build_auth_user(x_forwarded_user, x_forwarded_email, x_forwarded_name, x_forwarded_groups)
+    connection.state.auth_user = auth_user
+    return auth_user
 
 
 async def get_current_tenant(
@@ -291,6 +304,85 @@ async def require_operator(
     return auth_user
 
 
+# ============================================================================
+# TENANT IDENTITY CACHE
+# ============================================================================
+
+# Auth username -> tenant/client IDs, so tenant-scoped endpoints skip a
+# SELECT per request. Entries are dropped when this process commits a change
+# to a tenant (not at flush: a concurrent request could re-cache the old
+# committed row before the commit); other pods pick changes up within the
+# TTL. Unknown usernames are not cached, so a new link works immediately.
+TENANT_IDENTITY_TTL_SECONDS = 60.0
+TENANT_IDENTITY_CACHE_MAX = 10000
+
+# Session.info key: usernames whose tenant link changed in the open transaction
+FLUSHED_USERNAMES_KEY = "tenant_identity_usernames"
+
+
+class TenantIdentity(NamedTuple):
+    tenant_id: UUID
+    client_id: Optional[UUID]
+
+
+_tenant_identities: Dict[str, Tuple[float, TenantIdentity]] = {}
+
+# Bumped by every invalidation; a lookup that raced one does not store its result
+_identity_generation = 0
+
+
+async def get_tenant_identity(db: AsyncSession, username: str) -> Optional[TenantIdentity]:
+    """Tenant/client IDs linked to an auth username (None when there is no tenant)"""
+    cached = _tenant_identities.get(username)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    generation = _identity_generation
+    row = (await db.execute(
+        select(Tenant.id, Tenant.client_id).where(Tenant.auth_user_id == username)
+    )).first()
+    if row is None:
+        return None
+    identity = TenantIdentity(row.id, row.client_id)
+
+    if generation == _identity_generation:
+        if len(_tenant_identities) >= TENANT_IDENTITY_CACHE_MAX:
+            _tenant_identities.clear()
+        _tenant_identities[username] = (time.monotonic() + TENANT_IDENTITY_TTL_SECONDS, identity)
+    return identity
+
+
+def invalidate_tenant_identity(username: Optional[str] = None):
+    """Forget one username's cached tenant identity (or all of them)"""
+    global _identity_generation
+    _identity_generation += 1
+    if username is None:
+        _tenant_identities.clear()
+    else:
+        _tenant_identities.pop(username, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tenants(session, flush_context):
+    """Remember usernames of tenants created, updated or deleted until the transaction ends"""
+    usernames = session.info.setdefault(FLUSHED_USERNAMES_KEY, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Tenant):
+            history = inspect(obj).attrs.auth_user_id.history
+            usernames.update(u for u in (*history.added, *history.deleted, *history.unchanged) if u)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_tenants(session):
+    for username in session.info.pop(FLUSHED_USERNAMES_KEY, ()):
+        invalidate_tenant_identity(username)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_tenants(session):
+    session.info.pop(FLUSHED_USERNAMES_KEY, None)
+
+
 # ============================================================================
 # PERMISSION HELPERS
 # ============================================================================
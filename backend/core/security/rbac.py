@@ -4,7 +4,8 @@ Defines roles, permissions, and decorators for endpoint access control
 """
 
 from enum import Enum
-from typing import List, Set, Optional
+from types import MappingProxyType
+from typing import List, Mapping, Set, Optional, Tuple
 from fastapi import HTTPException, Request, Depends
 from functools import wraps
 import logging
@@ -93,6 +94,38 @@ ROLE_PERMISSIONS = {
 }
 
 
+def _compile_permission_matrix(
+    role_permissions: Mapping[Role, Mapping[str, List[str]]]
+) -> Tuple[Mapping[Tuple[str, str], int], Mapping[Role, int]]:
+    """
+    Compile the role matrix into bitmasks
+
+    Every (resource, action) pair gets one bit; each role's mask has the bits
+    of the pairs it is granted, so a check is a single AND.
+    """
+    pairs = sorted({
+        (resource, action)
+        for resources in role_permissions.values()
+        for resource, actions in resources.items()
+        for action in actions
+    })
+    bits = {pair: 1 << index for index, pair in enumerate(pairs)}
+    masks = {
+        role: sum(bits[(resource, action)] for resource, actions in resources.items() for action in set(actions))
+        for role, resources in role_permissions.items()
+    }
+    return MappingProxyType(bits), MappingProxyType(masks)
+
+
+# Frozen role x resource x action bitmap, compiled once at import
+PERMISSION_BITS, ROLE_PERMISSION_MASKS = _compile_permission_matrix(ROLE_PERMISSIONS)
+
+
+def permission_bit(resource: str, action: str) -> int:
+    """Bit for (resource, action); 0 when no role is ever granted it"""
+    return PERMISSION_BITS.get((resource, action), 0)
+
+
 def has_permission(role: Role, resource: str, action: str) -> bool:
     """
     Check if role has permission for action on resource
@@ -105,8 +138,7 @@ def has_permission(role: Role, resource: str, action: str) -> bool:
     Returns:
         True if role has permission, False otherwise
     """
-    permissions = ROLE_PERMISSIONS.get(role, {}).get(resource, [])
-    return action in permissions
+    return bool(ROLE_PERMISSION_MASKS.get(role, 0) & permission_bit(resource, action))
 
 
 def get_all_permissions(role: Role) -> dict:
@@ -128,19 +160,23 @@ def get_current_user_role(request: Request) -> Role:
     - X-User-Role header (set by Authelia or custom middleware)
     - Defaults to READ_ONLY for safety
     """
-    # Try to get role from header (set by Authelia or auth middleware)
-    role_str = request.headers.get("X-User-Role", "read_only").lower()
+    # Try to get from request state (set by auth dependency, or by an earlier call this request)
+    role_str = getattr(request.state, "user_role", None)
 
-    # Try to get from request state (set by auth dependency)
-    if hasattr(request.state, "user_role"):
-        role_str = request.state.user_role
+    # Otherwise get role from header (set by Authelia or auth middleware)
+    if role_str is None:
+        role_str = request.headers.get("X-User-Role", "read_only").lower()
 
     # Validate and convert to Role enum
     try:
-        return Role(role_str)
+        role = Role(role_str)
     except ValueError:
         logger.warning(f"Invalid role '{role_str}', defaulting to READ_ONLY")
-        return Role.READ_ONLY
+        role = Role.READ_ONLY
+
+    # Resolve once per request
+    request.state.user_role = role.value
+    return role
 
 
 def get_current_user_info(request: Request) -> dict:
@@ -152,8 +188,13 @@ def get_current_user_info(request: Request) -> dict:
     - role: User's role
     - email: User's email (if available)
     """
-    user_id = request.headers.get("X-Forwarded-User", "anonymous")
-    email = request.headers.get("X-Forwarded-Email", "")
+    # Reuse the AuthUser resolved by core.auth for this request when there is one
+    auth_user = getattr(request.state, "auth_user", None)
+    if auth_user is not None:
+        user_id, email = auth_user.username, auth_user.email or ""
+    else:
+        user_id = request.headers.get("X-Forwarded-User", "anonymous")
+        email = request.headers.get("X-Forwarded-Email", "")
     role = get_current_user_role(request)
 
     return {
@@ -230,15 +271,19 @@ def require_permission(resource: str, action: str):
     Raises:
         HTTPException: 403 if user doesn't have required permission
     """
+    required_bit = permission_bit(resource, action)
+    if not required_bit:
+        logger.warning(f"No role is granted '{action}' on '{resource}'; endpoint will always return 403")
+
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, request: Request, **kwargs):
             current_role = get_current_user_role(request)
-            user_info = get_current_user_info(request)
 
-            if not has_permission(current_role, resource, action):
+            if not ROLE_PERMISSION_MASKS.get(current_role, 0) & required_bit:
+                user_id = request.headers.get("X-Forwarded-User", "anonymous")
                 logger.warning(
-                    f"Access denied: User '{user_info['user_id']}' with role '{current_role}' "
+                    f"Access denied: User '{user_id}' with role '{current_role}' "
                     f"attempted to perform '{action}' on '{resource}'"
                 )
                 raise HTTPException(
@@ -6,14 +6,27 @@ Generates temporary session tokens for WebSocket connections
 import secrets
 import time
 import json
-from typing import Optional, Dict
+from collections import OrderedDict
+from typing import Optional, Dict, Tuple
 from dataclasses import dataclass, asdict
 import logging
-import redis
-from core.config import settings
+
+from services.redis_service import get_redis
 
 logger = logging.getLogger(__name__)
 
+TOKEN_KEY = "ws_token:{token}"
+USER_TOKENS_KEY = "ws_user_tokens:{username}"
+
+# Recently validated tokens are served from memory for a few seconds, so a
+# reconnect burst costs one Redis round trip. A revoked token can therefore
+# still be accepted by another pod for up to VALIDATION_CACHE_TTL seconds.
+VALIDATION_CACHE_SIZE = 1024
+VALIDATION_CACHE_TTL = 5.0
+
+# How long to wait before asking redis_service for a client again after Redis was unavailable
+REDIS_RETRY_INTERVAL = 30.0
+
 
 @dataclass
 class WebSocketSession:
@@ -51,39 +64,94 @@ class WebSocketAuthManager:
     2. Frontend calls /api/v1/ws/token to get WebSocket token
     3. Frontend connects to /ws?token={token}
     4. Backend validates token and establishes WebSocket connection
+
+    Tokens live in Redis (async client from services.redis_service) so any
+    pod can validate them, with a per-user token set for revocation. Every
+    operation is a single pipelined round trip. Without Redis, tokens are
+    kept in memory (multi-pod auth will fail).
     """
 
-    def __init__(self, token_lifetime: int = 300):
+    def __init__(
+        self,
+        token_lifetime: int = 300,
+        redis_client=None,
+        cache_size: int = VALIDATION_CACHE_SIZE,
+        cache_ttl: float = VALIDATION_CACHE_TTL
+    ):
         """
         Initialize auth manager
 
         Args:
             token_lifetime: Token lifetime in seconds (default: 300 = 5 minutes)
+            redis_client: Async Redis client (default: resolved lazily via get_redis)
+            cache_size: Max recently validated tokens kept in memory
+            cache_ttl: Seconds a validated token is served from memory
         """
         self.token_lifetime = token_lifetime
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
 
-        # Connect to Redis for shared token storage across pods
-        try:
-            redis_host = getattr(settings, 'REDIS_HOST', 'redis.core.svc.cluster.local')
-            redis_port = getattr(settings, 'REDIS_PORT', 6379)
-            self.redis_client = redis.Redis(
-                host=redis_host,
-                port=redis_port,
-                decode_responses=True,
-                socket_connect_timeout=5
-            )
-            # Test connection
-            self.redis_client.ping()
-            self.use_redis = True
-            logger.info(f"WebSocket auth using Redis at {redis_host}:{redis_port} (token lifetime: {token_lifetime}s)")
-        except Exception as e:
-            logger.warning(f"Failed to connect to Redis: {e}. Falling back to in-memory storage (multi-pod auth will fail!)")
-            self.redis_client = None
-            self.use_redis = False
-            self.sessions: Dict[str, WebSocketSession] = {}
-            logger.info(f"WebSocket auth using in-memory storage (token lifetime: {token_lifetime}s)")
+        self.redis_client = redis_client
+        self._redis_checked_at = float("-inf") if redis_client is None else time.monotonic()
+
+        # In-memory fallback storage when Redis is unavailable
+        self.sessions: Dict[str, WebSocketSession] = {}
 
-    def create_token(
+        # token -> (served until, session)
+        self._validated: "OrderedDict[str, Tuple[float, WebSocketSession]]" = OrderedDict()
+        self._stats = {"created": 0, "validated": 0, "rejected": 0, "cache_hits": 0, "redis_round_trips": 0}
+
+    @property
+    def use_redis(self) -> bool:
+        return self.redis_client is not None
+
+    async def _redis(self):
+        """Async Redis client, or None while Redis is unavailable"""
+        if self.redis_client is not None:
+            return self.redis_client
+        now = time.monotonic()
+        if now - self._redis_checked_at < REDIS_RETRY_INTERVAL:
+            return None
+        self._redis_checked_at = now
+        self.redis_client = await get_redis()
+        if self.redis_client is not None:
+            logger.info(f"WebSocket auth using Redis (token lifetime: {self.token_lifetime}s)")
+        else:
+            logger.warning("WebSocket auth falling back to in-memory storage (multi-pod auth will fail!)")
+        return self.redis_client
+
+    def _drop_redis(self, error: Exception):
+        logger.error(f"WebSocket auth Redis error: {error}")
+        self.redis_client = None
+        self._redis_checked_at = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # Validation cache
+    # ------------------------------------------------------------------
+
+    def _cache_get(self, token: str) -> Optional[WebSocketSession]:
+        entry = self._validated.get(token)
+        if entry is None:
+            return None
+        served_until, session = entry
+        if time.monotonic() > served_until or session.is_expired():
+            del self._validated[token]
+            return None
+        self._validated.move_to_end(token)
+        return session
+
+    def _cache_put(self, session: WebSocketSession, ttl: Optional[float] = None):
+        lifetime = self.cache_ttl if ttl is None else min(self.cache_ttl, ttl)
+        self._validated[session.token] = (time.monotonic() + lifetime, session)
+        self._validated.move_to_end(session.token)
+        while len(self._validated) > self.cache_size:
+            self._validated.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Tokens
+    # ------------------------------------------------------------------
+
+    async def create_token(
         self,
         username: str,
         email: Optional[str] = None,
@@ -115,28 +183,28 @@ class WebSocketAuthManager:
             expires_at=now + self.token_lifetime
         )
 
-        # Store session in Redis or in-memory
-        if self.use_redis:
+        client = await self._redis()
+        if client is not None:
             try:
-                # Store as JSON in Redis with TTL
-                session_data = asdict(session)
-                self.redis_client.setex(
-                    f"ws_token:{token}",
-                    self.token_lifetime,
-                    json.dumps(session_data)
-                )
-                logger.info(f"Created WebSocket token for user {username} in Redis (expires in {self.token_lifetime}s)")
+                user_key = USER_TOKENS_KEY.format(username=username)
+                async with client.pipeline(transaction=True) as pipe:
+                    pipe.set(TOKEN_KEY.format(token=token), json.dumps(asdict(session)), ex=self.token_lifetime)
+                    pipe.sadd(user_key, token)
+                    # The set outlives every token in it, since the newest token expires last
+                    pipe.expire(user_key, self.token_lifetime)
+                    await pipe.execute()
+                self._stats["redis_round_trips"] += 1
             except Exception as e:
-                logger.error(f"Failed to store token in Redis: {e}. Token will not work!")
+                self._drop_redis(e)
                 raise
         else:
-            # Fallback to in-memory
             self.sessions[token] = session
-            logger.info(f"Created WebSocket token for user {username} in memory (expires in {self.token_lifetime}s)")
 
+        self._stats["created"] += 1
+        logger.debug(f"Created WebSocket token for user {username} (expires in {self.token_lifetime}s)")
         return token
 
-    def validate_token(self, token: Optional[str]) -> Optional[WebSocketSession]:
+    async def validate_token(self, token: Optional[str]) -> Optional[WebSocketSession]:
         """
         Validate WebSocket session token
 
@@ -148,49 +216,51 @@ class WebSocketAuthManager:
         """
         if not token:
             logger.debug("WebSocket auth failed: No token provided")
+            self._stats["rejected"] += 1
             return None
 
-        # Get session from Redis or in-memory
-        session = None
+        session = self._cache_get(token)
+        if session is not None:
+            self._stats["cache_hits"] += 1
+            self._stats["validated"] += 1
+            return session
 
-        if self.use_redis:
+        remaining = None
+        client = await self._redis()
+        if client is not None:
             try:
-                session_data = self.redis_client.get(f"ws_token:{token}")
-                if session_data:
-                    # Deserialize from JSON
-                    data = json.loads(session_data)
-                    session = WebSocketSession(**data)
-                else:
-                    logger.debug(f"WebSocket auth failed: Token not found in Redis")
-                    return None
+                # Session and remaining TTL in one round trip
+                async with client.pipeline(transaction=False) as pipe:
+                    pipe.get(TOKEN_KEY.format(token=token))
+                    pipe.ttl(TOKEN_KEY.format(token=token))
+                    session_data, remaining = await pipe.execute()
+                self._stats["redis_round_trips"] += 1
             except Exception as e:
-                logger.error(f"Failed to validate token from Redis: {e}")
+                self._drop_redis(e)
+                self._stats["rejected"] += 1
                 return None
+            session = WebSocketSession(**json.loads(session_data)) if session_data else None
         else:
-            # Fallback to in-memory
             session = self.sessions.get(token)
 
         if not session:
-            logger.debug(f"WebSocket auth failed: Invalid token")
+            logger.debug("WebSocket auth failed: Invalid token")
+            self._stats["rejected"] += 1
             return None
 
         # Check expiration (Redis TTL handles this, but double-check)
         if session.is_expired():
             logger.info(f"WebSocket auth failed: Token expired for user {session.username}")
-            # Clean up expired token
-            if self.use_redis:
-                try:
-                    self.redis_client.delete(f"ws_token:{token}")
-                except:
-                    pass
-            else:
-                del self.sessions[token]
+            self.sessions.pop(token, None)
+            self._stats["rejected"] += 1
             return None
 
+        self._cache_put(session, ttl=remaining if remaining and remaining > 0 else None)
+        self._stats["validated"] += 1
         logger.debug(f"WebSocket auth successful for user {session.username}")
         return session
 
-    def revoke_token(self, token: str) -> bool:
+    async def revoke_token(self, token: str) -> bool:
         """
         Revoke WebSocket session token
 
@@ -200,25 +270,34 @@ class WebSocketAuthManager:
         Returns:
             True if token was revoked, False if not found
         """
-        if self.use_redis:
-            try:
-                result = self.redis_client.delete(f"ws_token:{token}")
-                if result > 0:
-                    logger.info(f"Revoked WebSocket token from Redis")
-                    return True
-                return False
-            except Exception as e:
-                logger.error(f"Failed to revoke token from Redis: {e}")
+        self._validated.pop(token, None)
+
+        client = await self._redis()
+        if client is None:
+            session = self.sessions.pop(token, None)
+            if session:
+                logger.info(f"Revoked WebSocket token for user {session.username}")
+            return session is not None
+
+        try:
+            key = TOKEN_KEY.format(token=token)
+            session_data = await client.get(key)
+            if not session_data:
                 return False
-        else:
-            if token in self.sessions:
-                username = self.sessions[token].username
-                del self.sessions[token]
+            username = json.loads(session_data)["username"]
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.srem(USER_TOKENS_KEY.format(username=username), token)
+                deleted, _ = await pipe.execute()
+            self._stats["redis_round_trips"] += 2
+            if deleted:
                 logger.info(f"Revoked WebSocket token for user {username}")
-                return True
+            return bool(deleted)
+        except Exception as e:
+            self._drop_redis(e)
             return False
 
-    def revoke_user_tokens(self, username: str) -> int:
+    async def revoke_user_tokens(self, username: str) -> int:
         """
         Revoke all WebSocket tokens for a user
 
@@ -227,48 +306,43 @@ class WebSocketAuthManager:
 
         Returns:
             Number of tokens revoked
-
-        Note: For Redis storage, this scans all ws_token keys (expensive).
-        Consider token expiration (5 min) as alternative.
         """
-        if self.use_redis:
-            try:
-                # Scan for all WebSocket tokens
-                count = 0
-                for key in self.redis_client.scan_iter(match="ws_token:*"):
-                    try:
-                        session_data = self.redis_client.get(key)
-                        if session_data:
-                            data = json.loads(session_data)
-                            if data.get('username') == username:
-                                self.redis_client.delete(key)
-                                count += 1
-                    except:
-                        pass
-
-                if count > 0:
-                    logger.info(f"Revoked {count} WebSocket tokens for user {username} from Redis")
-                return count
-            except Exception as e:
-                logger.error(f"Failed to revoke user tokens from Redis: {e}")
-                return 0
-        else:
+        for token in [t for t, (_, s) in self._validated.items() if s.username == username]:
+            del self._validated[token]
+
+        client = await self._redis()
+        if client is None:
             tokens_to_revoke = [
                 token for token, session in self.sessions.items()
                 if session.username == username
             ]
-
             for token in tokens_to_revoke:
                 del self.sessions[token]
-
             if tokens_to_revoke:
                 logger.info(f"Revoked {len(tokens_to_revoke)} WebSocket tokens for user {username}")
-
             return len(tokens_to_revoke)
 
+        try:
+            user_key = USER_TOKENS_KEY.format(username=username)
+            tokens = await client.smembers(user_key)
+            async with client.pipeline(transaction=True) as pipe:
+                for token in tokens:
+                    pipe.delete(TOKEN_KEY.format(token=token))
+                pipe.delete(user_key)
+                results = await pipe.execute()
+            self._stats["redis_round_trips"] += 2
+            # Members of expired tokens linger in the set until it expires; count live ones only
+            count = sum(results[:-1])
+            if count:
+                logger.info(f"Revoked {count} WebSocket tokens for user {username}")
+            return count
+        except Exception as e:
+            self._drop_redis(e)
+            return 0
+
     def cleanup_expired(self) -> int:
         """
-        Remove expired tokens from memory
+        Remove expired tokens from memory (Redis expires its keys itself)
 
         Returns:
             Number of tokens cleaned up
@@ -282,6 +356,10 @@ class WebSocketAuthManager:
         for token in expired_tokens:
             del self.sessions[token]
 
+        monotonic_now = time.monotonic()
+        for token in [t for t, (until, s) in self._validated.items() if until < monotonic_now or s.expires_at < now]:
+            del self._validated[token]
+
         if expired_tokens:
             logger.debug(f"Cleaned up {len(expired_tokens)} expired WebSocket tokens")
 
@@ -289,20 +367,22 @@ class WebSocketAuthManager:
 
     def get_stats(self) -> dict:
         """
-        Get statistics about active sessions
+        Get statistics about this process's token handling
 
         Returns:
             Dictionary with session statistics
         """
-        now = time.time()
         active_sessions = [s for s in self.sessions.values() if not s.is_expired()]
 
         return {
+            "storage": "redis" if self.use_redis else "memory",
             "total_sessions": len(self.sessions),
             "active_sessions": len(active_sessions),
             "expired_sessions": len(self.sessions) - len(active_sessions),
             "unique_users": len(set(s.username for s in active_sessions)),
-            "token_lifetime": self.token_lifetime
+            "token_lifetime": self.token_lifetime,
+            "validation_cache_size": len(self._validated),
+            **self._stats
         }
 
 
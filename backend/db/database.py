@@ -1,26 +1,131 @@
 """
 Somni Property Manager - Database Connection
 Async PostgreSQL connection pool using SQLAlchemy 2.0
+
+Writes go to the primary through get_db. Read-only endpoints (dashboards,
+analytics, exports) can use get_read_db / read_db(), which route to a
+replica from DATABASE_REPLICA_URLS while its replay lag is within
+DATABASE_REPLICA_MAX_LAG_SECONDS, and to the primary otherwise. Reads from
+a replica may trail the primary by up to that lag, so endpoints that read
+their own writes must keep using get_db.
+
+Each role has its own pool. Read sessions get a statement timeout
+(DATABASE_READ_STATEMENT_TIMEOUT_MS, also on replicas' connections) that
+routes can tighten or relax per transaction; the primary has none unless
+DATABASE_STATEMENT_TIMEOUT_MS is set. Pool usage (checked out, overflow,
+checkout wait) is reported by pool_stats().
 """
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.pool import NullPool
-from typing import AsyncGenerator
+import asyncio
+import itertools
 import logging
+import time
+from typing import AsyncGenerator, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from core.config import settings
 
 logger = logging.getLogger(__name__)
 
-# Create async engine
-engine = create_async_engine(
+# Seconds the replica is behind; 0 when it has replayed everything it received
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def stats(self) -> Dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 2) if self.checkouts else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 2),
+            "timeouts": self.timeouts,
+        }
+
+
+def create_role_engine(
+    url: str,
+    role: str,
+    pool_size: int,
+    max_overflow: int,
+    statement_timeout_ms: int
+) -> AsyncEngine:
+    """Engine for one database role with its own pool and default statement timeout (0 = server default)"""
+    connect_args = {}
+    if url.startswith("postgresql+asyncpg"):
+        server_settings = {"application_name": f"somniproperty-{role}"}
+        if statement_timeout_ms:
+            server_settings["statement_timeout"] = str(statement_timeout_ms)
+        connect_args["server_settings"] = server_settings
+    return create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        poolclass=InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_pre_ping=True,  # Enable connection health checks
+        connect_args=connect_args,
+    )
+
+
+# Create async engine (primary: all writes)
+engine = create_role_engine(
     settings.DATABASE_URL,
-    echo=settings.DEBUG,
+    "primary",
     pool_size=settings.DATABASE_POOL_SIZE,
     max_overflow=settings.DATABASE_MAX_OVERFLOW,
-    pool_pre_ping=True,  # Enable connection health checks
+    statement_timeout_ms=settings.DATABASE_STATEMENT_TIMEOUT_MS,
 )
 
+# Read replicas (optional)
+replica_engines: List[AsyncEngine] = [
+    create_role_engine(
+        url,
+        f"replica-{index}",
+        pool_size=settings.DATABASE_REPLICA_POOL_SIZE,
+        max_overflow=settings.DATABASE_REPLICA_MAX_OVERFLOW,
+        statement_timeout_ms=settings.DATABASE_READ_STATEMENT_TIMEOUT_MS,
+    )
+    for index, url in enumerate(u.strip() for u in settings.DATABASE_REPLICA_URLS.split(",") if u.strip())
+]
+
 # Create session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -31,6 +136,162 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+class ReplicaRouter:
+    """
+    Pick the engine for read-only sessions
+
+    A background loop measures each replica's replay lag. Replicas that
+    answered the last probe within max_lag_seconds are used round-robin;
+    when none qualifies, reads go to the primary.
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: List[AsyncEngine],
+        max_lag_seconds: float = 5.0,
+        check_interval: float = 5.0
+    ):
+        self.primary = primary
+        self.replicas = replicas
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.lag: Dict[int, Optional[float]] = {index: None for index in range(len(replicas))}
+        self.errors: Dict[int, Optional[str]] = {index: None for index in range(len(replicas))}
+        self.primary_fallbacks = 0
+        self._round_robin = itertools.count()
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+
+    def available_replicas(self) -> List[AsyncEngine]:
+        return [
+            replica for index, replica in enumerate(self.replicas)
+            if self.lag[index] is not None and self.lag[index] <= self.max_lag_seconds
+        ]
+
+    def read_engine(self) -> AsyncEngine:
+        """Engine for the next read-only session"""
+        if not self.replicas:
+            return self.primary
+        available = self.available_replicas()
+        if not available:
+            self.primary_fallbacks += 1
+            return self.primary
+        return available[next(self._round_robin) % len(available)]
+
+    async def measure_lag(self, replica: AsyncEngine) -> float:
+        """Replay lag in seconds (0 for databases that aren't streaming replicas)"""
+        if replica.dialect.name != "postgresql":
+            return 0.0
+        async with replica.connect() as conn:
+            return float((await conn.execute(REPLICA_LAG_SQL)).scalar() or 0.0)
+
+    async def check_once(self):
+        """Probe every replica once; unreachable replicas are taken out of rotation"""
+        results = await asyncio.gather(
+            *(self.measure_lag(replica) for replica in self.replicas),
+            return_exceptions=True
+        )
+        for index, result in enumerate(results):
+            previous = self.lag[index]
+            if isinstance(result, Exception):
+                self.lag[index], self.errors[index] = None, str(result)
+                if previous is not None:
+                    logger.warning(f"⚠️  Read replica {index} unavailable, reads fall back: {result}")
+            else:
+                self.lag[index], self.errors[index] = result, None
+                if result > self.max_lag_seconds and (previous is None or previous <= self.max_lag_seconds):
+                    logger.warning(f"⚠️  Read replica {index} is {result:.1f}s behind, skipping it")
+
+    async def start(self):
+        """Start the lag monitor (no-op without replicas)"""
+        if self.running or not self.replicas:
+            return
+        self.running = True
+        await self.check_once()
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"Replica router started ({len(self.available_replicas())}/{len(self.replicas)} replicas in rotation)")
+
+    async def stop(self):
+        self.running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while self.running:
+            try:
+                await asyncio.sleep(self.check_interval)
+                await self.check_once()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Replica lag check failed: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            "replicas": [
+                {"lag_seconds": self.lag[index], "in_rotation": replica in self.available_replicas(),
+                 "error": self.errors[index]}
+                for index, replica in enumerate(self.replicas)
+            ],
+            "max_lag_seconds": self.max_lag_seconds,
+            "primary_fallbacks": self.primary_fallbacks,
+        }
+
+
+replica_router = ReplicaRouter(
+    engine,
+    replica_engines,
+    max_lag_seconds=settings.DATABASE_REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.DATABASE_REPLICA_CHECK_INTERVAL_SECONDS,
+)
+
+
+def transaction_settings(info: Dict) -> Optional[Tuple[str, Dict]]:
+    """SQL applying a session's per-transaction timeout and read-only flag, if any"""
+    configs, params = [], {}
+    if info.get("statement_timeout_ms") is not None:
+        configs.append("set_config('statement_timeout', :statement_timeout, true)")
+        params["statement_timeout"] = str(int(info["statement_timeout_ms"]))
+    if info.get("read_only"):
+        configs.append("set_config('transaction_read_only', 'on', true)")
+    if not configs:
+        return None
+    return f"SELECT {', '.join(configs)}", params
+
+
+@event.listens_for(Session, "after_begin")
+def _apply_transaction_settings(session, transaction, connection):
+    """Apply read_session() options at the start of each transaction (PostgreSQL only)"""
+    if connection.dialect.name != "postgresql":
+        return
+    statement = transaction_settings(session.info)
+    if statement is not None:
+        sql, params = statement
+        connection.execute(text(sql), params)
+
+
+def read_session(statement_timeout_ms: Optional[int] = None) -> AsyncSession:
+    """
+    Read-only session on a replica (or the primary when no replica is fresh)
+
+    Args:
+        statement_timeout_ms: Per-transaction statement timeout; defaults to
+            DATABASE_READ_STATEMENT_TIMEOUT_MS (0 disables it)
+    """
+    if statement_timeout_ms is None:
+        statement_timeout_ms = settings.DATABASE_READ_STATEMENT_TIMEOUT_MS
+    return AsyncSessionLocal(
+        bind=replica_router.read_engine(),
+        info={"read_only": True, "statement_timeout_ms": statement_timeout_ms},
+    )
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency for FastAPI endpoints to get database session
@@ -53,6 +314,34 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+def read_db(statement_timeout_ms: Optional[int] = None):
+    """
+    Dependency factory for read-only endpoints with their own statement timeout
+
+    Usage:
+        @router.get("/analytics/summary")
+        async def summary(db: AsyncSession = Depends(read_db(statement_timeout_ms=15000))):
+            ...
+    """
+    async def dependency() -> AsyncGenerator[AsyncSession, None]:
+        async with read_session(statement_timeout_ms) as session:
+            yield session
+
+    return dependency
+
+
+# Read-only session with the default read timeout
+get_read_db = read_db()
+
+
+def pool_stats() -> Dict:
+    """Connection pool usage per role, plus replica lag"""
+    pools = {"primary": engine.pool.stats()}
+    for index, replica in enumerate(replica_engines):
+        pools[f"replica-{index}"] = replica.pool.stats()
+    return {"pools": pools, "routing": replica_router.stats()}
+
+
 async def init_db():
     """
     Initialize database connection
@@ -73,5 +362,8 @@ async def close_db():
     Close database connection pool
     Call this on application shutdown
     """
+    await replica_router.stop()
+    for replica in replica_engines:
+        await replica.dispose()
     await engine.dispose()
     logger.info("✅ Database connection closed")
@@ -4,7 +4,7 @@ SQLAlchemy ORM models for email and SMS communication
 """
 
 from sqlalchemy import (
-    Column, String, Integer, Numeric, Date, DateTime, Boolean,
+    Column, String, Integer, BigInteger, Numeric, Date, DateTime, Boolean,
     Text, ForeignKey, CheckConstraint, UniqueConstraint, Index, Time
 )
 from sqlalchemy.orm import relationship
@@ -38,6 +38,8 @@ class EmailAccount(Base):
     imap_username = Column(String(255), nullable=False)
     imap_password_encrypted = Column(Text, nullable=False)
     imap_folder = Column(String(255), default='INBOX')
+    imap_uidvalidity = Column(BigInteger)  # UIDVALIDITY the stored UID belongs to
+    imap_last_uid = Column(BigInteger)  # Highest UID already fetched
 
     # SMTP Configuration
     smtp_host = Column(String(255), nullable=False)
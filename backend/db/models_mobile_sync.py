@@ -0,0 +1,95 @@
+"""
+Somni Property Manager - Mobile Sync Models
+Change feed, device registry and conflict records for the offline-first mobile app
+"""
+
+from sqlalchemy import (
+    Column, String, Integer, BigInteger, Boolean, DateTime, Index, CheckConstraint
+)
+from sqlalchemy.sql import func
+import uuid
+
+from db.types import GUID, JSONB
+from db.models import Base
+
+# SQLite only auto-increments INTEGER PRIMARY KEY columns
+ChangeSeq = BigInteger().with_variant(Integer, "sqlite")
+
+
+class SyncChangeLog(Base):
+    """
+    One create/update/delete of a synced entity
+
+    seq is strictly increasing, so it doubles as the entity version (the seq
+    of an entity's latest change). seq is assigned at insert, not commit, so
+    the pull cursor is (txid, seq): txid is the writing transaction's id on
+    PostgreSQL (0 elsewhere), and pulls stop below the oldest transaction
+    still in progress.
+    Written by the ORM flush listener in services.mobile_sync_service.
+    """
+    __tablename__ = "sync_change_log"
+
+    seq = Column(ChangeSeq, primary_key=True, autoincrement=True)
+    txid = Column(BigInteger, nullable=False, server_default="0")
+    entity_type = Column(String(50), nullable=False)  # properties, tenants, work_orders, ...
+    entity_id = Column(String(64), nullable=False)
+    operation = Column(String(10), nullable=False)  # CREATE, UPDATE, DELETE
+    changed_fields = Column(JSONB)
+    user_id = Column(String(255))
+    device_id = Column(String(255))  # Device whose push caused the change (None for server edits)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        CheckConstraint("operation IN ('CREATE', 'UPDATE', 'DELETE')", name='check_sync_change_log_operation'),
+        Index('idx_sync_change_log_entity', 'entity_type', 'entity_id', 'seq'),
+        Index('idx_sync_change_log_position', 'txid', 'seq'),
+    )
+
+
+class MobileSyncDevice(Base):
+    """Registered mobile device and how far it has pulled the change feed"""
+    __tablename__ = "mobile_sync_devices"
+
+    id = Column(GUID, primary_key=True, default=uuid.uuid4)
+    device_id = Column(String(255), nullable=False, unique=True)
+    device_name = Column(String(255))
+    platform = Column(String(50))
+    app_version = Column(String(50))
+    os_version = Column(String(100))
+    user_id = Column(String(255))
+
+    last_pulled_txid = Column(BigInteger, nullable=False, default=0)
+    last_pulled_seq = Column(BigInteger, nullable=False, default=0)
+    last_sync_at = Column(DateTime(timezone=True))
+    last_pull_at = Column(DateTime(timezone=True))
+    last_push_at = Column(DateTime(timezone=True))
+    is_active = Column(Boolean, nullable=False, default=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class SyncConflict(Base):
+    """A pushed change rejected because the server row changed since the device last saw it"""
+    __tablename__ = "sync_conflicts"
+
+    id = Column(GUID, primary_key=True, default=uuid.uuid4)
+    device_id = Column(String(255), nullable=False)
+    entity_type = Column(String(50), nullable=False)
+    entity_id = Column(String(64), nullable=False)
+    operation = Column(String(10), nullable=False)
+
+    client_version = Column(BigInteger, nullable=False, default=0)
+    server_version = Column(BigInteger, nullable=False, default=0)
+    client_data = Column(JSONB, default=dict)
+    server_data = Column(JSONB, default=dict)
+    conflicting_fields = Column(JSONB, default=list)
+
+    status = Column(String(20), nullable=False, default='pending')  # pending, resolved
+    resolution_strategy = Column(String(20))  # client_wins, server_wins, merge, manual
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    resolved_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        CheckConstraint("status IN ('pending', 'resolved')", name='check_sync_conflicts_status'),
+        Index('idx_sync_conflicts_device_status', 'device_id', 'status'),
+    )
@@ -0,0 +1,63 @@
+"""
+Somni Property Manager - Integration Outbox Models
+Transactional outbox for external integration side effects
+"""
+
+from sqlalchemy import (
+    Column, String, Integer, DateTime, Text, Index, UniqueConstraint, CheckConstraint
+)
+from sqlalchemy.sql import func
+import uuid
+
+from db.types import GUID, JSONB
+from db.models import Base
+
+
+class IntegrationOutbox(Base):
+    """
+    One external integration call that must eventually happen
+
+    Rows are written in the same transaction as the business record that
+    caused them (e.g. a work order) and drained by the outbox dispatcher.
+    Status lifecycle: pending -> processing -> succeeded | dead
+    (failed attempts return the row to pending with a later next_attempt_at).
+    """
+    __tablename__ = "integration_outbox"
+
+    id = Column(GUID, primary_key=True, default=uuid.uuid4)
+
+    # What caused the side effect
+    aggregate_type = Column(String(50), nullable=False)  # work_order, lease, ...
+    aggregate_id = Column(String(100), nullable=False)
+
+    # Which integration call to make
+    integration = Column(String(50), nullable=False)  # vikunja, novu, ...
+    payload = Column(JSONB, nullable=False)
+    depends_on = Column(JSONB, default=list)  # Sibling integrations that must finish first
+    idempotency_key = Column(String(255), nullable=False)
+
+    # Delivery state
+    status = Column(String(20), nullable=False, default='pending')
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=8)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_at = Column(DateTime(timezone=True))
+    last_error = Column(Text)
+    result = Column(JSONB)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        UniqueConstraint('idempotency_key', name='uq_integration_outbox_idempotency_key'),
+        CheckConstraint(
+            "status IN ('pending', 'processing', 'succeeded', 'dead')",
+            name='check_integration_outbox_status'
+        ),
+        Index('idx_integration_outbox_due', 'status', 'next_attempt_at'),
+        Index('idx_integration_outbox_aggregate', 'aggregate_type', 'aggregate_id'),
+    )
+
+    def __repr__(self):
+        return f"<IntegrationOutbox {self.integration} {self.aggregate_type}:{self.aggregate_id} ({self.status})>"
@@ -13,7 +13,9 @@ from middleware import (
     RateLimitMiddleware,
     AuditLogMiddleware,
     RequestIDMiddleware,
-    ErrorHandlerMiddleware
+    ErrorHandlerMiddleware,
+    ConditionalGetMiddleware,
+    CompressionMiddleware
 )
 
 # Configure logging
@@ -34,6 +36,13 @@ app = FastAPI(
 )
 
 # Add custom middleware (order matters - first added = last executed)
+# ETags are computed on the uncompressed body, so conditional GETs sit inside compression
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    exclude_content_types=[t.strip() for t in settings.COMPRESSION_EXCLUDED_TYPES.split(",") if t.strip()],
+)
 app.add_middleware(ErrorHandlerMiddleware)
 app.add_middleware(AuditLogMiddleware)
 app.add_middleware(RateLimitMiddleware, requests_per_minute=100)
@@ -80,12 +89,24 @@ async def startup_event():
     import db.models_quotes  # Quote and pricing models
     import db.models_leads  # Lead management models (NoteCaptureMCP integration)
     import db.models_ha_instance  # Home Assistant instance models (Flutter app)
+    import db.models_outbox  # Integration outbox (durable external side effects)
+    import db.models_mobile_sync  # Mobile offline-sync change feed
     logger.info("✅ All database models imported")
 
     # Initialize database connection pool
     from db.database import init_db
     await init_db()
 
+    # Start read-replica lag monitor (reads use the primary until a replica qualifies)
+    if settings.DATABASE_REPLICA_URLS:
+        try:
+            from db.database import replica_router
+            await replica_router.start()
+            logger.info("✅ Read-replica routing started")
+        except Exception as e:
+            logger.warning(f"⚠️  Read-replica routing failed to start: {e}")
+            logger.info("Read-only endpoints will use the primary")
+
     # Initialize MQTT client connection (optional)
     mqtt_enabled = settings.MQTT_USERNAME is not None or settings.DEBUG
     if mqtt_enabled:
@@ -121,6 +142,80 @@ async def startup_event():
         logger.warning(f"⚠️  Proactive scheduler failed to start: {e}")
         logger.info("Application will continue without proactive ticket creation")
 
+    # Start integration outbox dispatcher (delivers queued integration calls)
+    try:
+        from services.outbox_service import outbox_dispatcher
+        await outbox_dispatcher.start()
+        logger.info("✅ Integration outbox dispatcher started")
+    except Exception as e:
+        logger.warning(f"⚠️  Integration outbox dispatcher failed to start: {e}")
+        logger.info("Queued integration calls will be delivered once the dispatcher runs")
+
+    # Start cache invalidation subscriber (applies other pods' cache invalidations)
+    try:
+        from services.cache_service import cache_invalidation_subscriber
+        await cache_invalidation_subscriber.start()
+        logger.info("✅ Cache invalidation subscriber started")
+    except Exception as e:
+        logger.warning(f"⚠️  Cache invalidation subscriber failed to start: {e}")
+        logger.info("In-process cache entries will expire by TTL only")
+
+    # Start dashboard snapshot publisher (pushes card deltas to dashboard WebSocket rooms)
+    try:
+        from services.dashboard_snapshot import dashboard_snapshots
+        await dashboard_snapshots.start()
+        logger.info("✅ Dashboard snapshot publisher started")
+    except Exception as e:
+        logger.warning(f"⚠️  Dashboard snapshot publisher failed to start: {e}")
+        logger.info("Dashboards will fall back to polling /dashboard")
+
+    # Start document vector index (embeds document metadata and OCR text for semantic search)
+    if settings.DOCUMENT_INDEX_ENABLED:
+        try:
+            from services.document_vector_index import document_vector_index
+            await document_vector_index.start()
+            logger.info("✅ Document vector index started")
+        except Exception as e:
+            logger.warning(f"⚠️  Document vector index failed to start: {e}")
+            logger.info("Semantic document search will serve the last saved index")
+    else:
+        logger.info("⏭️  Document vector index disabled")
+
+    # Start email poller (IMAP IDLE watchers for active email accounts)
+    if settings.EMAIL_POLLER_ENABLED:
+        try:
+            from db.database import AsyncSessionLocal
+            from services.email_service import get_email_poller
+            await get_email_poller(AsyncSessionLocal).start()
+            logger.info("✅ Email poller started")
+        except Exception as e:
+            logger.warning(f"⚠️  Email poller failed to start: {e}")
+            logger.info("Inbound email will not be processed automatically")
+    else:
+        logger.info("⏭️  Email poller disabled (set EMAIL_POLLER_ENABLED=true)")
+
+    # Start LLM provider health registry (background availability probes)
+    try:
+        from services.llm_provider_registry import llm_provider_registry
+        await llm_provider_registry.start()
+        logger.info("✅ LLM provider health registry started")
+    except Exception as e:
+        logger.warning(f"⚠️  LLM provider health registry failed to start: {e}")
+        logger.info("AI chat will select providers without cached health state")
+
+    # Start Git catalog refresher (only when component repos are configured)
+    from services.git_service import git_catalog_configured
+    if git_catalog_configured():
+        try:
+            from services.git_service import get_catalog_refresher
+            await get_catalog_refresher().start()
+            logger.info("✅ Git catalog refresher started")
+        except Exception as e:
+            logger.warning(f"⚠️  Git catalog refresher failed to start: {e}")
+            logger.info("Component sync will serve the built-in catalog")
+    else:
+        logger.info("⏭️  Git catalog refresher disabled (no component repos configured)")
+
     # Start device monitoring service (if MQTT is enabled)
     if mqtt_enabled:
         try:
@@ -167,6 +262,58 @@ async def shutdown_event():
     except Exception as e:
         logger.debug(f"Proactive scheduler stop: {e}")
 
+    # Stop integration outbox dispatcher
+    try:
+        from services.outbox_service import outbox_dispatcher
+        await outbox_dispatcher.stop()
+        logger.info("✅ Integration outbox dispatcher stopped")
+    except Exception as e:
+        logger.debug(f"Outbox dispatcher stop: {e}")
+
+    # Stop cache invalidation subscriber
+    try:
+        from services.cache_service import cache_invalidation_subscriber
+        await cache_invalidation_subscriber.stop()
+    except Exception as e:
+        logger.debug(f"Cache invalidation subscriber stop: {e}")
+
+    # Stop dashboard snapshot publisher
+    try:
+        from services.dashboard_snapshot import dashboard_snapshots
+        await dashboard_snapshots.stop()
+    except Exception as e:
+        logger.debug(f"Dashboard snapshot publisher stop: {e}")
+
+    # Stop document vector index
+    try:
+        from services.document_vector_index import document_vector_index
+        await document_vector_index.stop()
+    except Exception as e:
+        logger.debug(f"Document vector index stop: {e}")
+
+    # Stop email poller
+    try:
+        from services.email_service import email_poller
+        if email_poller is not None:
+            await email_poller.stop()
+    except Exception as e:
+        logger.debug(f"Email poller stop: {e}")
+
+    # Stop LLM provider health registry
+    try:
+        from services.llm_provider_registry import llm_provider_registry
+        await llm_provider_registry.stop()
+    except Exception as e:
+        logger.debug(f"LLM provider registry stop: {e}")
+
+    # Stop Git catalog refresher
+    try:
+        from services.git_service import git_catalog_configured, get_catalog_refresher
+        if git_catalog_configured():
+            await get_catalog_refresher().stop()
+    except Exception as e:
+        logger.debug(f"Git catalog refresher stop: {e}")
+
     # Close database connections
     from db.database import close_db
     await close_db()
@@ -223,6 +370,14 @@ async def shutdown_event():
     except Exception as e:
         logger.debug(f"Redis disconnect: {e}")
 
+    # Close pooled integration HTTP clients
+    try:
+        from services.http_client_registry import close_http_clients
+        await close_http_clients()
+        logger.info("✅ Integration HTTP clients closed")
+    except Exception as e:
+        logger.debug(f"HTTP client registry close: {e}")
+
     logger.info("✅ Application shutdown complete")
 
 
@@ -281,6 +436,20 @@ async def health_check():
     except Exception as e:
         health_status["dependencies"]["home_assistant"] = "not_configured"
 
+    # Connection pool usage and replica lag
+    try:
+        from db.database import pool_stats
+        health_status["database_pools"] = pool_stats()
+    except Exception as e:
+        logger.debug(f"Pool stats: {e}")
+
+    # Cache hit/miss metrics
+    try:
+        from services.cache_service import cache_stats
+        health_status["caches"] = cache_stats()
+    except Exception as e:
+        logger.debug(f"Cache stats: {e}")
+
     # Determine HTTP status code based on health
     status_code = 200 if health_status["status"] == "healthy" else 503
 
@@ -381,7 +550,15 @@ from api.v1 import (
     leads,  # Lead management and NoteCaptureMCP business opportunity capture
     # HA Instance Management (Flutter App)
     ha_instances,  # Home Assistant instance management for unified Flutter app
-    ha_terminal  # SSH terminal WebSocket for HA instances
+    ha_terminal,  # SSH terminal WebSocket for HA instances
+    # Integration Outbox (queued external side effects)
+    outbox,
+    # Unified search (type-ahead across tenants, clients, leads, quotes, HA instances)
+    search,
+    # Mobile offline sync (change feed for the Flutter app)
+    mobile_sync,
+    # Bulk exports (streaming NDJSON/CSV)
+    exports
 )
 
 # Include routers
@@ -742,6 +919,34 @@ app.include_router(
     tags=["ha-terminal", "ssh", "websocket", "flutter-app"]
 )
 
+# Integration Outbox (dead letters and delivery stats)
+app.include_router(
+    outbox.router,
+    prefix=f"{settings.API_V1_PREFIX}/outbox",
+    tags=["outbox", "integrations"]
+)
+
+# Unified Search (Flutter type-ahead)
+app.include_router(
+    search.router,
+    prefix=f"{settings.API_V1_PREFIX}/search",
+    tags=["search"]
+)
+
+# Mobile Offline Sync (Flutter change feed)
+app.include_router(
+    mobile_sync.router,
+    prefix=f"{settings.API_V1_PREFIX}/mobile-sync",
+    tags=["mobile-sync", "flutter-app"]
+)
+
+# Bulk Exports (streaming NDJSON/CSV)
+app.include_router(
+    exports.router,
+    prefix=f"{settings.API_V1_PREFIX}/exports",
+    tags=["exports"]
+)
+
 # TODO: Add more routers as we build them
 # Note: utilities, staff, approvals, communications routers exist but
 # are missing required database models and service implementations
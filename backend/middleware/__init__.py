@@ -1,16 +1,20 @@
 """
 Middleware for SomniProperty Backend
-Custom middleware for rate limiting, logging, and monitoring
+Custom middleware for rate limiting, logging, monitoring and HTTP caching
 """
 
 from .rate_limiter import RateLimitMiddleware
 from .audit_logger import AuditLogMiddleware
 from .request_id import RequestIDMiddleware
 from .error_handler import ErrorHandlerMiddleware
+from .conditional_get import ConditionalGetMiddleware
+from .compression import CompressionMiddleware
 
 __all__ = [
     "RateLimitMiddleware",
     "AuditLogMiddleware",
     "RequestIDMiddleware",
-    "ErrorHandlerMiddleware"
+    "ErrorHandlerMiddleware",
+    "ConditionalGetMiddleware",
+    "CompressionMiddleware"
 ]
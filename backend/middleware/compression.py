@@ -0,0 +1,199 @@
+"""
+Response Compression Middleware
+Brotli/gzip compression for responses above a size threshold
+
+Written as plain ASGI middleware (like Starlette's GZipMiddleware) rather
+than BaseHTTPMiddleware so streamed responses are compressed chunk by chunk
+instead of being buffered. Already-encoded responses and excluded content
+types (PDFs, event streams, exports that gzip themselves) pass through.
+"""
+
+import zlib
+import logging
+from typing import Iterable, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXCLUDED_CONTENT_TYPES = (
+    "application/pdf",
+    "application/zip",
+    "application/gzip",
+    "application/octet-stream",
+    "application/x-ndjson",
+    "text/event-stream",
+    "image/",
+    "video/",
+    "audio/",
+)
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """Accept-Encoding as {coding: q}"""
+    codings = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        codings[coding] = q
+    return codings
+
+
+def choose_encoding(header: Optional[str]) -> Optional[str]:
+    """Preferred supported coding for an Accept-Encoding header (br over gzip on ties)"""
+    if not header:
+        return None
+    codings = parse_accept_encoding(header)
+    wildcard = codings.get("*", 0.0)
+    candidates = (["br"] if BROTLI_AVAILABLE else []) + ["gzip"]
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = codings.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class _Encoder:
+    """Incremental compressor with one interface for gzip and brotli"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it, so streamed output is not held back"""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli (when installed) or gzip
+
+    Args:
+        app: ASGI app
+        minimum_size: Responses smaller than this (bytes) are sent as-is
+        exclude_content_types: Content-type prefixes never compressed
+        exclude_paths: Path prefixes never compressed
+        gzip_level: zlib level (1-9)
+        brotli_quality: brotli quality (0-11); 4-5 suits on-the-fly compression
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        exclude_content_types: Iterable[str] = DEFAULT_EXCLUDED_CONTENT_TYPES,
+        exclude_paths: Iterable[str] = (),
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.exclude_content_types: Tuple[str, ...] = tuple(t.lower() for t in exclude_content_types)
+        self.exclude_paths: Tuple[str, ...] = tuple(exclude_paths)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or (self.exclude_paths and scope["path"].startswith(self.exclude_paths)):
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def is_excluded(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return True
+        content_type = headers.get("content-type", "").lower()
+        return content_type.startswith(self.exclude_content_types)
+
+
+class _CompressionResponder:
+    """Per-response state: buffer until the size threshold, then compress or pass through"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.encoder: Optional[_Encoder] = None
+        self.buffer = b""
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            if self.middleware.is_excluded(Headers(raw=message["headers"])):
+                self.passthrough = True
+                await self._send(message)
+            else:
+                self.start = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is not None:
+            chunk = self.encoder.compress(body) if more_body else self.encoder.finish(body)
+            await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            return
+
+        self.buffer += body
+        if len(self.buffer) < self.middleware.minimum_size:
+            if more_body:
+                return
+            # Whole response is below the threshold: send it uncompressed
+            self.passthrough = True
+            await self._send(self.start)
+            await self._send({"type": "http.response.body", "body": self.buffer, "more_body": False})
+            return
+
+        self.encoder = _Encoder(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if more_body:
+            del headers["Content-Length"]
+            chunk = self.encoder.compress(self.buffer)
+        else:
+            chunk = self.encoder.finish(self.buffer)
+            headers["Content-Length"] = str(len(chunk))
+        self.buffer = b""
+        await self._send(self.start)
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
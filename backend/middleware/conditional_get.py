@@ -0,0 +1,168 @@
+"""
+Conditional GET Middleware
+ETag / If-None-Match and Last-Modified / If-Modified-Since for read endpoints
+
+Routes that know their data version (see api/conditional.py) set ETag and
+Last-Modified themselves and usually answer 304 before doing any work. For
+other GET responses this middleware derives a weak ETag from the JSON body,
+so unchanged responses still go back as a bodiless 304.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Headers a 304 carries over from the full response (RFC 9110 15.4.5)
+NOT_MODIFIED_HEADERS = ("cache-control", "content-location", "date", "etag", "expires", "last-modified", "vary")
+
+
+def weak_etag(*parts) -> str:
+    """Weak validator from a body or from row versions (ids, updated_at, counts)"""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"\x1f")
+    return f'W/"{digest.hexdigest()[:32]}"'
+
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an ETag against an If-None-Match list"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def is_not_modified(request_headers: Headers, etag: Optional[str], last_modified: Optional[str]) -> bool:
+    """
+    Whether a GET can be answered with 304
+
+    If-None-Match takes precedence; If-Modified-Since is only used without it.
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag is not None and etag_matches(if_none_match, etag)
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def not_modified_message(headers: Headers) -> Message:
+    raw = [
+        (name.encode("latin-1"), value.encode("latin-1"))
+        for name, value in headers.items() if name in NOT_MODIFIED_HEADERS
+    ]
+    return {"type": "http.response.start", "status": 304, "headers": raw}
+
+
+class ConditionalGetMiddleware:
+    """
+    Add weak ETags to JSON GET responses and answer matching requests with 304
+
+    Args:
+        app: ASGI app
+        max_body_size: Larger (or streamed past this size) bodies are not hashed
+        content_types: Content-type prefixes that get a body-derived ETag
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_body_size: int = 1024 * 1024,
+        content_types: Iterable[str] = ("application/json",)
+    ):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.content_types: Tuple[str, ...] = tuple(content_types)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        responder = _ConditionalResponder(self, Headers(scope=scope), send)
+        await self.app(scope, receive, responder.send)
+
+
+class _ConditionalResponder:
+    """Per-response state for ConditionalGetMiddleware"""
+
+    def __init__(self, middleware: ConditionalGetMiddleware, request_headers: Headers, send: Send):
+        self.middleware = middleware
+        self.request_headers = request_headers
+        self._send = send
+        self.start: Optional[Message] = None
+        self.mode = "passthrough"  # passthrough | buffer | drop
+        self.buffer = b""
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            await self._on_start(message)
+            return
+        if message["type"] != "http.response.body" or self.mode == "passthrough":
+            await self._send(message)
+            return
+        if self.mode == "drop":
+            return
+
+        self.buffer += message.get("body", b"")
+        if not message.get("more_body", False):
+            await self._finish_buffered()
+        elif len(self.buffer) > self.middleware.max_body_size:
+            # Too big to hash: stream it unchanged
+            self.mode = "passthrough"
+            await self._send(self.start)
+            await self._send({"type": "http.response.body", "body": self.buffer, "more_body": True})
+            self.buffer = b""
+
+    async def _on_start(self, message: Message) -> None:
+        headers = Headers(raw=message["headers"])
+        if message["status"] != 200:
+            await self._send(message)
+            return
+
+        etag = headers.get("etag")
+        if etag is not None:
+            # Route supplied its own validators
+            if is_not_modified(self.request_headers, etag, headers.get("last-modified")):
+                self.mode = "drop"
+                await self._send(not_modified_message(headers))
+                await self._send({"type": "http.response.body", "body": b"", "more_body": False})
+            else:
+                await self._send(message)
+            return
+
+        content_type = headers.get("content-type", "")
+        if "content-encoding" in headers or not content_type.startswith(self.middleware.content_types):
+            await self._send(message)
+            return
+
+        self.start = message
+        self.mode = "buffer"
+
+    async def _finish_buffered(self) -> None:
+        headers = MutableHeaders(raw=self.start["headers"])
+        etag = weak_etag(self.buffer)
+        headers["ETag"] = etag
+        if is_not_modified(self.request_headers, etag, headers.get("last-modified")):
+            await self._send(not_modified_message(headers))
+            await self._send({"type": "http.response.body", "body": b"", "more_body": False})
+        else:
+            await self._send(self.start)
+            await self._send({"type": "http.response.body", "body": self.buffer, "more_body": False})
+        self.buffer = b""
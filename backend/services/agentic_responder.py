@@ -20,6 +20,7 @@ from db.models import Tenant, Unit, WorkOrder
 from services.email_service import EmailService
 from services.sms_service import SMSService
 from services.ai_assistant import SomniAIAssistant
+from services.message_triage import MessageTriage
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +40,7 @@ class AgenticResponder:
         self.model = model
         self.client = httpx.AsyncClient(timeout=30.0)
         self.ai_assistant = SomniAIAssistant()
+        self.triage = MessageTriage(llm=self._call_localai)
 
     async def process_email(self, email_message: EmailMessage, db: AsyncSession):
         """
@@ -60,9 +62,11 @@ class AgenticResponder:
                 email_message.unit_id = sender_info.get('unit_id')
                 email_message.contractor_id = sender_info.get('contractor_id')
 
-            # 2. Spam detection
-            is_spam = await self._detect_spam(email_message.body_text or "")
-            if is_spam:
+            # 2. Spam and intent detection (rules, de-duplication, classifier, then batched LLM)
+            triage = await self.triage.triage(
+                "email", email_message.body_text or "", subject=email_message.subject or ""
+            )
+            if triage.is_spam:
                 email_message.is_spam = True
                 email_message.spam_score = 0.95
                 email_message.ai_processed = True
@@ -70,8 +74,8 @@ class AgenticResponder:
                 logger.info(f"Email marked as spam: {email_message.subject}")
                 return
 
-            # 3. Intent detection and entity extraction
-            intent_data = await self._detect_intent_email(email_message)
+            # 3. Intent and entity extraction
+            intent_data = triage.intent_data
 
             email_message.ai_intent = intent_data.get('intent')
             email_message.ai_confidence = intent_data.get('confidence')
@@ -198,15 +202,16 @@ class AgenticResponder:
                 sms_message.unit_id = sender_info.get('unit_id')
                 sms_message.contractor_id = sender_info.get('contractor_id')
 
-            # 2. Spam detection (simple keyword check for SMS)
-            if any(spam_word in sms_message.message_body.lower() for spam_word in ['viagra', 'casino', 'winner']):
+            # 2. Spam and intent detection (rules, de-duplication, classifier, then batched LLM)
+            triage = await self.triage.triage("sms", sms_message.message_body or "")
+            if triage.is_spam:
                 sms_message.is_spam = True
                 sms_message.ai_processed = True
                 await db.commit()
                 return
 
             # 3. Intent detection
-            intent_data = await self._detect_intent_sms(sms_message)
+            intent_data = triage.intent_data
 
             sms_message.ai_intent = intent_data.get('intent')
             sms_message.ai_confidence = intent_data.get('confidence')
@@ -365,97 +370,7 @@ class AgenticResponder:
             logger.error(f"Error identifying sender: {e}")
             return None
 
-    async def _detect_spam(self, text: str) -> bool:
-        """Simple spam detection"""
-        spam_keywords = [
-            'viagra', 'casino', 'lottery', 'winner', 'congratulations',
-            'click here now', 'limited time', 'act now', 'free money'
-        ]
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in spam_keywords)
-
-    async def _detect_intent_email(self, email_message: EmailMessage) -> Dict:
-        """Detect intent from email using LocalAI"""
-        prompt = f"""
-Analyze this property management email and classify its intent.
-
-From: {email_message.from_address}
-Subject: {email_message.subject}
-Body: {email_message.body_text[:1000]}
-
-Classify into one of these intents:
-- maintenance_request: Tenant reporting a problem
-- payment_inquiry: Questions about rent or payments
-- lease_question: Questions about lease terms
-- amenity_booking: Booking amenities
-- complaint: General complaints
-- move_in_out: Move-in or move-out related
-- general_inquiry: General questions
-- emergency: Emergency situations
-
-Also extract:
-- sentiment: positive, neutral, negative, urgent
-- category: maintenance, financial, leasing, general
-- priority: low, normal, high, urgent
-- entities: any specific items, dates, amounts mentioned
-
-Respond with JSON only:
-{{
-  "intent": "intent_name",
-  "confidence": 0.95,
-  "sentiment": "neutral",
-  "category": "maintenance",
-  "priority": "normal",
-  "entities": {{}}
-}}
-"""
-
-        try:
-            response = await self._call_localai(prompt)
-            return json.loads(response)
-        except Exception as e:
-            logger.error(f"Intent detection error: {e}")
-            return {
-                'intent': 'general_inquiry',
-                'confidence': 0.5,
-                'sentiment': 'neutral',
-                'category': 'general',
-                'priority': 'normal'
-            }
-
-    async def _detect_intent_sms(self, sms_message: SMSMessage) -> Dict:
-        """Detect intent from SMS using LocalAI"""
-        prompt = f"""
-Analyze this text message to a property manager.
-
-From: {sms_message.from_number}
-Message: {sms_message.message_body}
-
-Classify intent and respond with JSON only:
-{{
-  "intent": "intent_name",
-  "confidence": 0.95,
-  "sentiment": "neutral",
-  "category": "maintenance|financial|leasing|general",
-  "priority": "low|normal|high|urgent",
-  "entities": {{}}
-}}
-"""
-
-        try:
-            response = await self._call_localai(prompt)
-            return json.loads(response)
-        except Exception as e:
-            logger.error(f"SMS intent detection error: {e}")
-            return {
-                'intent': 'general_inquiry',
-                'confidence': 0.5,
-                'sentiment': 'neutral',
-                'category': 'general',
-                'priority': 'normal'
-            }
-
-    async def _call_localai(self, prompt: str) -> str:
+    async def _call_localai(self, prompt: str, max_tokens: int = 500) -> str:
         """Call LocalAI API"""
         try:
             response = await self.client.post(
@@ -473,7 +388,7 @@ Classify intent and respond with JSON only:
                         }
                     ],
                     "temperature": 0.3,
-                    "max_tokens": 500
+                    "max_tokens": max_tokens
                 }
             )
             result = response.json()
@@ -489,39 +404,14 @@ Classify intent and respond with JSON only:
         intent_data: Dict
     ) -> Dict:
         """Generate email response using LocalAI"""
-        prompt = f"""
-Generate a professional email response for this property management inquiry.
-
-Original Email:
-From: {email_message.from_address}
-Subject: {email_message.subject}
-Body: {email_message.body_text[:1000]}
-
-Context: {json.dumps(context, indent=2)}
-Intent: {intent_data.get('intent')}
-
-Write a helpful, professional response. Include:
-- Acknowledgment of their message
-- Direct answer to their question/concern
-- Next steps if applicable
-- Professional closing
-
-Respond with JSON:
-{{
-  "text": "plain text response",
-  "html": "<html>formatted response</html>"
-}}
-"""
-
-        try:
-            response = await self._call_localai(prompt)
-            return json.loads(response)
-        except Exception as e:
-            logger.error(f"Response generation error: {e}")
-            return {
-                "text": "Thank you for your message. We've received it and will respond shortly.",
-                "html": "<p>Thank you for your message. We've received it and will respond shortly.</p>"
-            }
+        content = f"Subject: {email_message.subject}\n{email_message.body_text or ''}"
+        response = await self.triage.generate_reply("email", content, context, intent_data)
+        if response:
+            return response
+        return {
+            "text": "Thank you for your message. We've received it and will respond shortly.",
+            "html": "<p>Thank you for your message. We've received it and will respond shortly.</p>"
+        }
 
     async def _generate_sms_response(
         self,
@@ -530,31 +420,10 @@ Respond with JSON:
         intent_data: Dict
     ) -> Dict:
         """Generate SMS response (keep it short!)"""
-        prompt = f"""
-Generate a brief SMS response (max 160 characters) for this property management text.
-
-Message: {sms_message.message_body}
-Context: {json.dumps(context, indent=2)}
-Intent: {intent_data.get('intent')}
-
-Keep it professional and concise.
-
-Respond with JSON:
-{{
-  "text": "your sms response here"
-}}
-"""
-
-        try:
-            response = await self._call_localai(prompt)
-            result = json.loads(response)
-            # Ensure it's under 160 chars
-            if len(result['text']) > 160:
-                result['text'] = result['text'][:157] + "..."
-            return result
-        except Exception as e:
-            logger.error(f"SMS response generation error: {e}")
-            return {"text": "Thanks for your message. We'll respond shortly."}
+        response = await self.triage.generate_reply("sms", sms_message.message_body, context, intent_data)
+        if response:
+            return response
+        return {"text": "Thanks for your message. We'll respond shortly."}
 
     async def _build_email_context(
         self,
@@ -4,8 +4,10 @@ Integrates with Ollama LLM for natural language understanding and response gener
 """
 
 import json
+import time
+import uuid
 import httpx
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Any
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
@@ -15,14 +17,22 @@ from db.models import (
     AIConversation,
     AIMessage,
     Tenant,
-    Unit,
-    Lease,
-    WorkOrder,
-    SmartDevice
+    WorkOrder
 )
+from core.config import settings
+from services.http_client_registry import get_http_client
+from services.semantic_cache import semantic_cache, context_fingerprint
+from services.ai_context_builder import ai_context_builder, render_tenant_context
 
 logger = logging.getLogger(__name__)
 
+# Intents whose answers depend only on the message and tenant context, so a
+# near-duplicate question can reuse an earlier answer (never action intents)
+CACHEABLE_RESPONSE_INTENTS = {"ask_rent_due", "ask_lease_info", "general_question"}
+
+# Intents whose actions need the tenant record
+ACTION_INTENTS = {"pay_rent", "report_maintenance", "request_guest_code", "book_amenity"}
+
 
 class SomniAIAssistant:
     """
@@ -33,37 +43,49 @@ class SomniAIAssistant:
     def __init__(self, ollama_url: str = "http://ollama.ai.svc.cluster.local:11434"):
         self.ollama_url = ollama_url
         self.model = "llama2:13b-chat"  # Or mistral, neural-chat, etc.
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = get_http_client("llm:ollama")
 
     async def chat(
         self,
         message: str,
         conversation_id: str,
         tenant_id: Optional[str],
-        db: AsyncSession
+        db: AsyncSession,
+        on_token: Optional[Callable[[str], Awaitable[None]]] = None
     ) -> Dict[str, Any]:
         """
         Main chat interface - process tenant message and generate response
+
+        When `on_token` is given the response is streamed from Ollama and each
+        text chunk is awaited through it as it is generated; the returned dict
+        (and the persisted messages) still hold the complete response.
         """
-        start_time = datetime.now()
+        turn_start = time.perf_counter()
 
         try:
             # 1. Get conversation context
             conversation = await self._get_conversation(conversation_id, db)
-            tenant = await self._get_tenant(tenant_id, db) if tenant_id else None
 
-            # 2. Build context from database (RAG)
-            context = await self._build_context(tenant, db)
+            # 2. Build context from database (RAG) - one query, cached per conversation
+            context = await self._build_context(tenant_id, db, conversation_id)
+            cache_scope = f"tenant:{tenant_id}" if tenant_id else "anonymous"
 
             # 3. Detect intent and extract entities
-            intent_data = await self._detect_intent(message, context)
+            intent_data = await self._detect_intent(message, context, cache_scope=cache_scope)
+
+            # The tenant record is only needed to act on their behalf
+            tenant = None
+            if tenant_id and intent_data.get("intent") in ACTION_INTENTS:
+                tenant = await self._get_tenant(tenant_id, db)
 
             # 4. Generate response using Ollama
             response = await self._generate_response(
                 message,
                 context,
                 intent_data,
-                conversation
+                conversation,
+                on_token=on_token,
+                cache_scope=cache_scope
             )
 
             # 5. Execute actions if needed
@@ -80,8 +102,7 @@ class SomniAIAssistant:
                 sender_type="tenant",
                 message_text=message,
                 intent=intent_data.get("intent"),
-                confidence=intent_data.get("confidence"),
-                entities=intent_data.get("entities"),
+                confidence_score=intent_data.get("confidence"),
                 db=db
             )
 
@@ -90,22 +111,24 @@ class SomniAIAssistant:
                 sender_type="ai",
                 message_text=response["text"],
                 intent=intent_data.get("intent"),
-                action_taken=json.dumps(actions),
-                action_result=response.get("action_results"),
-                llm_model=self.model,
-                tokens_used=response.get("tokens_used"),
-                response_time_ms=int((datetime.now() - start_time).total_seconds() * 1000),
+                actions_taken=actions,
                 db=db
             )
 
             await db.commit()
 
+            latency_ms = {"total": round((time.perf_counter() - turn_start) * 1000, 2)}
+            if response.get("first_token_at") is not None:
+                latency_ms["time_to_first_token"] = round((response["first_token_at"] - turn_start) * 1000, 2)
+            logger.info(f"AI chat turn ({self.model}, ~{response.get('tokens_used')} tokens): {latency_ms}")
+
             return {
                 "response": response["text"],
                 "intent": intent_data.get("intent"),
                 "confidence": intent_data.get("confidence"),
                 "actions": actions,
-                "suggestions": response.get("suggestions", [])
+                "suggestions": response.get("suggestions", []),
+                "metadata": {"latency_ms": latency_ms, "cached_response": bool(response.get("cached"))}
             }
 
         except ConnectionError as e:
@@ -125,10 +148,23 @@ class SomniAIAssistant:
                 "escalate": True
             }
 
-    async def _detect_intent(self, message: str, context: Dict) -> Dict[str, Any]:
+    async def _detect_intent(
+        self,
+        message: str,
+        context: Dict,
+        cache_scope: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
-        Detect user intent using LLM
+        Detect user intent using LLM (reusing the classification of a
+        near-duplicate message from the same tenant when cached)
         """
+        use_cache = cache_scope is not None and settings.AI_SEMANTIC_CACHE_ENABLED
+        fingerprint = context_fingerprint(context) if use_cache else ""
+        if use_cache:
+            cached = await semantic_cache.get("intent", message, cache_scope, fingerprint)
+            if cached is not None:
+                return dict(cached)
+
         system_prompt = """
 You are an intent classifier for a property management AI assistant.
 Analyze the user message and classify it into one of these intents:
@@ -159,11 +195,13 @@ Respond ONLY with valid JSON:
 }
 """
 
-        prompt = f"Context: {json.dumps(context)}\n\nUser message: {message}\n\nClassify this message:"
+        prompt = f"Context:\n{render_tenant_context(context)}\n\nUser message: {message}\n\nClassify this message:"
 
         try:
             response = await self._call_ollama(system_prompt, prompt)
             result = json.loads(response)
+            if use_cache and not result.get("is_emergency"):
+                await semantic_cache.set("intent", message, cache_scope, result, fingerprint)
             return result
         except Exception as e:
             logger.error(f"Intent detection error: {e}")
@@ -174,10 +212,13 @@ Respond ONLY with valid JSON:
         message: str,
         context: Dict,
         intent_data: Dict,
-        conversation: Optional[AIConversation]
+        conversation: Optional[AIConversation],
+        on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+        cache_scope: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate natural language response using Ollama LLM
+        (streamed chunk by chunk through `on_token` when given)
         """
         intent = intent_data.get("intent", "general_question")
 
@@ -188,7 +229,7 @@ You help tenants with rent payments, maintenance requests, amenity bookings, and
 Be helpful, professional, and concise. Use a friendly tone.
 
 Tenant context:
-{json.dumps(context, indent=2)}
+{render_tenant_context(context)}
 
 Current intent: {intent}
 """
@@ -200,19 +241,58 @@ Current intent: {intent}
 
         prompt = f"{history}\n\nUser: {message}\n\nSomni:"
 
+        # Informational answers without history can be reused for near-duplicates
+        use_cache = (
+            cache_scope is not None and settings.AI_SEMANTIC_CACHE_ENABLED
+            and intent in CACHEABLE_RESPONSE_INTENTS and not history
+        )
+        fingerprint = context_fingerprint({"context": context, "intent": intent}) if use_cache else ""
+        if use_cache:
+            cached = await semantic_cache.get("response", message, cache_scope, fingerprint)
+            if cached is not None:
+                first_token_at = time.perf_counter()
+                if on_token:
+                    await on_token(cached["text"])
+                return {**cached, "tokens_used": 0, "first_token_at": first_token_at, "cached": True}
+
+        first_token_at = None
+        chunks: List[str] = []
         try:
-            response_text = await self._call_ollama(system_prompt, prompt)
+            if on_token:
+                async for chunk in self._stream_ollama(system_prompt, prompt):
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    chunks.append(chunk)
+                    await on_token(chunk)
+                response_text = "".join(chunks)
+            else:
+                response_text = await self._call_ollama(system_prompt, prompt)
 
             # Parse for action indicators
             suggestions = self._extract_suggestions(response_text, intent)
 
+            if use_cache and response_text:
+                await semantic_cache.set(
+                    "response", message, cache_scope,
+                    {"text": response_text, "suggestions": suggestions}, fingerprint
+                )
+
             return {
                 "text": response_text,
                 "suggestions": suggestions,
-                "tokens_used": len(response_text.split())  # Approximate
+                "tokens_used": len(response_text.split()),  # Approximate
+                "first_token_at": first_token_at
             }
         except Exception as e:
             logger.error(f"Response generation error: {e}")
+            if chunks:
+                # Stream broke off mid-response: keep what the tenant already saw
+                return {
+                    "text": "".join(chunks),
+                    "suggestions": self._extract_suggestions("".join(chunks), intent),
+                    "tokens_used": len(chunks),
+                    "first_token_at": first_token_at
+                }
             return {
                 "text": "I'm here to help! Could you please rephrase your question?",
                 "tokens_used": 0
@@ -234,7 +314,8 @@ Current intent: {intent}
                         "top_p": 0.9,
                         "max_tokens": 500
                     }
-                }
+                },
+                timeout=30.0
             )
             result = response.json()
             return result.get("response", "")
@@ -242,67 +323,51 @@ Current intent: {intent}
             logger.error(f"Ollama API error: {e}")
             raise
 
-    async def _build_context(self, tenant: Optional[Tenant], db: AsyncSession) -> Dict:
+    async def _stream_ollama(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
         """
-        Build context for RAG from database (tenant, lease, unit info)
+        Call Ollama API with streaming, yielding text chunks as they are generated
         """
-        context = {}
-
-        if not tenant:
-            return context
-
-        # Get tenant info
-        context["tenant"] = {
-            "name": f"{tenant.first_name} {tenant.last_name}",
-            "email": tenant.email,
-            "phone": tenant.phone
-        }
-
-        # Get active lease
-        lease_query = select(Lease).where(
-            Lease.tenant_id == tenant.id,
-            Lease.status == "active"
-        )
-        lease_result = await db.execute(lease_query)
-        lease = lease_result.scalar_one_or_none()
-
-        if lease:
-            context["lease"] = {
-                "start_date": lease.start_date.isoformat(),
-                "end_date": lease.end_date.isoformat(),
-                "monthly_rent": float(lease.monthly_rent),
-                "rent_due_day": lease.rent_due_day,
-                "security_deposit": float(lease.security_deposit) if lease.security_deposit else None
-            }
-
-            # Get unit info
-            unit_query = select(Unit).where(Unit.id == lease.unit_id)
-            unit_result = await db.execute(unit_query)
-            unit = unit_result.scalar_one_or_none()
-
-            if unit:
-                context["unit"] = {
-                    "unit_number": unit.unit_number,
-                    "bedrooms": unit.bedrooms,
-                    "bathrooms": unit.bathrooms,
-                    "floor": unit.floor,
-                    "square_feet": unit.square_feet
+        async with self.client.stream(
+            "POST",
+            f"{self.ollama_url}/api/generate",
+            json={
+                "model": self.model,
+                "prompt": f"{system_prompt}\n\n{user_prompt}",
+                "stream": True,
+                "options": {
+                    "temperature": 0.7,
+                    "top_p": 0.9,
+                    "max_tokens": 500
                 }
-
-                # Get smart devices for this unit
-                devices_query = select(SmartDevice).where(SmartDevice.unit_id == unit.id)
-                devices_result = await db.execute(devices_query)
-                devices = devices_result.scalars().all()
-
-                context["smart_devices"] = [
-                    {
-                        "type": d.device_type,
-                        "name": d.device_name,
-                        "status": d.status
-                    } for d in devices
-                ]
-
-        return context
+            }
+        ) as response:
+            if response.is_error:
+                # Surface HTTP errors instead of parsing the error body as chunks
+                await response.aread()
+                response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise ValueError(f"Ollama API error: {chunk['error']}")
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    break
+
+    async def _build_context(
+        self,
+        tenant_id: Optional[str],
+        db: AsyncSession,
+        conversation_id: Optional[str] = None
+    ) -> Dict:
+        """
+        Build context for RAG from database (tenant, lease, unit, devices)
+        """
+        if not tenant_id:
+            return {}
+        return await ai_context_builder.tenant_context(tenant_id, db, conversation_id=conversation_id)
 
     async def _execute_actions(
         self,
@@ -353,8 +418,7 @@ Current intent: {intent}
                     executed_at=datetime.now()
                 )
                 db.add(ai_action)
-
-            await db.commit()
+            # Committed together with the turn's messages in chat()
 
         except Exception as e:
             logger.error(f"Error executing actions: {e}")
@@ -455,10 +519,8 @@ Current intent: {intent}
         return result.scalar_one_or_none()
 
     async def _get_tenant(self, tenant_id: str, db: AsyncSession) -> Optional[Tenant]:
-        """Get tenant from database"""
-        query = select(Tenant).where(Tenant.id == tenant_id)
-        result = await db.execute(query)
-        return result.scalar_one_or_none()
+        """Get tenant from database (from the session if the context query already loaded it)"""
+        return await db.get(Tenant, uuid.UUID(str(tenant_id)))
 
     async def _get_conversation_history(self, conversation_id: str) -> str:
         """Get recent conversation history for context"""
@@ -473,12 +535,13 @@ Current intent: {intent}
         db: AsyncSession,
         **kwargs
     ):
-        """Save message to database"""
+        """Save message to database (keyword arguments that are not AIMessage columns are ignored)"""
+        columns = AIMessage.__table__.columns.keys()
         message = AIMessage(
             conversation_id=conversation_id,
             sender_type=sender_type,
             message_text=message_text,
-            **kwargs
+            **{key: value for key, value in kwargs.items() if key in columns}
         )
         db.add(message)
 
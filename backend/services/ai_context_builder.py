@@ -0,0 +1,356 @@
+"""
+AI Context Builder
+
+Assembles the database context the AI assistants put in their prompts:
+
+- Tenant context (tenant → active lease → unit → devices) is loaded with a
+  single joined query and cached per conversation; any commit that touches
+  the tenant, their lease, unit or devices invalidates it
+- Manager context (dashboard counts, recent activity, current property)
+  is loaded with one aggregate query each and cached for a short TTL
+- render_tenant_context() turns the context into a compact prompt
+  fragment instead of indented JSON
+
+On a cache hit a chat turn does no context queries at all; on a miss it
+does one round trip.
+
+Invalidation waits for the commit: at flush time other sessions still read
+the old committed rows, and a chat turn in between would cache them again.
+A load that overlaps an invalidation is returned but not cached.
+"""
+
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from sqlalchemy import and_, event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from db.models import Building, Lease, Property, SmartDevice, Tenant, Unit, WorkOrder
+
+logger = logging.getLogger(__name__)
+
+TENANT_CONTEXT_TTL = 300.0
+MANAGER_CONTEXT_TTL = 30.0
+
+# Session.info key: (kind, id) contexts to invalidate when the transaction commits
+PENDING_INVALIDATIONS_KEY = "ai_context_invalidations"
+
+# Work order statuses that count as open (see valid_work_order_status)
+OPEN_WORK_ORDER_STATUSES = ("open", "assigned", "in_progress")
+
+
+def _as_uuid(value) -> uuid.UUID:
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+
+
+def _number(value) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+class AIContextBuilder:
+    """Loads and caches prompt context for the AI assistants"""
+
+    def __init__(
+        self,
+        tenant_ttl: float = TENANT_CONTEXT_TTL,
+        manager_ttl: float = MANAGER_CONTEXT_TTL,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.tenant_ttl = tenant_ttl
+        self.manager_ttl = manager_ttl
+        self._clock = clock
+        # (conversation_id, tenant_id) -> (expires_at, context, unit_id)
+        self._tenant_contexts: Dict[Tuple[str, str], Tuple[float, Dict[str, Any], Optional[str]]] = {}
+        self._manager_contexts: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        # Bumped by every invalidation; loads that overlap one are not cached
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Tenant context
+    # ------------------------------------------------------------------
+
+    async def tenant_context(
+        self,
+        tenant_id,
+        db: AsyncSession,
+        conversation_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Context for a tenant chat turn (empty if the tenant does not exist)"""
+        key = (str(conversation_id or ""), str(tenant_id))
+        cached = self._tenant_contexts.get(key)
+        if cached and cached[0] > self._clock():
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        generation = self._generation
+        context, unit_id = await self._load_tenant_context(_as_uuid(tenant_id), db)
+        if generation == self._generation:
+            self._tenant_contexts[key] = (self._clock() + self.tenant_ttl, context, unit_id)
+        return context
+
+    async def _load_tenant_context(self, tenant_id: uuid.UUID, db: AsyncSession) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Tenant, active lease, unit and devices in one query (one row per device)"""
+        query = (
+            select(
+                Tenant,
+                Lease.start_date, Lease.end_date, Lease.rent_amount,
+                Lease.rent_due_day, Lease.security_deposit, Lease.unit_id,
+                Unit.unit_number, Unit.bedrooms, Unit.bathrooms, Unit.floor, Unit.square_feet,
+                SmartDevice.id.label("device_id"), SmartDevice.device_type,
+                SmartDevice.device_name, SmartDevice.status.label("device_status"),
+            )
+            .outerjoin(Lease, and_(Lease.tenant_id == Tenant.id, Lease.status == "active"))
+            .outerjoin(Unit, Unit.id == Lease.unit_id)
+            .outerjoin(SmartDevice, SmartDevice.client_id == Tenant.id)
+            .where(Tenant.id == tenant_id)
+            .order_by(Lease.start_date.desc())
+        )
+        rows = (await db.execute(query)).all()
+        if not rows:
+            return {}, None
+
+        first = rows[0]
+        tenant = first.Tenant
+        context: Dict[str, Any] = {
+            "tenant": {
+                "name": f"{tenant.first_name} {tenant.last_name}",
+                "email": tenant.email,
+                "phone": tenant.phone
+            }
+        }
+
+        unit_id = str(first.unit_id) if first.unit_id else None
+        if first.start_date is not None:
+            context["lease"] = {
+                "start_date": first.start_date.isoformat(),
+                "end_date": first.end_date.isoformat(),
+                "monthly_rent": _number(first.rent_amount),
+                "rent_due_day": first.rent_due_day,
+                "security_deposit": _number(first.security_deposit)
+            }
+        if first.unit_number is not None:
+            context["unit"] = {
+                "unit_number": first.unit_number,
+                "bedrooms": _number(first.bedrooms),
+                "bathrooms": _number(first.bathrooms),
+                "floor": first.floor,
+                "square_feet": first.square_feet
+            }
+
+        devices, seen = [], set()
+        for row in rows:
+            # Rows repeat per device (and per extra active lease); keep one of each
+            if row.device_id is None or row.device_id in seen:
+                continue
+            seen.add(row.device_id)
+            devices.append({"type": row.device_type, "name": row.device_name, "status": row.device_status})
+        if devices:
+            context["smart_devices"] = devices
+
+        return context, unit_id
+
+    def invalidate_tenant(self, tenant_id) -> int:
+        """Drop cached context for a tenant (all conversations)"""
+        self._generation += 1
+        tenant_id = str(tenant_id)
+        stale = [key for key in self._tenant_contexts if key[1] == tenant_id]
+        for key in stale:
+            del self._tenant_contexts[key]
+        return len(stale)
+
+    def invalidate_unit(self, unit_id) -> int:
+        """Drop cached context of every tenant whose lease is on this unit"""
+        self._generation += 1
+        unit_id = str(unit_id)
+        stale = [key for key, entry in self._tenant_contexts.items() if entry[2] == unit_id]
+        for key in stale:
+            del self._tenant_contexts[key]
+        return len(stale)
+
+    # ------------------------------------------------------------------
+    # Manager context
+    # ------------------------------------------------------------------
+
+    async def manager_overview(self, db: AsyncSession) -> Dict[str, Any]:
+        """Dashboard counts and recent activity in one aggregate query"""
+        return await self._cached_manager("overview", lambda: self._load_manager_overview(db))
+
+    async def _load_manager_overview(self, db: AsyncSession) -> Dict[str, Any]:
+        week_ago = datetime.now() - timedelta(days=7)
+        row = (await db.execute(select(
+            select(func.count(Property.id)).scalar_subquery().label("total_properties"),
+            select(func.count(Unit.id)).scalar_subquery().label("total_units"),
+            select(func.count(WorkOrder.id)).where(
+                WorkOrder.status.in_(OPEN_WORK_ORDER_STATUSES)
+            ).scalar_subquery().label("open_work_orders"),
+            select(func.count(WorkOrder.id)).where(
+                WorkOrder.created_at >= week_ago
+            ).scalar_subquery().label("work_orders_this_week"),
+        ))).one()
+        return {
+            "stats": {
+                "total_properties": row.total_properties,
+                "total_units": row.total_units,
+                "open_work_orders": row.open_work_orders
+            },
+            "recent_activity": {
+                "work_orders_this_week": row.work_orders_this_week
+            }
+        }
+
+    async def property_summary(self, property_id, db: AsyncSession) -> Dict[str, Any]:
+        """Property details with building/unit counts and vacancy in one query"""
+        property_id = _as_uuid(property_id)
+        return await self._cached_manager(
+            f"property:{property_id}", lambda: self._load_property_summary(property_id, db)
+        )
+
+    async def _load_property_summary(self, property_id: uuid.UUID, db: AsyncSession) -> Dict[str, Any]:
+        row = (await db.execute(select(
+            Property,
+            select(func.count(Building.id)).where(
+                Building.property_id == Property.id
+            ).scalar_subquery().label("buildings_count"),
+            select(func.count(Unit.id)).join(Building).where(
+                Building.property_id == Property.id
+            ).scalar_subquery().label("units_count"),
+            select(func.count(func.distinct(Unit.id))).join(Building).join(Lease, Lease.unit_id == Unit.id).where(
+                and_(Building.property_id == Property.id, Lease.status == "active")
+            ).scalar_subquery().label("occupied_count"),
+        ).where(Property.id == property_id))).first()
+        if row is None:
+            return {}
+
+        property_obj = row.Property
+        units_count = row.units_count or 0
+        occupied_count = row.occupied_count or 0
+        vacancy_rate = ((units_count - occupied_count) / units_count * 100) if units_count > 0 else 0
+        return {
+            "id": str(property_obj.id),
+            "name": property_obj.name,
+            "address": f"{property_obj.address_line1}, {property_obj.city}, {property_obj.state}",
+            "type": property_obj.property_type,
+            "buildings_count": row.buildings_count,
+            "units_count": units_count,
+            "vacancy_rate": round(vacancy_rate, 1)
+        }
+
+    async def _cached_manager(self, key: str, load) -> Dict[str, Any]:
+        cached = self._manager_contexts.get(key)
+        if cached and cached[0] > self._clock():
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        generation = self._generation
+        value = await load()
+        if generation == self._generation:
+            self._manager_contexts[key] = (self._clock() + self.manager_ttl, value)
+        return value
+
+    def clear(self):
+        self._generation += 1
+        self._tenant_contexts.clear()
+        self._manager_contexts.clear()
+
+    # ------------------------------------------------------------------
+    # Commit-driven invalidation
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def invalidations_for_flush(session: Session) -> Set[Tuple[str, str]]:
+        """(kind, id) contexts affected by the objects in a flushed session"""
+        keys = set()
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            if isinstance(obj, Lease):
+                keys.update({("tenant", str(obj.tenant_id)), ("unit", str(obj.unit_id))})
+            elif isinstance(obj, SmartDevice):
+                if obj.client_id:
+                    keys.add(("tenant", str(obj.client_id)))
+            elif isinstance(obj, Tenant):
+                keys.add(("tenant", str(obj.id)))
+            elif isinstance(obj, Unit):
+                keys.add(("unit", str(obj.id)))
+            elif isinstance(obj, Property):
+                keys.add(("property", str(obj.id)))
+        return keys
+
+    def invalidate(self, keys: Set[Tuple[str, str]]):
+        """Drop the contexts named by invalidations_for_flush()"""
+        for kind, key_id in keys:
+            if kind == "tenant":
+                self.invalidate_tenant(key_id)
+            elif kind == "unit":
+                self.invalidate_unit(key_id)
+            else:
+                self._generation += 1
+                self._manager_contexts.pop(f"property:{key_id}", None)
+
+
+def render_tenant_context(context: Dict[str, Any]) -> str:
+    """Compact prompt fragment for a tenant context"""
+    if not context:
+        return "No tenant record is linked to this conversation."
+
+    lines = []
+    tenant = context.get("tenant")
+    if tenant:
+        contact = ", ".join(v for v in (tenant.get("email"), tenant.get("phone")) if v)
+        lines.append(f"Tenant: {tenant['name']}" + (f" ({contact})" if contact else ""))
+
+    lease = context.get("lease")
+    if lease:
+        rent = f"${lease['monthly_rent']:,.2f}" if lease.get("monthly_rent") is not None else "unknown"
+        line = f"Lease: {lease['start_date']} to {lease['end_date']}, rent {rent} due on day {lease.get('rent_due_day') or 1}"
+        if lease.get("security_deposit") is not None:
+            line += f", deposit ${lease['security_deposit']:,.2f}"
+        lines.append(line)
+    else:
+        lines.append("Lease: no active lease")
+
+    unit = context.get("unit")
+    if unit:
+        details = [
+            f"{unit['bedrooms']:g} bed" if unit.get("bedrooms") is not None else None,
+            f"{unit['bathrooms']:g} bath" if unit.get("bathrooms") is not None else None,
+            f"floor {unit['floor']}" if unit.get("floor") is not None else None,
+            f"{unit['square_feet']} sq ft" if unit.get("square_feet") else None,
+        ]
+        lines.append(f"Unit {unit['unit_number']}: " + ", ".join(d for d in details if d))
+
+    devices = context.get("smart_devices")
+    if devices:
+        lines.append("Smart devices: " + "; ".join(
+            f"{d.get('name') or d.get('type')} ({d.get('type')}, {d.get('status')})" for d in devices
+        ))
+
+    return "\n".join(lines)
+
+
+# Shared builder
+ai_context_builder = AIContextBuilder()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_ai_context_invalidations(session: Session, flush_context):
+    keys = ai_context_builder.invalidations_for_flush(session)
+    if keys:
+        session.info.setdefault(PENDING_INVALIDATIONS_KEY, set()).update(keys)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_ai_context(session: Session):
+    keys = session.info.pop(PENDING_INVALIDATIONS_KEY, None)
+    if keys:
+        ai_context_builder.invalidate(keys)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_ai_context_invalidations(session: Session):
+    session.info.pop(PENDING_INVALIDATIONS_KEY, None)
@@ -16,8 +16,8 @@ from services.notification_service import get_notification_service
 from services.email_service import EmailService
 from services.sms_service import SMSService
 
-# Integration Orchestrator - Master coordinator for all services
-from services.integration_orchestrator import get_integration_orchestrator
+# Integration outbox - durable, retried delivery of integration side effects
+from services.outbox_service import enqueue_work_order_workflow
 
 logger = logging.getLogger(__name__)
 
@@ -360,7 +360,9 @@ class ApprovalWorkflowEngine:
         """
         Execute work order creation with COMPLETE 14-service integration
 
-        Delegates to IntegrationOrchestrator which coordinates ALL services:
+        The work order and one integration outbox row per service are written
+        in a single transaction; the outbox dispatcher then delivers the
+        IntegrationOrchestrator steps in the background with retries:
         1. Create work order in database
         2. Vikunja task management
         3. Homebox BOM creation
@@ -379,66 +381,75 @@ class ApprovalWorkflowEngine:
         from db.models import WorkOrder, Unit, Tenant
 
         try:
-            # Step 1: Create work order in database
-            work_order = WorkOrder(
-                unit_id=pending_action.unit_id,
-                tenant_id=pending_action.tenant_id,
-                title=action_data.get('title', pending_action.action_title),
-                description=action_data.get('description', pending_action.action_description),
-                category=action_data.get('category', 'maintenance'),
-                priority=pending_action.urgency,
-                status='submitted',
-                created_by_ai=True,
-                notes=f"Created via AI approval workflow. Action ID: {pending_action.id}"
-            )
+            # Work order + outbox rows are written atomically; a failure rolls
+            # back only this savepoint, not the caller's pending action
+            async with self.db.begin_nested():
+                # Step 1: Create work order in database
+                work_order = WorkOrder(
+                    id=uuid.uuid4(),
+                    unit_id=pending_action.unit_id,
+                    tenant_id=pending_action.tenant_id,
+                    title=action_data.get('title', pending_action.action_title),
+                    description=action_data.get('description', pending_action.action_description),
+                    category=action_data.get('category', 'maintenance'),
+                    priority=pending_action.urgency,
+                    status='submitted',
+                    created_by_ai=True,
+                    notes=f"Created via AI approval workflow. Action ID: {pending_action.id}"
+                )
+
+                self.db.add(work_order)
+
+                work_order_id = str(work_order.id)
+
+                # Get related data for the integrations
+                unit = await self.db.get(Unit, pending_action.unit_id) if pending_action.unit_id else None
+                tenant = await self.db.get(Tenant, pending_action.tenant_id) if pending_action.tenant_id else None
+
+                property_name = unit.property.name if unit and unit.property else "Unknown Property"
+                unit_number = unit.unit_number if unit else "N/A"
+                tenant_name = f"{tenant.first_name} {tenant.last_name}" if tenant else pending_action.requester_name or "Unknown"
+                tenant_email = tenant.email if tenant else pending_action.requester_contact or ""
+
+                # Step 2: Enqueue integrations in the same transaction as the work order
+                outbox_rows = await enqueue_work_order_workflow(self.db, {
+                    "work_order_id": work_order_id,
+                    "property_name": property_name,
+                    "unit_number": unit_number,
+                    "work_order_title": work_order.title,
+                    "work_order_description": work_order.description or "",
+                    "tenant_name": tenant_name,
+                    "tenant_email": tenant_email,
+                    "contractor_name": action_data.get('contractor_name'),
+                    "contractor_email": action_data.get('contractor_email'),
+                    "estimated_cost": pending_action.estimated_cost,
+                    "urgency": pending_action.urgency,
+                    "requires_parts": action_data.get('requires_parts', False),
+                    "bom_items": action_data.get('bom_items'),
+                    "requires_signature": action_data.get('requires_signature', False),
+                })
 
-            self.db.add(work_order)
             await self.db.commit()
-            await self.db.refresh(work_order)
-
-            work_order_id = str(work_order.id)
-            logger.info(f"Created work order {work_order_id}: {work_order.title}")
-
-            # Get related data for orchestrator
-            unit = await self.db.get(Unit, pending_action.unit_id) if pending_action.unit_id else None
-            tenant = await self.db.get(Tenant, pending_action.tenant_id) if pending_action.tenant_id else None
-
-            property_name = unit.property.name if unit and unit.property else "Unknown Property"
-            unit_number = unit.unit_number if unit else "N/A"
-            tenant_name = f"{tenant.first_name} {tenant.last_name}" if tenant else pending_action.requester_name or "Unknown"
-            tenant_email = tenant.email if tenant else pending_action.requester_contact or ""
-
-            # Step 2: Execute complete workflow via Integration Orchestrator
-            orchestrator = get_integration_orchestrator(self.db)
-
-            workflow_result = await orchestrator.execute_complete_work_order_workflow(
-                work_order_id=work_order_id,
-                property_name=property_name,
-                unit_number=unit_number,
-                work_order_title=work_order.title,
-                work_order_description=work_order.description or "",
-                tenant_name=tenant_name,
-                tenant_email=tenant_email,
-                contractor_name=action_data.get('contractor_name'),
-                contractor_email=action_data.get('contractor_email'),
-                estimated_cost=pending_action.estimated_cost,
-                urgency=pending_action.urgency,
-                requires_parts=action_data.get('requires_parts', False),
-                bom_items=action_data.get('bom_items'),
-                requires_signature=action_data.get('requires_signature', False)
+            logger.info(
+                f"Created work order {work_order_id}: {work_order.title} "
+                f"({len(outbox_rows)} integrations queued)"
             )
 
-            # Build success message from workflow results
-            success_message = f"Work order {work_order_id} created with {len(workflow_result['integrations'])} integrations"
-
-            for service, result in workflow_result['integrations'].items():
-                if result['status'] == 'success':
-                    success_message += f"\n✓ {service.capitalize()}"
-
-            if workflow_result['errors']:
-                success_message += f"\n\n⚠️ {len(workflow_result['errors'])} integration(s) had errors:"
-                for error in workflow_result['errors']:
-                    success_message += f"\n  - {error}"
+            workflow_result = {
+                "work_order_id": work_order_id,
+                "status": "queued",
+                "integrations": {
+                    row.integration: {"status": "queued", "outbox_id": str(row.id)}
+                    for row in outbox_rows
+                },
+                "errors": []
+            }
+
+            success_message = (
+                f"Work order {work_order_id} created with {len(outbox_rows)} integrations queued"
+            )
+            for service in workflow_result['integrations']:
+                success_message += f"\n⏳ {service.capitalize()}"
 
             return (True, success_message, workflow_result)
 
@@ -0,0 +1,588 @@
+"""
+Cache Service - Multi-Level Read-Through Cache
+
+Two levels per named cache:
+- L1: in-process LRU with a short TTL (no network hop)
+- L2: Redis shared by every pod (services.redis_service), optional
+
+Cached values are JSON-compatible (routes cache their serialized response
+model) and carry tags - the tables they were built from. When a session that
+wrote to a tagged table commits, those tags are invalidated: in this
+process's L1 at once, then in Redis, and in the other pods' L1 through a
+pub/sub message.
+
+Stampede protection: concurrent misses for one key are collapsed into a
+single load per process, and a short Redis lock lets one pod load while the
+others wait for its result.
+
+Usage:
+    @router.get("/pricing-tiers", response_model=PricingTierListResponse)
+    @cached("pricing", tags=("pricing_tiers",), model=PricingTierListResponse)
+    async def list_pricing_tiers(...):
+        ...
+
+Only tables written through the ORM (flushes and ORM bulk update/delete)
+fire invalidation; raw SQL writes rely on the TTL. Other in-process caches
+can follow the same commits with on_tables_committed().
+"""
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+from services.redis_service import get_redis
+
+logger = logging.getLogger(__name__)
+
+VALUE_KEY = "cache:{name}:{key}"
+TAG_KEY = "cache:tag:{tag}"
+LOCK_KEY = "cache:lock:{name}:{key}"
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Tag sets outlive every entry in them; entry TTLs are capped to this
+MAX_TTL_SECONDS = 24 * 3600
+
+# How long to wait before asking redis_service for a client again after Redis was unavailable
+REDIS_RETRY_INTERVAL = 30.0
+
+# Identifies this process in invalidation messages so it skips its own
+INSTANCE_ID = uuid.uuid4().hex
+
+SESSION_TAGS_KEY = "cache_tags"
+
+_MISSING = object()
+
+
+class RedisHandle:
+    """Lazily resolved Redis client shared by the caches (None while Redis is unavailable)"""
+
+    def __init__(self, client=None, enabled: bool = True):
+        self.client = client
+        self.enabled = enabled
+        self._checked_at = float("-inf") if client is None else time.monotonic()
+
+    async def get(self):
+        if self.client is not None or not self.enabled:
+            return self.client
+        now = time.monotonic()
+        if now - self._checked_at < REDIS_RETRY_INTERVAL:
+            return None
+        self._checked_at = now
+        self.client = await get_redis()
+        return self.client
+
+    def drop(self, error: Exception):
+        logger.warning(f"Cache Redis error, serving L1 only for {REDIS_RETRY_INTERVAL:.0f}s: {error}")
+        self.client = None
+        self._checked_at = time.monotonic()
+
+
+_redis = RedisHandle()
+
+
+class _LRU:
+    """In-process entries: key -> (expires at, value, tags)"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Tuple[float, Any, FrozenSet[str]]]" = OrderedDict()
+
+    def get(self, key: str):
+        entry = self.entries.get(key)
+        if entry is None:
+            return _MISSING
+        if entry[0] <= time.monotonic():
+            del self.entries[key]
+            return _MISSING
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float, tags: FrozenSet[str]) -> int:
+        """Store an entry; returns the number of entries evicted"""
+        self.entries[key] = (time.monotonic() + ttl, value, tags)
+        self.entries.move_to_end(key)
+        evicted = 0
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def invalidate_tags(self, tags: FrozenSet[str]) -> int:
+        doomed = [key for key, (_, _, entry_tags) in self.entries.items() if entry_tags & tags]
+        for key in doomed:
+            del self.entries[key]
+        return len(doomed)
+
+
+class Cache:
+    """
+    One named read-through cache (L1 LRU + Redis L2)
+
+    Values must be JSON-compatible and are shared between callers, so treat
+    them as read-only.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float = 300,
+        l1_ttl: float = 30,
+        l1_size: int = 1024,
+        stampede_wait: float = 5.0
+    ):
+        """
+        Args:
+            name: Cache name (Redis key namespace and metrics label)
+            ttl: Seconds an entry lives in Redis
+            l1_ttl: Seconds an entry lives in process memory (bounds staleness if an invalidation message is lost)
+            l1_size: Max in-process entries
+            stampede_wait: Seconds a pod waits for another pod's load before loading itself (0 disables the Redis lock)
+        """
+        self.name = name
+        self.ttl = min(ttl, MAX_TTL_SECONDS)
+        self.l1_ttl = l1_ttl
+        self.stampede_wait = stampede_wait
+        self._l1 = _LRU(l1_size)
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._stats = {
+            "l1_hits": 0, "l2_hits": 0, "misses": 0, "loads": 0, "load_errors": 0,
+            "stampede_waits": 0, "invalidated": 0, "evictions": 0, "redis_errors": 0
+        }
+
+    def _redis_key(self, key: str) -> str:
+        return VALUE_KEY.format(name=self.name, key=key)
+
+    def _fill_l1(self, key: str, value: Any, ttl: float, tags: FrozenSet[str]):
+        self._stats["evictions"] += self._l1.set(key, value, min(ttl, self.l1_ttl), tags)
+
+    async def _get_l2(self, key: str):
+        client = await _redis.get()
+        if client is None:
+            return _MISSING
+        try:
+            raw = await client.get(self._redis_key(key))
+        except Exception as e:
+            self._stats["redis_errors"] += 1
+            _redis.drop(e)
+            return _MISSING
+        if raw is None:
+            return _MISSING
+        envelope = json.loads(raw)
+        self._fill_l1(key, envelope["v"], self.ttl, frozenset(envelope["t"]))
+        return envelope["v"]
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        """Cached value for key (L1, then Redis), or default"""
+        value = self._l1.get(key)
+        if value is not _MISSING:
+            self._stats["l1_hits"] += 1
+            return value
+        value = await self._get_l2(key)
+        if value is not _MISSING:
+            self._stats["l2_hits"] += 1
+            return value
+        return default
+
+    async def set(self, key: str, value: Any, tags: Iterable[str] = (), ttl: Optional[float] = None):
+        """Store a JSON-compatible value in both levels"""
+        ttl = min(ttl or self.ttl, MAX_TTL_SECONDS)
+        tags = frozenset(tags)
+        _known_tags.update(tags)
+        payload = json.dumps({"v": value, "t": sorted(tags)})
+        self._fill_l1(key, value, ttl, tags)
+
+        client = await _redis.get()
+        if client is None:
+            return
+        redis_key = self._redis_key(key)
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.set(redis_key, payload, ex=int(ttl))
+                for tag in tags:
+                    pipe.sadd(TAG_KEY.format(tag=tag), redis_key)
+                    pipe.expire(TAG_KEY.format(tag=tag), MAX_TTL_SECONDS)
+                await pipe.execute()
+        except Exception as e:
+            self._stats["redis_errors"] += 1
+            _redis.drop(e)
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        tags: Iterable[str] = (),
+        ttl: Optional[float] = None
+    ) -> Any:
+        """Cached value for key, calling loader (once across concurrent callers) on a miss"""
+        value = await self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        if lock.locked():
+            self._stats["stampede_waits"] += 1
+        async with lock:
+            value = self._l1.get(key)
+            if value is not _MISSING:
+                self._stats["l1_hits"] += 1
+            else:
+                self._stats["misses"] += 1
+                value = await self._load(key, loader, tags, ttl)
+        if not lock.locked():
+            self._locks.pop(key, None)
+        return value
+
+    async def _load(self, key: str, loader, tags, ttl):
+        client = await _redis.get()
+        lock_key = None
+        if client is not None and self.stampede_wait > 0:
+            lock_key = LOCK_KEY.format(name=self.name, key=key)
+            try:
+                acquired = await client.set(lock_key, INSTANCE_ID, nx=True, px=int(self.stampede_wait * 1000))
+            except Exception as e:
+                self._stats["redis_errors"] += 1
+                _redis.drop(e)
+                acquired, lock_key = True, None
+            if not acquired:
+                # Another pod is loading this key: wait for its result
+                self._stats["stampede_waits"] += 1
+                lock_key = None
+                value = await self._wait_for_peer(key)
+                if value is not _MISSING:
+                    self._stats["l2_hits"] += 1
+                    return value
+
+        self._stats["loads"] += 1
+        try:
+            value = await loader()
+            await self.set(key, value, tags, ttl)
+            return value
+        except Exception:
+            self._stats["load_errors"] += 1
+            raise
+        finally:
+            if lock_key is not None and _redis.client is not None:
+                try:
+                    await _redis.client.delete(lock_key)
+                except Exception:
+                    pass
+
+    async def _wait_for_peer(self, key: str):
+        deadline = time.monotonic() + self.stampede_wait
+        delay = 0.02
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.25)
+            value = await self._get_l2(key)
+            if value is not _MISSING:
+                return value
+        return _MISSING
+
+    def invalidate_local(self, tags: FrozenSet[str]) -> int:
+        count = self._l1.invalidate_tags(tags)
+        self._stats["invalidated"] += count
+        return count
+
+    def clear_local(self):
+        self._l1.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._stats["l1_hits"] + self._stats["l2_hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "l1_entries": len(self._l1.entries),
+            "hit_ratio": round((lookups - self._stats["misses"]) / lookups, 4) if lookups else None
+        }
+
+
+# ============================================================================
+# REGISTRY AND INVALIDATION
+# ============================================================================
+
+_caches: Dict[str, Cache] = {}
+
+# Tags some cache entry may carry; commits only invalidate these
+_known_tags: Set[str] = set()
+
+_pending_invalidations: Set[asyncio.Task] = set()
+
+_commit_hooks: List[Callable[[FrozenSet[str]], Any]] = []
+
+
+def get_cache(name: str, **options) -> Cache:
+    """Named cache, created with options on first use"""
+    cache = _caches.get(name)
+    if cache is None:
+        cache = _caches[name] = Cache(name, **options)
+    return cache
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss metrics per cache"""
+    return {name: cache.stats() for name, cache in sorted(_caches.items())}
+
+
+def invalidate_local(tags: Iterable[str]) -> int:
+    """Drop entries carrying any of the tags from this process's L1"""
+    tags = frozenset(tags)
+    return sum(cache.invalidate_local(tags) for cache in _caches.values())
+
+
+async def invalidate_tags(*tags: str, publish: bool = True):
+    """Invalidate tags everywhere: local L1, Redis, and (via pub/sub) other pods' L1"""
+    tags = frozenset(tags)
+    if not tags:
+        return
+    invalidate_local(tags)
+
+    client = await _redis.get()
+    if client is None:
+        return
+    tag_keys = [TAG_KEY.format(tag=tag) for tag in sorted(tags)]
+    try:
+        # Read and drop the tag sets atomically, then delete their entries
+        async with client.pipeline(transaction=True) as pipe:
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            pipe.delete(*tag_keys)
+            *members, _ = await pipe.execute()
+        keys = set().union(*members)
+        async with client.pipeline(transaction=False) as pipe:
+            if keys:
+                pipe.delete(*keys)
+            if publish:
+                pipe.publish(INVALIDATION_CHANNEL, json.dumps({"origin": INSTANCE_ID, "tags": sorted(tags)}))
+            await pipe.execute()
+    except Exception as e:
+        _redis.drop(e)
+
+
+def _schedule_invalidation(tags: FrozenSet[str]):
+    """Invalidate from a sync context (session events): L1 now, Redis on the running loop"""
+    invalidate_local(tags)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        logger.debug(f"No event loop; cache tags {sorted(tags)} invalidated in this process only")
+        return
+    task = loop.create_task(invalidate_tags(*tags))
+    _pending_invalidations.add(task)
+    task.add_done_callback(_pending_invalidations.discard)
+
+
+def _session_tags(session) -> Set[str]:
+    return session.info.setdefault(SESSION_TAGS_KEY, set())
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tags(session, flush_context):
+    """Remember the tables written by this flush until the transaction ends"""
+    tags = _session_tags(session)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        tags.update(table.name for table in sa_inspect(obj).mapper.tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_tags(orm_execute_state):
+    """ORM-enabled update()/delete()/insert() statements bypass the flush"""
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            _session_tags(orm_execute_state.session).update(table.name for table in mapper.tables)
+
+
+def on_tables_committed(hook: Callable[[FrozenSet[str]], Any]) -> Callable[[FrozenSet[str]], Any]:
+    """
+    Register hook(tables), called in-process after each commit that wrote those tables
+
+    For caches outside this module; hooks run synchronously inside the
+    session event and must not do I/O.
+    """
+    _commit_hooks.append(hook)
+    return hook
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_tags(session):
+    tables = session.info.pop(SESSION_TAGS_KEY, None)
+    if not tables:
+        return
+    tables = frozenset(tables)
+    for hook in _commit_hooks:
+        try:
+            hook(tables)
+        except Exception as e:
+            logger.warning(f"Commit hook {getattr(hook, '__name__', hook)} failed: {e}")
+    tags = tables & _known_tags
+    if tags:
+        _schedule_invalidation(tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_tags(session):
+    session.info.pop(SESSION_TAGS_KEY, None)
+
+
+class CacheInvalidationSubscriber:
+    """Background listener applying other pods' invalidations to this process's L1"""
+
+    def __init__(self, poll_timeout: float = 1.0):
+        self.poll_timeout = poll_timeout
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+        self.received = 0
+
+    async def start(self):
+        """Start listening for invalidations"""
+        if self.running:
+            return
+        self.running = True
+        self._task = asyncio.create_task(self._loop())
+        logger.info("Cache invalidation subscriber started")
+
+    async def stop(self):
+        """Stop listening for invalidations"""
+        if not self.running:
+            return
+        self.running = False
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        logger.info("Cache invalidation subscriber stopped")
+
+    def handle(self, data: str) -> int:
+        """Apply one invalidation message; returns L1 entries dropped"""
+        payload = json.loads(data)
+        if payload.get("origin") == INSTANCE_ID:
+            return 0
+        self.received += 1
+        return invalidate_local(payload.get("tags", []))
+
+    async def _loop(self):
+        while self.running:
+            client = await _redis.get()
+            if client is None:
+                try:
+                    await asyncio.sleep(REDIS_RETRY_INTERVAL)
+                except asyncio.CancelledError:
+                    break
+                continue
+
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Entries filled while we were disconnected may be stale
+                for cache in _caches.values():
+                    cache.clear_local()
+                while self.running:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=self.poll_timeout)
+                    if message and message.get("type") == "message":
+                        self.handle(message["data"])
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.warning(f"Cache invalidation subscriber error: {e}")
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    break
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+
+
+cache_invalidation_subscriber = CacheInvalidationSubscriber()
+
+
+# ============================================================================
+# DECORATOR
+# ============================================================================
+
+def _keyable(value: Any) -> bool:
+    if value is None or isinstance(value, (str, int, float, bool, UUID, Decimal, date, datetime, Enum)):
+        return True
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return all(_keyable(item) for item in value)
+    return False
+
+
+def make_key(prefix: str, arguments: Dict[str, Any]) -> str:
+    """
+    Cache key from call arguments
+
+    Arguments that aren't plain values (sessions, auth users, requests) are
+    left out, so they must not change the result.
+    """
+    plain = {
+        name: sorted(value, key=str) if isinstance(value, (set, frozenset)) else value
+        for name, value in arguments.items() if _keyable(value)
+    }
+    digest = hashlib.sha1(json.dumps(plain, sort_keys=True, default=str).encode()).hexdigest()[:24]
+    return f"{prefix}:{digest}"
+
+
+def cached(
+    cache_name: str,
+    *,
+    tags: Iterable[str] = (),
+    ttl: Optional[float] = None,
+    model: Any = None,
+    **cache_options
+):
+    """
+    Read-through cache decorator for async service functions and GET routes
+
+    Args:
+        cache_name: Named cache to use (created with cache_options on first use)
+        tags: Tables the result is built from; commits touching them invalidate it
+        ttl: Entry TTL in seconds (default: the cache's TTL)
+        model: Type to serialize the result with (e.g. the route's response_model,
+            validated from ORM attributes); otherwise jsonable_encoder is used
+
+    The wrapped function always returns the JSON-compatible form, on hits and misses.
+    Place it under @router.get so FastAPI still sees the original signature.
+    """
+    cache = get_cache(cache_name, **cache_options)
+    tags = frozenset(tags)
+    _known_tags.update(tags)
+    adapter = TypeAdapter(model) if model is not None else None
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        prefix = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+
+            async def load():
+                result = await func(*args, **kwargs)
+                if adapter is not None:
+                    return adapter.dump_python(adapter.validate_python(result, from_attributes=True), mode="json")
+                return jsonable_encoder(result)
+
+            return await cache.get_or_load(make_key(prefix, bound.arguments), load, tags=tags, ttl=ttl)
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
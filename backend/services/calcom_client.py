@@ -17,9 +17,10 @@ import logging
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
 from enum import Enum
-import httpx
 from pydantic import BaseModel
 
+from services.http_client_registry import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -87,11 +88,11 @@ class CalcomClient:
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
         self.timeout = timeout
-        self.client = httpx.AsyncClient(timeout=timeout)
+        self.client = get_http_client("calcom", timeout=timeout)
 
     async def close(self):
-        """Close HTTP client"""
-        await self.client.aclose()
+        """Release HTTP client (the shared pool is closed at application shutdown)"""
+        pass
 
     def _headers(self) -> Dict[str, str]:
         """Get request headers with authentication"""
@@ -10,7 +10,7 @@ from typing import Dict, List, Optional
 from datetime import datetime
 from uuid import UUID
 
-from services.git_service import GitService
+from services.git_service import GitService, get_git_service
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +20,7 @@ class ComponentSyncService:
 
     def __init__(self, git_service: Optional[GitService] = None):
         """Initialize ComponentSyncService."""
-        self.git_service = git_service or GitService()
+        self.git_service = git_service or get_git_service()
         self.ssh_key_path = os.getenv("TIER0_SSH_KEY_PATH", "/app/config/tier0_ssh_key")
         self.ssh_user = os.getenv("TIER0_SSH_USER", "root")
 
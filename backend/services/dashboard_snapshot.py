@@ -0,0 +1,447 @@
+"""
+Dashboard Snapshot Service
+
+Computes every database-backed dashboard card for a scope (the whole
+portfolio, or one property) in a single CTE-based query, caches it for a few
+seconds, and pushes the cards that changed to subscribed WebSocket rooms so
+dashboards don't have to poll.
+
+Snapshots are plain nested dicts of numbers:
+- property_hubs / residential_hubs: total, online, offline, error, warning
+- work_orders: open_by_priority (dashboard cards), active (summary cards), created_this_week
+- alerts: critical_24h
+- approvals: pending, estimated_cost
+- communications: unread_emails, unread_sms
+
+WebSocket rooms:
+- "dashboard": portfolio-wide cards
+- "dashboard:<property uuid>": cards for one property
+
+Joining a room sends a full `dashboard_snapshot`; afterwards the publisher
+sends `dashboard_delta` messages holding only the changed values.
+
+Endpoints pass in their own (usually replica) session. The publisher reads
+the primary and bypasses the cache, so a lagging replica can never push
+stale values or make a delta go backwards.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, func, case, and_, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.database import AsyncSessionLocal
+from db.models import Property, Building, Unit, WorkOrder, Alert, PropertyEdgeNode
+from db.models_approval import PendingAction
+from db.models_comms import EmailMessage, SMSMessage
+from services.websocket_manager import ConnectionManager, manager
+
+logger = logging.getLogger(__name__)
+
+ALL_PROPERTIES = "all"
+DASHBOARD_ROOM = "dashboard"
+
+HUB_TYPES = {"property_hubs": "PROPERTY_HUB", "residential_hubs": "RESIDENTIAL"}
+
+# Work order statuses/priorities as counted by /dashboard and by /summary respectively
+DASHBOARD_OPEN_STATUSES = ('open', 'assigned', 'in_progress')
+DASHBOARD_PRIORITIES = ('low', 'medium', 'high', 'emergency')
+SUMMARY_OPEN_STATUSES = ('submitted', 'in_progress')
+
+SNAPSHOT_TTL_SECONDS = 5.0
+PUSH_INTERVAL_SECONDS = 5.0
+
+# Result labels are paths into the snapshot dict
+PATH_SEPARATOR = "__"
+
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _number(value):
+    if value is None:
+        return 0
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _nest(row: Dict[str, Any]) -> Dict[str, Any]:
+    """{"a__b": 1} -> {"a": {"b": 1}}"""
+    snapshot: Dict[str, Any] = {}
+    for label, value in row.items():
+        *parents, leaf = label.split(PATH_SEPARATOR)
+        node = snapshot
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[leaf] = _number(value)
+    return snapshot
+
+
+def _label(*path: str) -> str:
+    return PATH_SEPARATOR.join(path)
+
+
+def scope_key(property_id=None) -> str:
+    """Canonical cache/room scope for an optional property ID"""
+    return ALL_PROPERTIES if property_id is None else str(UUID(str(property_id)))
+
+
+def room_for_scope(scope: str) -> str:
+    return DASHBOARD_ROOM if scope == ALL_PROPERTIES else f"{DASHBOARD_ROOM}:{scope}"
+
+
+def is_dashboard_room(room: str) -> bool:
+    """Whether a room name addresses the dashboard, valid or not"""
+    return room == DASHBOARD_ROOM or room.startswith(f"{DASHBOARD_ROOM}:")
+
+
+def scope_for_room(room: str) -> Optional[str]:
+    """Scope a dashboard room subscribes to, or None for other rooms"""
+    if room == DASHBOARD_ROOM:
+        return ALL_PROPERTIES
+    prefix = f"{DASHBOARD_ROOM}:"
+    if room.startswith(prefix):
+        try:
+            return scope_key(room[len(prefix):])
+        except ValueError:
+            return None
+    return None
+
+
+def _work_orders_with_property():
+    """Work orders joined to their building (directly or through the unit), for property scoping"""
+    return (
+        select()
+        .select_from(WorkOrder)
+        .outerjoin(Unit, Unit.id == WorkOrder.unit_id)
+        .outerjoin(Building, Building.id == func.coalesce(WorkOrder.building_id, Unit.building_id))
+    )
+
+
+def build_cards_query(property_id: Optional[UUID] = None, now: Optional[datetime] = None):
+    """One statement computing every card: a single-row CTE per source table, joined together"""
+    now = now or datetime.utcnow()
+
+    hub_columns = []
+    for key, hub_type in HUB_TYPES.items():
+        is_type = PropertyEdgeNode.hub_type == hub_type
+        hub_columns += [
+            _count_if(is_type).label(_label(key, "total")),
+            _count_if(and_(is_type, PropertyEdgeNode.status == 'online')).label(_label(key, "online")),
+            _count_if(and_(is_type, PropertyEdgeNode.status == 'offline')).label(_label(key, "offline")),
+            _count_if(and_(is_type, PropertyEdgeNode.status == 'error')).label(_label(key, "error")),
+            _count_if(and_(is_type, PropertyEdgeNode.status == 'warning')).label(_label(key, "warning")),
+        ]
+    hubs = select(*hub_columns)
+
+    dashboard_open = WorkOrder.status.in_(DASHBOARD_OPEN_STATUSES)
+    summary_open = WorkOrder.status.in_(SUMMARY_OPEN_STATUSES)
+    work_orders = (_work_orders_with_property() if property_id else select()).add_columns(
+        *[
+            _count_if(and_(dashboard_open, WorkOrder.priority == priority)).label(
+                _label("work_orders", "open_by_priority", priority)
+            )
+            for priority in DASHBOARD_PRIORITIES
+        ],
+        _count_if(summary_open).label(_label("work_orders", "active", "total")),
+        _count_if(and_(summary_open, WorkOrder.priority == 'emergency')).label(_label("work_orders", "active", "emergency")),
+        _count_if(and_(summary_open, WorkOrder.priority == 'high')).label(_label("work_orders", "active", "high_priority")),
+        _count_if(WorkOrder.status == 'in_progress').label(_label("work_orders", "active", "in_progress")),
+        _count_if(WorkOrder.created_at >= now - timedelta(days=7)).label(_label("work_orders", "created_this_week")),
+    )
+
+    alerts = select(func.count(Alert.id).label(_label("alerts", "critical_24h"))).where(
+        Alert.severity == 'critical',
+        Alert.occurred_at >= now - timedelta(hours=24),
+        Alert.status != 'resolved'
+    )
+
+    approvals = select(
+        func.count(PendingAction.id).label(_label("approvals", "pending")),
+        func.coalesce(func.sum(PendingAction.estimated_cost), 0).label(_label("approvals", "estimated_cost")),
+    ).where(PendingAction.status == 'pending')
+
+    if property_id:
+        hubs = hubs.where(PropertyEdgeNode.property_id == property_id)
+        work_orders = work_orders.where(Building.property_id == property_id)
+        alerts = alerts.where(Alert.hub_id.in_(
+            select(PropertyEdgeNode.id).where(PropertyEdgeNode.property_id == property_id)
+        ))
+        approvals = approvals.where(PendingAction.property_id == property_id)
+
+    # Communications are not tied to a property
+    emails = select(func.count(EmailMessage.id).label(_label("communications", "unread_emails"))).where(
+        EmailMessage.direction == 'incoming',
+        EmailMessage.ai_processed == False  # noqa: E712
+    )
+    sms = select(func.count(SMSMessage.id).label(_label("communications", "unread_sms"))).where(
+        SMSMessage.direction == 'incoming',
+        SMSMessage.ai_processed == False  # noqa: E712
+    )
+
+    ctes = [
+        query.cte(name) for name, query in (
+            ("hub_cards", hubs), ("work_order_cards", work_orders), ("alert_cards", alerts),
+            ("approval_cards", approvals), ("email_cards", emails), ("sms_cards", sms),
+        )
+    ]
+    joined = ctes[0]
+    for cte in ctes[1:]:
+        joined = joined.join(cte, true())
+    return select(*[column for cte in ctes for column in cte.c]).select_from(joined)
+
+
+def build_portfolio_query():
+    """Per-property unit occupancy and work order counts, plus pending approvals, in one statement"""
+    units = (
+        select(
+            Building.property_id.label("property_id"),
+            func.count(Unit.id).label("total_units"),
+            _count_if(Unit.status == 'occupied').label("occupied_units"),
+        )
+        .join(Building, Building.id == Unit.building_id)
+        .group_by(Building.property_id)
+        .cte("unit_counts")
+    )
+    work_orders = (
+        _work_orders_with_property()
+        .add_columns(
+            Building.property_id.label("property_id"),
+            func.count(WorkOrder.id).label("open_work_orders"),
+            _count_if(WorkOrder.priority == 'urgent').label("urgent_work_orders"),
+        )
+        .where(WorkOrder.status.in_(SUMMARY_OPEN_STATUSES))
+        .group_by(Building.property_id)
+        .cte("work_order_counts")
+    )
+    approvals = select(func.count(PendingAction.id).label("pending_approvals")).where(
+        PendingAction.status == 'pending'
+    ).cte("approval_counts")
+
+    # Start from the single approvals row so it is returned even without properties
+    return (
+        select(
+            approvals.c.pending_approvals,
+            Property.id,
+            Property.name,
+            func.coalesce(units.c.total_units, 0).label("total_units"),
+            func.coalesce(units.c.occupied_units, 0).label("occupied_units"),
+            func.coalesce(work_orders.c.open_work_orders, 0).label("open_work_orders"),
+            func.coalesce(work_orders.c.urgent_work_orders, 0).label("urgent_work_orders"),
+        )
+        .select_from(approvals)
+        .outerjoin(Property, true())
+        .outerjoin(units, units.c.property_id == Property.id)
+        .outerjoin(work_orders, work_orders.c.property_id == Property.id)
+        .order_by(Property.name)
+    )
+
+
+def diff_snapshot(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Nested dict of the values in `new` that differ from `old` (removed keys map to None)"""
+    changes: Dict[str, Any] = {}
+    for key, value in new.items():
+        previous = old.get(key)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = diff_snapshot(previous, value)
+            if nested:
+                changes[key] = nested
+        elif key not in old or value != previous:
+            changes[key] = value
+    for key in old.keys() - new.keys():
+        changes[key] = None
+    return changes
+
+
+class DashboardSnapshotService:
+    """
+    Cached dashboard snapshots per scope, with WebSocket delta publishing
+
+    Concurrent misses for the same scope are coalesced: one caller runs the
+    query, the others wait for its result. The publisher recomputes only the
+    scopes that have subscribers, so the database cost is one query per
+    watched scope per interval regardless of how many dashboards are open.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = SNAPSHOT_TTL_SECONDS,
+        push_interval: float = PUSH_INTERVAL_SECONDS,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+        ws_manager: Optional[ConnectionManager] = None
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.push_interval = push_interval
+        # Publisher reads go to the primary (see module docstring)
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.ws_manager = ws_manager or manager
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+        self._cache: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        # Last snapshot sent to each watched scope; deltas are computed against it
+        self._published: Dict[str, Dict[str, Any]] = {}
+        self.stats = {"hits": 0, "misses": 0, "deltas_pushed": 0}
+
+    async def _cached(
+        self,
+        key: Tuple[str, str],
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        refresh: bool = False
+    ) -> Dict[str, Any]:
+        entry = self._cache.get(key)
+        if entry and entry[0] > time.monotonic() and not refresh:
+            self.stats["hits"] += 1
+            return entry[1]
+
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            entry = self._cache.get(key)
+            if entry and entry[0] > time.monotonic() and not refresh:
+                self.stats["hits"] += 1
+                return entry[1]
+            self.stats["misses"] += 1
+            snapshot = await compute()
+            self._cache[key] = (time.monotonic() + self.ttl_seconds, snapshot)
+            return snapshot
+
+    async def cards(self, db: AsyncSession, property_id=None, refresh: bool = False) -> Dict[str, Any]:
+        """Dashboard cards for the portfolio or one property (refresh: recompute even if cached)"""
+        scope = scope_key(property_id)
+
+        async def compute():
+            query = build_cards_query(None if scope == ALL_PROPERTIES else UUID(scope))
+            row = (await db.execute(query)).mappings().one()
+            return _nest(dict(row))
+
+        return await self._cached(("cards", scope), compute, refresh)
+
+    async def portfolio(self, db: AsyncSession) -> Dict[str, Any]:
+        """Per-property occupancy/work order counts keyed by property ID"""
+
+        async def compute():
+            rows = (await db.execute(build_portfolio_query())).all()
+            return {
+                "pending_approvals": rows[0].pending_approvals if rows else 0,
+                "properties": {
+                    str(row.id): {
+                        "name": row.name,
+                        "total_units": row.total_units,
+                        "occupied_units": row.occupied_units,
+                        "open_work_orders": row.open_work_orders,
+                        "urgent_work_orders": row.urgent_work_orders,
+                    }
+                    for row in rows if row.id is not None
+                },
+            }
+
+        return await self._cached(("portfolio", ALL_PROPERTIES), compute)
+
+    def invalidate(self, property_id=None):
+        """Drop cached snapshots (all scopes when property_id is None)"""
+        if property_id is None:
+            self._cache.clear()
+            return
+        scope = scope_key(property_id)
+        for key in [key for key in self._cache if key[1] in (scope, ALL_PROPERTIES)]:
+            del self._cache[key]
+
+    # ------------------------------------------------------------------
+    # WebSocket push
+    # ------------------------------------------------------------------
+
+    def watched_scopes(self) -> set:
+        return {
+            scope for room, connections in list(self.ws_manager.rooms.items())
+            if connections and (scope := scope_for_room(room)) is not None
+        }
+
+    async def send_snapshot(self, websocket, room: str):
+        """Send the full snapshot a delta subscriber starts from"""
+        scope = scope_for_room(room)
+        if scope is None:
+            return
+        snapshot = self._published.get(scope)
+        if snapshot is None:
+            async with self.session_factory() as session:
+                snapshot = await self.cards(session, None if scope == ALL_PROPERTIES else scope, refresh=True)
+            self._published[scope] = snapshot
+        await self.ws_manager.send_personal_message({
+            "type": "dashboard_snapshot",
+            "scope": scope,
+            "cards": snapshot,
+            "timestamp": datetime.utcnow().isoformat()
+        }, websocket)
+
+    async def publish_once(self) -> int:
+        """Recompute watched scopes and push changed cards; returns deltas sent"""
+        scopes = self.watched_scopes()
+        for scope in self._published.keys() - scopes:
+            del self._published[scope]
+        if not scopes:
+            return 0
+
+        pushed = 0
+        async with self.session_factory() as session:
+            for scope in scopes:
+                snapshot = await self.cards(session, None if scope == ALL_PROPERTIES else scope, refresh=True)
+                previous = self._published.get(scope)
+                self._published[scope] = snapshot
+                if previous is None:
+                    continue
+                changes = diff_snapshot(previous, snapshot)
+                if not changes:
+                    continue
+                await self.ws_manager.broadcast_to_room({
+                    "type": "dashboard_delta",
+                    "scope": scope,
+                    "changes": changes,
+                    "timestamp": datetime.utcnow().isoformat()
+                }, room_for_scope(scope))
+                pushed += 1
+
+        self.stats["deltas_pushed"] += pushed
+        return pushed
+
+    async def start(self):
+        """Start the delta publisher loop"""
+        if self.running:
+            return
+        self.running = True
+        self._task = asyncio.create_task(self._loop())
+        logger.info("Dashboard snapshot publisher started")
+
+    async def stop(self):
+        """Stop the delta publisher loop"""
+        if not self.running:
+            return
+        self.running = False
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        logger.info("Dashboard snapshot publisher stopped")
+
+    async def _loop(self):
+        while self.running:
+            try:
+                await self.publish_once()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Dashboard snapshot publisher error: {e}", exc_info=True)
+            try:
+                await asyncio.sleep(self.push_interval)
+            except asyncio.CancelledError:
+                break
+
+
+# Global dashboard snapshot service
+dashboard_snapshots = DashboardSnapshotService()
@@ -0,0 +1,545 @@
+"""
+Document Vector Index
+
+Local semantic retrieval over document metadata and Paperless OCR text, so
+search and AI retrieval never call Paperless on the request path:
+
+- A background job picks up new/changed documents, fetches their OCR text
+  from Paperless once, splits it into overlapping word chunks (plus one
+  metadata chunk: title, type, description) and embeds the chunks in
+  batches via LocalAI
+- Vectors live in one flat float32 matrix, persisted as a raw `vectors.f32`
+  file next to `chunks.json` (chunk metadata and per-document index state).
+  With NumPy installed the file is memory-mapped on load and searched with
+  a single matrix product; without it the same file is read with `array`
+- Updates are incremental: only changed documents are re-embedded, deleted
+  documents are dropped, and documents whose OCR is still pending in
+  Paperless are re-checked periodically
+- search() embeds the query (memoized) and returns the top-k documents
+  with their best matching chunk, optionally filtered by lease / tenant /
+  property / work order / document type
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+
+from core.config import settings
+from db.models import Document
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+CHUNK_WORDS = 200
+CHUNK_OVERLAP = 40
+EMBED_BATCH_SIZE = 32
+
+# Chunk metadata usable as search filters
+FILTER_FIELDS = ("document_type", "lease_id", "tenant_id", "property_id", "work_order_id")
+
+# Columns whose change triggers re-indexing (the OCR text itself is keyed by paperless_document_id)
+STAMP_COLUMNS = (
+    Document.id, Document.updated_at, Document.paperless_document_id,
+    Document.title, Document.description, Document.document_type,
+    Document.lease_id, Document.tenant_id, Document.property_id, Document.work_order_id,
+)
+
+VECTORS_FILE = "vectors.f32"
+CHUNKS_FILE = "chunks.json"
+
+EmbedBatchFunction = Callable[[List[str]], Awaitable[Optional[List[List[float]]]]]
+FetchTextFunction = Callable[[int], Awaitable[Optional[str]]]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def chunk_text(text: str, size: int = CHUNK_WORDS, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """Split text into chunks of `size` words, consecutive chunks sharing `overlap` words"""
+    words = text.split() if text else []
+    if not words:
+        return []
+    step = max(size - overlap, 1)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + size]))
+        if start + size >= len(words):
+            break
+    return chunks
+
+
+def metadata_text(document: Document) -> str:
+    """Searchable text for a document's own fields"""
+    parts = [document.title, f"Type: {document.document_type}"]
+    if document.description:
+        parts.append(document.description)
+    return "\n".join(p for p in parts if p)
+
+
+def _unit(vector: Sequence[float]) -> List[float]:
+    norm = math.sqrt(sum(v * v for v in vector))
+    return [v / norm for v in vector] if norm else list(vector)
+
+
+async def _localai_embed_batch(texts: List[str]) -> Optional[List[List[float]]]:
+    from services.localai_client import get_localai_client
+    response = await get_localai_client().create_embedding(texts)
+    if not response or not response.data or len(response.data) != len(texts):
+        return None
+    return [item.get("embedding") for item in response.data]
+
+
+async def _paperless_text(paperless_document_id: int) -> Optional[str]:
+    from services.paperless_client import get_paperless_client
+    return await get_paperless_client().get_document_text(paperless_document_id)
+
+
+class DocumentVectorStore:
+    """
+    Flat matrix of unit-length chunk vectors plus chunk metadata
+
+    `directory=None` keeps the store in memory only.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self.dim: Optional[int] = None
+        self.chunks: List[Dict[str, Any]] = []
+        # document_id -> {"stamp": ..., "has_text": bool, "checked_at": epoch seconds}
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self._vectors = self._empty()
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def upsert(
+        self,
+        document_id: str,
+        chunks: List[Dict[str, Any]],
+        vectors: List[List[float]],
+        state: Dict[str, Any]
+    ):
+        """Replace every chunk of a document"""
+        if vectors and self.dim is None:
+            self.dim = len(vectors[0])
+        if any(len(v) != self.dim for v in vectors):
+            raise ValueError("Embedding dimension does not match the index")
+
+        self._drop(document_id)
+        for chunk in chunks:
+            chunk["document_id"] = document_id
+        self.chunks.extend(chunks)
+        self._append(vectors)
+        self.documents[document_id] = state
+
+    def remove(self, document_id: str) -> bool:
+        """Drop a document; returns False if it was not indexed"""
+        if document_id not in self.documents:
+            return False
+        self._drop(document_id)
+        del self.documents[document_id]
+        return True
+
+    def _drop(self, document_id: str):
+        keep = [i for i, chunk in enumerate(self.chunks) if chunk["document_id"] != document_id]
+        if len(keep) == len(self.chunks):
+            return
+        self.chunks = [self.chunks[i] for i in keep]
+        if NUMPY_AVAILABLE:
+            self._vectors = self._vectors[keep]
+        else:
+            self._vectors = [self._vectors[i] for i in keep]
+
+    def _empty(self):
+        if NUMPY_AVAILABLE:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        return []
+
+    def _append(self, vectors: List[List[float]]):
+        if not vectors:
+            return
+        if NUMPY_AVAILABLE:
+            block = np.asarray(vectors, dtype=np.float32)
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            block = block / np.where(norms == 0, 1, norms)
+            existing = self._vectors if len(self._vectors) else np.zeros((0, self.dim), dtype=np.float32)
+            self._vectors = np.vstack([existing, block])
+        else:
+            self._vectors.extend(array("f", _unit(v)) for v in vectors)
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        query_vector: Sequence[float],
+        k: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """Top-k documents as (score, best chunk), best first"""
+        if not self.chunks or self.dim is None or len(query_vector) != self.dim:
+            return []
+
+        filters = {key: str(value) for key, value in (filters or {}).items() if value is not None}
+        candidates = [
+            i for i, chunk in enumerate(self.chunks)
+            if all(chunk.get(key) == value for key, value in filters.items())
+        ] if filters else None
+
+        query = _unit(query_vector)
+        indices = candidates if candidates is not None else list(range(len(self.chunks)))
+        if NUMPY_AVAILABLE:
+            matrix = self._vectors if candidates is None else self._vectors[candidates]
+            scores = matrix @ np.asarray(query, dtype=np.float32)
+            ranked = ((float(scores[i]), indices[i]) for i in np.argsort(-scores, kind="stable"))
+        else:
+            ranked = iter(sorted(
+                ((sum(a * b for a, b in zip(self._vectors[i], query)), i) for i in indices),
+                key=lambda pair: pair[0], reverse=True
+            ))
+
+        # One hit per document: its best chunk
+        results, seen = [], set()
+        for score, index in ranked:
+            chunk = self.chunks[index]
+            if chunk["document_id"] in seen:
+                continue
+            seen.add(chunk["document_id"])
+            results.append((float(score), chunk))
+            if len(results) >= k:
+                break
+        return results
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self):
+        """Write vectors and metadata atomically (no-op for in-memory stores)"""
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        vectors_path = os.path.join(self.directory, VECTORS_FILE)
+        chunks_path = os.path.join(self.directory, CHUNKS_FILE)
+
+        with open(vectors_path + ".tmp", "wb") as f:
+            if NUMPY_AVAILABLE:
+                np.ascontiguousarray(self._vectors, dtype=np.float32).tofile(f)
+            else:
+                for row in self._vectors:
+                    row.tofile(f)
+        with open(chunks_path + ".tmp", "w") as f:
+            json.dump({"dim": self.dim, "chunks": self.chunks, "documents": self.documents}, f)
+
+        # Vectors first: a crash in between leaves metadata describing the old file
+        os.replace(vectors_path + ".tmp", vectors_path)
+        os.replace(chunks_path + ".tmp", chunks_path)
+
+    def load(self) -> bool:
+        """Load a saved index; returns False if none exists or it is inconsistent"""
+        if not self.directory:
+            return False
+        vectors_path = os.path.join(self.directory, VECTORS_FILE)
+        chunks_path = os.path.join(self.directory, CHUNKS_FILE)
+        if not (os.path.exists(vectors_path) and os.path.exists(chunks_path)):
+            return False
+
+        with open(chunks_path) as f:
+            saved = json.load(f)
+        dim, chunks = saved.get("dim"), saved.get("chunks", [])
+        expected_bytes = len(chunks) * (dim or 0) * 4
+        if os.path.getsize(vectors_path) != expected_bytes:
+            logger.warning("Document index files are inconsistent; rebuilding")
+            return False
+
+        self.dim = dim
+        self.chunks = chunks
+        self.documents = saved.get("documents", {})
+        if not chunks:
+            self._vectors = self._empty()
+        elif NUMPY_AVAILABLE:
+            self._vectors = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(len(chunks), dim))
+        else:
+            flat = array("f")
+            with open(vectors_path, "rb") as f:
+                flat.fromfile(f, len(chunks) * dim)
+            self._vectors = [flat[i * dim:(i + 1) * dim] for i in range(len(chunks))]
+        return True
+
+
+class DocumentVectorIndex:
+    """Background indexer and query interface for the document vector store"""
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        interval: float = 60.0,
+        batch_size: int = 20,
+        concurrency: int = 4,
+        ocr_retry_seconds: float = 900.0,
+        embed_batch: Optional[EmbedBatchFunction] = None,
+        fetch_text: Optional[FetchTextFunction] = None,
+        session_factory=None,
+        max_query_embeddings: int = 500
+    ):
+        self.store = DocumentVectorStore(directory)
+        self.interval = interval
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.ocr_retry_seconds = ocr_retry_seconds
+        self.max_query_embeddings = max_query_embeddings
+        self._embed_batch = embed_batch or _localai_embed_batch
+        self._fetch_text = fetch_text or _paperless_text
+        self._session_factory = session_factory
+        self._query_vectors: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._loaded = False
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"indexed": 0, "removed": 0, "failed": 0, "searches": 0}
+
+    # ------------------------------------------------------------------
+    # Background loop
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        """Load the saved index and start the indexing loop"""
+        if self.running:
+            return
+        self._load()
+        self.running = True
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"Document vector index started ({len(self.store)} chunks loaded)")
+
+    async def stop(self):
+        """Stop the indexing loop"""
+        if not self.running:
+            return
+        self.running = False
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        logger.info("Document vector index stopped")
+
+    def notify(self):
+        """Run the next indexing pass now (a document was added or changed)"""
+        self._wakeup.set()
+
+    async def _loop(self):
+        while self.running:
+            try:
+                processed = await self.run_once()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Document indexing error: {e}", exc_info=True)
+                processed = 0
+
+            # Work through backlogs quickly; otherwise wait for the interval or a notify()
+            if processed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+                except asyncio.TimeoutError:
+                    pass
+                except asyncio.CancelledError:
+                    break
+                self._wakeup.clear()
+
+    async def run_once(self) -> int:
+        """Index one batch of new/changed documents and drop deleted ones; returns documents indexed"""
+        self._load()
+        async with self._sessions()() as db:
+            rows = (await db.execute(select(*STAMP_COLUMNS))).all()
+            current = {str(row.id): row for row in rows}
+
+            removed = [doc_id for doc_id in list(self.store.documents) if doc_id not in current]
+            for doc_id in removed:
+                self.store.remove(doc_id)
+            self.stats["removed"] += len(removed)
+
+            now = time.time()
+            due = [row.id for doc_id, row in current.items() if self._needs_indexing(doc_id, row, now)]
+            due = due[:self.batch_size]
+            documents = []
+            if due:
+                documents = (await db.execute(select(Document).where(Document.id.in_(due)))).scalars().all()
+
+        indexed = await self._index_documents(documents)
+        if removed or indexed:
+            self._save()
+        return indexed
+
+    def _needs_indexing(self, doc_id: str, row, now: float) -> bool:
+        state = self.store.documents.get(doc_id)
+        if state is None or state.get("stamp") != self._stamp(row):
+            return True
+        # OCR may still be running in Paperless; look again later
+        return (
+            row.paperless_document_id is not None
+            and not state.get("has_text")
+            and now - state.get("checked_at", 0) >= self.ocr_retry_seconds
+        )
+
+    @staticmethod
+    def _stamp(row) -> str:
+        """Fingerprint of everything an indexed document's chunks depend on"""
+        values = [getattr(row, column.key) for column in STAMP_COLUMNS]
+        encoded = json.dumps(values, default=str)
+        return hashlib.sha256(encoded.encode()).hexdigest()[:16]
+
+    async def _index_documents(self, documents: List[Document]) -> int:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def prepare(document: Document):
+            text = None
+            if document.paperless_document_id is not None:
+                async with semaphore:
+                    try:
+                        text = await self._fetch_text(document.paperless_document_id)
+                    except Exception as e:
+                        logger.debug(f"OCR text fetch failed for document {document.id}: {e}")
+            return document, text
+
+        prepared = await asyncio.gather(*(prepare(d) for d in documents))
+
+        indexed = 0
+        for document, text in prepared:
+            chunk_texts = [metadata_text(document)] + chunk_text(text or "")
+            vectors = await self._embed(chunk_texts)
+            if vectors is None:
+                # Embedding service unavailable; the document stays due
+                self.stats["failed"] += 1
+                continue
+
+            base = {
+                "title": document.title,
+                **{field: str(getattr(document, field)) if getattr(document, field) is not None else None
+                   for field in FILTER_FIELDS},
+            }
+            chunks = [{**base, "chunk": i, "text": t} for i, t in enumerate(chunk_texts)]
+            self.store.upsert(str(document.id), chunks, vectors, {
+                "stamp": self._stamp(document),
+                "has_text": bool(text),
+                "checked_at": time.time(),
+            })
+            indexed += 1
+        self.stats["indexed"] += indexed
+        return indexed
+
+    async def _embed(self, texts: List[str]) -> Optional[List[List[float]]]:
+        vectors = []
+        for start in range(0, len(texts), EMBED_BATCH_SIZE):
+            try:
+                batch = await self._embed_batch(texts[start:start + EMBED_BATCH_SIZE])
+            except Exception as e:
+                logger.debug(f"Embedding batch failed: {e}")
+                batch = None
+            if not batch:
+                return None
+            vectors.extend(batch)
+        return vectors
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+
+    async def search(self, query: str, k: int = 5, **filters) -> Optional[List[Dict[str, Any]]]:
+        """
+        Top-k documents for a natural-language query
+
+        Returns None if the query could not be embedded.
+        """
+        self._load()
+        self.stats["searches"] += 1
+        vector = await self._query_vector(query)
+        if vector is None:
+            return None
+        return [
+            {
+                "document_id": chunk["document_id"],
+                "title": chunk.get("title"),
+                "document_type": chunk.get("document_type"),
+                "lease_id": chunk.get("lease_id"),
+                "tenant_id": chunk.get("tenant_id"),
+                "property_id": chunk.get("property_id"),
+                "work_order_id": chunk.get("work_order_id"),
+                "score": round(score, 4),
+                "snippet": chunk.get("text", "")[:300],
+            }
+            for score, chunk in self.store.search(vector, k, filters)
+        ]
+
+    async def _query_vector(self, query: str) -> Optional[List[float]]:
+        key = _WHITESPACE.sub(" ", query.strip().lower())
+        if key in self._query_vectors:
+            self._query_vectors.move_to_end(key)
+            return self._query_vectors[key]
+        vectors = await self._embed([query])
+        if not vectors:
+            return None
+        self._query_vectors[key] = vectors[0]
+        if len(self._query_vectors) > self.max_query_embeddings:
+            self._query_vectors.popitem(last=False)
+        return vectors[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "documents": len(self.store.documents),
+            "chunks": len(self.store),
+            "dimensions": self.store.dim,
+            "running": self.running,
+            "numpy": NUMPY_AVAILABLE,
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _sessions(self):
+        if self._session_factory is None:
+            from db.database import AsyncSessionLocal
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            self.store.load()
+        except Exception as e:
+            logger.warning(f"Could not load document index from {self.store.directory}: {e}")
+
+    def _save(self):
+        try:
+            self.store.save()
+        except Exception as e:
+            logger.warning(f"Could not persist document index to {self.store.directory}: {e}")
+
+
+# Shared index (documents API, MCP search_documents tool)
+document_vector_index = DocumentVectorIndex(
+    directory=settings.DOCUMENT_INDEX_DIR,
+    interval=settings.DOCUMENT_INDEX_INTERVAL_SECONDS
+)
@@ -12,10 +12,15 @@ from email.mime.base import MIMEBase
 from email import encoders
 from email.utils import parseaddr, formataddr
 import logging
-from typing import List, Dict, Optional, Any
+from typing import Any, Awaitable, Callable, List, Dict, Optional, Tuple
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import asyncio
 import base64
+import re
+import select as io_select
+import threading
+import time
 from pathlib import Path
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -121,7 +126,24 @@ class EmailService:
 
     async def _parse_email(self, email_msg: email.message.Message) -> Optional[EmailMessage]:
         """
-        Parse raw email message into EmailMessage model
+        Parse raw email message into EmailMessage model and save it
+        """
+        email_message = self._build_email_message(email_msg)
+        if email_message is None:
+            return None
+
+        try:
+            self.db.add(email_message)
+            await self.db.commit()
+            await self.db.refresh(email_message)
+            return email_message
+        except Exception as e:
+            logger.error(f"Error saving email: {e}")
+            return None
+
+    def _build_email_message(self, email_msg: email.message.Message) -> Optional[EmailMessage]:
+        """
+        Parse raw email message into an (unsaved) EmailMessage model
         """
         try:
             # Extract headers
@@ -196,11 +218,6 @@ class EmailService:
                 raw_headers=dict(email_msg.items())
             )
 
-            # Save to database
-            self.db.add(email_message)
-            await self.db.commit()
-            await self.db.refresh(email_message)
-
             return email_message
 
         except Exception as e:
@@ -344,65 +361,407 @@ AI Note: {note}
         self.disconnect()
 
 
-class EmailPoller:
+# IMAP servers drop idle sessions after ~30 minutes; re-issue IDLE well before that
+IDLE_TIMEOUT_SECONDS = 300.0
+RECONNECT_MIN_SECONDS = 5.0
+RECONNECT_MAX_SECONDS = 300.0
+FETCH_BATCH_SIZE = 50
+
+_FETCH_UID = re.compile(rb"UID (\d+)")
+
+
+def _parse_uid_fetch(data) -> List[Tuple[int, bytes]]:
+    """(uid, raw message) pairs from an IMAP `UID FETCH ... (RFC822)` response"""
+    messages = []
+    for item in data or []:
+        if isinstance(item, tuple) and len(item) >= 2:
+            match = _FETCH_UID.search(item[0])
+            if match:
+                messages.append((int(match.group(1)), item[1]))
+    return messages
+
+
+class IMAPMailbox:
     """
-    Background service that polls all active email accounts
+    Blocking IMAP session for one mailbox
+
+    All methods block and are run on EmailPoller's thread pool, one thread
+    per connected mailbox.
     """
 
-    def __init__(self, db_session_factory):
-        self.db_session_factory = db_session_factory
-        self.running = False
+    def __init__(self, host: str, port: int, use_ssl: bool, username: str, password: str, folder: str):
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.username = username
+        self.password = password
+        self.folder = folder or "INBOX"
+        self.imap = None
+        self.uidvalidity: Optional[int] = None
+        self.uidnext: Optional[int] = None
+        self.supports_idle = False
+
+    def connect(self):
+        """Log in, select the folder and read UIDVALIDITY / UIDNEXT"""
+        imap_class = imaplib.IMAP4_SSL if self.use_ssl else imaplib.IMAP4
+        self.imap = imap_class(self.host, self.port)
+        self.imap.login(self.username, self.password)
+        status, _ = self.imap.select(self.folder)
+        if status != 'OK':
+            raise imaplib.IMAP4.error(f"Cannot select folder {self.folder}")
+
+        self.uidvalidity = self._response_int('UIDVALIDITY')
+        self.uidnext = self._response_int('UIDNEXT')
+        self.supports_idle = 'IDLE' in self.imap.capabilities
+
+    def _response_int(self, name: str) -> Optional[int]:
+        _, data = self.imap.response(name)
+        try:
+            return int(data[0])
+        except (TypeError, ValueError, IndexError):
+            return None
 
-    async def start(self):
-        """Start polling loop"""
-        self.running = True
-        logger.info("Email poller started")
+    def search_uids(self, criteria: str) -> List[int]:
+        status, data = self.imap.uid('search', None, criteria)
+        if status != 'OK':
+            raise imaplib.IMAP4.error(f"UID SEARCH {criteria} failed")
+        return sorted(int(uid) for uid in (data[0] or b"").split())
+
+    def new_uids(self, last_uid: int) -> List[int]:
+        """UIDs above `last_uid` (`N:*` always matches the highest UID, so filter)"""
+        return [uid for uid in self.search_uids(f"UID {last_uid + 1}:*") if uid > last_uid]
+
+    def fetch(self, uids: List[int]) -> List[Tuple[int, bytes]]:
+        """Raw messages for `uids` (fetching RFC822 marks them \\Seen, as before)"""
+        messages = []
+        for start in range(0, len(uids), FETCH_BATCH_SIZE):
+            uid_set = ",".join(str(uid) for uid in uids[start:start + FETCH_BATCH_SIZE])
+            status, data = self.imap.uid('fetch', uid_set, '(RFC822)')
+            if status != 'OK':
+                raise imaplib.IMAP4.error(f"UID FETCH {uid_set} failed")
+            messages.extend(_parse_uid_fetch(data))
+        return messages
 
-        while self.running:
+    def idle(self, timeout: float, stop: threading.Event) -> bool:
+        """
+        Wait in IDLE until the server reports mailbox activity, `timeout`
+        elapses or `stop` is set; returns True on activity
+        """
+        imap = self.imap
+        tag = imap._new_tag()
+        imap.send(tag + b' IDLE\r\n')
+        if not imap.readline().startswith(b'+'):
+            raise imaplib.IMAP4.error("IDLE rejected")
+
+        sock = imap.socket()
+        deadline = time.monotonic() + timeout
+        activity = False
+        while not stop.is_set() and time.monotonic() < deadline:
+            pending = getattr(sock, "pending", lambda: 0)()
+            readable, _, _ = io_select.select([sock], [], [], min(1.0, max(deadline - time.monotonic(), 0)))
+            if readable or pending:
+                line = imap.readline()
+                if not line:
+                    raise imaplib.IMAP4.abort("Connection closed during IDLE")
+                activity = True
+                break
+
+        imap.send(b'DONE\r\n')
+        while True:
+            line = imap.readline()
+            if not line:
+                raise imaplib.IMAP4.abort("Connection closed ending IDLE")
+            if line.startswith(tag):
+                break
+            # Untagged EXISTS/RECENT that arrived while leaving IDLE
+            activity = True
+        return activity
+
+    def noop(self):
+        self.imap.noop()
+
+    def close(self):
+        if self.imap:
             try:
-                async with self.db_session_factory() as db:
-                    # Get all active email accounts
-                    query = select(EmailAccount).where(EmailAccount.is_active == True)
-                    result = await db.execute(query)
-                    accounts = result.scalars().all()
+                self.imap.logout()
+            except Exception:
+                pass
+            self.imap = None
 
-                    for account in accounts:
-                        try:
-                            # Poll emails
-                            service = EmailService(account, db)
-                            new_messages = await service.poll_new_emails()
 
-                            if new_messages:
-                                logger.info(f"Found {len(new_messages)} new emails for {account.email_address}")
+class MailboxWatcher:
+    """
+    Keeps one IMAP connection open for an account and stores new mail
 
-                                # Trigger AI processing (will be handled by agentic_responder)
-                                from services.agentic_responder import agentic_responder
-                                for msg in new_messages:
-                                    asyncio.create_task(
-                                        agentic_responder.process_email(msg, db)
-                                    )
+    New messages are found by UID (not UNSEEN), so each cycle only fetches
+    what arrived since the last one. If UIDVALIDITY changes (mailbox
+    recreated) the stored UID is discarded and unseen mail is re-scanned;
+    Message-ID de-duplication prevents storing anything twice.
+    """
 
-                            service.disconnect()
+    def __init__(self, account_id: uuid.UUID, poller: "EmailPoller"):
+        self.account_id = account_id
+        self.poller = poller
+        self.stop_event = threading.Event()
+        self.mailbox: Optional[IMAPMailbox] = None
+        self.connected = False
 
-                            # Wait interval before checking next account
-                            await asyncio.sleep(5)
+    async def run(self):
+        backoff = RECONNECT_MIN_SECONDS
+        while not self.stop_event.is_set():
+            try:
+                if not await self._session():
+                    return
+                backoff = RECONNECT_MIN_SECONDS
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"IMAP session for account {self.account_id} failed: {e}; retrying in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, RECONNECT_MAX_SECONDS)
+            finally:
+                self.connected = False
+                if self.mailbox is not None:
+                    self.poller._executor.submit(self.mailbox.close)
+                    self.mailbox = None
+
+    def stop(self):
+        self.stop_event.set()
+
+    async def _session(self) -> bool:
+        """One connection lifetime; returns False if the account is gone"""
+        async with self.poller.db_session_factory() as db:
+            account = await db.get(EmailAccount, self.account_id)
+            if account is None or not account.is_active:
+                return False
+            mailbox = self.poller.mailbox_factory(
+                host=account.imap_host,
+                port=account.imap_port,
+                use_ssl=account.imap_use_ssl,
+                username=account.imap_username,
+                password=decrypt_value(account.imap_password_encrypted),
+                folder=account.imap_folder
+            )
+            stored_validity, last_uid = account.imap_uidvalidity, account.imap_last_uid
+            poll_seconds = (account.polling_interval_minutes or 2) * 60
+
+        self.mailbox = mailbox
+        await self._blocking(mailbox.connect)
+        self.connected = True
+        if stored_validity != mailbox.uidvalidity:
+            if stored_validity is not None:
+                logger.info(f"UIDVALIDITY changed for account {self.account_id}; rescanning unseen mail")
+            last_uid = None
+
+        while not self.stop_event.is_set():
+            if last_uid is None:
+                uids = await self._blocking(mailbox.search_uids, 'UNSEEN')
+                baseline = (mailbox.uidnext - 1) if mailbox.uidnext else 0
+            else:
+                uids = await self._blocking(mailbox.new_uids, last_uid)
+                baseline = last_uid
 
-                        except Exception as e:
-                            logger.error(f"Error polling account {account.email_address}: {e}")
-                            continue
+            messages = await self._blocking(mailbox.fetch, uids) if uids else []
+            next_uid = max([baseline, *uids]) if (uids or baseline) else 0
+            if messages or next_uid != last_uid:
+                await self._store(messages, mailbox.uidvalidity, next_uid)
+            last_uid = next_uid
+
+            if mailbox.supports_idle:
+                await self._blocking(mailbox.idle, self.poller.idle_timeout, self.stop_event)
+            else:
+                await self._blocking(self.stop_event.wait, poll_seconds)
+                await self._blocking(mailbox.noop)
+        return True
 
-                # Wait before next polling cycle
-                await asyncio.sleep(60)  # Poll every minute
+    async def _store(self, messages: List[Tuple[int, bytes]], uidvalidity: Optional[int], last_uid: int):
+        """Save new messages and the UID watermark in one transaction, then queue them"""
+        async with self.poller.db_session_factory() as db:
+            account = await db.get(EmailAccount, self.account_id)
+            if account is None:
+                return
+            service = EmailService(account, db)
+
+            parsed = [service._build_email_message(email.message_from_bytes(raw)) for _, raw in messages]
+            parsed = [m for m in parsed if m is not None]
+            existing = set()
+            if parsed:
+                existing = set((await db.execute(
+                    select(EmailMessage.message_id).where(
+                        EmailMessage.message_id.in_([m.message_id for m in parsed])
+                    )
+                )).scalars().all())
 
-            except Exception as e:
-                logger.error(f"Email poller error: {e}")
-                await asyncio.sleep(60)
+            new_messages = []
+            for message in parsed:
+                if message.message_id in existing:
+                    continue
+                existing.add(message.message_id)
+                db.add(message)
+                new_messages.append(message)
+
+            account.imap_uidvalidity = uidvalidity
+            account.imap_last_uid = last_uid
+            account.last_checked = datetime.utcnow()
+            account.total_emails_processed = (account.total_emails_processed or 0) + len(new_messages)
+            email_address = account.email_address
+            await db.flush()
+            message_ids = [m.id for m in new_messages]
+            await db.commit()
+
+        if message_ids:
+            logger.info(f"Found {len(message_ids)} new emails for {email_address}")
+        for message_id in message_ids:
+            await self.poller.queue.put(message_id)
+
+    async def _blocking(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.poller._executor, fn, *args)
+
+
+class EmailPoller:
+    """
+    Background mailbox supervisor for all active email accounts
+
+    - One MailboxWatcher (persistent IMAP connection, IDLE push, UID
+      tracking) per active account, all running concurrently
+    - The account list is re-read every `refresh_interval` seconds; watchers
+      are started, stopped or restarted when accounts are added,
+      deactivated or their IMAP settings change
+    - New messages go to a bounded queue drained by `workers` tasks, each
+      processing a message on its own database session
+    """
+
+    def __init__(
+        self,
+        db_session_factory,
+        workers: int = 4,
+        queue_size: int = 200,
+        refresh_interval: float = 60.0,
+        idle_timeout: float = IDLE_TIMEOUT_SECONDS,
+        max_mailboxes: int = 100,
+        mailbox_factory: Callable[..., IMAPMailbox] = IMAPMailbox,
+        process: Optional[Callable[[EmailMessage, AsyncSession], Awaitable[Any]]] = None
+    ):
+        self.db_session_factory = db_session_factory
+        self.workers = workers
+        self.queue_size = queue_size
+        self.refresh_interval = refresh_interval
+        self.idle_timeout = idle_timeout
+        self.max_mailboxes = max_mailboxes
+        self.mailbox_factory = mailbox_factory
+        self._process = process
+        self.running = False
+        self.queue: Optional[asyncio.Queue] = None
+        # account_id -> (config fingerprint, watcher, task)
+        self._watchers: Dict[uuid.UUID, Tuple[str, MailboxWatcher, asyncio.Task]] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.stats = {"processed": 0, "failed": 0}
+
+    async def start(self):
+        """Start the supervisor and worker pool"""
+        if self.running:
+            return
+        self.running = True
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        # Each connected mailbox holds one thread while it waits in IDLE
+        self._executor = ThreadPoolExecutor(max_workers=self.max_mailboxes + 2, thread_name_prefix="imap")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._supervise()))
+        logger.info("Email poller started")
 
     async def stop(self):
-        """Stop polling"""
+        """Stop all watchers and workers"""
+        if not self.running:
+            return
         self.running = False
+        for _, watcher, _ in self._watchers.values():
+            watcher.stop()
+        tasks = self._tasks + [task for _, _, task in self._watchers.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._watchers.clear()
+        self._tasks = []
+        self._executor.shutdown(wait=False)
         logger.info("Email poller stopped")
 
+    async def _supervise(self):
+        while self.running:
+            try:
+                await self.refresh_accounts()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Email poller error: {e}")
+            try:
+                await asyncio.sleep(self.refresh_interval)
+            except asyncio.CancelledError:
+                break
+
+    async def refresh_accounts(self):
+        """Reconcile running watchers with the active accounts"""
+        async with self.db_session_factory() as db:
+            rows = (await db.execute(
+                select(
+                    EmailAccount.id, EmailAccount.imap_host, EmailAccount.imap_port,
+                    EmailAccount.imap_use_ssl, EmailAccount.imap_username,
+                    EmailAccount.imap_password_encrypted, EmailAccount.imap_folder,
+                    EmailAccount.polling_interval_minutes
+                ).where(EmailAccount.is_active == True)
+            )).all()
+        wanted = {row.id: "|".join(str(value) for value in row[1:]) for row in rows}
+
+        for account_id, (fingerprint, watcher, task) in list(self._watchers.items()):
+            if wanted.get(account_id) != fingerprint or task.done():
+                watcher.stop()
+                task.cancel()
+                del self._watchers[account_id]
+
+        for account_id, fingerprint in wanted.items():
+            if account_id in self._watchers:
+                continue
+            if len(self._watchers) >= self.max_mailboxes:
+                logger.warning(f"Email poller is watching the maximum of {self.max_mailboxes} mailboxes")
+                break
+            watcher = MailboxWatcher(account_id, self)
+            self._watchers[account_id] = (fingerprint, watcher, asyncio.create_task(watcher.run()))
+
+    async def _worker(self):
+        while self.running:
+            try:
+                message_id = await self.queue.get()
+            except asyncio.CancelledError:
+                break
+            try:
+                async with self.db_session_factory() as db:
+                    message = await db.get(EmailMessage, message_id)
+                    if message is not None:
+                        await self._processor()(message, db)
+                self.stats["processed"] += 1
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.error(f"Error processing email {message_id}: {e}")
+            finally:
+                self.queue.task_done()
+
+    def _processor(self):
+        if self._process is None:
+            from services.agentic_responder import agentic_responder
+            self._process = agentic_responder.process_email
+        return self._process
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "mailboxes": len(self._watchers),
+            "connected": sum(1 for _, watcher, _ in self._watchers.values() if watcher.connected),
+            "queued": self.queue.qsize() if self.queue else 0,
+            "running": self.running,
+        }
+
 
 # Singleton instance
 email_poller = None
@@ -412,7 +771,12 @@ def get_email_poller(db_session_factory):
     """Get or create email poller singleton"""
     global email_poller
     if email_poller is None:
-        email_poller = EmailPoller(db_session_factory)
+        from core.config import settings
+        email_poller = EmailPoller(
+            db_session_factory,
+            workers=settings.EMAIL_POLLER_WORKERS,
+            max_mailboxes=settings.EMAIL_POLLER_MAX_MAILBOXES
+        )
     return email_poller
 
 
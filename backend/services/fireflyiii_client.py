@@ -21,9 +21,10 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime, date
 from enum import Enum
 from decimal import Decimal
-import httpx
 from pydantic import BaseModel
 
+from services.http_client_registry import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -130,11 +131,11 @@ class FireflyIIIClient:
         self.base_url = base_url.rstrip('/')
         self.api_token = api_token
         self.timeout = timeout
-        self.client = httpx.AsyncClient(timeout=timeout)
+        self.client = get_http_client("fireflyiii", timeout=timeout)
 
     async def close(self):
-        """Close HTTP client"""
-        await self.client.aclose()
+        """Release HTTP client (the shared pool is closed at application shutdown)"""
+        pass
 
     def _headers(self) -> Dict[str, str]:
         """Get request headers with authentication"""
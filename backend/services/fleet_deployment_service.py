@@ -6,16 +6,50 @@ Deploys Kubernetes service packages to Tier 2/3 hubs via GitOps
 import logging
 import asyncio
 import httpx
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Dict, List, Optional
+from uuid import uuid4
 from sqlalchemy import select, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import PropertyEdgeNode, ServicePackage, FleetDeployment
 from db.database import AsyncSessionLocal
+from services.websocket_manager import manager as ws_manager
 
 logger = logging.getLogger(__name__)
 
+# WebSocket room that receives progress events for every fleet rollout
+ROLLOUT_PROGRESS_ROOM = "fleet:rollouts"
+
+
+@dataclass
+class RolloutPolicy:
+    """
+    Wave configuration for bulk fleet deployments
+
+    The first `canary_count` hubs are deployed alone as a canary wave; the
+    remaining hubs are deployed in waves of `batch_size`, with at most
+    `max_parallel` deployments in flight at any time. The rollout halts when
+    a canary fails or when the cumulative failure ratio exceeds
+    `failure_threshold`.
+    """
+    batch_size: int = 10
+    max_parallel: int = 5
+    canary_count: int = 1
+    failure_threshold: float = 0.2
+    rollback_on_halt: bool = True
+
+    def __post_init__(self):
+        if self.batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if self.max_parallel < 1:
+            raise ValueError("max_parallel must be at least 1")
+        if self.canary_count < 0:
+            raise ValueError("canary_count cannot be negative")
+        if not 0.0 <= self.failure_threshold <= 1.0:
+            raise ValueError("failure_threshold must be between 0 and 1")
+
 
 class FleetDeploymentService:
     """
@@ -34,7 +68,7 @@ class FleetDeploymentService:
 
     Supports:
     - Single hub deployments
-    - Bulk deployments to multiple hubs
+    - Bulk deployments to multiple hubs (canary + batched waves)
     - Tier-based filtering (all tier_2, all tier_3)
     - Deployment status tracking
     - Rollback capabilities
@@ -174,10 +208,16 @@ class FleetDeploymentService:
         service_package_id: str,
         manifest_version: str,
         initiated_by: str,
-        hub_ids: Optional[List[str]] = None
+        hub_ids: Optional[List[str]] = None,
+        policy: Optional[RolloutPolicy] = None
     ) -> Dict:
         """
-        Deploy to multiple hubs in parallel
+        Deploy to multiple hubs in waves
+
+        A canary wave goes first, followed by batches with bounded
+        parallelism. Progress is broadcast to the "fleet:rollouts" WebSocket
+        room, and the rollout halts (rolling back already-updated hubs) when
+        the failure ratio exceeds the policy threshold.
 
         Args:
             hub_filter: 'all_tier_2' | 'all_tier_3' | 'all' | 'custom'
@@ -185,12 +225,17 @@ class FleetDeploymentService:
             manifest_version: Git commit SHA or version tag
             initiated_by: Username who triggered the deployment
             hub_ids: List of hub UUIDs (required if hub_filter='custom')
+            policy: Wave configuration (defaults to RolloutPolicy())
 
         Returns:
             Dict with bulk deployment results: {
+                "rollout_id": "uuid",
                 "total_hubs": 10,
                 "successful": 8,
                 "failed": 2,
+                "skipped": 0,
+                "rolled_back": 0,
+                "halted": false,
                 "deployments": [...]
             }
         """
@@ -224,65 +269,256 @@ class FleetDeploymentService:
 
         if not target_hubs:
             return {
+                "rollout_id": None,
                 "total_hubs": 0,
                 "successful": 0,
                 "failed": 0,
+                "skipped": 0,
+                "rolled_back": 0,
+                "halted": False,
+                "halt_reason": None,
+                "waves_completed": 0,
+                "total_waves": 0,
                 "deployments": []
             }
 
-        # Deploy to all hubs in parallel
-        deployment_tasks = [
-            self.deploy_to_hub(
-                hub_id=str(hub.id),
-                service_package_id=service_package_id,
-                manifest_version=manifest_version,
-                initiated_by=initiated_by
-            )
-            for hub in target_hubs
-        ]
+        return await self._run_rollout(
+            target_hubs=list(target_hubs),
+            service_package_id=service_package_id,
+            manifest_version=manifest_version,
+            initiated_by=initiated_by,
+            policy=policy or RolloutPolicy()
+        )
+
+    def _plan_waves(
+        self,
+        target_hubs: List[PropertyEdgeNode],
+        policy: RolloutPolicy
+    ) -> List[List[PropertyEdgeNode]]:
+        """
+        Split target hubs into deployment waves
+
+        Returns:
+            List of waves; the first wave is the canary wave when
+            policy.canary_count > 0
+        """
+        waves = []
+        canary_count = min(policy.canary_count, len(target_hubs))
+        if canary_count:
+            waves.append(target_hubs[:canary_count])
+
+        remaining = target_hubs[canary_count:]
+        for i in range(0, len(remaining), policy.batch_size):
+            waves.append(remaining[i:i + policy.batch_size])
+
+        return waves
+
+    async def _run_rollout(
+        self,
+        target_hubs: List[PropertyEdgeNode],
+        service_package_id: str,
+        manifest_version: str,
+        initiated_by: str,
+        policy: RolloutPolicy
+    ) -> Dict:
+        """
+        Deploy to target hubs wave by wave, halting on excessive failures
+
+        Hubs that were already updated when the rollout halts are rolled back
+        to the manifest version they had before the rollout (if
+        policy.rollback_on_halt is set and a previous version is known).
+        """
+        rollout_id = str(uuid4())
+        waves = self._plan_waves(target_hubs, policy)
+        semaphore = asyncio.Semaphore(policy.max_parallel)
 
-        results = await asyncio.gather(*deployment_tasks, return_exceptions=True)
+        # Snapshot versions before anything changes so rollbacks know where to go
+        previous_versions = {str(hub.id): hub.manifest_version for hub in target_hubs}
+
+        logger.info(
+            f"Rollout {rollout_id}: {len(target_hubs)} hubs in {len(waves)} waves "
+            f"(canary={min(policy.canary_count, len(target_hubs))}, "
+            f"batch_size={policy.batch_size}, max_parallel={policy.max_parallel})"
+        )
+
+        async def deploy_one(hub: PropertyEdgeNode) -> Dict:
+            async with semaphore:
+                try:
+                    result = await self.deploy_to_hub(
+                        hub_id=str(hub.id),
+                        service_package_id=service_package_id,
+                        manifest_version=manifest_version,
+                        initiated_by=initiated_by
+                    )
+                except Exception as e:
+                    return {
+                        "hub_id": str(hub.id),
+                        "hub_name": hub.hostname,
+                        "status": "failed",
+                        "error": str(e)
+                    }
+
+            return {
+                "hub_id": str(hub.id),
+                "hub_name": hub.hostname,
+                "status": result['status'],
+                "deployment_id": result['deployment_id']
+            }
 
-        # Analyze results
         successful = 0
         failed = 0
         deployments = []
+        halted = False
+        halt_reason = None
+        waves_completed = 0
 
-        for i, result in enumerate(results):
-            hub = target_hubs[i]
+        await self._publish_progress(rollout_id, "started", {
+            "total_hubs": len(target_hubs),
+            "total_waves": len(waves),
+            "manifest_version": manifest_version
+        })
+
+        for wave_index, wave in enumerate(waves):
+            is_canary = wave_index == 0 and policy.canary_count > 0
+
+            wave_results = await asyncio.gather(*[deploy_one(hub) for hub in wave])
+
+            wave_failed = sum(1 for r in wave_results if r["status"] != "success")
+            failed += wave_failed
+            successful += len(wave_results) - wave_failed
+            deployments.extend(wave_results)
+            waves_completed += 1
+
+            attempted = successful + failed
+            failure_ratio = failed / attempted if attempted else 0.0
+
+            await self._publish_progress(rollout_id, "wave_completed", {
+                "wave": wave_index + 1,
+                "total_waves": len(waves),
+                "canary": is_canary,
+                "successful": successful,
+                "failed": failed,
+                "failure_ratio": round(failure_ratio, 3)
+            })
+
+            if is_canary and wave_failed:
+                halted = True
+                halt_reason = f"Canary wave failed on {wave_failed} of {len(wave)} hubs"
+            elif failure_ratio > policy.failure_threshold:
+                halted = True
+                halt_reason = (
+                    f"Failure ratio {failure_ratio:.0%} exceeded threshold "
+                    f"{policy.failure_threshold:.0%}"
+                )
 
-            if isinstance(result, Exception):
-                failed += 1
-                deployments.append({
-                    "hub_id": str(hub.id),
-                    "hub_name": hub.hostname,
-                    "status": "failed",
-                    "error": str(result)
-                })
-            else:
-                if result['status'] == 'success':
-                    successful += 1
-                else:
-                    failed += 1
+            if halted:
+                logger.warning(f"Rollout {rollout_id} halted after wave {wave_index + 1}: {halt_reason}")
+                break
+
+        # Hubs in waves that never ran
+        skipped = 0
+        for wave in waves[waves_completed:]:
+            for hub in wave:
+                skipped += 1
                 deployments.append({
                     "hub_id": str(hub.id),
                     "hub_name": hub.hostname,
-                    "status": result['status'],
-                    "deployment_id": result['deployment_id']
+                    "status": "skipped"
                 })
 
+        rolled_back = 0
+        if halted and policy.rollback_on_halt:
+            rolled_back = await self._rollback_updated_hubs(
+                deployments, previous_versions, initiated_by, semaphore
+            )
+
+        await self._publish_progress(rollout_id, "halted" if halted else "completed", {
+            "successful": successful,
+            "failed": failed,
+            "skipped": skipped,
+            "rolled_back": rolled_back,
+            "halt_reason": halt_reason
+        })
+
         logger.info(
-            f"Bulk deployment complete: {successful} successful, "
-            f"{failed} failed out of {len(target_hubs)} total"
+            f"Bulk deployment {rollout_id} {'halted' if halted else 'complete'}: "
+            f"{successful} successful, {failed} failed, {skipped} skipped, "
+            f"{rolled_back} rolled back out of {len(target_hubs)} total"
         )
 
         return {
+            "rollout_id": rollout_id,
             "total_hubs": len(target_hubs),
             "successful": successful,
             "failed": failed,
+            "skipped": skipped,
+            "rolled_back": rolled_back,
+            "halted": halted,
+            "halt_reason": halt_reason,
+            "waves_completed": waves_completed,
+            "total_waves": len(waves),
             "deployments": deployments
         }
 
+    async def _rollback_updated_hubs(
+        self,
+        deployments: List[Dict],
+        previous_versions: Dict[str, Optional[str]],
+        initiated_by: str,
+        semaphore: asyncio.Semaphore
+    ) -> int:
+        """
+        Roll back hubs that were successfully updated by a halted rollout
+
+        Updates the matching entries in `deployments` in place.
+
+        Returns:
+            Number of hubs rolled back successfully
+        """
+        async def rollback_one(entry: Dict) -> bool:
+            previous_version = previous_versions.get(entry["hub_id"])
+            if not previous_version:
+                entry["rollback"] = "skipped: no previous version"
+                return False
+
+            async with semaphore:
+                try:
+                    result = await self.rollback_deployment(
+                        hub_id=entry["hub_id"],
+                        previous_manifest_version=previous_version,
+                        initiated_by=initiated_by
+                    )
+                except Exception as e:
+                    logger.error(f"Rollback of hub {entry['hub_id']} failed: {e}")
+                    entry["rollback"] = f"failed: {e}"
+                    return False
+
+            if result['status'] != 'success':
+                entry["rollback"] = "failed"
+                return False
+
+            entry["status"] = "rolled_back"
+            entry["rollback"] = previous_version
+            return True
+
+        to_rollback = [d for d in deployments if d["status"] == "success"]
+        results = await asyncio.gather(*[rollback_one(entry) for entry in to_rollback])
+        return sum(1 for ok in results if ok)
+
+    async def _publish_progress(self, rollout_id: str, event: str, data: Dict):
+        """Broadcast rollout progress to subscribers of the rollout room"""
+        message = {
+            "type": "fleet_rollout",
+            "rollout_id": rollout_id,
+            "event": event,
+            "timestamp": datetime.utcnow().isoformat(),
+            **data
+        }
+        try:
+            await ws_manager.broadcast_to_room(message, ROLLOUT_PROGRESS_ROOM)
+        except Exception as e:
+            logger.debug(f"Rollout progress broadcast failed: {e}")
+
     async def get_deployment_status(self, deployment_id: str) -> Dict:
         """
         Get status of a specific deployment
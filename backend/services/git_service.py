@@ -1,17 +1,37 @@
 """
 Git repository management for Somni component and config delivery.
 Adapted from ha-receiver git service for SomniProperty platform.
+
+Each repository has an in-memory catalog (entry name -> path, manifest,
+checksum) built once per commit SHA and persisted next to the clone as
+`<repo>.index.json`. Listing and path lookups are served from the catalog;
+only the background refresher (or an explicit refresh) talks to the remote.
 """
+import asyncio
+import json
 import os
 import shutil
+import threading
+import time
 from pathlib import Path
 from typing import Optional, Dict, List
 import git
 from git import Repo
 import logging
+import yaml
 
 logger = logging.getLogger(__name__)
 
+# Bump when the on-disk index format changes so stale files are rebuilt
+INDEX_FORMAT_VERSION = 1
+
+# Where entries live in each repository and which file describes them
+REPO_LAYOUTS = {
+    "components": ("custom_components", "manifest.json"),
+    "configs": ("configs", "README.md"),
+    "addons": ("addons", "config.yaml"),
+}
+
 
 class GitService:
     """Manages git repositories for Somni component and config delivery."""
@@ -41,12 +61,16 @@ class GitService:
             ),
         }
 
+        # repo_name -> {"sha", "built_at", "entries": {name: entry}}
+        self._catalogs: Dict[str, Dict] = {}
+        self._catalog_lock = threading.Lock()
+
     def _get_repo_path(self, repo_name: str) -> Path:
         """Get local path for repository."""
         return self.cache_dir / repo_name
 
-    def _ensure_repo_cloned(self, repo_name: str) -> Repo:
-        """Ensure repository is cloned and up to date."""
+    def _ensure_repo_cloned(self, repo_name: str, pull: bool = True) -> Repo:
+        """Ensure repository is cloned, optionally pulling latest changes."""
         repo_path = self._get_repo_path(repo_name)
         repo_url = self.repos.get(repo_name)
 
@@ -62,80 +86,262 @@ class GitService:
             except Exception as e:
                 logger.error(f"Failed to clone {repo_name}: {e}")
                 raise
+            return repo
+
+        repo = Repo(repo_path)
+
+        if pull:
+            try:
+                logger.info(f"Pulling latest changes for {repo_name}")
+                origin = repo.remotes.origin
+                origin.pull()
+                logger.info(f"Successfully pulled {repo_name}")
+            except Exception as e:
+                logger.warning(f"Failed to pull {repo_name}: {e}")
+
+        return repo
+
+    # ------------------------------------------------------------------
+    # Catalog index
+    # ------------------------------------------------------------------
+
+    def _get_index_path(self, repo_name: str) -> Path:
+        """Get path of the persisted catalog index (next to the clone)."""
+        return self.cache_dir / f"{repo_name}.index.json"
+
+    def _read_entry(self, repo_name: str, entry_path: Path, repo_path: Path) -> Dict:
+        """Parse a single catalog entry from the working tree."""
+        _, descriptor_name = REPO_LAYOUTS[repo_name]
+        descriptor = entry_path / descriptor_name
+        name = entry_path.name
+        entry = {
+            "name": name,
+            "path": str(entry_path.relative_to(repo_path)),
+            "manifest": None,
+            "info": None,
+        }
+
+        if repo_name == "components":
+            info = {
+                "name": name,
+                "domain": name,
+                "version": "unknown",
+                "description": name,
+            }
+            if descriptor.exists():
+                try:
+                    with open(descriptor) as f:
+                        manifest = json.load(f)
+                    entry["manifest"] = manifest
+                    info = {
+                        "name": name,
+                        "domain": manifest.get("domain", name),
+                        "version": manifest.get("version", "unknown"),
+                        "description": manifest.get("name", name),
+                        "requirements": manifest.get("requirements", []),
+                        "documentation": manifest.get("documentation", ""),
+                    }
+                except Exception as e:
+                    logger.error(f"Failed to read manifest for {name}: {e}")
+            entry["info"] = info
+
+        elif repo_name == "configs":
+            description = ""
+            if descriptor.exists():
+                try:
+                    with open(descriptor) as f:
+                        description = f.read().split('\n')[0]  # First line
+                except Exception:
+                    pass
+            entry["info"] = {
+                "name": name,
+                "path": entry["path"],
+                "description": description,
+            }
+
+        elif repo_name == "addons":
+            info = {"name": name, "path": entry["path"]}
+            if descriptor.exists():
+                try:
+                    with open(descriptor) as f:
+                        config = yaml.safe_load(f) or {}
+                    entry["manifest"] = config
+                    info.update({
+                        "display_name": config.get("name", name),
+                        "version": config.get("version", "unknown"),
+                        "description": config.get("description", ""),
+                        "arch": config.get("arch", []),
+                    })
+                except Exception as e:
+                    logger.error(f"Failed to read config for {name}: {e}")
+            entry["info"] = info
+
+        return entry
+
+    def _build_catalog(self, repo_name: str, repo: Repo) -> Dict:
+        """Walk the working tree once and build the catalog for HEAD."""
+        repo_path = self._get_repo_path(repo_name)
+        subdir, _ = REPO_LAYOUTS[repo_name]
+        entries_dir = repo_path / subdir
+        sha = repo.head.commit.hexsha
+
+        try:
+            subtree = repo.head.commit.tree / subdir
+        except KeyError:
+            subtree = None
+
+        entries = {}
+        if entries_dir.exists():
+            for entry_path in sorted(entries_dir.iterdir()):
+                if not entry_path.is_dir() or entry_path.name.startswith('.'):
+                    continue
+                entry = self._read_entry(repo_name, entry_path, repo_path)
+                # Git tree SHA changes exactly when any file in the entry changes
+                try:
+                    entry["checksum"] = (subtree / entry_path.name).hexsha if subtree else None
+                except KeyError:
+                    entry["checksum"] = None
+                entries[entry["name"]] = entry
         else:
-            repo = Repo(repo_path)
+            logger.warning(f"{repo_name} directory not found: {entries_dir}")
+
+        logger.info(f"Indexed {len(entries)} {repo_name} at {sha[:8]}")
+        return {
+            "format": INDEX_FORMAT_VERSION,
+            "repo": repo_name,
+            "sha": sha,
+            "built_at": time.time(),
+            "entries": entries,
+        }
 
-        # Pull latest changes
+    def _load_persisted_catalog(self, repo_name: str, sha: str) -> Optional[Dict]:
+        """Load the on-disk catalog if it was built for the given SHA."""
+        index_path = self._get_index_path(repo_name)
+        if not index_path.exists():
+            return None
         try:
-            logger.info(f"Pulling latest changes for {repo_name}")
-            origin = repo.remotes.origin
-            origin.pull()
-            logger.info(f"Successfully pulled {repo_name}")
+            with open(index_path) as f:
+                catalog = json.load(f)
         except Exception as e:
-            logger.warning(f"Failed to pull {repo_name}: {e}")
+            logger.warning(f"Ignoring unreadable index for {repo_name}: {e}")
+            return None
+        if catalog.get("format") != INDEX_FORMAT_VERSION or catalog.get("sha") != sha:
+            return None
+        return catalog
 
-        return repo
+    def _persist_catalog(self, repo_name: str, catalog: Dict):
+        """Write the catalog atomically next to the clone."""
+        index_path = self._get_index_path(repo_name)
+        tmp_path = index_path.with_suffix(".json.tmp")
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(catalog, f)
+            os.replace(tmp_path, index_path)
+        except Exception as e:
+            logger.warning(f"Failed to persist index for {repo_name}: {e}")
+
+    def _index_repo(self, repo_name: str, repo: Repo) -> Dict:
+        """Make the catalog for the repo's current HEAD available in memory."""
+        sha = repo.head.commit.hexsha
+        current = self._catalogs.get(repo_name)
+        if current and current["sha"] == sha:
+            return current
+
+        catalog = self._load_persisted_catalog(repo_name, sha)
+        if catalog is None:
+            catalog = self._build_catalog(repo_name, repo)
+            self._persist_catalog(repo_name, catalog)
+
+        with self._catalog_lock:
+            self._catalogs[repo_name] = catalog
+        return catalog
+
+    def get_catalog(self, repo_name: str) -> Dict:
+        """
+        Get the catalog for a repository, building it on first use.
+
+        Clones the repository if it is missing but never pulls; freshness is
+        the job of refresh_repo / the background refresher.
+        """
+        catalog = self._catalogs.get(repo_name)
+        if catalog is not None:
+            return catalog
+        repo = self._ensure_repo_cloned(repo_name, pull=False)
+        return self._index_repo(repo_name, repo)
+
+    def get_cached_catalog(self, repo_name: str) -> Optional[Dict]:
+        """Get the in-memory catalog without touching disk or network."""
+        return self._catalogs.get(repo_name)
+
+    def _remote_ref(self, repo: Repo):
+        """Remote ref to follow: the branch's upstream, or origin/HEAD when detached."""
+        if not repo.head.is_detached:
+            tracking = repo.active_branch.tracking_branch()
+            if tracking is not None:
+                return tracking
+        try:
+            return repo.remotes.origin.refs["HEAD"]
+        except IndexError:
+            return None
+
+    def refresh_repo(self, repo_name: str) -> Dict:
+        """
+        Fetch a repository and re-index only if the remote SHA changed.
+
+        The clone is read-only, so it is moved to the remote commit with a
+        hard reset (works on a detached HEAD, unlike pull). Not safe to run
+        concurrently for the same repository; GitCatalogRefresher serializes it.
+
+        Returns:
+            Dict with the previous and current SHA and whether it changed
+        """
+        repo_path = self._get_repo_path(repo_name)
+        if not repo_path.exists():
+            repo = self._ensure_repo_cloned(repo_name)
+            catalog = self._index_repo(repo_name, repo)
+            return {"previous_sha": None, "sha": catalog["sha"], "changed": True}
+
+        repo = Repo(repo_path)
+        previous_sha = repo.head.commit.hexsha
+
+        repo.remotes.origin.fetch()
+        remote_ref = self._remote_ref(repo)
+        remote_sha = remote_ref.commit.hexsha if remote_ref is not None else previous_sha
+
+        # ETag-style comparison: nothing to update or re-index when SHAs match
+        if remote_sha != previous_sha:
+            logger.info(f"{repo_name}: {previous_sha[:8]} -> {remote_sha[:8]}, updating")
+            repo.head.reset(remote_sha, index=True, working_tree=True)
+
+        catalog = self._index_repo(repo_name, repo)
+        return {
+            "previous_sha": previous_sha,
+            "sha": catalog["sha"],
+            "changed": catalog["sha"] != previous_sha,
+        }
 
     def list_components(self) -> List[Dict]:
         """List all available Somni components."""
         try:
-            repo = self._ensure_repo_cloned("components")
-            repo_path = self._get_repo_path("components")
-            components_dir = repo_path / "custom_components"
-
-            if not components_dir.exists():
-                logger.warning(f"Components directory not found: {components_dir}")
-                return []
-
-            components = []
-            for component_path in components_dir.iterdir():
-                if component_path.is_dir() and not component_path.name.startswith('.'):
-                    # Try to read manifest
-                    manifest_path = component_path / "manifest.json"
-                    if manifest_path.exists():
-                        import json
-                        try:
-                            with open(manifest_path) as f:
-                                manifest = json.load(f)
-                                components.append({
-                                    "name": component_path.name,
-                                    "domain": manifest.get("domain", component_path.name),
-                                    "version": manifest.get("version", "unknown"),
-                                    "description": manifest.get("name", component_path.name),
-                                    "requirements": manifest.get("requirements", []),
-                                    "documentation": manifest.get("documentation", ""),
-                                })
-                        except Exception as e:
-                            logger.error(f"Failed to read manifest for {component_path.name}: {e}")
-                            # Still add it without manifest data
-                            components.append({
-                                "name": component_path.name,
-                                "domain": component_path.name,
-                                "version": "unknown",
-                                "description": component_path.name,
-                            })
-                    else:
-                        # Add component without manifest
-                        components.append({
-                            "name": component_path.name,
-                            "domain": component_path.name,
-                            "version": "unknown",
-                            "description": component_path.name,
-                        })
-
-            return components
+            catalog = self.get_catalog("components")
+            return [entry["info"] for entry in catalog["entries"].values()]
         except Exception as e:
             logger.error(f"Failed to list components: {e}")
             raise
 
+    def _get_entry_path(self, repo_name: str, entry_name: str) -> Optional[Path]:
+        """Resolve an entry's working tree path via the catalog."""
+        entry = self.get_catalog(repo_name)["entries"].get(entry_name)
+        if not entry:
+            return None
+        entry_path = self._get_repo_path(repo_name) / entry["path"]
+        return entry_path if entry_path.is_dir() else None
+
     def get_component_path(self, component_name: str) -> Optional[Path]:
         """Get path to component directory."""
         try:
-            repo = self._ensure_repo_cloned("components")
-            repo_path = self._get_repo_path("components")
-            component_path = repo_path / "custom_components" / component_name
-
-            if component_path.exists() and component_path.is_dir():
+            component_path = self._get_entry_path("components", component_name)
+            if component_path:
                 return component_path
 
             logger.warning(f"Component not found: {component_name}")
@@ -146,54 +352,22 @@ class GitService:
 
     def get_component_manifest(self, component_name: str) -> Optional[Dict]:
         """Get component manifest."""
-        component_path = self.get_component_path(component_name)
-        if not component_path:
-            return None
-
-        manifest_path = component_path / "manifest.json"
-        if not manifest_path.exists():
-            logger.warning(f"Manifest not found for component: {component_name}")
-            return None
-
-        import json
         try:
-            with open(manifest_path) as f:
-                return json.load(f)
+            entry = self.get_catalog("components")["entries"].get(component_name)
         except Exception as e:
             logger.error(f"Failed to read manifest for {component_name}: {e}")
             return None
 
+        if not entry or entry["manifest"] is None:
+            logger.warning(f"Manifest not found for component: {component_name}")
+            return None
+        return entry["manifest"]
+
     def list_configs(self) -> List[Dict]:
         """List all available property configurations."""
         try:
-            repo = self._ensure_repo_cloned("configs")
-            repo_path = self._get_repo_path("configs")
-            configs_dir = repo_path / "configs"
-
-            if not configs_dir.exists():
-                logger.warning(f"Configs directory not found: {configs_dir}")
-                return []
-
-            configs = []
-            for config_path in configs_dir.iterdir():
-                if config_path.is_dir() and not config_path.name.startswith('.'):
-                    # Try to read config metadata
-                    readme_path = config_path / "README.md"
-                    description = ""
-                    if readme_path.exists():
-                        try:
-                            with open(readme_path) as f:
-                                description = f.read().split('\n')[0]  # First line
-                        except Exception:
-                            pass
-
-                    configs.append({
-                        "name": config_path.name,
-                        "path": str(config_path.relative_to(repo_path)),
-                        "description": description,
-                    })
-
-            return configs
+            catalog = self.get_catalog("configs")
+            return [entry["info"] for entry in catalog["entries"].values()]
         except Exception as e:
             logger.error(f"Failed to list configs: {e}")
             raise
@@ -201,11 +375,8 @@ class GitService:
     def get_config_path(self, config_name: str) -> Optional[Path]:
         """Get path to configuration directory."""
         try:
-            repo = self._ensure_repo_cloned("configs")
-            repo_path = self._get_repo_path("configs")
-            config_path = repo_path / "configs" / config_name
-
-            if config_path.exists() and config_path.is_dir():
+            config_path = self._get_entry_path("configs", config_name)
+            if config_path:
                 return config_path
 
             logger.warning(f"Config not found: {config_name}")
@@ -217,41 +388,8 @@ class GitService:
     def list_addons(self) -> List[Dict]:
         """List all available Home Assistant add-ons."""
         try:
-            repo = self._ensure_repo_cloned("addons")
-            repo_path = self._get_repo_path("addons")
-            addons_dir = repo_path / "addons"
-
-            if not addons_dir.exists():
-                logger.warning(f"Addons directory not found: {addons_dir}")
-                return []
-
-            addons = []
-            for addon_path in addons_dir.iterdir():
-                if addon_path.is_dir() and not addon_path.name.startswith('.'):
-                    # Try to read addon config
-                    config_path = addon_path / "config.yaml"
-                    addon_info = {
-                        "name": addon_path.name,
-                        "path": str(addon_path.relative_to(repo_path)),
-                    }
-
-                    if config_path.exists():
-                        import yaml
-                        try:
-                            with open(config_path) as f:
-                                config = yaml.safe_load(f)
-                                addon_info.update({
-                                    "display_name": config.get("name", addon_path.name),
-                                    "version": config.get("version", "unknown"),
-                                    "description": config.get("description", ""),
-                                    "arch": config.get("arch", []),
-                                })
-                        except Exception as e:
-                            logger.error(f"Failed to read config for {addon_path.name}: {e}")
-
-                    addons.append(addon_info)
-
-            return addons
+            catalog = self.get_catalog("addons")
+            return [entry["info"] for entry in catalog["entries"].values()]
         except Exception as e:
             logger.error(f"Failed to list addons: {e}")
             raise
@@ -259,11 +397,8 @@ class GitService:
     def get_addon_path(self, addon_name: str) -> Optional[Path]:
         """Get path to add-on directory."""
         try:
-            repo = self._ensure_repo_cloned("addons")
-            repo_path = self._get_repo_path("addons")
-            addon_path = repo_path / "addons" / addon_name
-
-            if addon_path.exists() and addon_path.is_dir():
+            addon_path = self._get_entry_path("addons", addon_name)
+            if addon_path:
                 return addon_path
 
             logger.warning(f"Addon not found: {addon_name}")
@@ -272,14 +407,14 @@ class GitService:
             logger.error(f"Failed to get addon path for {addon_name}: {e}")
             return None
 
-    def refresh_all(self) -> Dict[str, str]:
-        """Refresh all repositories by pulling latest changes."""
+    def refresh_all(self, repo_names: Optional[List[str]] = None) -> Dict[str, str]:
+        """Refresh repositories, re-indexing only those whose SHA changed."""
         results = {}
-        for repo_name in self.repos.keys():
+        for repo_name in repo_names or list(self.repos.keys()):
             try:
                 logger.info(f"Refreshing repository: {repo_name}")
-                self._ensure_repo_cloned(repo_name)
-                results[repo_name] = "success"
+                refresh = self.refresh_repo(repo_name)
+                results[repo_name] = "updated" if refresh["changed"] else "unchanged"
             except Exception as e:
                 logger.error(f"Failed to refresh {repo_name}: {e}")
                 results[repo_name] = f"error: {str(e)}"
@@ -289,18 +424,111 @@ class GitService:
     def get_repo_info(self, repo_name: str) -> Optional[Dict]:
         """Get information about a repository."""
         try:
-            repo = self._ensure_repo_cloned(repo_name)
+            repo = self._ensure_repo_cloned(repo_name, pull=False)
             repo_path = self._get_repo_path(repo_name)
+            catalog = self.get_cached_catalog(repo_name)
 
             return {
                 "name": repo_name,
                 "path": str(repo_path),
                 "url": self.repos.get(repo_name),
-                "branch": repo.active_branch.name,
+                "branch": None if repo.head.is_detached else repo.active_branch.name,
                 "last_commit": repo.head.commit.hexsha[:8],
                 "last_commit_message": repo.head.commit.message.strip(),
                 "last_commit_date": repo.head.commit.committed_datetime.isoformat(),
+                "indexed_sha": catalog["sha"][:8] if catalog else None,
+                "indexed_entries": len(catalog["entries"]) if catalog else 0,
             }
         except Exception as e:
             logger.error(f"Failed to get repo info for {repo_name}: {e}")
             return None
+
+
+class GitCatalogRefresher:
+    """
+    Background task that keeps GitService catalogs fresh.
+
+    Git operations run in a worker thread so the event loop never blocks on
+    network or filesystem I/O. A per-repository lock keeps the loop and
+    manual refreshes from updating the same clone at once.
+    """
+
+    def __init__(self, git_service: GitService, interval_seconds: int = 300):
+        self.git_service = git_service
+        self.interval_seconds = interval_seconds
+        self.running = False
+        self.last_results: Dict[str, str] = {}
+        self.last_refresh_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._repo_locks: Dict[str, asyncio.Lock] = {}
+
+    async def start(self):
+        """Start the background refresh loop"""
+        if self.running:
+            return
+        self.running = True
+        self._task = asyncio.create_task(self._refresh_loop())
+        logger.info(f"Git catalog refresher started (interval: {self.interval_seconds}s)")
+
+    async def stop(self):
+        """Stop the background refresh loop"""
+        if not self.running:
+            return
+        self.running = False
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        logger.info("Git catalog refresher stopped")
+
+    async def refresh_now(self, repo_names: Optional[List[str]] = None) -> Dict[str, str]:
+        """Refresh repositories off the event loop, one refresh per repository at a time"""
+        results = {}
+        for repo_name in repo_names or list(self.git_service.repos.keys()):
+            async with self._repo_locks.setdefault(repo_name, asyncio.Lock()):
+                results.update(await asyncio.to_thread(self.git_service.refresh_all, [repo_name]))
+        self.last_results = results
+        self.last_refresh_at = time.time()
+        return results
+
+    async def _refresh_loop(self):
+        while self.running:
+            try:
+                await self.refresh_now()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Git catalog refresh failed: {e}", exc_info=True)
+
+            try:
+                await asyncio.sleep(self.interval_seconds)
+            except asyncio.CancelledError:
+                break
+
+
+def git_catalog_configured() -> bool:
+    """Whether component repositories are configured for background indexing"""
+    return bool(os.getenv("GITHUB_TOKEN") or os.getenv("SOMNI_COMPONENTS_REPO"))
+
+
+_git_service: Optional[GitService] = None
+_catalog_refresher: Optional[GitCatalogRefresher] = None
+
+
+def get_git_service() -> GitService:
+    """Get the shared GitService instance (catalogs live for the app lifetime)"""
+    global _git_service
+    if _git_service is None:
+        _git_service = GitService(cache_dir=os.getenv("SOMNI_GIT_CACHE_DIR", "/app/cache/git"))
+    return _git_service
+
+
+def get_catalog_refresher() -> GitCatalogRefresher:
+    """Get the shared background catalog refresher"""
+    global _catalog_refresher
+    if _catalog_refresher is None:
+        _catalog_refresher = GitCatalogRefresher(
+            get_git_service(),
+            interval_seconds=int(os.getenv("SOMNI_GIT_REFRESH_INTERVAL", "300"))
+        )
+    return _catalog_refresher
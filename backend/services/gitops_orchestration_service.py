@@ -14,7 +14,7 @@ import git
 from git import Repo
 import yaml
 
-from services.git_service import GitService
+from services.git_service import GitService, get_git_service
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +24,7 @@ class GitOpsOrchestrationService:
 
     def __init__(self, git_service: Optional[GitService] = None):
         """Initialize GitOpsOrchestrationService."""
-        self.git_service = git_service or GitService()
+        self.git_service = git_service or get_git_service()
         self.github_token = os.getenv("GITHUB_TOKEN", "")
         self.git_user_name = os.getenv("GIT_USER_NAME", "SomniProperty Bot")
         self.git_user_email = os.getenv("GIT_USER_EMAIL", "bot@somniproperty.com")
@@ -18,9 +18,10 @@ import logging
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
-import httpx
 from pydantic import BaseModel
 
+from services.http_client_registry import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -134,11 +135,11 @@ class GrafanaClient:
         self.username = username
         self.password = password
         self.timeout = timeout
-        self.client = httpx.AsyncClient(timeout=timeout)
+        self.client = get_http_client("grafana", timeout=timeout)
 
     async def close(self):
-        """Close HTTP client"""
-        await self.client.aclose()
+        """Release HTTP client (the shared pool is closed at application shutdown)"""
+        pass
 
     def _headers(self) -> Dict[str, str]:
         """Get request headers with authentication"""
@@ -0,0 +1,236 @@
+"""
+Shared HTTP Client Registry
+
+One long-lived, pooled httpx.AsyncClient per external service for the whole
+application lifetime, instead of every integration client building its own.
+
+Each service gets:
+- Its own connection limits and keep-alive tuning (HttpClientPolicy)
+- HTTP/2 when the `h2` package is installed and the policy allows it
+- A shared retry policy: connection failures are retried for every method,
+  transient 502/503/504 responses and read timeouts only for idempotent ones
+- Latency/error metrics per service, exposed via /health/metrics
+
+All clients are closed by `close_http_clients()` at application shutdown.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRYABLE_STATUS_CODES = frozenset({502, 503, 504})
+
+
+@dataclass(frozen=True)
+class HttpClientPolicy:
+    """Connection, timeout and retry settings for one external service"""
+    timeout: float = 30.0
+    connect_timeout: float = 5.0
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    retries: int = 2
+    retry_backoff: float = 0.25
+
+
+DEFAULT_POLICY = HttpClientPolicy()
+
+# Per-service tuning. Chatty in-cluster services get more pooled connections,
+# LLM backends get long read timeouts and no response retries (generation is
+# expensive and not safely repeatable).
+SERVICE_POLICIES: Dict[str, HttpClientPolicy] = {
+    "vikunja": HttpClientPolicy(max_connections=20),
+    "novu": HttpClientPolicy(max_connections=20),
+    "calcom": HttpClientPolicy(max_connections=10),
+    "homebox": HttpClientPolicy(max_connections=10),
+    "paperless": HttpClientPolicy(timeout=60.0, max_connections=10),
+    "invoiceninja": HttpClientPolicy(max_connections=20),
+    "documenso": HttpClientPolicy(max_connections=10),
+    "immich": HttpClientPolicy(timeout=60.0, max_connections=10),
+    "n8n": HttpClientPolicy(timeout=60.0, max_connections=10),
+    "nextcloud": HttpClientPolicy(timeout=60.0, max_connections=10),
+    "fireflyiii": HttpClientPolicy(max_connections=10),
+    "grafana": HttpClientPolicy(max_connections=10),
+    "localai": HttpClientPolicy(timeout=120.0, max_connections=10, retries=0),
+    "llm:localai": HttpClientPolicy(timeout=180.0, max_connections=10, retries=0),
+    "llm:ollama": HttpClientPolicy(timeout=180.0, max_connections=10, retries=0),
+    "llm:openai": HttpClientPolicy(timeout=180.0, max_connections=20, http2=True, retries=0),
+    "llm:anthropic": HttpClientPolicy(timeout=180.0, max_connections=20, http2=True, retries=0),
+}
+
+
+class ServiceHttpMetrics:
+    """Rolling request metrics for one service"""
+
+    def __init__(self, window: int = 500):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.status_classes: Dict[str, int] = {}
+        self.total_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self._recent = deque(maxlen=window)
+
+    def record(self, latency_ms: float, status_code: Optional[int] = None, error: bool = False):
+        self.requests += 1
+        self.total_latency_ms += latency_ms
+        self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+        self._recent.append(latency_ms)
+        if error or (status_code is not None and status_code >= 500):
+            self.errors += 1
+        if status_code is not None:
+            key = f"{status_code // 100}xx"
+            self.status_classes[key] = self.status_classes.get(key, 0) + 1
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self._recent:
+            return None
+        ordered = sorted(self._recent)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "error_rate": round(self.errors / self.requests, 4) if self.requests else 0.0,
+            "status_classes": dict(self.status_classes),
+            "avg_latency_ms": round(self.total_latency_ms / self.requests, 2) if self.requests else None,
+            "p50_latency_ms": self.percentile(50),
+            "p95_latency_ms": self.percentile(95),
+            "max_latency_ms": round(self.max_latency_ms, 2),
+        }
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper that applies the retry policy and records metrics"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, policy: HttpClientPolicy, metrics: ServiceHttpMetrics):
+        self._transport = transport
+        self._policy = policy
+        self._metrics = metrics
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        idempotent = request.method in IDEMPOTENT_METHODS
+        attempt = 0
+
+        while True:
+            start = time.perf_counter()
+            try:
+                response = await self._transport.handle_async_request(request)
+            except httpx.TransportError as e:
+                self._metrics.record((time.perf_counter() - start) * 1000, error=True)
+                # A failed connect never reached the server, so it is safe to
+                # retry for any method; other transport errors only when idempotent
+                retryable = isinstance(e, httpx.ConnectError) or (
+                    idempotent and isinstance(e, (httpx.ReadTimeout, httpx.RemoteProtocolError))
+                )
+                if not retryable or attempt >= self._policy.retries:
+                    raise
+            else:
+                self._metrics.record((time.perf_counter() - start) * 1000, status_code=response.status_code)
+                if (
+                    response.status_code not in RETRYABLE_STATUS_CODES
+                    or not idempotent
+                    or attempt >= self._policy.retries
+                ):
+                    return response
+                await response.aclose()
+
+            attempt += 1
+            self._metrics.retries += 1
+            await asyncio.sleep(self._policy.retry_backoff * (2 ** (attempt - 1)))
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class HttpClientRegistry:
+    """App-lifetime registry of pooled HTTP clients keyed by service name"""
+
+    def __init__(self, policies: Optional[Dict[str, HttpClientPolicy]] = None):
+        self.policies = dict(SERVICE_POLICIES if policies is None else policies)
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._metrics: Dict[str, ServiceHttpMetrics] = {}
+
+    def policy_for(self, service: str) -> HttpClientPolicy:
+        return self.policies.get(service, DEFAULT_POLICY)
+
+    def get_client(self, service: str, timeout: Optional[float] = None) -> httpx.AsyncClient:
+        """
+        Get the shared client for a service, creating it on first use
+
+        Args:
+            service: Service name (e.g. "vikunja", "llm:openai")
+            timeout: Overrides the policy read timeout when the client is created
+        """
+        client = self._clients.get(service)
+        if client is not None and not client.is_closed:
+            return client
+
+        policy = self.policy_for(service)
+        if timeout is not None:
+            policy = replace(policy, timeout=float(timeout))
+
+        metrics = self._metrics.setdefault(service, ServiceHttpMetrics())
+        transport = httpx.AsyncHTTPTransport(
+            http2=policy.http2 and HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=policy.max_connections,
+                max_keepalive_connections=policy.max_keepalive_connections,
+                keepalive_expiry=policy.keepalive_expiry
+            )
+        )
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(policy.timeout, connect=policy.connect_timeout),
+            transport=InstrumentedTransport(transport, policy, metrics)
+        )
+        self._clients[service] = client
+        logger.debug(
+            f"Created pooled HTTP client for {service} "
+            f"(max_connections={policy.max_connections}, http2={policy.http2 and HTTP2_AVAILABLE})"
+        )
+        return client
+
+    def get_metrics(self) -> Dict[str, Dict]:
+        """Per-service request metrics"""
+        return {service: metrics.snapshot() for service, metrics in self._metrics.items()}
+
+    async def close_all(self):
+        """Close every pooled client"""
+        clients, self._clients = self._clients, {}
+        for service, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.debug(f"HTTP client close for {service}: {e}")
+
+
+# Global registry instance
+http_client_registry = HttpClientRegistry()
+
+
+def get_http_client(service: str, timeout: Optional[float] = None) -> httpx.AsyncClient:
+    """Get the shared pooled HTTP client for a service"""
+    return http_client_registry.get_client(service, timeout=timeout)
+
+
+async def close_http_clients():
+    """Close all pooled HTTP clients (application shutdown)"""
+    await http_client_registry.close_all()
@@ -19,10 +19,11 @@ import logging
 from typing import Optional, List, Dict, Any, BinaryIO
 from datetime import datetime
 from enum import Enum
-import httpx
 from pydantic import BaseModel
 import io
 
+from services.http_client_registry import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -100,11 +101,11 @@ class ImmichClient:
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
         self.timeout = timeout
-        self.client = httpx.AsyncClient(timeout=timeout)
+        self.client = get_http_client("immich", timeout=timeout)
 
     async def close(self):
-        """Close HTTP client"""
-        await self.client.aclose()
+        """Release HTTP client (the shared pool is closed at application shutdown)"""
+        pass
 
     def _headers(self) -> Dict[str, str]:
         """Get request headers with authentication"""
@@ -20,6 +20,7 @@ Coordinates complex multi-service workflows across 14 integrated services:
 Provides unified high-level workflows for property management operations.
 """
 
+import asyncio
 import logging
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, date
@@ -44,6 +45,8 @@ from services.mqtt_client import get_mqtt_client
 from services.grafana_client import get_grafana_client
 from services.contractor_manager import get_contractor_manager
 from services.quote_lookup_service import get_quote_lookup_service
+from services.workflow_engine import WorkflowEngine, WorkflowStep
+from services.outbox_service import make_idempotency_key
 
 logger = logging.getLogger(__name__)
 
@@ -326,6 +329,10 @@ class IntegrationOrchestrator:
         """
         Execute complete work order workflow across ALL services
 
+        Steps are executed by WorkflowEngine: independent integrations run
+        concurrently with per-integration timeouts/retries, and per-step
+        latency is reported in results["step_timings"].
+
         Workflow Steps:
         1. Create Vikunja task with subtasks
         2. Create Homebox BOM if parts needed
@@ -341,7 +348,7 @@ class IntegrationOrchestrator:
         12. Create digital signature request if needed
 
         Returns:
-            Dict with all integration IDs and status
+            Dict with all integration IDs, status and step timings
         """
         results = {
             "work_order_id": work_order_id,
@@ -352,19 +359,80 @@ class IntegrationOrchestrator:
 
         logger.info(f"Starting complete workflow for work order {work_order_id}")
 
-        # Step 1: Create Vikunja Task
-        try:
-            task_priority_map = {
-                'low': TaskPriority.LOW,
-                'normal': TaskPriority.MEDIUM,
-                'high': TaskPriority.HIGH,
-                'urgent': TaskPriority.URGENT
-            }
-            priority = task_priority_map.get(urgency, TaskPriority.MEDIUM)
+        engine = WorkflowEngine(self._build_work_order_steps(
+            work_order_id=work_order_id,
+            property_name=property_name,
+            unit_number=unit_number,
+            work_order_title=work_order_title,
+            work_order_description=work_order_description,
+            tenant_name=tenant_name,
+            tenant_email=tenant_email,
+            contractor_name=contractor_name,
+            contractor_email=contractor_email,
+            estimated_cost=estimated_cost,
+            urgency=urgency,
+            requires_parts=requires_parts,
+            bom_items=bom_items,
+            requires_signature=requires_signature
+        ))
+        await engine.run(results)
+
+        # Final status
+        results["status"] = "completed" if not results["errors"] else "completed_with_errors"
+        results["completed_at"] = datetime.now().isoformat()
+
+        logger.info(
+            f"Completed workflow for {work_order_id}: "
+            f"{len(results['integrations'])} integrations, "
+            f"{len(results['errors'])} errors"
+        )
+
+        return results
+
+    def _build_work_order_steps(
+        self,
+        work_order_id: str,
+        property_name: str,
+        unit_number: str,
+        work_order_title: str,
+        work_order_description: str,
+        tenant_name: str,
+        tenant_email: str,
+        contractor_name: Optional[str] = None,
+        contractor_email: Optional[str] = None,
+        estimated_cost: Optional[Decimal] = None,
+        urgency: str = "normal",
+        requires_parts: bool = False,
+        bom_items: Optional[List[Dict]] = None,
+        requires_signature: bool = False
+    ) -> List[WorkflowStep]:
+        """
+        Declare the work order integrations as workflow steps
+
+        Shared by the in-request workflow and the outbox dispatcher, which
+        runs the same steps one at a time.
+        """
+        task_priority_map = {
+            'low': TaskPriority.LOW,
+            'normal': TaskPriority.MEDIUM,
+            'high': TaskPriority.HIGH,
+            'urgent': TaskPriority.URGENT
+        }
+        priority = task_priority_map.get(urgency, TaskPriority.MEDIUM)
 
+        def idempotency_key(step_name: str) -> str:
+            # Same key as the step's outbox row, so in-request and outbox runs dedupe too
+            return make_idempotency_key("work_order", str(work_order_id), step_name)
+
+        async def create_vikunja_task(_: Dict) -> Optional[Dict]:
             # TODO: Get project_id from property configuration
             project_id = 1
 
+            existing = await self.vikunja.find_work_order_task(project_id, work_order_id)
+            if existing:
+                logger.info(f"Vikunja task {existing.id} already exists for work order {work_order_id}")
+                return {"status": "success", "task_id": existing.id}
+
             vikunja_task = await self.vikunja.create_work_order_task(
                 project_id=project_id,
                 work_order_id=work_order_id,
@@ -372,85 +440,55 @@ class IntegrationOrchestrator:
                 work_order_description=work_order_description,
                 priority=priority
             )
+            if not vikunja_task:
+                return None
+            logger.info(f"Created Vikunja task {vikunja_task.id}")
+            return {"status": "success", "task_id": vikunja_task.id}
 
-            if vikunja_task:
-                results["integrations"]["vikunja"] = {
-                    "status": "success",
-                    "task_id": vikunja_task.id
-                }
-                logger.info(f"Created Vikunja task {vikunja_task.id}")
-        except Exception as e:
-            logger.error(f"Failed to create Vikunja task: {e}")
-            results["errors"].append(f"Vikunja: {str(e)}")
-
-        # Step 2: Create Homebox BOM
-        if requires_parts and bom_items:
-            try:
-                bom = await self.homebox.create_bom_for_work_order(
-                    work_order_id=work_order_id,
-                    work_order_description=work_order_description,
-                    items=bom_items
-                )
-
-                if bom:
-                    results["integrations"]["homebox"] = {
-                        "status": "success",
-                        "bom_id": bom.work_order_id,
-                        "total_cost": float(bom.total_estimated_cost)
-                    }
-                    logger.info(f"Created BOM for work order: ${bom.total_estimated_cost}")
-            except Exception as e:
-                logger.error(f"Failed to create Homebox BOM: {e}")
-                results["errors"].append(f"Homebox: {str(e)}")
-
-        # Step 3: Schedule Cal.com Appointment
-        if contractor_email and contractor_name:
-            try:
-                property_address = f"{property_name}, Unit {unit_number}"
-
-                booking = await self.calcom.schedule_work_order(
-                    work_order_id=work_order_id,
-                    work_order_title=work_order_title,
-                    work_order_description=work_order_description,
-                    contractor_email=contractor_email,
-                    contractor_name=contractor_name,
-                    property_address=property_address
-                )
-
-                if booking:
-                    results["integrations"]["calcom"] = {
-                        "status": "success",
-                        "booking_id": booking.id,
-                        "appointment_time": booking.start_time.isoformat()
-                    }
-                    logger.info(f"Scheduled appointment {booking.id} at {booking.start_time}")
-            except Exception as e:
-                logger.error(f"Failed to schedule Cal.com appointment: {e}")
-                results["errors"].append(f"Cal.com: {str(e)}")
+        async def create_homebox_bom(_: Dict) -> Optional[Dict]:
+            bom = await self.homebox.create_bom_for_work_order(
+                work_order_id=work_order_id,
+                work_order_description=work_order_description,
+                items=bom_items
+            )
+            if not bom:
+                return None
+            logger.info(f"Created BOM for work order: ${bom.total_estimated_cost}")
+            return {
+                "status": "success",
+                "bom_id": bom.work_order_id,
+                "total_cost": float(bom.total_estimated_cost)
+            }
 
-        # Step 4: Create Immich Photo Album
-        try:
-            album_name = f"WO-{work_order_id}: {work_order_title}"
-            album_description = f"Photos for work order {work_order_id} at {property_name} Unit {unit_number}"
+        async def schedule_calcom(_: Dict) -> Optional[Dict]:
+            booking = await self.calcom.schedule_work_order(
+                work_order_id=work_order_id,
+                work_order_title=work_order_title,
+                work_order_description=work_order_description,
+                contractor_email=contractor_email,
+                contractor_name=contractor_name,
+                property_address=f"{property_name}, Unit {unit_number}"
+            )
+            if not booking:
+                return None
+            logger.info(f"Scheduled appointment {booking.id} at {booking.start_time}")
+            return {
+                "status": "success",
+                "booking_id": booking.id,
+                "appointment_time": booking.start_time.isoformat()
+            }
 
+        async def create_immich_album(_: Dict) -> Optional[Dict]:
             album = await self.immich.create_album(
-                name=album_name,
-                description=album_description
+                name=f"WO-{work_order_id}: {work_order_title}",
+                description=f"Photos for work order {work_order_id} at {property_name} Unit {unit_number}"
             )
+            if not album:
+                return None
+            logger.info(f"Created Immich album {album.id}")
+            return {"status": "success", "album_id": album.id}
 
-            if album:
-                results["integrations"]["immich"] = {
-                    "status": "success",
-                    "album_id": album.id
-                }
-                logger.info(f"Created Immich album {album.id}")
-        except Exception as e:
-            logger.error(f"Failed to create Immich album: {e}")
-            results["errors"].append(f"Immich: {str(e)}")
-
-        # Step 5: Store in Paperless-ngx
-        try:
-            # Create work order document
+        async def store_in_paperless(_: Dict) -> Optional[Dict]:
             wo_doc_content = f"""
 Work Order #{work_order_id}
 
@@ -468,7 +506,6 @@ Urgency: {urgency.upper()}
 
 Created: {datetime.now().isoformat()}
 """
-
             doc_id = await self.paperless.upload_work_order_document(
                 work_order_id=work_order_id,
                 property_name=property_name,
@@ -476,120 +513,86 @@ Created: {datetime.now().isoformat()}
                 document_content=wo_doc_content.encode('utf-8'),
                 document_name=f"Work_Order_{work_order_id}.txt"
             )
+            if not doc_id:
+                return None
+            logger.info(f"Stored document in Paperless-ngx: {doc_id}")
+            return {"status": "success", "document_id": doc_id}
 
-            if doc_id:
-                results["integrations"]["paperless"] = {
-                    "status": "success",
-                    "document_id": doc_id
-                }
-                logger.info(f"Stored document in Paperless-ngx: {doc_id}")
-        except Exception as e:
-            logger.error(f"Failed to store in Paperless-ngx: {e}")
-            results["errors"].append(f"Paperless-ngx: {str(e)}")
-
-        # Step 6: Set up Nextcloud Folder
-        try:
+        async def setup_nextcloud_folder(_: Dict) -> Optional[Dict]:
             folder_path = await self.nextcloud.setup_property_structure(
                 property_name=property_name,
                 unit_number=unit_number
             )
-
-            results["integrations"]["nextcloud"] = {
-                "status": "success",
-                "folder_path": folder_path
-            }
             logger.info(f"Created Nextcloud folder: {folder_path}")
-        except Exception as e:
-            logger.error(f"Failed to set up Nextcloud folder: {e}")
-            results["errors"].append(f"Nextcloud: {str(e)}")
-
-        # Step 7: Record in Firefly III
-        try:
-            if estimated_cost and estimated_cost > 0:
-                transaction = await self.fireflyiii.record_work_order_expense(
-                    work_order_id=work_order_id,
-                    description=work_order_title,
-                    amount=estimated_cost,
-                    property_name=property_name,
-                    unit_number=unit_number,
-                    category="Maintenance"
-                )
-
-                if transaction:
-                    results["integrations"]["fireflyiii"] = {
-                        "status": "success",
-                        "transaction_id": transaction.id
-                    }
-                    logger.info(f"Recorded expense in Firefly III: ${estimated_cost}")
-        except Exception as e:
-            logger.error(f"Failed to record in Firefly III: {e}")
-            results["errors"].append(f"Firefly III: {str(e)}")
+            return {"status": "success", "folder_path": folder_path}
 
-        # Step 8: Send Novu Notifications
-        try:
+        async def record_fireflyiii_expense(_: Dict) -> Optional[Dict]:
+            transaction = await self.fireflyiii.record_work_order_expense(
+                work_order_id=work_order_id,
+                description=work_order_title,
+                amount=estimated_cost,
+                property_name=property_name,
+                unit_number=unit_number,
+                category="Maintenance"
+            )
+            if not transaction:
+                return None
+            logger.info(f"Recorded expense in Firefly III: ${estimated_cost}")
+            return {"status": "success", "transaction_id": transaction.id}
+
+        async def send_novu_notification(outputs: Dict) -> Optional[Dict]:
+            # The outbox runs this step on its own, without the other outputs
+            task = outputs.get("vikunja") or {}
+            booking = outputs.get("calcom") or {}
+            if booking.get("appointment_time"):
+                message = f"Your work order has been approved and scheduled for {booking['appointment_time']}."
+            else:
+                message = "Your work order has been approved and will be scheduled shortly."
             novu_tx = await self.novu.send_work_order_update(
                 tenant_id=f"tenant-{tenant_email}",
                 work_order_id=work_order_id,
                 work_order_title=work_order_title,
                 status="created",
-                message=f"Your work order has been approved and scheduled.",
+                message=message,
                 metadata={
                     "property": property_name,
                     "unit": unit_number,
-                    "urgency": urgency
-                }
+                    "urgency": urgency,
+                    "task_id": task.get("task_id"),
+                    "booking_id": booking.get("booking_id")
+                },
+                transaction_id=idempotency_key("novu")
             )
+            if not novu_tx:
+                return None
+            logger.info(f"Sent Novu notification: {novu_tx}")
+            return {"status": "success", "transaction_id": novu_tx}
 
-            if novu_tx:
-                results["integrations"]["novu"] = {
-                    "status": "success",
-                    "transaction_id": novu_tx
-                }
-                logger.info(f"Sent Novu notification: {novu_tx}")
-        except Exception as e:
-            logger.error(f"Failed to send Novu notification: {e}")
-            results["errors"].append(f"Novu: {str(e)}")
-
-        # Step 9: Trigger n8n Workflow
-        try:
+        async def trigger_n8n_workflow(_: Dict) -> Optional[Dict]:
             workflow_result = await self.n8n.trigger_maintenance_scheduling(
                 work_order_id=work_order_id,
                 property_name=property_name,
                 contractor_email=contractor_email or "",
                 urgency=urgency
             )
+            if not workflow_result:
+                return None
+            logger.info(f"Triggered n8n workflow")
+            return {"status": "success", "workflow_result": workflow_result}
 
-            if workflow_result:
-                results["integrations"]["n8n"] = {
-                    "status": "success",
-                    "workflow_result": workflow_result
-                }
-                logger.info(f"Triggered n8n workflow")
-        except Exception as e:
-            logger.error(f"Failed to trigger n8n workflow: {e}")
-            results["errors"].append(f"n8n: {str(e)}")
-
-        # Step 10: Update Grafana
-        try:
+        async def create_grafana_annotation(_: Dict) -> Optional[Dict]:
             annotation = await self.grafana.create_work_order_annotation(
                 work_order_id=work_order_id,
                 work_order_title=work_order_title,
                 property_name=property_name,
                 tags=["work-order", urgency]
             )
+            if not annotation:
+                return None
+            logger.info(f"Created Grafana annotation")
+            return {"status": "success", "annotation_id": annotation}
 
-            if annotation:
-                results["integrations"]["grafana"] = {
-                    "status": "success",
-                    "annotation_id": annotation
-                }
-                logger.info(f"Created Grafana annotation")
-        except Exception as e:
-            logger.error(f"Failed to create Grafana annotation: {e}")
-            results["errors"].append(f"Grafana: {str(e)}")
-
-        # Step 11: Publish MQTT Event
-        try:
+        async def publish_mqtt_event(_: Dict) -> Optional[Dict]:
             event_published = await self.mqtt.publish_event(
                 event_type="work_order_created",
                 property_id=property_name,
@@ -598,56 +601,95 @@ Created: {datetime.now().isoformat()}
                     "work_order_id": work_order_id,
                     "title": work_order_title,
                     "urgency": urgency,
-                    "contractor": contractor_name
+                    "contractor": contractor_name,
+                    "event_id": idempotency_key("mqtt")  # Lets subscribers drop redelivered events
                 }
             )
+            if not event_published:
+                return None
+            logger.info(f"Published MQTT event")
+            return {"status": "success"}
 
-            if event_published:
-                results["integrations"]["mqtt"] = {
-                    "status": "success"
-                }
-                logger.info(f"Published MQTT event")
-        except Exception as e:
-            logger.error(f"Failed to publish MQTT event: {e}")
-            results["errors"].append(f"MQTT: {str(e)}")
-
-        # Step 12: Create Digital Signature Request
-        if requires_signature:
-            try:
-                # TODO: Generate work order completion PDF
-                pdf_bytes = b"PDF content placeholder"
-
-                doc_id = await self.documenso.create_work_order_completion(
-                    work_order_id=work_order_id,
-                    work_order_title=work_order_title,
-                    pdf_content=pdf_bytes,
-                    tenant_email=tenant_email,
-                    tenant_name=tenant_name,
-                    contractor_email=contractor_email or "",
-                    contractor_name=contractor_name or ""
-                )
+        async def create_documenso_request(_: Dict) -> Optional[Dict]:
+            # TODO: Generate work order completion PDF
+            pdf_bytes = b"PDF content placeholder"
 
-                if doc_id:
-                    results["integrations"]["documenso"] = {
-                        "status": "success",
-                        "document_id": doc_id
-                    }
-                    logger.info(f"Created Documenso signature request: {doc_id}")
-            except Exception as e:
-                logger.error(f"Failed to create Documenso signature request: {e}")
-                results["errors"].append(f"Documenso: {str(e)}")
-
-        # Final status
-        results["status"] = "completed" if not results["errors"] else "completed_with_errors"
-        results["completed_at"] = datetime.now().isoformat()
+            doc_id = await self.documenso.create_work_order_completion(
+                work_order_id=work_order_id,
+                work_order_title=work_order_title,
+                pdf_content=pdf_bytes,
+                tenant_email=tenant_email,
+                tenant_name=tenant_name,
+                contractor_email=contractor_email or "",
+                contractor_name=contractor_name or ""
+            )
+            if not doc_id:
+                return None
+            logger.info(f"Created Documenso signature request: {doc_id}")
+            return {"status": "success", "document_id": doc_id}
+
+        # Independent steps run concurrently. The tenant notification and the
+        # n8n scheduling flow wait for the task/appointment to exist so they
+        # describe a work order that is actually scheduled. Only idempotent
+        # steps (Vikunja looks up its task first, Novu dedupes on the
+        # transaction ID, Nextcloud folders are created in place) are repeated
+        # after a timeout or 5xx; the others may already have gone through.
+        return [
+            WorkflowStep("vikunja", "Vikunja", create_vikunja_task, timeout=15.0, idempotent=True),
+            WorkflowStep(
+                "homebox", "Homebox", create_homebox_bom, timeout=15.0,
+                enabled=bool(requires_parts and bom_items)
+            ),
+            WorkflowStep(
+                "calcom", "Cal.com", schedule_calcom, timeout=20.0,
+                enabled=bool(contractor_email and contractor_name)
+            ),
+            WorkflowStep("immich", "Immich", create_immich_album, timeout=15.0),
+            WorkflowStep("paperless", "Paperless-ngx", store_in_paperless, timeout=30.0),
+            WorkflowStep("nextcloud", "Nextcloud", setup_nextcloud_folder, timeout=20.0, idempotent=True),
+            WorkflowStep(
+                "fireflyiii", "Firefly III", record_fireflyiii_expense, timeout=15.0,
+                enabled=bool(estimated_cost and estimated_cost > 0)
+            ),
+            WorkflowStep(
+                "novu", "Novu", send_novu_notification,
+                depends_on=("vikunja", "calcom"), timeout=10.0, idempotent=True
+            ),
+            WorkflowStep(
+                "n8n", "n8n", trigger_n8n_workflow,
+                depends_on=("calcom",), timeout=15.0
+            ),
+            WorkflowStep(
+                "grafana", "Grafana", create_grafana_annotation, timeout=10.0
+            ),
+            WorkflowStep("mqtt", "MQTT", publish_mqtt_event, timeout=5.0),
+            WorkflowStep(
+                "documenso", "Documenso", create_documenso_request, timeout=30.0,
+                enabled=requires_signature
+            ),
+        ]
+
+    async def execute_work_order_step(self, step_name: str, workflow_args: Dict[str, Any]) -> Optional[Dict]:
+        """
+        Execute a single work order integration step
 
-        logger.info(
-            f"Completed workflow for {work_order_id}: "
-            f"{len(results['integrations'])} integrations, "
-            f"{len(results['errors'])} errors"
-        )
+        Args:
+            step_name: Step name (e.g. "vikunja", "novu")
+            workflow_args: Keyword arguments of execute_complete_work_order_workflow
 
-        return results
+        Returns:
+            Integration result dict, or None if the service returned nothing
+        """
+        step = self.work_order_step(step_name, workflow_args)
+        return await asyncio.wait_for(step.func({}), timeout=step.timeout)
+
+    def work_order_step(self, step_name: str, workflow_args: Dict[str, Any]) -> WorkflowStep:
+        """Declared work order step by name (raises ValueError if unknown)"""
+        steps = {step.name: step for step in self._build_work_order_steps(**workflow_args)}
+        step = steps.get(step_name)
+        if step is None:
+            raise ValueError(f"Unknown work order step: {step_name}")
+        return step
 
     # ========================================
     # Complete Workflow: Lease Signing
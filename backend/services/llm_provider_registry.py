@@ -0,0 +1,329 @@
+"""
+LLM Provider Health Registry
+
+Keeps one provider instance per (provider, model, key) for the process and
+tracks each provider's availability and rolling latency from cheap
+background probes (model-list endpoints, no tokens generated).
+
+Provider selection is answered instantly from cached state instead of
+sending a test completion to every provider in the cascade, and
+FailoverLLMProvider moves on to the next healthy provider when a request
+fails mid-flight.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+from services.llm_providers import (
+    BaseLLMProvider, LLMFactory, LLMMessage, LLMProvider, LLMResponse
+)
+
+logger = logging.getLogger(__name__)
+
+CLUSTER_PROVIDERS = ("localai", "ollama")
+
+# Errors meaning the provider itself is unreachable (vs. a bad request)
+UNAVAILABLE_ERRORS = (ConnectionError, asyncio.TimeoutError, httpx.TransportError)
+
+
+@dataclass
+class ProviderHealth:
+    """Observed health of one provider"""
+    name: str
+    available: Optional[bool] = None  # None = not probed yet
+    last_checked: Optional[float] = None
+    last_error: Optional[str] = None
+    consecutive_failures: int = 0
+    latencies_ms: deque = field(default_factory=lambda: deque(maxlen=50))
+
+    @property
+    def avg_latency_ms(self) -> Optional[float]:
+        if not self.latencies_ms:
+            return None
+        return round(sum(self.latencies_ms) / len(self.latencies_ms), 2)
+
+    def snapshot(self) -> Dict:
+        return {
+            "available": self.available,
+            "last_checked": self.last_checked,
+            "last_error": self.last_error,
+            "consecutive_failures": self.consecutive_failures,
+            "avg_latency_ms": self.avg_latency_ms,
+        }
+
+
+class LLMProviderRegistry:
+    """Process-wide provider instances plus their health state"""
+
+    def __init__(self, probe_interval: float = 30.0, probe_timeout: float = 5.0):
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.health: Dict[str, ProviderHealth] = {}
+        self._instances: Dict[Tuple[str, Optional[str], str], BaseLLMProvider] = {}
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Instances
+    # ------------------------------------------------------------------
+
+    def get_provider(
+        self,
+        name: str,
+        model: Optional[str] = None,
+        api_key: Optional[str] = None
+    ) -> BaseLLMProvider:
+        """Reuse (or create once) the provider instance for this configuration"""
+        key_hash = hashlib.sha256(api_key.encode()).hexdigest()[:12] if api_key else ""
+        key = (name, model, key_hash)
+        provider = self._instances.get(key)
+        if provider is None:
+            provider = LLMFactory.create_provider(provider=name, api_key=api_key, model=model)
+            self._instances[key] = provider
+        return provider
+
+    def _health(self, name: str) -> ProviderHealth:
+        return self.health.setdefault(name, ProviderHealth(name=name))
+
+    # ------------------------------------------------------------------
+    # Selection
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def cascade(primary: Optional[LLMProvider] = None, api_key: Optional[str] = None) -> List[str]:
+        """Provider preference order (same order as the original fallback cascade)"""
+        order = []
+        if primary and primary != "auto":
+            order.append(primary)
+        order.extend(CLUSTER_PROVIDERS)
+        if os.getenv("ANTHROPIC_API_KEY") or api_key:
+            order.append("anthropic")
+        if os.getenv("OPENAI_API_KEY") or api_key:
+            order.append("openai")
+        return list(dict.fromkeys(order))
+
+    def candidates(self, primary: Optional[LLMProvider] = None, api_key: Optional[str] = None) -> List[str]:
+        """
+        Cascade ordered by health: known-good first, unprobed next,
+        known-down last (still tried as a last resort)
+        """
+        order = self.cascade(primary, api_key)
+        rank = {True: 0, None: 1, False: 2}
+        return sorted(order, key=lambda name: rank[self._health(name).available])
+
+    def select(self, primary: Optional[LLMProvider] = None, api_key: Optional[str] = None) -> str:
+        """Best provider name right now, from cached state only"""
+        return self.candidates(primary, api_key)[0]
+
+    # ------------------------------------------------------------------
+    # Health recording
+    # ------------------------------------------------------------------
+
+    def record_success(self, name: str, latency_ms: Optional[float] = None):
+        health = self._health(name)
+        if health.available is False:
+            logger.info(f"✅ LLM provider {name} is available again")
+        health.available = True
+        health.last_error = None
+        health.consecutive_failures = 0
+        health.last_checked = time.time()
+        if latency_ms is not None:
+            health.latencies_ms.append(latency_ms)
+
+    def record_failure(self, name: str, error: Exception):
+        health = self._health(name)
+        if health.available is not False:
+            logger.warning(f"❌ LLM provider {name} marked unavailable: {error}")
+        health.available = False
+        health.last_error = f"{type(error).__name__}: {error}"
+        health.consecutive_failures += 1
+        health.last_checked = time.time()
+
+    # ------------------------------------------------------------------
+    # Probing
+    # ------------------------------------------------------------------
+
+    async def probe(self, name: str, api_key: Optional[str] = None) -> bool:
+        """Run one cheap health probe against a provider"""
+        start = time.perf_counter()
+        try:
+            provider = self.get_provider(name, api_key=api_key)
+            await provider.health_check(timeout=self.probe_timeout)
+        except Exception as e:
+            self.record_failure(name, e)
+            return False
+        self.record_success(name, (time.perf_counter() - start) * 1000)
+        return True
+
+    async def probe_all(self) -> Dict[str, bool]:
+        """Probe every provider in the default cascade concurrently"""
+        names = self.cascade()
+        results = await asyncio.gather(*(self.probe(name) for name in names))
+        return dict(zip(names, results))
+
+    async def start(self):
+        """Start background probing"""
+        if self.running:
+            return
+        self.running = True
+        self._task = asyncio.create_task(self._loop())
+        logger.info("LLM provider health registry started")
+
+    async def stop(self):
+        """Stop background probing"""
+        if not self.running:
+            return
+        self.running = False
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        logger.info("LLM provider health registry stopped")
+
+    async def _loop(self):
+        while self.running:
+            try:
+                await self.probe_all()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"LLM provider probe error: {e}", exc_info=True)
+            try:
+                await asyncio.sleep(self.probe_interval)
+            except asyncio.CancelledError:
+                break
+
+    def get_status(self) -> Dict[str, Dict]:
+        """Health snapshot of every known provider"""
+        return {name: health.snapshot() for name, health in self.health.items()}
+
+
+class FailoverLLMProvider(BaseLLMProvider):
+    """
+    LLM provider facade that picks the healthiest provider per request
+    and fails over to the next candidate on connection/API errors
+    """
+
+    def __init__(
+        self,
+        registry: LLMProviderRegistry,
+        primary: Optional[LLMProvider] = None,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None
+    ):
+        # No HTTP client of its own: requests go through the selected provider
+        self.registry = registry
+        self.primary = primary
+        self.api_key = api_key
+        self.requested_model = model
+        self.provider_name = registry.select(primary, api_key)
+
+    def _model_for(self, name: str) -> Optional[str]:
+        # An explicit model only applies to the explicitly requested provider
+        if self.requested_model and (self.primary in (None, "auto") or name == self.primary):
+            return self.requested_model
+        return None
+
+    def _provider(self, name: str) -> BaseLLMProvider:
+        return self.registry.get_provider(name, model=self._model_for(name), api_key=self.api_key)
+
+    @property
+    def model(self) -> str:
+        return self._provider(self.provider_name).model
+
+    async def chat_completion(
+        self,
+        messages: List[LLMMessage],
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        tools: Optional[List[Dict]] = None
+    ) -> LLMResponse:
+        errors = []
+        for name in self.registry.candidates(self.primary, self.api_key):
+            provider = self._provider(name)
+            start = time.perf_counter()
+            try:
+                response = await provider.chat_completion(
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    tools=tools
+                )
+            except Exception as e:
+                # Fail over on any error, but only mark the provider down when
+                # it is unreachable; a rejected request says nothing about health
+                if isinstance(e, UNAVAILABLE_ERRORS):
+                    self.registry.record_failure(name, e)
+                errors.append(f"{name}: {e}")
+                continue
+
+            self.registry.record_success(name, (time.perf_counter() - start) * 1000)
+            if name != self.provider_name:
+                logger.info(f"LLM failover: {self.provider_name} → {name}")
+                self.provider_name = name
+            return response
+
+        raise ConnectionError(
+            "All LLM providers failed. " + "; ".join(errors) +
+            ". Please ensure at least one AI service is running or configure cloud API keys."
+        )
+
+    async def stream_completion(
+        self,
+        messages: List[LLMMessage],
+        temperature: float = 0.7,
+        max_tokens: int = 1000
+    ) -> AsyncIterator[str]:
+        """
+        Stream from the healthiest provider
+
+        Failover only happens before the first chunk is yielded; once text
+        has reached the caller a mid-stream error is raised as-is.
+        """
+        errors = []
+        for name in self.registry.candidates(self.primary, self.api_key):
+            provider = self._provider(name)
+            start = time.perf_counter()
+            started = False
+            try:
+                async for chunk in provider.stream_completion(
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                ):
+                    if not started:
+                        started = True
+                        self.registry.record_success(name, (time.perf_counter() - start) * 1000)
+                        if name != self.provider_name:
+                            logger.info(f"LLM failover: {self.provider_name} → {name}")
+                            self.provider_name = name
+                    yield chunk
+            except Exception as e:
+                if isinstance(e, UNAVAILABLE_ERRORS):
+                    self.registry.record_failure(name, e)
+                if started:
+                    raise
+                errors.append(f"{name}: {e}")
+                continue
+            return
+
+        raise ConnectionError(
+            "All LLM providers failed. " + "; ".join(errors) +
+            ". Please ensure at least one AI service is running or configure cloud API keys."
+        )
+
+    async def close(self):
+        """Provider instances are shared; nothing to release"""
+        pass
+
+
+# Global registry instance
+llm_provider_registry = LLMProviderRegistry()
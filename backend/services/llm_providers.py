@@ -6,11 +6,13 @@ Supports OpenAI, Anthropic (Claude), and Ollama for AI assistant
 import os
 import json
 import logging
-from typing import Dict, List, Optional, Any, Literal
+from typing import AsyncIterator, Dict, List, Optional, Any, Literal
 from abc import ABC, abstractmethod
 import httpx
 from pydantic import BaseModel
 
+from services.http_client_registry import get_http_client
+
 logger = logging.getLogger(__name__)
 
 LLMProvider = Literal["openai", "anthropic", "ollama", "localai", "auto"]
@@ -31,13 +33,27 @@ class LLMResponse(BaseModel):
     tool_calls: Optional[List[Dict[str, Any]]] = None
 
 
+async def _sse_data(response: httpx.Response) -> AsyncIterator[str]:
+    """Yield the `data:` payloads of a server-sent events response"""
+    async for line in response.aiter_lines():
+        if line.startswith("data:"):
+            data = line[5:].strip()
+            if data == "[DONE]":
+                return
+            if data:
+                yield data
+
+
 class BaseLLMProvider(ABC):
     """Base class for LLM providers"""
 
+    # Key of the shared pooled HTTP client in the client registry
+    http_service = "llm"
+
     def __init__(self, api_key: Optional[str] = None, model: str = "default"):
         self.api_key = api_key
         self.model = model
-        self.client = httpx.AsyncClient(timeout=180.0)
+        self.client = get_http_client(self.http_service, timeout=180.0)
 
     @abstractmethod
     async def chat_completion(
@@ -50,14 +66,47 @@ class BaseLLMProvider(ABC):
         """Generate chat completion"""
         pass
 
+    async def stream_completion(
+        self,
+        messages: List[LLMMessage],
+        temperature: float = 0.7,
+        max_tokens: int = 1000
+    ) -> AsyncIterator[str]:
+        """
+        Generate a chat completion as text chunks, yielded as they arrive
+
+        Providers without a streaming API yield the whole completion at once.
+        """
+        response = await self.chat_completion(messages, temperature=temperature, max_tokens=max_tokens)
+        if response.content:
+            yield response.content
+
+    # Cheap endpoint used by the provider health registry (lists models,
+    # generates no tokens). Relative to the provider's api_url.
+    health_check_path = "/v1/models"
+
+    def _health_check_headers(self) -> Dict[str, str]:
+        return {}
+
+    async def health_check(self, timeout: float = 5.0):
+        """Probe provider availability; raises on failure"""
+        response = await self.client.get(
+            f"{self.api_url}{self.health_check_path}",
+            headers=self._health_check_headers(),
+            timeout=timeout
+        )
+        response.raise_for_status()
+
     async def close(self):
-        """Close HTTP client"""
-        await self.client.aclose()
+        """Release HTTP client (the shared pool is closed at application shutdown)"""
+        pass
 
 
 class LocalAIProvider(BaseLLMProvider):
     """LocalAI Provider (cluster-deployed, GPU-accelerated)"""
 
+    http_service = "llm:localai"
+
     def __init__(
         self,
         api_url: str = "http://localai.ai.svc.cluster.local:8080",
@@ -150,10 +199,47 @@ class LocalAIProvider(BaseLLMProvider):
             logger.error(f"LocalAI API error: {e}")
             raise
 
+    async def stream_completion(
+        self,
+        messages: List[LLMMessage],
+        temperature: float = 0.7,
+        max_tokens: int = 1000
+    ) -> AsyncIterator[str]:
+        """LocalAI streaming chat completion (OpenAI-compatible SSE)"""
+        payload = {
+            "model": self.model,
+            "messages": [{"role": msg.role, "content": msg.content} for msg in messages],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True
+        }
+        try:
+            async with self.client.stream(
+                "POST",
+                f"{self.api_url}/v1/chat/completions",
+                headers={"Content-Type": "application/json"},
+                json=payload
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                    raise ValueError(f"LocalAI API error: {response.text}")
+                async for data in _sse_data(response):
+                    chunk = json.loads(data)
+                    choices = chunk.get("choices") or [{}]
+                    content = (choices[0].get("delta") or {}).get("content")
+                    if content:
+                        yield content
+        except httpx.ConnectError as e:
+            logger.error(f"Cannot connect to LocalAI at {self.api_url}: {e}")
+            raise ConnectionError(f"LocalAI service is not available at {self.api_url}")
+
 
 class OllamaProvider(BaseLLMProvider):
     """Ollama LLM Provider (local, on-premise)"""
 
+    http_service = "llm:ollama"
+    health_check_path = "/api/tags"
+
     def __init__(
         self,
         api_url: str = "http://ollama.ai.svc.cluster.local:11434",
@@ -224,6 +310,42 @@ class OllamaProvider(BaseLLMProvider):
             logger.error(f"Ollama API error: {e}")
             raise
 
+    async def stream_completion(
+        self,
+        messages: List[LLMMessage],
+        temperature: float = 0.7,
+        max_tokens: int = 1000
+    ) -> AsyncIterator[str]:
+        """Ollama streaming generation (newline-delimited JSON chunks)"""
+        payload = {
+            "model": self.model,
+            "prompt": self._messages_to_prompt(messages),
+            "stream": True,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens,
+                "top_p": 0.9
+            }
+        }
+        try:
+            async with self.client.stream("POST", f"{self.api_url}/api/generate", json=payload) as response:
+                if response.is_error:
+                    await response.aread()
+                    raise ValueError(f"Ollama API error: {response.text}")
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise ValueError(f"Ollama API error: {chunk['error']}")
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        return
+        except httpx.ConnectError as e:
+            logger.error(f"Cannot connect to Ollama at {self.api_url}: {e}")
+            raise ConnectionError(f"AI service (Ollama) is not available. Please ensure Ollama is running at {self.api_url}")
+
     def _messages_to_prompt(self, messages: List[LLMMessage]) -> str:
         """Convert message format to Ollama prompt"""
         prompt_parts = []
@@ -240,6 +362,8 @@ class OllamaProvider(BaseLLMProvider):
 class OpenAIProvider(BaseLLMProvider):
     """OpenAI LLM Provider (GPT-4, GPT-3.5)"""
 
+    http_service = "llm:openai"
+
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -250,6 +374,13 @@ class OpenAIProvider(BaseLLMProvider):
         super().__init__(api_key=api_key, model=model)
         self.api_url = "https://api.openai.com/v1"
 
+    health_check_path = "/models"
+
+    def _health_check_headers(self) -> Dict[str, str]:
+        if not self.api_key:
+            raise ValueError("OpenAI API key not configured")
+        return {"Authorization": f"Bearer {self.api_key}"}
+
     async def chat_completion(
         self,
         messages: List[LLMMessage],
@@ -325,10 +456,45 @@ class OpenAIProvider(BaseLLMProvider):
             logger.error(f"OpenAI API error: {e}")
             raise
 
+    async def stream_completion(
+        self,
+        messages: List[LLMMessage],
+        temperature: float = 0.7,
+        max_tokens: int = 1000
+    ) -> AsyncIterator[str]:
+        """OpenAI streaming chat completion (SSE)"""
+        payload = {
+            "model": self.model,
+            "messages": [{"role": msg.role, "content": msg.content} for msg in messages],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True
+        }
+        async with self.client.stream(
+            "POST",
+            f"{self.api_url}/chat/completions",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            },
+            json=payload
+        ) as response:
+            if response.is_error:
+                await response.aread()
+                raise ValueError(f"OpenAI API error: {response.text}")
+            async for data in _sse_data(response):
+                chunk = json.loads(data)
+                choices = chunk.get("choices") or [{}]
+                content = (choices[0].get("delta") or {}).get("content")
+                if content:
+                    yield content
+
 
 class AnthropicProvider(BaseLLMProvider):
     """Anthropic (Claude) LLM Provider"""
 
+    http_service = "llm:anthropic"
+
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -339,6 +505,13 @@ class AnthropicProvider(BaseLLMProvider):
         super().__init__(api_key=api_key, model=model)
         self.api_url = "https://api.anthropic.com/v1"
 
+    health_check_path = "/models"
+
+    def _health_check_headers(self) -> Dict[str, str]:
+        if not self.api_key:
+            raise ValueError("Anthropic API key not configured")
+        return {"x-api-key": self.api_key, "anthropic-version": "2023-06-01"}
+
     async def chat_completion(
         self,
         messages: List[LLMMessage],
@@ -427,6 +600,49 @@ class AnthropicProvider(BaseLLMProvider):
             logger.error(f"Anthropic API error: {e}")
             raise
 
+    async def stream_completion(
+        self,
+        messages: List[LLMMessage],
+        temperature: float = 0.7,
+        max_tokens: int = 1000
+    ) -> AsyncIterator[str]:
+        """Anthropic streaming messages (SSE content_block_delta events)"""
+        system_message = "\n".join(msg.content for msg in messages if msg.role == "system")
+        payload = {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "messages": [
+                {"role": msg.role, "content": msg.content}
+                for msg in messages if msg.role != "system"
+            ],
+            "stream": True
+        }
+        if system_message:
+            payload["system"] = system_message.strip()
+
+        async with self.client.stream(
+            "POST",
+            f"{self.api_url}/messages",
+            headers={
+                "x-api-key": self.api_key,
+                "anthropic-version": "2023-06-01",
+                "Content-Type": "application/json"
+            },
+            json=payload
+        ) as response:
+            if response.is_error:
+                await response.aread()
+                raise ValueError(f"Anthropic API error: {response.text}")
+            async for data in _sse_data(response):
+                event = json.loads(data)
+                if event.get("type") == "content_block_delta":
+                    text = (event.get("delta") or {}).get("text")
+                    if text:
+                        yield text
+                elif event.get("type") == "error":
+                    raise ValueError(f"Anthropic API error: {event.get('error')}")
+
 
 class LLMFactory:
     """Factory for creating LLM provider instances"""
@@ -496,66 +712,20 @@ class LLMFactory:
         3. Anthropic Claude (cloud, best tool calling)
         4. OpenAI GPT-4 (cloud, widely available)
 
-        Returns the first working provider
+        Selection uses the provider health registry's cached probe state
+        (no test completion), and the returned provider fails over to the
+        next healthy provider if a request errors.
         """
-        # Define fallback cascade
-        cascade = []
-
-        if primary_provider and primary_provider != "auto":
-            # User specified a provider, try that first
-            cascade.append(primary_provider)
-
-        # Add cluster providers (free, private)
-        cascade.extend(["localai", "ollama"])
-
-        # Add cloud providers if API keys available
-        if os.getenv("ANTHROPIC_API_KEY") or api_key:
-            cascade.append("anthropic")
-        if os.getenv("OPENAI_API_KEY") or api_key:
-            cascade.append("openai")
-
-        # Remove duplicates while preserving order
-        cascade = list(dict.fromkeys(cascade))
-
-        # Try each provider in cascade
-        for provider_name in cascade:
-            try:
-                logger.info(f"Attempting to create LLM provider: {provider_name}")
-                provider = LLMFactory.create_provider(
-                    provider=provider_name,
-                    api_key=api_key,
-                    model=model
-                )
-
-                # Test the provider with a simple request
-                test_messages = [
-                    LLMMessage(role="user", content="Say 'OK' if you can hear me")
-                ]
-                test_response = await provider.chat_completion(
-                    messages=test_messages,
-                    temperature=0.1,
-                    max_tokens=10
-                )
-
-                if test_response.content:
-                    logger.info(f"✅ Successfully connected to {provider_name}")
-                    return provider
-
-            except ConnectionError as e:
-                logger.warning(f"❌ {provider_name} connection failed: {e}")
-                continue
-            except ValueError as e:
-                logger.warning(f"❌ {provider_name} configuration error: {e}")
-                continue
-            except Exception as e:
-                logger.warning(f"❌ {provider_name} failed: {e}")
-                continue
-
-        # No providers worked
-        raise ConnectionError(
-            "All LLM providers failed. Tried: " + ", ".join(cascade) +
-            ". Please ensure at least one AI service is running or configure cloud API keys."
+        from services.llm_provider_registry import FailoverLLMProvider, llm_provider_registry
+
+        provider = FailoverLLMProvider(
+            llm_provider_registry,
+            primary=primary_provider,
+            api_key=api_key,
+            model=model
         )
+        logger.info(f"Selected LLM provider {provider.provider_name} from health registry")
+        return provider
 
 
 # Configuration helper
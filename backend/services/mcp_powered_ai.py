@@ -6,7 +6,8 @@ Supports OpenAI, Anthropic (Claude), and Ollama.
 
 import json
 import logging
-from typing import Dict, List, Optional, Any
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Any
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -15,6 +16,10 @@ from services.llm_providers import (
     BaseLLMProvider
 )
 from services.somniproperty_mcp_server import somniproperty_mcp
+from services.mcp_tool_executor import MCPToolExecutor, tool_result_cache, truncate_for_prompt
+from services.semantic_cache import semantic_cache, context_fingerprint
+from core.config import settings
+from core.auth import AuthUser
 
 logger = logging.getLogger(__name__)
 
@@ -62,6 +67,7 @@ class MCPPoweredAI:
         # Create LLM provider (will be set by async init)
         self.llm: Optional[BaseLLMProvider] = None
         self.mcp_server = somniproperty_mcp
+        self.tool_executor = MCPToolExecutor(self.mcp_server, cache=tool_result_cache)
         self._initialized = False
 
         logger.info(f"MCPPoweredAI initializing with provider preference: {self.config.provider}")
@@ -100,17 +106,22 @@ class MCPPoweredAI:
         message: str,
         conversation_id: str,
         context: Dict[str, Any],
-        db: AsyncSession
+        db: AsyncSession,
+        on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+        auth_user: Optional[AuthUser] = None
     ) -> Dict[str, Any]:
         """
         Main chat interface with MCP tool execution
 
+        Tools run with the permissions of `auth_user`.
+
         Flow:
         1. Detect intent
         2. Determine which MCP tools to use
         3. Execute tools
         4. Format results
-        5. Generate natural language response
+        5. Generate natural language response (streamed through `on_token`
+           chunk by chunk when given)
         """
         # Allow model override from context (frontend selection)
         model_override = context.get('model', 'auto')
@@ -131,10 +142,19 @@ class MCPPoweredAI:
         await self._ensure_initialized()
 
         start_time = datetime.now()
+        turn_start = time.perf_counter()
+        latency_ms: Dict[str, float] = {}
+
+        def mark(stage: str, since: float) -> float:
+            now = time.perf_counter()
+            latency_ms[stage] = round((now - since) * 1000, 2)
+            return now
 
         try:
             # Build context
+            stage_start = time.perf_counter()
             manager_context = await self._build_manager_context(context, db)
+            stage_start = mark("context", stage_start)
 
             # Skip tool planning for simple conversational messages
             simple_greetings = ['hi', 'hello', 'hey', 'thanks', 'thank you', 'bye', 'goodbye']
@@ -170,22 +190,25 @@ class MCPPoweredAI:
 
             # Use pattern matching for common queries (faster and more reliable than LLM planning)
             tool_plan = await self._simple_intent_detection(message, manager_context, enabled_tools)
+            stage_start = mark("planning", stage_start)
 
-            # Execute MCP tools
+            # Execute MCP tools (reads concurrently and cached, writes in order)
             tool_results = []
+            tool_timings = []
             if tool_plan.get("tools"):
                 logger.info(f"⚙️ Executing {len(tool_plan['tools'])} MCP tools...")
-                for tool_call in tool_plan["tools"]:
-                    logger.info(f"📞 Calling MCP tool: {tool_call['name']} with args: {tool_call['arguments']}")
-                    result = await self.mcp_server.call_tool(
-                        tool_name=tool_call["name"],
-                        arguments=tool_call["arguments"]
+                tool_results, tool_timings = await self.tool_executor.execute(
+                    tool_plan["tools"],
+                    db=db,
+                    scope=self._cache_scope(auth_user) or "anonymous",
+                    auth_user=auth_user
+                )
+                for timing in tool_timings:
+                    logger.info(
+                        f"✅ Tool {timing['tool']} finished in {timing['latency_ms']}ms"
+                        f"{' (cached)' if timing['cached'] else ''}"
                     )
-                    logger.info(f"✅ Tool {tool_call['name']} returned result (length: {len(str(result))})")
-                    tool_results.append({
-                        "tool": tool_call["name"],
-                        "result": result
-                    })
+            stage_start = mark("tools", stage_start)
 
             # Generate response incorporating tool results (or simple chat if no tools)
             if tool_results or tool_plan.get("intent") != "general_query":
@@ -194,8 +217,12 @@ class MCPPoweredAI:
                     message=message,
                     context=manager_context,
                     tool_plan=tool_plan,
-                    tool_results=tool_results
+                    tool_results=tool_results,
+                    on_token=on_token,
+                    cache_scope=self._cache_scope(auth_user)
                 )
+                if response.get("first_token_at") is not None:
+                    latency_ms["time_to_first_token"] = round((response["first_token_at"] - turn_start) * 1000, 2)
             else:
                 # No tools needed - provide a helpful general response
                 response = {
@@ -212,6 +239,8 @@ class MCPPoweredAI:
                         "Show open work orders"
                     ]
                 }
+            mark("response", stage_start)
+            latency_ms["total"] = round((time.perf_counter() - turn_start) * 1000, 2)
 
             return {
                 "response": response["text"],
@@ -219,7 +248,11 @@ class MCPPoweredAI:
                 "confidence": tool_plan.get("confidence"),
                 "tools_used": [t["tool"] for t in tool_results],
                 "tool_results": tool_results,
-                "suggestions": response.get("suggestions", [])
+                "suggestions": response.get("suggestions", []),
+                "metadata": {
+                    "latency_ms": latency_ms,
+                    "tool_timings": tool_timings
+                }
             }
 
         except ConnectionError as e:
@@ -244,6 +277,16 @@ class MCPPoweredAI:
                 "error_type": "general_error"
             }
 
+    @staticmethod
+    def _cache_scope(auth_user: Optional[AuthUser]) -> Optional[str]:
+        """
+        Cache partition for tool results and responses: the authenticated user
+
+        Never taken from the client-supplied context, which could name
+        another user's partition. None (no response caching) without a user.
+        """
+        return f"user:{auth_user.username}" if auth_user else None
+
     def _is_tool_enabled(self, tool_name: str, enabled_tools: Optional[List[str]]) -> bool:
         """Check if a tool is enabled (None means all tools are enabled)"""
         if enabled_tools is None:
@@ -283,6 +326,11 @@ class MCPPoweredAI:
                     "tool_disabled": tool_name
                 }
 
+        # Document content queries (local vector index)
+        if any(keyword in message_lower for keyword in ['document', 'clause', 'paperwork', 'pdf']):
+            if any(keyword in message_lower for keyword in ['find', 'search', 'which', 'mention', 'about', 'say']):
+                return make_plan("search_documents", 85, "search_documents", {"query": message})
+
         # Client queries
         if any(keyword in message_lower for keyword in ['client', 'customer', 'tenant']):
             if any(keyword in message_lower for keyword in ['list', 'all', 'show', 'how many', 'count']):
@@ -477,11 +525,30 @@ If no tools are needed, return empty tools array.
         message: str,
         context: Dict,
         tool_plan: Dict,
-        tool_results: List[Dict]
+        tool_results: List[Dict],
+        on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+        cache_scope: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate natural language response incorporating tool execution results
+
+        Answers are cached per user and fingerprint of the tool results, so a
+        near-duplicate question over unchanged data reuses the earlier answer.
         """
+        # Keep large results from blowing up the prompt
+        prompt_results = [
+            {"tool": r["tool"], "result": truncate_for_prompt(r["result"])}
+            for r in tool_results
+        ]
+
+        use_cache = bool(cache_scope and tool_results and settings.AI_SEMANTIC_CACHE_ENABLED)
+        fingerprint = context_fingerprint(prompt_results) if use_cache else ""
+        if use_cache:
+            cached = await semantic_cache.get("manager_response", message, cache_scope, fingerprint)
+            if cached is not None:
+                if on_token:
+                    await on_token(cached["text"])
+                return {**cached, "first_token_at": time.perf_counter()}
 
         system_message = f"""
 You are Somni, an AI assistant for property managers.
@@ -490,7 +557,7 @@ You just executed some tools to answer the user's question.
 Original question: {message}
 
 Tool results:
-{json.dumps(tool_results, indent=2)}
+{json.dumps(prompt_results, indent=2, default=str)}
 
 Context:
 {json.dumps(context, indent=2)}
@@ -509,22 +576,51 @@ Be concise, professional, and actionable.
             LLMMessage(role="user", content="Generate response:")
         ]
 
+        first_token_at = None
+        chunks: List[str] = []
         try:
-            response = await self.llm.chat_completion(
-                messages=messages,
-                temperature=self.config.temperature,
-                max_tokens=self.config.max_tokens
-            )
+            if on_token:
+                async for chunk in self.llm.stream_completion(
+                    messages=messages,
+                    temperature=self.config.temperature,
+                    max_tokens=self.config.max_tokens
+                ):
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    chunks.append(chunk)
+                    await on_token(chunk)
+                text = "".join(chunks)
+            else:
+                response = await self.llm.chat_completion(
+                    messages=messages,
+                    temperature=self.config.temperature,
+                    max_tokens=self.config.max_tokens
+                )
+                text = response.content
 
             suggestions = self._generate_suggestions_from_results(tool_plan, tool_results)
 
+            if use_cache and text:
+                await semantic_cache.set(
+                    "manager_response", message, cache_scope,
+                    {"text": text, "suggestions": suggestions}, fingerprint
+                )
+
             return {
-                "text": response.content,
-                "suggestions": suggestions
+                "text": text,
+                "suggestions": suggestions,
+                "first_token_at": first_token_at
             }
 
         except Exception as e:
             logger.error(f"Response generation error: {e}")
+            if chunks:
+                # Stream broke off mid-response: keep what was already sent
+                return {
+                    "text": "".join(chunks),
+                    "suggestions": self._generate_suggestions_from_results(tool_plan, tool_results),
+                    "first_token_at": first_token_at
+                }
             # Fallback: use template-based formatting for common queries
             formatted_response = self._format_tool_results_fallback(
                 message=message,
@@ -663,6 +759,14 @@ Be concise, professional, and actionable.
             else:
                 response_text = f"You have **{total} {status} work orders** that need attention."
 
+        elif tool_name == "search_documents":
+            if total == 0:
+                response_text = "I couldn't find any documents matching that."
+            else:
+                response_text = f"I found **{total} matching documents**:"
+                for item in items[:5]:
+                    response_text += f"\n• {item.get('title', 'Untitled')} ({item.get('document_type', 'document')})"
+
         else:
             # Generic fallback
             if total == 0:
@@ -682,7 +786,9 @@ Be concise, professional, and actionable.
     async def execute_action(
         self,
         action_type: str,
-        action_data: Dict[str, Any]
+        action_data: Dict[str, Any],
+        db: Optional[AsyncSession] = None,
+        auth_user: Optional[AuthUser] = None
     ) -> Dict[str, Any]:
         """
         Execute a specific action via MCP tools
@@ -702,7 +808,7 @@ Be concise, professional, and actionable.
             return {"error": f"Unknown action type: {action_type}"}
 
         try:
-            result = await self.mcp_server.call_tool(tool_name, action_data)
+            result = await self.mcp_server.call_tool(tool_name, action_data, db=db, auth_user=auth_user)
             return {
                 "success": True,
                 "action": action_type,
@@ -0,0 +1,576 @@
+"""
+In-Process MCP Tool Dispatcher
+
+Executes SomniProperty MCP tools directly against the database using the
+caller's AsyncSession, instead of looping back through HTTP to our own API.
+
+Each tool has:
+- A Pydantic argument model (typed validation, unknown arguments ignored)
+- A handler `(db, args) -> result` running on the caller's session
+- A result projection: only the fields the LLM needs, JSON-safe
+- The RBAC resource it reads, checked against the caller before it runs
+
+Managers and admins are checked against the role matrix. Tenants may only
+use tools that can be pinned to their own tenant record (their leases,
+payments and documents). Calls without an authenticated caller are refused,
+like the REST endpoints the tools mirror.
+
+Results keep the `{"items": [...], "total": n}` shape of the REST list
+endpoints so response formatting works the same for both execution modes.
+Tools without a direct handler (writes, external integrations) are still
+served by SomniPropertyMCPServer's HTTP mode.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Type
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+from sqlalchemy import select, func, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models import (
+    Property, Building, Unit, Tenant, Lease, RentPayment, WorkOrder,
+    SmartDevice, PropertyEdgeNode, Client
+)
+from core.auth import AuthUser, get_tenant_identity
+from core.security.rbac import Role, has_permission
+
+logger = logging.getLogger(__name__)
+
+# Leases ending within this window count as "expiring" (upcoming renewals)
+EXPIRING_LEASE_DAYS = 60
+
+
+# ============================================================================
+# ARGUMENT MODELS
+# ============================================================================
+
+class ToolArgs(BaseModel):
+    """Base tool arguments (LLMs often send extra keys; ignore them)"""
+    model_config = ConfigDict(extra="ignore")
+
+
+class ListArgs(ToolArgs):
+    limit: int = Field(50, ge=1, le=200)
+
+
+class ListPropertiesArgs(ListArgs):
+    property_type: Optional[str] = None
+    city: Optional[str] = None
+
+
+class PropertyIdArgs(ToolArgs):
+    property_id: UUID
+
+
+class ListClientsArgs(ListArgs):
+    tier: Optional[str] = None
+    status: Optional[str] = None
+
+
+class ClientIdArgs(ToolArgs):
+    client_id: UUID
+
+
+class ListTenantsArgs(ListArgs):
+    status: Optional[str] = None
+
+
+class TenantIdArgs(ToolArgs):
+    tenant_id: UUID
+
+
+class ListLeasesArgs(ListArgs):
+    status: Optional[str] = None
+    tenant_id: Optional[UUID] = None
+    unit_id: Optional[UUID] = None
+
+
+class ListWorkOrdersArgs(ListArgs):
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    unit_id: Optional[UUID] = None
+
+
+class ListPaymentsArgs(ListArgs):
+    status: Optional[str] = None
+    tenant_id: Optional[UUID] = None
+
+
+class ListUnitsArgs(ListArgs):
+    building_id: Optional[UUID] = None
+    property_id: Optional[UUID] = None
+    status: Optional[str] = None
+
+
+class ListSmartDevicesArgs(ListArgs):
+    property_id: Optional[UUID] = None
+    device_type: Optional[str] = None
+
+
+class DeviceIdArgs(ToolArgs):
+    device_id: UUID
+
+
+class ListEdgeNodesArgs(ListArgs):
+    status: Optional[str] = None
+
+
+class EdgeNodeIdArgs(ToolArgs):
+    edge_node_id: UUID
+
+
+class SearchDocumentsArgs(ToolArgs):
+    query: str = Field(..., min_length=2)
+    k: int = Field(5, ge=1, le=20)
+    document_type: Optional[str] = None
+    lease_id: Optional[UUID] = None
+    tenant_id: Optional[UUID] = None
+    property_id: Optional[UUID] = None
+
+
+# ============================================================================
+# RESULT PROJECTION
+# ============================================================================
+
+def _json_safe(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def project(obj: Any, fields: Iterable[str]) -> Dict[str, Any]:
+    """Pick `fields` from an ORM object as a JSON-safe dict"""
+    return {name: _json_safe(getattr(obj, name, None)) for name in fields}
+
+
+def _list_result(items, total: int) -> Dict[str, Any]:
+    return {"items": items, "total": total}
+
+
+async def _count(db: AsyncSession, query) -> int:
+    return (await db.execute(select(func.count()).select_from(query.subquery()))).scalar() or 0
+
+
+async def _paged(db: AsyncSession, query, order_by, limit: int):
+    """Total count plus the first `limit` rows"""
+    total = await _count(db, query)
+    rows = (await db.execute(query.order_by(order_by).limit(limit))).all()
+    return rows, total
+
+
+PROPERTY_FIELDS = ("id", "name", "address_line1", "city", "state", "zip_code", "property_type")
+CLIENT_FIELDS = ("id", "name", "tier", "client_type", "status", "email", "phone", "city", "state")
+TENANT_FIELDS = ("id", "first_name", "last_name", "email", "phone", "status")
+LEASE_FIELDS = ("id", "unit_id", "tenant_id", "start_date", "end_date", "rent_amount", "status")
+WORK_ORDER_FIELDS = ("id", "title", "category", "priority", "status", "unit_id", "reported_date", "scheduled_date")
+PAYMENT_FIELDS = ("id", "lease_id", "tenant_id", "amount", "due_date", "paid_date", "status")
+UNIT_FIELDS = ("id", "building_id", "unit_number", "unit_type", "bedrooms", "bathrooms", "monthly_rent", "status")
+DEVICE_FIELDS = ("id", "property_id", "device_name", "device_type", "ha_domain", "ha_state", "status", "health_status", "last_seen")
+EDGE_NODE_FIELDS = ("id", "property_id", "hostname", "hub_type", "status", "sync_status", "last_heartbeat", "last_sync")
+
+
+# ============================================================================
+# DISPATCHER
+# ============================================================================
+
+ToolHandler = Callable[[AsyncSession, Any], Awaitable[Dict[str, Any]]]
+
+
+@dataclass
+class DirectTool:
+    """A tool executed in-process"""
+    name: str
+    args_model: Type[ToolArgs]
+    handler: ToolHandler
+    resource: str  # RBAC resource the tool reads
+    tenant_field: Optional[str] = None  # Argument pinned to the caller's own tenant for tenant users
+
+
+def caller_role(auth_user: AuthUser) -> Optional[Role]:
+    """RBAC role of a staff caller (None for tenants and other users)"""
+    if auth_user.is_admin:
+        return Role.ADMIN
+    if auth_user.is_manager:
+        return Role.OPERATOR
+    return None
+
+
+class MCPToolDispatcher:
+    """Maps MCP tool names to in-process handlers"""
+
+    def __init__(self):
+        self._tools: Dict[str, DirectTool] = {}
+
+    def tool(
+        self,
+        name: str,
+        args_model: Type[ToolArgs] = ToolArgs,
+        *,
+        resource: str,
+        tenant_field: Optional[str] = None
+    ):
+        """Decorator registering a direct handler for a tool"""
+        def decorator(handler: ToolHandler) -> ToolHandler:
+            self._tools[name] = DirectTool(
+                name=name, args_model=args_model, handler=handler,
+                resource=resource, tenant_field=tenant_field
+            )
+            return handler
+        return decorator
+
+    def has_tool(self, name: str) -> bool:
+        return name in self._tools
+
+    @property
+    def tool_names(self):
+        return sorted(self._tools)
+
+    async def authorize(
+        self,
+        tool: DirectTool,
+        args: ToolArgs,
+        db: AsyncSession,
+        auth_user: Optional[AuthUser]
+    ) -> Optional[ToolArgs]:
+        """Arguments the caller may run the tool with (tenant-pinned), or None if not allowed"""
+        if auth_user is None:
+            return None
+
+        role = caller_role(auth_user)
+        if role is not None:
+            return args if has_permission(role, tool.resource, "read") else None
+
+        if not auth_user.is_tenant or tool.tenant_field is None:
+            return None
+        identity = await get_tenant_identity(db, auth_user.username)
+        if identity is None:
+            return None
+        requested = getattr(args, tool.tenant_field)
+        if requested is not None and requested != identity.tenant_id:
+            return None
+        return args.model_copy(update={tool.tenant_field: identity.tenant_id})
+
+    async def dispatch(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        db: AsyncSession,
+        auth_user: Optional[AuthUser] = None
+    ) -> Dict[str, Any]:
+        """
+        Validate arguments, check the caller's access and run a tool on the caller's session
+
+        Returns an `{"error": ...}` dict (like the HTTP mode) instead of
+        raising, so one bad tool call does not abort the chat turn.
+        """
+        tool = self._tools.get(tool_name)
+        if tool is None:
+            return {"error": f"Unknown tool: {tool_name}", "tool": tool_name}
+
+        try:
+            args = tool.args_model.model_validate(arguments or {})
+        except ValidationError as e:
+            return {
+                "error": "Invalid arguments",
+                "tool": tool_name,
+                "details": [
+                    {"field": ".".join(str(part) for part in err["loc"]), "message": err["msg"]}
+                    for err in e.errors()
+                ]
+            }
+
+        permitted = await self.authorize(tool, args, db, auth_user)
+        if permitted is None:
+            logger.warning(
+                f"Tool {tool_name} refused for {auth_user.username if auth_user else 'unauthenticated caller'}"
+            )
+            return {"error": "Not permitted", "tool": tool_name}
+
+        try:
+            return await tool.handler(db, permitted)
+        except Exception as e:
+            logger.error(f"Direct tool execution error: {tool_name} - {str(e)}")
+            return {"error": str(e), "tool": tool_name}
+
+
+mcp_tool_dispatcher = MCPToolDispatcher()
+tool = mcp_tool_dispatcher.tool
+
+
+# ============================================================================
+# PROPERTY / CLIENT / TENANT TOOLS
+# ============================================================================
+
+@tool("list_properties", ListPropertiesArgs, resource="properties")
+async def _list_properties(db: AsyncSession, args: ListPropertiesArgs):
+    query = select(Property)
+    if args.property_type:
+        query = query.where(Property.property_type == args.property_type)
+    if args.city:
+        query = query.where(func.lower(Property.city) == args.city.lower())
+    rows, total = await _paged(db, query, Property.name, args.limit)
+    return _list_result([project(p, PROPERTY_FIELDS) for (p,) in rows], total)
+
+
+@tool("get_property", PropertyIdArgs, resource="properties")
+async def _get_property(db: AsyncSession, args: PropertyIdArgs):
+    prop = await db.get(Property, args.property_id)
+    if prop is None:
+        return {"error": "Property not found", "property_id": str(args.property_id)}
+
+    unit_counts = (await db.execute(
+        select(Unit.status, func.count())
+        .join(Building, Unit.building_id == Building.id)
+        .where(Building.property_id == args.property_id)
+        .group_by(Unit.status)
+    )).all()
+    by_status = {status or "unknown": count for status, count in unit_counts}
+    total_units = sum(by_status.values())
+    building_count = await _count(db, select(Building.id).where(Building.property_id == args.property_id))
+
+    result = project(prop, PROPERTY_FIELDS)
+    result.update({
+        "buildings": building_count,
+        "units": total_units,
+        "units_by_status": by_status,
+        "occupancy_rate": round(by_status.get("occupied", 0) / total_units * 100, 1) if total_units else None,
+    })
+    return result
+
+
+@tool("list_clients", ListClientsArgs, resource="clients")
+async def _list_clients(db: AsyncSession, args: ListClientsArgs):
+    query = select(Client)
+    if args.tier:
+        query = query.where(Client.tier == args.tier)
+    if args.status:
+        query = query.where(Client.status == args.status)
+    rows, total = await _paged(db, query, Client.created_at.desc(), args.limit)
+    return _list_result([project(c, CLIENT_FIELDS) for (c,) in rows], total)
+
+
+@tool("get_client", ClientIdArgs, resource="clients")
+async def _get_client(db: AsyncSession, args: ClientIdArgs):
+    client = await db.get(Client, args.client_id)
+    if client is None:
+        return {"error": "Client not found", "client_id": str(args.client_id)}
+    return project(client, CLIENT_FIELDS + ("property_name", "property_type", "onboarding_stage"))
+
+
+@tool("list_tenants", ListTenantsArgs, resource="tenants")
+async def _list_tenants(db: AsyncSession, args: ListTenantsArgs):
+    query = select(Tenant)
+    if args.status:
+        query = query.where(Tenant.status == args.status)
+    rows, total = await _paged(db, query, Tenant.last_name, args.limit)
+    return _list_result([project(t, TENANT_FIELDS) for (t,) in rows], total)
+
+
+@tool("get_tenant", TenantIdArgs, resource="tenants", tenant_field="tenant_id")
+async def _get_tenant(db: AsyncSession, args: TenantIdArgs):
+    tenant = await db.get(Tenant, args.tenant_id)
+    if tenant is None:
+        return {"error": "Tenant not found", "tenant_id": str(args.tenant_id)}
+    result = project(tenant, TENANT_FIELDS)
+    result["active_leases"] = await _count(
+        db, select(Lease.id).where(Lease.tenant_id == args.tenant_id, Lease.status == "active")
+    )
+    return result
+
+
+# ============================================================================
+# LEASE / WORK ORDER / PAYMENT TOOLS
+# ============================================================================
+
+@tool("list_leases", ListLeasesArgs, resource="leases", tenant_field="tenant_id")
+async def _list_leases(db: AsyncSession, args: ListLeasesArgs):
+    query = (
+        select(
+            Lease,
+            (Tenant.first_name + " " + Tenant.last_name).label("tenant_name"),
+            Unit.unit_number
+        )
+        .join(Tenant, Lease.tenant_id == Tenant.id)
+        .join(Unit, Lease.unit_id == Unit.id)
+    )
+    if args.status == "expiring":
+        today = date.today()
+        query = query.where(
+            Lease.status == "active",
+            Lease.end_date >= today,
+            Lease.end_date <= today + timedelta(days=EXPIRING_LEASE_DAYS)
+        )
+        order_by = Lease.end_date
+    else:
+        if args.status:
+            query = query.where(Lease.status == args.status)
+        order_by = Lease.start_date.desc()
+    if args.tenant_id:
+        query = query.where(Lease.tenant_id == args.tenant_id)
+    if args.unit_id:
+        query = query.where(Lease.unit_id == args.unit_id)
+
+    rows, total = await _paged(db, query, order_by, args.limit)
+    items = []
+    for lease, tenant_name, unit_number in rows:
+        item = project(lease, LEASE_FIELDS)
+        item.update({"tenant_name": tenant_name, "unit_number": unit_number})
+        items.append(item)
+    return _list_result(items, total)
+
+
+@tool("list_work_orders", ListWorkOrdersArgs, resource="work_orders")
+async def _list_work_orders(db: AsyncSession, args: ListWorkOrdersArgs):
+    query = select(WorkOrder)
+    if args.status:
+        query = query.where(WorkOrder.status == args.status)
+    if args.priority:
+        query = query.where(WorkOrder.priority == args.priority)
+    if args.unit_id:
+        query = query.where(WorkOrder.unit_id == args.unit_id)
+    rows, total = await _paged(db, query, WorkOrder.reported_date.desc(), args.limit)
+    return _list_result([project(w, WORK_ORDER_FIELDS) for (w,) in rows], total)
+
+
+@tool("list_payments", ListPaymentsArgs, resource="payments", tenant_field="tenant_id")
+async def _list_payments(db: AsyncSession, args: ListPaymentsArgs):
+    query = select(RentPayment)
+    if args.status == "overdue":
+        # Overdue = flagged overdue/late, or still pending past the due date
+        query = query.where(or_(
+            RentPayment.status.in_(("overdue", "late")),
+            and_(RentPayment.status == "pending", RentPayment.due_date < date.today())
+        ))
+    elif args.status:
+        query = query.where(RentPayment.status == args.status)
+    if args.tenant_id:
+        query = query.where(RentPayment.tenant_id == args.tenant_id)
+    rows, total = await _paged(db, query, RentPayment.due_date.desc(), args.limit)
+    return _list_result([project(p, PAYMENT_FIELDS) for (p,) in rows], total)
+
+
+# ============================================================================
+# UNIT / DEVICE / EDGE NODE TOOLS
+# ============================================================================
+
+def _units_query(args: ListUnitsArgs):
+    query = select(Unit)
+    if args.building_id:
+        query = query.where(Unit.building_id == args.building_id)
+    if args.property_id:
+        query = query.join(Building, Unit.building_id == Building.id).where(
+            Building.property_id == args.property_id
+        )
+    if args.status:
+        query = query.where(Unit.status == args.status)
+    return query
+
+
+@tool("list_units", ListUnitsArgs, resource="units")
+async def _list_units(db: AsyncSession, args: ListUnitsArgs):
+    rows, total = await _paged(db, _units_query(args), Unit.unit_number, args.limit)
+    return _list_result([project(u, UNIT_FIELDS) for (u,) in rows], total)
+
+
+@tool("get_vacant_units", ListUnitsArgs, resource="units")
+async def _get_vacant_units(db: AsyncSession, args: ListUnitsArgs):
+    args = args.model_copy(update={"status": "vacant"})
+    rows, total = await _paged(db, _units_query(args), Unit.unit_number, args.limit)
+    return _list_result(
+        [project(u, UNIT_FIELDS + ("available_date",)) for (u,) in rows], total
+    )
+
+
+@tool("list_smart_devices", ListSmartDevicesArgs, resource="hubs")
+async def _list_smart_devices(db: AsyncSession, args: ListSmartDevicesArgs):
+    query = select(SmartDevice)
+    if args.property_id:
+        query = query.where(SmartDevice.property_id == args.property_id)
+    if args.device_type:
+        query = query.where(SmartDevice.device_type == args.device_type)
+    rows, total = await _paged(db, query, SmartDevice.device_name, args.limit)
+    return _list_result([project(d, DEVICE_FIELDS) for (d,) in rows], total)
+
+
+@tool("get_device_status", DeviceIdArgs, resource="hubs")
+async def _get_device_status(db: AsyncSession, args: DeviceIdArgs):
+    device = await db.get(SmartDevice, args.device_id)
+    if device is None:
+        return {"error": "Device not found", "device_id": str(args.device_id)}
+    return project(device, DEVICE_FIELDS + ("home_assistant_entity_id", "last_heartbeat"))
+
+
+@tool("list_edge_nodes", ListEdgeNodesArgs, resource="hubs")
+async def _list_edge_nodes(db: AsyncSession, args: ListEdgeNodesArgs):
+    query = select(PropertyEdgeNode)
+    if args.status:
+        query = query.where(PropertyEdgeNode.status == args.status)
+    rows, total = await _paged(db, query, PropertyEdgeNode.hostname, args.limit)
+    return _list_result([project(n, EDGE_NODE_FIELDS) for (n,) in rows], total)
+
+
+@tool("get_edge_node_status", EdgeNodeIdArgs, resource="hubs")
+async def _get_edge_node_status(db: AsyncSession, args: EdgeNodeIdArgs):
+    node = await db.get(PropertyEdgeNode, args.edge_node_id)
+    if node is None:
+        return {"error": "Edge node not found", "edge_node_id": str(args.edge_node_id)}
+    return project(node, EDGE_NODE_FIELDS + ("manifest_version", "deployment_status", "last_component_sync_at"))
+
+
+# ============================================================================
+# DASHBOARD
+# ============================================================================
+
+@tool("get_dashboard_stats", resource="properties")
+async def _get_dashboard_stats(db: AsyncSession, args: ToolArgs):
+    total_properties = (await db.execute(select(func.count(Property.id)))).scalar() or 0
+    unit_rows = (await db.execute(select(Unit.status, func.count()).group_by(Unit.status))).all()
+    units_by_status = {status or "unknown": count for status, count in unit_rows}
+    total_units = sum(units_by_status.values())
+    active_leases, monthly_rent = (await db.execute(
+        select(func.count(Lease.id), func.coalesce(func.sum(Lease.rent_amount), 0))
+        .where(Lease.status == "active")
+    )).one()
+    open_work_orders = (await db.execute(
+        select(func.count(WorkOrder.id)).where(WorkOrder.status.in_(("open", "in_progress", "assigned")))
+    )).scalar() or 0
+
+    return {
+        "total_properties": total_properties,
+        "total_units": total_units,
+        "units_by_status": units_by_status,
+        "occupancy_rate": (
+            round(units_by_status.get("occupied", 0) / total_units * 100, 1) if total_units else None
+        ),
+        "active_leases": active_leases,
+        "monthly_rent_roll": float(monthly_rent or 0),
+        "open_work_orders": open_work_orders,
+    }
+
+
+# ============================================================================
+# DOCUMENT RETRIEVAL
+# ============================================================================
+
+@tool("search_documents", SearchDocumentsArgs, resource="documents", tenant_field="tenant_id")
+async def _search_documents(db: AsyncSession, args: SearchDocumentsArgs):
+    # Served from the local vector index, not the database or Paperless
+    from services.document_vector_index import document_vector_index
+
+    results = await document_vector_index.search(
+        args.query, args.k,
+        document_type=args.document_type, lease_id=args.lease_id,
+        tenant_id=args.tenant_id, property_id=args.property_id
+    )
+    if results is None:
+        return {"error": "Document search unavailable (embedding service down)"}
+    return _list_result(results, len(results))
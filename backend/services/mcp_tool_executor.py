@@ -0,0 +1,324 @@
+"""
+MCP Tool Execution Layer
+
+Runs the tools planned for one chat turn:
+- Read-only tools run concurrently (each on its own session, since an
+  AsyncSession cannot be shared between concurrent queries)
+- Read results are cached per (tool, arguments, user scope) with short TTLs
+- Write tools run sequentially, in plan order, and invalidate the cached
+  reads they affect
+- Any committed ORM write (chat or REST) invalidates the reads of the tables
+  it touched, through cache_service's after_commit hook
+- Large results are trimmed before they are embedded in an LLM prompt
+
+Per-tool timings and cache hits are returned so the caller can report a
+latency breakdown for the turn.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.auth import AuthUser
+from db.database import AsyncSessionLocal
+from services.cache_service import on_tables_committed
+
+logger = logging.getLogger(__name__)
+
+# Tools that never change data and may be cached / run concurrently
+READ_ONLY_TOOLS = frozenset({
+    "list_properties", "get_property", "get_property_analytics",
+    "list_clients", "get_client",
+    "list_tenants", "get_tenant",
+    "list_leases",
+    "list_work_orders",
+    "list_payments", "list_invoices",
+    "list_smart_devices", "get_device_status",
+    "get_utility_usage", "get_utility_costs",
+    "list_units", "get_vacant_units",
+    "list_edge_nodes", "get_edge_node_status",
+    "get_dashboard_stats",
+    "search_documents",
+})
+
+# Seconds a cached read stays fresh. Status-like data expires quickly.
+DEFAULT_CACHE_TTL = 30.0
+TOOL_CACHE_TTLS = {
+    "get_device_status": 5.0,
+    "get_edge_node_status": 10.0,
+    "list_smart_devices": 10.0,
+    "get_dashboard_stats": 30.0,
+    "list_properties": 60.0,
+    "list_clients": 60.0,
+    "search_documents": 60.0,
+}
+
+# Reads invalidated by each write tool
+WRITE_INVALIDATES = {
+    "create_property": {"list_properties", "get_property", "get_property_analytics", "get_dashboard_stats"},
+    "create_client": {"list_clients", "get_client"},
+    "create_tenant": {"list_tenants", "get_tenant"},
+    "create_lease": {"list_leases", "list_units", "get_vacant_units", "get_property", "get_tenant", "get_dashboard_stats"},
+    "create_work_order": {"list_work_orders", "get_dashboard_stats"},
+    "update_work_order_status": {"list_work_orders", "get_dashboard_stats"},
+    "create_invoice": {"list_invoices", "list_payments"},
+    "control_device": {"get_device_status", "list_smart_devices"},
+    "sync_components_to_edge_node": {"list_edge_nodes", "get_edge_node_status"},
+}
+
+# Tables each cached read is built from; a commit writing one drops the read's results.
+# Reads served over HTTP by other services (invoices, utilities) rely on their TTL.
+TOOL_TABLES = {
+    "list_properties": {"properties"},
+    "get_property": {"properties", "buildings", "units", "leases"},
+    "get_property_analytics": {"properties", "units", "leases", "rent_payments", "work_orders"},
+    "list_clients": {"clients"},
+    "get_client": {"clients"},
+    "list_tenants": {"tenants"},
+    "get_tenant": {"tenants", "leases"},
+    "list_leases": {"leases", "tenants", "units"},
+    "list_work_orders": {"work_orders"},
+    "list_payments": {"rent_payments"},
+    "list_smart_devices": {"smart_devices"},
+    "get_device_status": {"smart_devices"},
+    "list_units": {"units", "buildings"},
+    "get_vacant_units": {"units", "buildings"},
+    "list_edge_nodes": {"property_edge_nodes"},
+    "get_edge_node_status": {"property_edge_nodes"},
+    "get_dashboard_stats": {"properties", "units", "tenants", "leases", "work_orders", "rent_payments"},
+    "search_documents": {"documents"},
+}
+
+TABLE_TOOLS: Dict[str, Set[str]] = {}
+for _tool, _tables in TOOL_TABLES.items():
+    for _table in _tables:
+        TABLE_TOOLS.setdefault(_table, set()).add(_tool)
+
+# Prompt budget for tool results
+PROMPT_MAX_ITEMS = 15
+PROMPT_MAX_STRING = 300
+PROMPT_MAX_CHARS = 12000
+
+
+class ToolResultCache:
+    """In-process TTL cache of read-only tool results, invalidated by tool name"""
+
+    def __init__(self, max_entries: int = 1000, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: Dict[Tuple[str, str, str], Tuple[float, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(tool_name: str, arguments: Dict[str, Any], scope: str) -> Tuple[str, str, str]:
+        return tool_name, json.dumps(arguments or {}, sort_keys=True, default=str), scope
+
+    def get(self, key) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def set(self, key, value: Any, ttl: float):
+        if len(self._entries) >= self.max_entries:
+            self._evict()
+        self._entries[key] = (self._clock() + ttl, value)
+
+    def invalidate_tools(self, tool_names) -> int:
+        """Drop every cached result of the given tools (all arguments, all scopes)"""
+        tool_names = set(tool_names)
+        stale = [key for key in self._entries if key[0] in tool_names]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        self._entries.clear()
+
+    def _evict(self):
+        now = self._clock()
+        expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        if len(self._entries) >= self.max_entries:
+            # Still full: drop the entries closest to expiry
+            for key, _ in sorted(self._entries.items(), key=lambda kv: kv[1][0])[:self.max_entries // 10 or 1]:
+                del self._entries[key]
+
+
+def truncate_for_prompt(
+    result: Any,
+    max_items: int = PROMPT_MAX_ITEMS,
+    max_string: int = PROMPT_MAX_STRING,
+    max_chars: int = PROMPT_MAX_CHARS
+) -> Any:
+    """
+    Shrink a tool result before it is embedded in an LLM prompt
+
+    Lists are cut to `max_items` (with an "omitted" count), long strings are
+    clipped, and if the JSON is still over `max_chars` only a summary of the
+    keys and totals is kept.
+    """
+    def shrink(value):
+        if isinstance(value, dict):
+            out = {}
+            for key, item in value.items():
+                if isinstance(item, list) and len(item) > max_items:
+                    out[key] = [shrink(v) for v in item[:max_items]]
+                    out[f"{key}_omitted"] = len(item) - max_items
+                else:
+                    out[key] = shrink(item)
+            return out
+        if isinstance(value, list):
+            return [shrink(v) for v in value[:max_items]]
+        if isinstance(value, str) and len(value) > max_string:
+            return value[:max_string] + "…"
+        return value
+
+    trimmed = shrink(result)
+    if len(json.dumps(trimmed, default=str)) <= max_chars:
+        return trimmed
+
+    # Still too large: keep scalars and list sizes only
+    if isinstance(trimmed, dict):
+        return {
+            key: (f"<{len(value)} items>" if isinstance(value, list)
+                  else "<object>" if isinstance(value, dict) else value)
+            for key, value in trimmed.items()
+        }
+    return json.dumps(trimmed, default=str)[:max_chars] + "…"
+
+
+class MCPToolExecutor:
+    """Executes planned MCP tool calls for a chat turn"""
+
+    def __init__(
+        self,
+        mcp_server,
+        cache: Optional[ToolResultCache] = None,
+        session_factory=AsyncSessionLocal,
+        max_concurrency: int = 4
+    ):
+        self.mcp_server = mcp_server
+        self.cache = cache or ToolResultCache()
+        self.session_factory = session_factory
+        self.max_concurrency = max_concurrency
+
+    async def execute(
+        self,
+        tool_calls: List[Dict[str, Any]],
+        db: AsyncSession,
+        scope: str = "global",
+        auth_user: Optional[AuthUser] = None
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Execute tool calls
+
+        Args:
+            tool_calls: [{"name": ..., "arguments": {...}}, ...]
+            db: The request's session (used for writes and single reads)
+            scope: Cache partition, e.g. the user or role the results are for
+            auth_user: Caller the tools run for (checked by the dispatcher)
+
+        Returns:
+            (tool_results in plan order, per-tool timings)
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(tool_calls)
+        timings: List[Optional[Dict[str, Any]]] = [None] * len(tool_calls)
+
+        reads, writes = [], []
+        for index, call in enumerate(tool_calls):
+            (reads if call["name"] in READ_ONLY_TOOLS else writes).append(index)
+
+        # Serve cached reads, collect the misses
+        misses = []
+        for index in reads:
+            call = tool_calls[index]
+            key = ToolResultCache.make_key(call["name"], call.get("arguments"), scope)
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[index] = {"tool": call["name"], "result": cached}
+                timings[index] = {"tool": call["name"], "latency_ms": 0.0, "cached": True}
+            else:
+                misses.append((index, key))
+
+        # Independent reads run concurrently, each on its own session
+        if len(misses) == 1:
+            index, key = misses[0]
+            await self._run_read(tool_calls[index], key, db, auth_user, results, timings, index)
+        elif misses:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def run(index, key):
+                async with semaphore:
+                    async with self.session_factory() as session:
+                        await self._run_read(tool_calls[index], key, session, auth_user, results, timings, index)
+
+            await asyncio.gather(*(run(index, key) for index, key in misses))
+
+        # Writes keep their relative order and invalidate affected reads
+        for index in writes:
+            call = tool_calls[index]
+            start = time.perf_counter()
+            result = await self.mcp_server.call_tool(
+                call["name"], call.get("arguments") or {}, db=db, auth_user=auth_user
+            )
+            results[index] = {"tool": call["name"], "result": result}
+            timings[index] = {
+                "tool": call["name"],
+                "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+                "cached": False
+            }
+            if not (isinstance(result, dict) and result.get("error")):
+                invalidated = self.cache.invalidate_tools(WRITE_INVALIDATES.get(call["name"], ()))
+                if invalidated:
+                    logger.debug(f"{call['name']} invalidated {invalidated} cached tool results")
+
+        return results, timings
+
+    async def _run_read(self, call, key, session, auth_user, results, timings, index):
+        start = time.perf_counter()
+        result = await self.mcp_server.call_tool(
+            call["name"], dict(call.get("arguments") or {}), db=session, auth_user=auth_user
+        )
+        results[index] = {"tool": call["name"], "result": result}
+        timings[index] = {
+            "tool": call["name"],
+            "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+            "cached": False
+        }
+        if not (isinstance(result, dict) and result.get("error")):
+            self.cache.set(key, result, TOOL_CACHE_TTLS.get(call["name"], DEFAULT_CACHE_TTL))
+
+
+# Shared cache so results survive across chat turns
+tool_result_cache = ToolResultCache()
+
+
+def invalidate_tool_cache(*tool_names: str) -> int:
+    """Invalidate cached MCP read results (for writes made outside the AI chat)"""
+    return tool_result_cache.invalidate_tools(tool_names)
+
+
+@on_tables_committed
+def invalidate_committed_tables(tables: FrozenSet[str]) -> int:
+    """Drop cached reads built from tables a committed session wrote to"""
+    tool_names = set().union(*(TABLE_TOOLS.get(table, ()) for table in tables))
+    if not tool_names:
+        return 0
+    invalidated = invalidate_tool_cache(*tool_names)
+    if invalidated:
+        logger.debug(f"Commit to {sorted(tables)} invalidated {invalidated} cached tool results")
+    return invalidated
@@ -0,0 +1,604 @@
+"""
+Message Triage Pipeline
+
+Classifies inbound email/SMS for the agentic responder with the cheapest
+stage that can decide, so a burst of messages (e.g. a building-wide outage)
+is not throttled by one LLM round trip per message per step:
+
+1. rules      - compiled spam and intent regexes (no I/O)
+2. dedupe     - near-identical messages (any tenant) seen recently, or in
+                flight right now, reuse that classification
+3. classifier - nearest labelled exemplar by embedding (embeddings cached)
+4. llm        - remaining messages are collected for a short window and
+                classified with one combined LLM request per batch
+
+Replies are generated one request per message: their prompts carry the
+sender's tenant/lease context, which must not be shared with other senders.
+Every stage records message counts and latency; get_stats() reports
+per-stage throughput.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import re
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from services.semantic_cache import normalize_message
+
+logger = logging.getLogger(__name__)
+
+LLMFunction = Callable[[str, int], Awaitable[str]]
+EmbedFunction = Callable[[str], Awaitable[Optional[List[float]]]]
+
+STAGES = ("rules", "dedupe", "classifier", "llm", "reply")
+
+# Spam keywords matched against the message body
+EMAIL_SPAM = re.compile(
+    r"\b(viagra|casino|lottery|winner|congratulations|click here now|limited time|act now|free money)\b",
+    re.IGNORECASE
+)
+SMS_SPAM = re.compile(r"\b(viagra|casino|winner)\b", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class IntentRule:
+    intent: str
+    pattern: "re.Pattern"
+    category: str
+    priority: str
+    sentiment: str = "neutral"
+
+
+# Patterns are word-bounded phrases rather than bare keywords, so e.g. an
+# "emergency contact" or a "spare key" question is not forced into an intent
+INTENT_RULES = (
+    IntentRule(
+        "emergency",
+        re.compile(
+            r"\b(on fire|(a|the) fire (in|at|on)|fire in|smoke (is )?(coming|pouring|filling|in|from)|"
+            r"smell(s|ing)? (of )?(gas|smoke)|gas (leak|smell)|carbon monoxide|flood(ing|ed)|burst pipe|"
+            r"sparks? (coming|from|in)|sparking|electrical fire|no heat|sewage backup|break[- ]?in|"
+            r"(is|it'?s|this is|we have|there'?s|having) an emergency)\b",
+            re.IGNORECASE
+        ),
+        "maintenance", "urgent", "urgent"
+    ),
+    IntentRule(
+        "maintenance_request",
+        re.compile(
+            r"\b(leak(s|ing|y)?|broken|not working|doesn'?t work|clog(ged)?|repair|fix|drip(ping)?|"
+            r"no (hot )?water|outage|power( is)? out|ac|a/c|heater|furnace|toilet|faucet|sink|"
+            r"dishwasher|fridge|refrigerator|mold|pests?|roach(es)?|mice|smoke (detector|alarm))\b",
+            re.IGNORECASE
+        ),
+        "maintenance", "normal"
+    ),
+    IntentRule(
+        "payment_inquiry",
+        re.compile(
+            r"\b(rent|payment|pay|paid|balance|late fee|invoice|receipt|autopay|charge[sd]?|refund)\b",
+            re.IGNORECASE
+        ),
+        "financial", "normal"
+    ),
+    IntentRule(
+        "lease_question",
+        re.compile(r"\b(lease|renew(al)?|sublet|sublease|terminate|termination|lease terms?)\b", re.IGNORECASE),
+        "leasing", "normal"
+    ),
+    IntentRule(
+        "move_in_out",
+        re.compile(
+            r"\b(move[- ]?(in|out)|moving (in|out)|(pick(ing)? up|collect|return(ing)?|drop(ping)? off) "
+            r"(my |the )?keys|keys? (pick[- ]?up|handover|return)|walk[- ]?through|deposit return)\b",
+            re.IGNORECASE
+        ),
+        "leasing", "normal"
+    ),
+    IntentRule(
+        "amenity_booking",
+        re.compile(r"\b(book|reserve|reservation)\b.*\b(gym|pool|clubhouse|room|grill|court)\b", re.IGNORECASE),
+        "general", "low"
+    ),
+    IntentRule(
+        "complaint",
+        re.compile(r"\b(complain(t|ts|ing)?|noise|noisy|too loud|unacceptable|rude)\b", re.IGNORECASE),
+        "general", "normal", "negative"
+    ),
+)
+
+RULE_CONFIDENCE = 0.85
+EMERGENCY_CONFIDENCE = 0.95
+
+# Labelled examples for the embedding classifier
+INTENT_EXAMPLES = {
+    "maintenance_request": [
+        "my kitchen sink is leaking",
+        "the air conditioning in my unit stopped working",
+        "there is no hot water in my apartment",
+        "the garbage disposal is jammed",
+    ],
+    "payment_inquiry": [
+        "how much do I owe this month",
+        "did you receive my rent payment",
+        "can I set up automatic payments",
+    ],
+    "lease_question": [
+        "when does my lease end",
+        "can I renew my lease for another year",
+        "am I allowed to have a roommate under my lease",
+    ],
+    "amenity_booking": [
+        "can I reserve the clubhouse on saturday",
+        "I would like to book the party room",
+    ],
+    "move_in_out": [
+        "I am moving out at the end of next month",
+        "when can I pick up my keys",
+    ],
+    "complaint": [
+        "my upstairs neighbor is very loud every night",
+        "I am unhappy with how my request was handled",
+    ],
+    "general_inquiry": [
+        "what are the office hours",
+        "where should packages be delivered",
+    ],
+}
+
+INTENT_CATEGORIES = {
+    "maintenance_request": "maintenance",
+    "emergency": "maintenance",
+    "payment_inquiry": "financial",
+    "lease_question": "leasing",
+    "move_in_out": "leasing",
+    "amenity_booking": "general",
+    "complaint": "general",
+    "general_inquiry": "general",
+}
+
+FALLBACK_INTENT = {
+    "intent": "general_inquiry",
+    "confidence": 0.5,
+    "sentiment": "neutral",
+    "category": "general",
+    "priority": "normal",
+}
+
+
+# Fields a duplicate may reuse from another sender's message; entities (names,
+# unit numbers, amounts) and sentiment belong to the original text only
+SHARED_INTENT_FIELDS = ("intent", "confidence", "category", "priority")
+
+
+def _shared_intent(intent_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Fresh copy of a classification, safe to hand to another sender's message"""
+    shared = _intent_data(FALLBACK_INTENT["intent"], FALLBACK_INTENT["confidence"])
+    shared.update({field: intent_data[field] for field in SHARED_INTENT_FIELDS if field in intent_data})
+    return shared
+
+
+def _intent_data(intent: str, confidence: float, priority: str = "normal",
+                 sentiment: str = "neutral", category: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "intent": intent,
+        "confidence": round(confidence, 2),
+        "sentiment": sentiment,
+        "category": category or INTENT_CATEGORIES.get(intent, "general"),
+        "priority": priority,
+        "entities": {},
+    }
+
+
+def _unit(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(v * v for v in vector))
+    return [v / norm for v in vector] if norm else list(vector)
+
+
+def _dot(a: List[float], b: List[float]) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+def _parse_json_array(raw: str) -> List[Dict[str, Any]]:
+    """JSON array from an LLM reply (tolerates prose or code fences around it)"""
+    start, end = raw.find("["), raw.rfind("]")
+    if start == -1 or end <= start:
+        raise ValueError("No JSON array in LLM response")
+    items = json.loads(raw[start:end + 1])
+    return [item for item in items if isinstance(item, dict)]
+
+
+def _parse_json_object(raw: str) -> Dict[str, Any]:
+    """JSON object from an LLM reply (tolerates prose or code fences around it)"""
+    start, end = raw.find("{"), raw.rfind("}")
+    if start == -1 or end <= start:
+        raise ValueError("No JSON object in LLM response")
+    item = json.loads(raw[start:end + 1])
+    if not isinstance(item, dict):
+        raise ValueError("LLM response is not a JSON object")
+    return item
+
+
+async def _localai_embedding(text: str) -> Optional[List[float]]:
+    from services.localai_client import get_localai_client
+    return await get_localai_client().get_embedding_vector(text)
+
+
+@dataclass
+class TriageResult:
+    """Outcome of triaging one message"""
+    intent_data: Dict[str, Any]
+    is_spam: bool
+    stage: str
+    duplicate: bool = False
+
+
+class _StageStats:
+    """Message counts, latency and recent throughput for one pipeline stage"""
+
+    def __init__(self, window: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self._clock = clock
+        self.messages = 0
+        self.seconds = 0.0
+        self._recent: Deque[Tuple[float, int]] = deque()
+
+    def record(self, messages: int, seconds: float):
+        now = self._clock()
+        self.messages += messages
+        self.seconds += seconds
+        self._recent.append((now, messages))
+        while self._recent and self._recent[0][0] < now - self.window:
+            self._recent.popleft()
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = self._clock()
+        recent = sum(count for at, count in self._recent if at >= now - self.window)
+        return {
+            "messages": self.messages,
+            "avg_ms": round(self.seconds / self.messages * 1000, 2) if self.messages else 0.0,
+            "per_minute": round(recent * 60.0 / self.window, 2),
+        }
+
+
+class _MicroBatcher:
+    """Collects submitted items for `window` seconds (or `size` items) and runs them as one batch"""
+
+    def __init__(self, run: Callable[[List[Any]], Awaitable[List[Any]]], size: int, window: float):
+        self._run = run
+        self.size = size
+        self.window = window
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.create_task(self._execute(batch))
+
+    async def _execute(self, batch: List[Tuple[Any, asyncio.Future]]):
+        try:
+            results = await self._run([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+@dataclass
+class _Seen:
+    vector: Optional[List[float]]
+    intent_data: Dict[str, Any]
+    expires_at: float
+
+
+class MessageTriage:
+    """Rule-first, batched classification and per-message reply generation for inbound messages"""
+
+    def __init__(
+        self,
+        llm: LLMFunction,
+        embed: Optional[EmbedFunction] = None,
+        batch_size: int = 8,
+        batch_window: float = 0.25,
+        classifier_threshold: float = 0.82,
+        classifier_margin: float = 0.05,
+        dedupe_threshold: float = 0.95,
+        dedupe_ttl: float = 1800.0,
+        max_recent: int = 500,
+        max_embeddings: int = 2000,
+        embed_backoff: float = 60.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._llm = llm
+        self._embed = embed or _localai_embedding
+        self.classifier_threshold = classifier_threshold
+        self.classifier_margin = classifier_margin
+        self.dedupe_threshold = dedupe_threshold
+        self.dedupe_ttl = dedupe_ttl
+        self.max_recent = max_recent
+        self.max_embeddings = max_embeddings
+        self.embed_backoff = embed_backoff
+        self._clock = clock
+
+        self._classify_batcher = _MicroBatcher(self._classify_batch, batch_size, batch_window)
+        self._embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._embed_disabled_until = 0.0
+        self._examples: Optional[List[Tuple[str, List[float]]]] = None
+        # normalized text -> classification, most recent last
+        self._recent: "OrderedDict[str, _Seen]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {stage: _StageStats(clock=clock) for stage in STAGES}
+        self.llm_requests = 0
+
+    # ------------------------------------------------------------------
+    # Classification
+    # ------------------------------------------------------------------
+
+    async def triage(self, channel: str, text: str, subject: str = "") -> TriageResult:
+        """Spam flag and intent for one message"""
+        content = f"{subject}\n{text}".strip() if subject else (text or "")
+
+        started = time.perf_counter()
+        spam = (SMS_SPAM if channel == "sms" else EMAIL_SPAM).search(text or "")
+        if spam:
+            self._record("rules", started)
+            return TriageResult(_intent_data("spam", 0.95, priority="low"), True, "rules")
+        ruled = self._apply_rules(content)
+        if ruled is not None:
+            self._record("rules", started)
+            return TriageResult(ruled, False, "rules")
+
+        normalized = normalize_message(content)[:2000]
+        started = time.perf_counter()
+        vector = await self._vector(normalized)
+        seen = self._find_recent(normalized, vector)
+        if seen is not None:
+            self._record("dedupe", started)
+            return TriageResult(_shared_intent(seen), False, "dedupe", duplicate=True)
+        pending = self._inflight.get(normalized)
+        if pending is not None:
+            intent_data = await asyncio.shield(pending)
+            self._record("dedupe", started)
+            return TriageResult(_shared_intent(intent_data), False, "dedupe", duplicate=True)
+
+        started = time.perf_counter()
+        classified = await self._classify_by_example(vector)
+        if classified is not None:
+            self._record("classifier", started)
+            self._remember(normalized, vector, classified)
+            return TriageResult(classified, False, "classifier")
+
+        started = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[normalized] = future
+        intent_data = dict(FALLBACK_INTENT)
+        try:
+            intent_data = await self._classify_batcher.submit((channel, content))
+        except Exception as e:
+            logger.error(f"Batched intent detection error: {e}")
+        finally:
+            # Release identical messages waiting on this one, even if cancelled
+            self._inflight.pop(normalized, None)
+            future.set_result(intent_data)
+        self._record("llm", started)
+        if intent_data.get("confidence", 0) >= 0.7:
+            self._remember(normalized, vector, intent_data)
+        return TriageResult(intent_data, False, "llm")
+
+    def _apply_rules(self, content: str) -> Optional[Dict[str, Any]]:
+        """Intent if the rules agree on exactly one (emergency always wins)"""
+        matched = [rule for rule in INTENT_RULES if rule.pattern.search(content)]
+        if not matched:
+            return None
+        if matched[0].intent == "emergency":
+            rule = matched[0]
+            return _intent_data(rule.intent, EMERGENCY_CONFIDENCE, rule.priority, rule.sentiment, rule.category)
+        if len(matched) == 1:
+            rule = matched[0]
+            return _intent_data(rule.intent, RULE_CONFIDENCE, rule.priority, rule.sentiment, rule.category)
+        return None
+
+    async def _classify_by_example(self, vector: Optional[List[float]]) -> Optional[Dict[str, Any]]:
+        """Nearest labelled example, if clearly closer than any other intent"""
+        if vector is None:
+            return None
+        examples = await self._example_vectors()
+        best: Dict[str, float] = {}
+        for intent, example in examples:
+            if len(example) == len(vector):
+                best[intent] = max(best.get(intent, -1.0), _dot(example, vector))
+        if not best:
+            return None
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)
+        intent, score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else -1.0
+        if score < self.classifier_threshold or score - runner_up < self.classifier_margin:
+            return None
+        return _intent_data(intent, min(score, 0.9))
+
+    async def _example_vectors(self) -> List[Tuple[str, List[float]]]:
+        if self._examples is None:
+            vectors = []
+            for intent, examples in INTENT_EXAMPLES.items():
+                for example in examples:
+                    vector = await self._vector(normalize_message(example))
+                    if vector is None:
+                        # Embedding service down; try again on a later message
+                        return []
+                    vectors.append((intent, vector))
+            self._examples = vectors
+        return self._examples
+
+    async def _classify_batch(self, items: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """One LLM request classifying every message in the batch"""
+        listing = "\n\n".join(
+            f"[{i}] ({channel})\n{content[:1000]}" for i, (channel, content) in enumerate(items)
+        )
+        prompt = f"""
+Classify each of these messages sent to a property manager.
+
+{listing}
+
+Intents: maintenance_request, payment_inquiry, lease_question, amenity_booking,
+complaint, move_in_out, general_inquiry, emergency.
+Sentiment: positive, neutral, negative, urgent.
+Category: maintenance, financial, leasing, general.
+Priority: low, normal, high, urgent.
+
+Respond with a JSON array only, one object per message:
+[{{"id": 0, "intent": "intent_name", "confidence": 0.95, "sentiment": "neutral",
+  "category": "maintenance", "priority": "normal", "entities": {{}}}}]
+"""
+        self.llm_requests += 1
+        raw = await self._llm(prompt, 120 * len(items) + 100)
+        by_id = {item.get("id"): item for item in _parse_json_array(raw)}
+        results = []
+        for i in range(len(items)):
+            result = by_id.get(i)
+            if not result or "intent" not in result:
+                results.append(dict(FALLBACK_INTENT))
+                continue
+            result.pop("id", None)
+            results.append(result)
+        return results
+
+    # ------------------------------------------------------------------
+    # Replies
+    # ------------------------------------------------------------------
+
+    async def generate_reply(
+        self,
+        channel: str,
+        content: str,
+        context: Dict[str, Any],
+        intent_data: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Reply {"text", "html"?} from one LLM request for this message; None on failure
+
+        Not batched: the context belongs to this sender alone.
+        """
+        started = time.perf_counter()
+        try:
+            return await self._reply(channel, content, context, intent_data.get("intent"))
+        except Exception as e:
+            logger.error(f"Reply generation error: {e}")
+            return None
+        finally:
+            self._record("reply", started)
+
+    async def _reply(self, channel: str, content: str, context: Dict[str, Any],
+                     intent: Optional[str]) -> Optional[Dict[str, Any]]:
+        if channel == "sms":
+            format_rules = 'At most 160 characters; include "text" only.'
+        else:
+            format_rules = ('Professional: acknowledge the message, answer it, give next steps, '
+                            'and close politely; include "text" and "html".')
+        prompt = f"""
+Write a reply to this {channel} message sent to a property manager.
+
+Intent: {intent}
+Context: {json.dumps(context, default=str)}
+Message: {content[:1000]}
+
+{format_rules}
+
+Respond with a JSON object only:
+{{"text": "plain text reply", "html": "<p>formatted reply</p>"}}
+"""
+        self.llm_requests += 1
+        raw = await self._llm(prompt, 500)
+        reply = _parse_json_object(raw)
+        if not reply.get("text"):
+            return None
+        if channel == "sms" and len(reply["text"]) > 160:
+            reply["text"] = reply["text"][:157] + "..."
+        return reply
+
+    # ------------------------------------------------------------------
+    # Embeddings and de-duplication
+    # ------------------------------------------------------------------
+
+    async def _vector(self, normalized: str) -> Optional[List[float]]:
+        if not normalized:
+            return None
+        if normalized in self._embeddings:
+            self._embeddings.move_to_end(normalized)
+            return self._embeddings[normalized]
+        if self._clock() < self._embed_disabled_until:
+            return None
+        try:
+            raw = await self._embed(normalized)
+        except Exception as e:
+            logger.debug(f"Embedding failed: {e}")
+            raw = None
+        if not raw:
+            self._embed_disabled_until = self._clock() + self.embed_backoff
+            return None
+        vector = _unit(raw)
+        self._embeddings[normalized] = vector
+        if len(self._embeddings) > self.max_embeddings:
+            self._embeddings.popitem(last=False)
+        return vector
+
+    def _find_recent(self, normalized: str, vector: Optional[List[float]]) -> Optional[Dict[str, Any]]:
+        now = self._clock()
+        while self._recent:
+            oldest_key, oldest = next(iter(self._recent.items()))
+            if oldest.expires_at > now:
+                break
+            del self._recent[oldest_key]
+
+        seen = self._recent.get(normalized)
+        if seen is not None:
+            return seen.intent_data
+        if vector is None:
+            return None
+        for entry in reversed(self._recent.values()):
+            if entry.vector is not None and len(entry.vector) == len(vector) \
+                    and _dot(entry.vector, vector) >= self.dedupe_threshold:
+                return entry.intent_data
+        return None
+
+    def _remember(self, normalized: str, vector: Optional[List[float]], intent_data: Dict[str, Any]):
+        self._recent.pop(normalized, None)
+        self._recent[normalized] = _Seen(vector, _shared_intent(intent_data), self._clock() + self.dedupe_ttl)
+        while len(self._recent) > self.max_recent:
+            self._recent.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def _record(self, stage: str, started: float):
+        self.stats[stage].record(1, time.perf_counter() - started)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "stages": {stage: stats.snapshot() for stage, stats in self.stats.items()},
+            "llm_requests": self.llm_requests,
+            "recent_messages": len(self._recent),
+        }
@@ -0,0 +1,528 @@
+"""
+Mobile Sync Service
+
+Change feed for the offline-first mobile app:
+
+- Every ORM flush that creates, updates or deletes one of the synced entity
+  types appends a row to sync_change_log (after_flush listener below). The
+  log's seq is monotonically increasing and serves as the entity version.
+- Pull returns only the latest change per entity after the cursor, keyset
+  paginated on (txid, seq), with the current row serialized for non-deletes.
+  seq is assigned at insert time, so a transaction can commit a lower seq
+  after a higher one was already pulled. On PostgreSQL each row records its
+  transaction id and a pull only returns rows from transactions older than
+  the oldest one still in progress (pg_snapshot_xmin); anything committed
+  later has a higher txid and so sorts after the cursor.
+- Push applies a batch of device changes, each checked against the entity's
+  current version; stale writes become SyncConflict rows instead of
+  silently overwriting newer server data.
+
+Changes made with bulk UPDATE/DELETE statements bypass the ORM and are not
+recorded; synced entities should be modified through the session.
+"""
+
+import logging
+import uuid
+import weakref
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import (
+    Date, DateTime, Numeric, Time, and_, event, func, insert, inspect, literal_column, or_, select, text
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+
+from db.models import (
+    Property, Building, Unit, Tenant, Lease, WorkOrder, RentPayment, SupportTicket, IoTDevice
+)
+from db.models_mobile_sync import SyncChangeLog, MobileSyncDevice, SyncConflict
+from db.types import GUID
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PULL_LIMIT = 500
+MAX_PULL_LIMIT = 1000
+MAX_PUSH_BATCH = 500
+
+# entity_type -> (model, display name); entity_type names match the mobile app's tables
+SYNC_ENTITIES = {
+    "properties": (Property, "Properties"),
+    "buildings": (Building, "Buildings"),
+    "units": (Unit, "Units"),
+    "tenants": (Tenant, "Tenants"),
+    "leases": (Lease, "Leases"),
+    "work_orders": (WorkOrder, "Work Orders"),
+    "rent_payments": (RentPayment, "Rent Payments"),
+    "support_tickets": (SupportTicket, "Support Tickets"),
+    "iot_devices": (IoTDevice, "IoT Devices"),
+}
+_ENTITY_TYPE_BY_MODEL = {model: entity_type for entity_type, (model, _) in SYNC_ENTITIES.items()}
+
+# Columns a device may not set directly
+READ_ONLY_FIELDS = {"id", "created_at", "updated_at", "version"}
+
+OPERATIONS = ("CREATE", "UPDATE", "DELETE")
+
+# Transaction id of the writing transaction, and the oldest one still running
+CURRENT_TXID = literal_column("pg_current_xact_id()::text::bigint")
+VISIBLE_HORIZON_SQL = text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+
+
+class FeedPosition(NamedTuple):
+    """Pull cursor: the (txid, seq) of the last change a device received"""
+    txid: int
+    seq: int
+
+
+START = FeedPosition(0, 0)
+
+
+class SyncError(Exception):
+    """A pushed change that cannot be applied (bad type, missing row, invalid data)"""
+
+
+# ----------------------------------------------------------------------
+# Serialization
+# ----------------------------------------------------------------------
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def entity_data(obj: Any) -> Dict[str, Any]:
+    """Column values of an entity as JSON-compatible data"""
+    mapper = inspect(obj).mapper
+    return {attr.key: _jsonable(getattr(obj, attr.key)) for attr in mapper.column_attrs}
+
+
+def _coerce(column: Any, value: Any) -> Any:
+    """Device JSON value -> Python value for the column type"""
+    if value is None or not isinstance(value, str):
+        if isinstance(value, float) and isinstance(column.type, Numeric) and column.type.asdecimal:
+            return Decimal(str(value))
+        return value
+    column_type = column.type
+    if isinstance(column_type, GUID):
+        return uuid.UUID(value)
+    if isinstance(column_type, DateTime):
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if isinstance(column_type, Date):
+        return date.fromisoformat(value[:10])
+    if isinstance(column_type, Time):
+        return time.fromisoformat(value)
+    if isinstance(column_type, Numeric) and column_type.asdecimal:
+        return Decimal(value)
+    return value
+
+
+def _writable_values(model: Any, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Known, device-writable columns from pushed data, coerced to column types"""
+    columns = {attr.key: attr.columns[0] for attr in inspect(model).column_attrs}
+    values = {}
+    for key, value in (data or {}).items():
+        if key in READ_ONLY_FIELDS or key not in columns:
+            continue
+        try:
+            values[key] = _coerce(columns[key], value)
+        except ValueError as e:
+            raise SyncError(f"Invalid value for {key}: {e}")
+    return values
+
+
+def _entity_uuid(entity_id: Optional[str]) -> uuid.UUID:
+    try:
+        return uuid.UUID(str(entity_id))
+    except ValueError:
+        raise SyncError(f"Invalid entity_id: {entity_id}")
+
+
+# ----------------------------------------------------------------------
+# Change capture
+# ----------------------------------------------------------------------
+
+_log_table_present: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _change_log_available(connection) -> bool:
+    """Whether sync_change_log exists (checked once per engine, e.g. before migrations run)"""
+    engine = connection.engine
+    present = _log_table_present.get(engine)
+    if present is None:
+        present = inspect(connection).has_table(SyncChangeLog.__tablename__)
+        _log_table_present[engine] = present
+    return present
+
+
+def collect_changes(session: Session) -> List[Dict[str, Any]]:
+    """Change-log rows for the synced entities in the flush being processed"""
+    device_id = session.info.get("sync_device_id")
+    user_id = session.info.get("sync_user_id")
+    rows = []
+
+    def add(obj, operation, changed_fields=None):
+        entity_type = _ENTITY_TYPE_BY_MODEL.get(type(obj))
+        if entity_type is None or getattr(obj, "id", None) is None:
+            return
+        rows.append({
+            "entity_type": entity_type,
+            "entity_id": str(obj.id),
+            "operation": operation,
+            "changed_fields": changed_fields,
+            "user_id": user_id,
+            "device_id": device_id,
+        })
+
+    for obj in session.new:
+        add(obj, "CREATE")
+    for obj in session.dirty:
+        if type(obj) not in _ENTITY_TYPE_BY_MODEL:
+            continue
+        state = inspect(obj)
+        changed = [attr.key for attr in state.mapper.column_attrs if state.attrs[attr.key].history.has_changes()]
+        if changed:
+            add(obj, "UPDATE", changed)
+    for obj in session.deleted:
+        add(obj, "DELETE")
+    return rows
+
+
+@event.listens_for(Session, "after_flush")
+def _record_sync_changes(session: Session, flush_context):
+    rows = collect_changes(session)
+    if not rows:
+        return
+    connection = session.connection()
+    if _change_log_available(connection):
+        stmt = insert(SyncChangeLog.__table__)
+        if connection.dialect.name == "postgresql":
+            stmt = stmt.values(txid=CURRENT_TXID)
+        connection.execute(stmt, rows)
+
+
+# ----------------------------------------------------------------------
+# Versions
+# ----------------------------------------------------------------------
+
+async def current_versions(db: AsyncSession, entity_type: str, entity_ids: Sequence[str]) -> Dict[str, int]:
+    """Latest change-log seq per entity (entities with no changes are absent)"""
+    if not entity_ids:
+        return {}
+    result = await db.execute(
+        select(SyncChangeLog.entity_id, func.max(SyncChangeLog.seq))
+        .where(SyncChangeLog.entity_type == entity_type, SyncChangeLog.entity_id.in_(list(entity_ids)))
+        .group_by(SyncChangeLog.entity_id)
+    )
+    return {entity_id: seq for entity_id, seq in result.all()}
+
+
+# ----------------------------------------------------------------------
+# Pull
+# ----------------------------------------------------------------------
+
+def encode_cursor(position: FeedPosition) -> str:
+    return f"{position.txid}.{position.seq}"
+
+
+def decode_cursor(cursor: Optional[str]) -> FeedPosition:
+    if not cursor:
+        return START
+    try:
+        txid, _, seq = cursor.rpartition(".")
+        position = FeedPosition(int(txid or 0), int(seq))
+    except ValueError:
+        raise SyncError(f"Invalid cursor: {cursor}")
+    if position.txid < 0 or position.seq < 0:
+        raise SyncError(f"Invalid cursor: {cursor}")
+    return position
+
+
+async def visible_horizon(db: AsyncSession) -> Optional[int]:
+    """
+    Oldest transaction id still in progress (None off PostgreSQL)
+
+    Every change log row with a lower txid is final: committed or rolled
+    back. SQLite holds its write lock until commit, so seq order is already
+    commit order there.
+    """
+    connection = await db.connection()
+    if connection.dialect.name != "postgresql":
+        return None
+    return (await connection.execute(VISIBLE_HORIZON_SQL)).scalar()
+
+
+async def pull_changes(
+    db: AsyncSession,
+    after: FeedPosition,
+    limit: int = DEFAULT_PULL_LIMIT,
+    entity_types: Optional[Sequence[str]] = None
+) -> Tuple[List[Dict[str, Any]], FeedPosition, bool]:
+    """
+    Latest change per entity after the `after` position, oldest first
+
+    Returns (changes, next_position, has_more). An entity changed again while
+    a device is paging is skipped at its older seq and returned at its newer
+    one, so every page reflects current data. Changes from transactions at
+    or above the visible horizon are held back until a later pull, so a
+    late commit is never left behind the cursor.
+    """
+    newer = aliased(SyncChangeLog)
+    latest_for_entity = (
+        select(func.max(newer.seq))
+        .where(newer.entity_type == SyncChangeLog.entity_type, newer.entity_id == SyncChangeLog.entity_id)
+        .scalar_subquery()
+    )
+    stmt = select(SyncChangeLog).where(
+        or_(
+            SyncChangeLog.txid > after.txid,
+            and_(SyncChangeLog.txid == after.txid, SyncChangeLog.seq > after.seq)
+        ),
+        SyncChangeLog.seq == latest_for_entity
+    )
+    horizon = await visible_horizon(db)
+    if horizon is not None:
+        stmt = stmt.where(SyncChangeLog.txid < horizon)
+    if entity_types:
+        stmt = stmt.where(SyncChangeLog.entity_type.in_(list(entity_types)))
+    stmt = stmt.order_by(SyncChangeLog.txid, SyncChangeLog.seq).limit(limit + 1)
+    entries = (await db.execute(stmt)).scalars().all()
+
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    # Current rows, one query per entity type
+    rows: Dict[Tuple[str, str], Any] = {}
+    by_type: Dict[str, List[uuid.UUID]] = {}
+    for entry in entries:
+        if entry.operation != "DELETE":
+            by_type.setdefault(entry.entity_type, []).append(uuid.UUID(entry.entity_id))
+    for entity_type, ids in by_type.items():
+        model = SYNC_ENTITIES[entity_type][0]
+        for obj in (await db.execute(select(model).where(model.id.in_(ids)))).scalars().all():
+            rows[(entity_type, str(obj.id))] = obj
+
+    changes = []
+    for entry in entries:
+        obj = rows.get((entry.entity_type, entry.entity_id))
+        data = None
+        operation = entry.operation
+        if obj is not None:
+            data = entity_data(obj)
+            data["version"] = entry.seq
+        else:
+            operation = "DELETE"
+        changes.append({
+            "id": str(entry.seq),
+            "entity_type": entry.entity_type,
+            "entity_id": entry.entity_id,
+            "operation": operation,
+            "data": data,
+            "changed_fields": entry.changed_fields,
+            "version": entry.seq,
+            "user_id": entry.user_id,
+            "created_at": _jsonable(entry.created_at),
+        })
+
+    next_position = FeedPosition(entries[-1].txid, entries[-1].seq) if entries else after
+    return changes, next_position, has_more
+
+
+# ----------------------------------------------------------------------
+# Push
+# ----------------------------------------------------------------------
+
+def _conflicting_fields(values: Dict[str, Any], obj: Any) -> List[str]:
+    return sorted(key for key, value in values.items() if getattr(obj, key) != value)
+
+
+async def push_changes(
+    db: AsyncSession,
+    device: MobileSyncDevice,
+    changes: Sequence[Dict[str, Any]],
+    user_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Apply a batch of device changes; one result per change, in order
+
+    A change carries the version (change-log seq) of the row the device
+    edited; without one, the device's pull position is used. If the server
+    row has a newer version and differs in the pushed fields, a SyncConflict
+    is recorded instead. Each change runs in its own savepoint so one bad
+    change does not discard the rest of the batch.
+    """
+    db.info["sync_device_id"] = device.device_id
+    db.info["sync_user_id"] = user_id
+
+    # Load every targeted row and its version up front: one query per entity type
+    targets: Dict[str, List[uuid.UUID]] = {}
+    for change in changes:
+        if change.get("entity_type") in SYNC_ENTITIES and change.get("entity_id"):
+            try:
+                targets.setdefault(change["entity_type"], []).append(_entity_uuid(change["entity_id"]))
+            except SyncError:
+                pass
+    rows: Dict[Tuple[str, str], Any] = {}
+    versions: Dict[Tuple[str, str], int] = {}
+    for entity_type, ids in targets.items():
+        model = SYNC_ENTITIES[entity_type][0]
+        for obj in (await db.execute(select(model).where(model.id.in_(ids)))).scalars().all():
+            rows[(entity_type, str(obj.id))] = obj
+        for entity_id, seq in (await current_versions(db, entity_type, [str(i) for i in ids])).items():
+            versions[(entity_type, entity_id)] = seq
+
+    results = []
+    try:
+        for change in changes:
+            result = {
+                "local_id": change.get("local_id"),
+                "entity_id": change.get("entity_id"),
+                "entity_type": change.get("entity_type"),
+                "operation": change.get("operation"),
+                "status": "success",
+                "version": None,
+                "conflict_id": None,
+                "error": None,
+            }
+            try:
+                async with db.begin_nested():
+                    await _apply_change(db, device, change, result, rows, versions)
+            except SyncError as e:
+                result["status"] = "error"
+                result["error"] = str(e)
+            except Exception as e:
+                logger.warning(f"Mobile sync push failed for {change.get('entity_type')}/{change.get('entity_id')}: {e}")
+                result["status"] = "error"
+                result["error"] = str(e)
+            results.append(result)
+
+        # Versions assigned by the flush listener
+        applied: Dict[str, List[str]] = {}
+        for result in results:
+            if result["status"] == "success" and result["entity_id"] and result["operation"] != "DELETE":
+                applied.setdefault(result["entity_type"], []).append(result["entity_id"])
+        for entity_type, ids in applied.items():
+            found = await current_versions(db, entity_type, ids)
+            for result in results:
+                if result["entity_type"] == entity_type and result["entity_id"] in found:
+                    result["version"] = found[result["entity_id"]]
+    finally:
+        db.info.pop("sync_device_id", None)
+        db.info.pop("sync_user_id", None)
+    return results
+
+
+async def _apply_change(db, device, change, result, rows, versions):
+    entity_type = change.get("entity_type")
+    operation = change.get("operation")
+    if entity_type not in SYNC_ENTITIES:
+        raise SyncError(f"Unknown entity type: {entity_type}")
+    if operation not in OPERATIONS:
+        raise SyncError(f"Unknown operation: {operation}")
+    model = SYNC_ENTITIES[entity_type][0]
+    values = _writable_values(model, change.get("data") or {})
+
+    if operation == "CREATE":
+        entity_id = change.get("entity_id") or (change.get("data") or {}).get("id")
+        if entity_id and (entity_type, str(_entity_uuid(entity_id))) in rows:
+            # Retried create that already reached the server
+            result["entity_id"] = str(_entity_uuid(entity_id))
+            return
+        obj = model(id=_entity_uuid(entity_id) if entity_id else uuid.uuid4(), **values)
+        db.add(obj)
+        await db.flush()
+        result["entity_id"] = str(obj.id)
+        rows[(entity_type, str(obj.id))] = obj
+        return
+
+    entity_id = str(_entity_uuid(change.get("entity_id")))
+    obj = rows.get((entity_type, entity_id))
+    if obj is None:
+        if operation == "DELETE":
+            return  # Already gone
+        raise SyncError(f"{entity_type} {entity_id} not found")
+
+    server_version = versions.get((entity_type, entity_id), 0)
+    client_version = change.get("version")
+    if client_version is None:
+        client_version = device.last_pulled_seq or 0
+    if server_version > client_version:
+        conflicting = _conflicting_fields(values, obj) if operation == "UPDATE" else ["_deleted"]
+        if conflicting:
+            conflict = SyncConflict(
+                device_id=device.device_id,
+                entity_type=entity_type,
+                entity_id=entity_id,
+                operation=operation,
+                client_version=client_version,
+                server_version=server_version,
+                client_data=change.get("data") or {},
+                server_data=entity_data(obj),
+                conflicting_fields=conflicting,
+            )
+            db.add(conflict)
+            await db.flush()
+            result["status"] = "conflict"
+            result["conflict_id"] = str(conflict.id)
+            result["version"] = server_version
+            return
+        # The device wants exactly what the server already has
+        result["version"] = server_version
+        return
+
+    if operation == "DELETE":
+        await db.delete(obj)
+        await db.flush()
+        rows.pop((entity_type, entity_id), None)
+        return
+    for key, value in values.items():
+        setattr(obj, key, value)
+    await db.flush()
+
+
+async def resolve_conflict(
+    db: AsyncSession,
+    conflict: SyncConflict,
+    strategy: str,
+    resolved_data: Optional[Dict[str, Any]] = None,
+    user_id: Optional[str] = None
+) -> int:
+    """Apply a conflict resolution; returns the entity's version afterwards"""
+    model = SYNC_ENTITIES[conflict.entity_type][0]
+    obj = await db.get(model, uuid.UUID(conflict.entity_id))
+
+    data = None
+    if strategy == "client_wins":
+        data = conflict.client_data or {}
+    elif strategy in ("merge", "manual"):
+        if resolved_data is None:
+            raise SyncError(f"resolved_data is required for {strategy}")
+        data = resolved_data
+
+    db.info["sync_device_id"] = conflict.device_id
+    db.info["sync_user_id"] = user_id
+    try:
+        if data is not None:
+            if conflict.operation == "DELETE" and strategy == "client_wins":
+                if obj is not None:
+                    await db.delete(obj)
+            elif obj is None:
+                raise SyncError(f"{conflict.entity_type} {conflict.entity_id} no longer exists")
+            else:
+                for key, value in _writable_values(model, data).items():
+                    setattr(obj, key, value)
+        conflict.status = "resolved"
+        conflict.resolution_strategy = strategy
+        conflict.resolved_at = datetime.now(timezone.utc)
+        await db.flush()
+    finally:
+        db.info.pop("sync_device_id", None)
+        db.info.pop("sync_user_id", None)
+
+    return (await current_versions(db, conflict.entity_type, [conflict.entity_id])).get(conflict.entity_id, 0)
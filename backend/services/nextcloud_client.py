@@ -20,11 +20,12 @@ import logging
 from typing import Optional, List, Dict, Any, BinaryIO
 from datetime import datetime
 from enum import Enum
-import httpx
 from pydantic import BaseModel
 import xml.etree.ElementTree as ET
 from urllib.parse import quote
 
+from services.http_client_registry import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -101,7 +102,7 @@ class NextcloudClient:
         self.username = username
         self.password = password
         self.timeout = timeout
-        self.client = httpx.AsyncClient(timeout=timeout)
+        self.client = get_http_client("nextcloud", timeout=timeout)
 
         # WebDAV endpoint
         self.webdav_url = f"{self.base_url}/remote.php/dav/files/{username}"
@@ -109,8 +110,8 @@ class NextcloudClient:
         self.ocs_url = f"{self.base_url}/ocs/v2.php"
 
     async def close(self):
-        """Close HTTP client"""
-        await self.client.aclose()
+        """Release HTTP client (the shared pool is closed at application shutdown)"""
+        pass
 
     def _auth(self) -> Optional[tuple]:
         """Get HTTP basic authentication tuple"""
@@ -20,9 +20,10 @@ import logging
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
-import httpx
 from pydantic import BaseModel
 
+from services.http_client_registry import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -94,11 +95,11 @@ class NovuClient:
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
         self.timeout = timeout
-        self.client = httpx.AsyncClient(timeout=timeout)
+        self.client = get_http_client("novu", timeout=timeout)
 
     async def close(self):
-        """Close HTTP client"""
-        await self.client.aclose()
+        """Release HTTP client (the shared pool is closed at application shutdown)"""
+        pass
 
     def _headers(self) -> Dict[str, str]:
         """Get request headers with authentication"""
@@ -253,7 +254,8 @@ class NovuClient:
         subscriber_id: str,
         payload: Dict[str, Any],
         actor: Optional[Dict[str, str]] = None,
-        overrides: Optional[Dict[str, Any]] = None
+        overrides: Optional[Dict[str, Any]] = None,
+        transaction_id: Optional[str] = None
     ) -> Optional[str]:
         """
         Trigger a notification workflow
@@ -270,6 +272,8 @@ class NovuClient:
             payload: Template variables (e.g., {"work_order_id": "WO-123", "unit": "204"})
             actor: Who triggered the notification (e.g., {"subscriberId": "system"})
             overrides: Channel-specific overrides
+            transaction_id: Caller-chosen unique ID; Novu ignores a repeated
+                trigger with the same ID, so retries cannot notify twice
 
         Returns:
             Transaction ID or None on failure
@@ -287,6 +291,8 @@ class NovuClient:
                 request_payload["actor"] = actor
             if overrides:
                 request_payload["overrides"] = overrides
+            if transaction_id:
+                request_payload["transactionId"] = transaction_id
 
             response = await self.client.post(
                 f"{self.base_url}/v1/events/trigger",
@@ -592,7 +598,8 @@ class NovuClient:
         work_order_title: str,
         status: str,
         message: str,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        transaction_id: Optional[str] = None
     ) -> Optional[str]:
         """
         Send work order status update to tenant
@@ -604,6 +611,7 @@ class NovuClient:
             status: New status
             message: Update message
             metadata: Additional metadata
+            transaction_id: Idempotency key for the trigger
 
         Returns:
             Transaction ID or None on failure
@@ -619,7 +627,8 @@ class NovuClient:
         return await self.trigger(
             event_name="work-order-update",
             subscriber_id=tenant_id,
-            payload=payload
+            payload=payload,
+            transaction_id=transaction_id
         )
 
     async def send_payment_reminder(
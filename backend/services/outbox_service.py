@@ -0,0 +1,449 @@
+"""
+Integration Outbox - Durable Delivery of External Side Effects
+
+Business transactions (e.g. creating a work order) enqueue one outbox row per
+external integration call in the same DB transaction. A background
+dispatcher drains due rows, calls the integration, and retries transient
+failures with exponential backoff until they succeed or exhaust their
+attempts and land in the dead-letter state.
+
+A call that is not idempotent is only retried when it certainly did not
+reach the service (connection refused, 429). After a timeout or 5xx it may
+already have created its task or notification, so the row is dead-lettered
+for manual review (requeue_dead_letter) instead of being repeated.
+
+Guarantees:
+- A side effect is recorded iff the business transaction commits
+- Each (aggregate, integration) pair has a unique idempotency key, so
+  re-enqueueing is a no-op and a succeeded call is never repeated
+- Request latency no longer includes any third-party call
+"""
+
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import select, func, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.database import AsyncSessionLocal
+from db.models_outbox import IntegrationOutbox
+from services.workflow_engine import is_retryable, is_safe_to_repeat
+
+logger = logging.getLogger(__name__)
+
+# Handler signature: (session, outbox_row) -> integration result (or None)
+OutboxHandler = Callable[[AsyncSession, IntegrationOutbox], Awaitable[Optional[Dict[str, Any]]]]
+
+# Idempotency check signature: (session, outbox_row) -> whether the row's call may be repeated
+IdempotencyCheck = Callable[[AsyncSession, IntegrationOutbox], bool]
+
+_handlers: Dict[str, OutboxHandler] = {}
+_idempotency_checks: Dict[str, IdempotencyCheck] = {}
+
+
+def register_outbox_handler(
+    aggregate_type: str,
+    handler: OutboxHandler,
+    is_idempotent: Optional[IdempotencyCheck] = None
+):
+    """
+    Register the delivery handler for an aggregate type
+
+    is_idempotent says whether a row's call can safely be repeated after an
+    ambiguous failure; without it every call is treated as non-idempotent.
+    """
+    _handlers[aggregate_type] = handler
+    if is_idempotent is not None:
+        _idempotency_checks[aggregate_type] = is_idempotent
+    else:
+        _idempotency_checks.pop(aggregate_type, None)
+
+
+def make_idempotency_key(aggregate_type: str, aggregate_id: str, integration: str) -> str:
+    """Stable idempotency key for one integration call of one aggregate"""
+    return f"{aggregate_type}:{aggregate_id}:{integration}"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_aware(value: Optional[datetime]) -> Optional[datetime]:
+    """SQLite returns naive datetimes; treat them as UTC"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+async def enqueue(
+    db: AsyncSession,
+    aggregate_type: str,
+    aggregate_id: str,
+    integration: str,
+    payload: Dict[str, Any],
+    depends_on: Optional[List[str]] = None,
+    max_attempts: int = 8
+) -> IntegrationOutbox:
+    """
+    Add an outbox row to the caller's session (does NOT commit)
+
+    The caller commits it together with the business change. If a row with
+    the same idempotency key already exists it is returned unchanged.
+    """
+    key = make_idempotency_key(aggregate_type, aggregate_id, integration)
+
+    existing = await db.execute(
+        select(IntegrationOutbox).where(IntegrationOutbox.idempotency_key == key)
+    )
+    row = existing.scalar_one_or_none()
+    if row is not None:
+        return row
+
+    row = IntegrationOutbox(
+        aggregate_type=aggregate_type,
+        aggregate_id=aggregate_id,
+        integration=integration,
+        payload=payload,
+        depends_on=depends_on or [],
+        idempotency_key=key,
+        status='pending',
+        attempts=0,
+        max_attempts=max_attempts,
+        next_attempt_at=_utcnow()
+    )
+    db.add(row)
+    return row
+
+
+# ============================================================================
+# WORK ORDER INTEGRATIONS
+# ============================================================================
+
+def _encode_workflow_args(workflow_args: Dict[str, Any]) -> Dict[str, Any]:
+    """Make work order workflow arguments JSON-safe"""
+    encoded = dict(workflow_args)
+    if isinstance(encoded.get("estimated_cost"), Decimal):
+        encoded["estimated_cost"] = str(encoded["estimated_cost"])
+    return encoded
+
+
+def _decode_workflow_args(payload: Dict[str, Any]) -> Dict[str, Any]:
+    decoded = dict(payload)
+    if decoded.get("estimated_cost") is not None:
+        decoded["estimated_cost"] = Decimal(str(decoded["estimated_cost"]))
+    return decoded
+
+
+async def enqueue_work_order_workflow(
+    db: AsyncSession,
+    workflow_args: Dict[str, Any]
+) -> List[IntegrationOutbox]:
+    """
+    Enqueue every enabled work order integration for asynchronous delivery
+
+    Args:
+        db: Session holding the (uncommitted) work order
+        workflow_args: Keyword arguments of
+            IntegrationOrchestrator.execute_complete_work_order_workflow
+
+    Returns:
+        The outbox rows added to the session
+    """
+    from services.integration_orchestrator import IntegrationOrchestrator
+
+    steps = IntegrationOrchestrator(db)._build_work_order_steps(**workflow_args)
+    enabled = {step.name for step in steps if step.enabled}
+    payload = _encode_workflow_args(workflow_args)
+
+    rows = []
+    for step in steps:
+        if not step.enabled:
+            continue
+        rows.append(await enqueue(
+            db,
+            aggregate_type="work_order",
+            aggregate_id=str(workflow_args["work_order_id"]),
+            integration=step.name,
+            payload=payload,
+            depends_on=[dep for dep in step.depends_on if dep in enabled]
+        ))
+    return rows
+
+
+async def _deliver_work_order_step(db: AsyncSession, row: IntegrationOutbox) -> Optional[Dict[str, Any]]:
+    from services.integration_orchestrator import IntegrationOrchestrator
+
+    orchestrator = IntegrationOrchestrator(db)
+    return await orchestrator.execute_work_order_step(row.integration, _decode_workflow_args(row.payload))
+
+
+def _work_order_step_idempotent(db: AsyncSession, row: IntegrationOutbox) -> bool:
+    from services.integration_orchestrator import IntegrationOrchestrator
+
+    orchestrator = IntegrationOrchestrator(db)
+    return orchestrator.work_order_step(row.integration, _decode_workflow_args(row.payload)).idempotent
+
+
+register_outbox_handler("work_order", _deliver_work_order_step, is_idempotent=_work_order_step_idempotent)
+
+
+# ============================================================================
+# DISPATCHER
+# ============================================================================
+
+class OutboxDispatcher:
+    """
+    Background worker that drains the integration outbox
+
+    Rows are claimed with FOR UPDATE SKIP LOCKED (on PostgreSQL) so several
+    workers or pods can drain the same table. A row stuck in 'processing'
+    longer than `lease_seconds` (worker crash) is reclaimed.
+    """
+
+    def __init__(
+        self,
+        poll_interval: float = 2.0,
+        batch_size: int = 20,
+        concurrency: int = 8,
+        base_backoff_seconds: float = 5.0,
+        max_backoff_seconds: float = 3600.0,
+        lease_seconds: int = 300
+    ):
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.lease_seconds = lease_seconds
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"delivered": 0, "retried": 0, "dead": 0}
+
+    async def start(self):
+        """Start the dispatcher loop"""
+        if self.running:
+            return
+        self.running = True
+        self._task = asyncio.create_task(self._loop())
+        logger.info("Integration outbox dispatcher started")
+
+    async def stop(self):
+        """Stop the dispatcher loop"""
+        if not self.running:
+            return
+        self.running = False
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        logger.info("Integration outbox dispatcher stopped")
+
+    def backoff_delay(self, attempts: int) -> float:
+        """Exponential backoff with +/-20% jitter for the given attempt count"""
+        delay = min(self.base_backoff_seconds * (2 ** max(attempts - 1, 0)), self.max_backoff_seconds)
+        return delay * random.uniform(0.8, 1.2)
+
+    async def _loop(self):
+        while self.running:
+            try:
+                processed = await self.run_once()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Outbox dispatcher error: {e}", exc_info=True)
+                processed = 0
+
+            # Drain backlogs quickly; idle-poll otherwise
+            if processed < self.batch_size:
+                try:
+                    await asyncio.sleep(self.poll_interval)
+                except asyncio.CancelledError:
+                    break
+
+    async def run_once(self) -> int:
+        """Claim and deliver one batch of due rows; returns rows processed"""
+        claimed = await self._claim_batch()
+        if not claimed:
+            return 0
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def deliver(row_id):
+            async with semaphore:
+                await self._deliver(row_id)
+
+        await asyncio.gather(*(deliver(row_id) for row_id in claimed))
+        return len(claimed)
+
+    async def _claim_batch(self) -> List:
+        """Mark a batch of due rows as processing and return their IDs"""
+        now = _utcnow()
+        lease_cutoff = now - timedelta(seconds=self.lease_seconds)
+
+        async with AsyncSessionLocal() as session:
+            stmt = (
+                select(IntegrationOutbox)
+                .where(or_(
+                    and_(IntegrationOutbox.status == 'pending', IntegrationOutbox.next_attempt_at <= now),
+                    and_(IntegrationOutbox.status == 'processing', IntegrationOutbox.locked_at < lease_cutoff),
+                ))
+                .order_by(IntegrationOutbox.next_attempt_at)
+                .limit(self.batch_size * 2)
+                .with_for_update(skip_locked=True)
+            )
+            candidates = (await session.execute(stmt)).scalars().all()
+            if not candidates:
+                return []
+
+            blocked = await self._blocked_by_dependencies(session, candidates)
+
+            claimed = []
+            for row in candidates:
+                if row.id in blocked:
+                    continue
+                row.status = 'processing'
+                row.locked_at = now
+                claimed.append(row.id)
+                if len(claimed) >= self.batch_size:
+                    break
+
+            await session.commit()
+            return claimed
+
+    async def _blocked_by_dependencies(self, session: AsyncSession, candidates: List[IntegrationOutbox]) -> set:
+        """IDs of rows whose sibling dependencies have not finished yet"""
+        with_deps = [row for row in candidates if row.depends_on]
+        if not with_deps:
+            return set()
+
+        aggregates = {(row.aggregate_type, row.aggregate_id) for row in with_deps}
+        stmt = select(
+            IntegrationOutbox.aggregate_type,
+            IntegrationOutbox.aggregate_id,
+            IntegrationOutbox.integration,
+            IntegrationOutbox.status
+        ).where(or_(*[
+            and_(IntegrationOutbox.aggregate_type == agg_type, IntegrationOutbox.aggregate_id == agg_id)
+            for agg_type, agg_id in aggregates
+        ]))
+        statuses = {
+            (agg_type, agg_id, integration): status
+            for agg_type, agg_id, integration, status in (await session.execute(stmt)).all()
+        }
+
+        blocked = set()
+        for row in with_deps:
+            for dep in row.depends_on:
+                status = statuses.get((row.aggregate_type, row.aggregate_id, dep))
+                if status in ('pending', 'processing'):
+                    blocked.add(row.id)
+                    break
+        return blocked
+
+    def _is_idempotent(self, session: AsyncSession, row: IntegrationOutbox) -> bool:
+        check = _idempotency_checks.get(row.aggregate_type)
+        if check is None:
+            return False
+        try:
+            return check(session, row)
+        except Exception as e:
+            logger.warning(f"Outbox {row.idempotency_key}: idempotency check failed, treating as non-idempotent: {e}")
+            return False
+
+    async def _deliver(self, row_id):
+        """Deliver one claimed row and record the outcome"""
+        async with AsyncSessionLocal() as session:
+            row = await session.get(IntegrationOutbox, row_id)
+            if row is None or row.status != 'processing':
+                return
+
+            handler = _handlers.get(row.aggregate_type)
+            row.attempts = (row.attempts or 0) + 1
+
+            try:
+                if handler is None:
+                    raise LookupError(f"No outbox handler for aggregate type '{row.aggregate_type}'")
+                result = await handler(session, row)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                row.last_error = error
+                row.locked_at = None
+                retry = handler is not None and is_safe_to_repeat(e, self._is_idempotent(session, row))
+                if not retry or row.attempts >= row.max_attempts:
+                    if retry:
+                        reason = f"after {row.attempts} attempts"
+                    elif is_retryable(e):
+                        reason = "for manual review (the call may already have taken effect)"
+                    else:
+                        reason = "(not retryable)"
+                    row.status = 'dead'
+                    row.completed_at = _utcnow()
+                    self.stats["dead"] += 1
+                    logger.error(f"Outbox {row.idempotency_key} dead-lettered {reason}: {error}")
+                else:
+                    row.status = 'pending'
+                    row.next_attempt_at = _utcnow() + timedelta(seconds=self.backoff_delay(row.attempts))
+                    self.stats["retried"] += 1
+                    logger.warning(
+                        f"Outbox {row.idempotency_key} attempt {row.attempts} failed, "
+                        f"retrying at {row.next_attempt_at.isoformat()}: {error}"
+                    )
+                await session.commit()
+                return
+
+            row.status = 'succeeded'
+            row.result = result or {}
+            row.last_error = None
+            row.locked_at = None
+            row.completed_at = _utcnow()
+            self.stats["delivered"] += 1
+            await session.commit()
+            logger.info(f"Outbox {row.idempotency_key} delivered (attempt {row.attempts})")
+
+
+# ============================================================================
+# OPERATOR HELPERS
+# ============================================================================
+
+async def get_outbox_stats(db: AsyncSession) -> Dict[str, Any]:
+    """Row counts per status plus the age of the oldest pending row"""
+    rows = await db.execute(
+        select(IntegrationOutbox.status, func.count()).group_by(IntegrationOutbox.status)
+    )
+    counts = {status: count for status, count in rows.all()}
+
+    oldest = await db.execute(
+        select(func.min(IntegrationOutbox.created_at)).where(IntegrationOutbox.status == 'pending')
+    )
+    oldest_pending = _as_aware(oldest.scalar())
+
+    return {
+        "pending": counts.get('pending', 0),
+        "processing": counts.get('processing', 0),
+        "succeeded": counts.get('succeeded', 0),
+        "dead": counts.get('dead', 0),
+        "oldest_pending_age_seconds": (
+            (_utcnow() - oldest_pending).total_seconds() if oldest_pending else None
+        ),
+        "dispatcher": dict(outbox_dispatcher.stats),
+    }
+
+
+async def requeue_dead_letter(db: AsyncSession, outbox_id) -> Optional[IntegrationOutbox]:
+    """Move a dead-lettered row back to pending with a fresh attempt budget"""
+    row = await db.get(IntegrationOutbox, outbox_id)
+    if row is None or row.status != 'dead':
+        return None
+    row.status = 'pending'
+    row.attempts = 0
+    row.next_attempt_at = _utcnow()
+    row.completed_at = None
+    return row
+
+
+# Global dispatcher instance
+outbox_dispatcher = OutboxDispatcher()
@@ -20,9 +20,10 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
 from io import BytesIO
-import httpx
 from pydantic import BaseModel
 
+from services.http_client_registry import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -93,11 +94,11 @@ class PaperlessClient:
         self.base_url = base_url.rstrip('/')
         self.api_token = api_token
         self.timeout = timeout
-        self.client = httpx.AsyncClient(timeout=timeout)
+        self.client = get_http_client("paperless", timeout=timeout)
 
     async def close(self):
-        """Close HTTP client"""
-        await self.client.aclose()
+        """Release HTTP client (the shared pool is closed at application shutdown)"""
+        pass
 
     def _headers(self) -> Dict[str, str]:
         """Get request headers with authentication"""
@@ -6,16 +6,13 @@ Extends the base AI assistant with property management-specific capabilities
 import json
 import logging
 from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select
 
 from services.ai_assistant import SomniAIAssistant
-from db.models import (
-    Property, Client, Tenant, Unit, Building,
-    Lease, WorkOrder, RentPayment, UtilityBill,
-    SmartDevice
-)
+from services.ai_context_builder import ai_context_builder
+from db.models import Client
 
 logger = logging.getLogger(__name__)
 
@@ -108,50 +105,14 @@ class PropertyManagerAI(SomniAIAssistant):
         elif "tenant" in page.lower() and entity_id:
             context["tenant"] = await self._get_tenant_context(entity_id, db)
 
-        # Get dashboard stats for insights
-        context["stats"] = await self._get_dashboard_stats(db)
-
-        # Get recent activity
-        context["recent_activity"] = await self._get_recent_activity(db)
+        # Dashboard stats and recent activity (one aggregate query, briefly cached)
+        context.update(await ai_context_builder.manager_overview(db))
 
         return context
 
     async def _get_property_context(self, property_id: str, db: AsyncSession) -> Dict:
         """Get detailed property context"""
-        query = select(Property).where(Property.id == property_id)
-        result = await db.execute(query)
-        property_obj = result.scalar_one_or_none()
-
-        if not property_obj:
-            return {}
-
-        # Get buildings and units count
-        buildings_query = select(func.count(Building.id)).where(Building.property_id == property_id)
-        buildings_result = await db.execute(buildings_query)
-        buildings_count = buildings_result.scalar()
-
-        units_query = select(func.count(Unit.id)).join(Building).where(Building.property_id == property_id)
-        units_result = await db.execute(units_query)
-        units_count = units_result.scalar()
-
-        # Get vacancy rate
-        occupied_query = select(func.count(Unit.id)).join(Building).join(Lease).where(
-            and_(Building.property_id == property_id, Lease.status == "active")
-        )
-        occupied_result = await db.execute(occupied_query)
-        occupied_count = occupied_result.scalar() or 0
-
-        vacancy_rate = ((units_count - occupied_count) / units_count * 100) if units_count > 0 else 0
-
-        return {
-            "id": str(property_obj.id),
-            "name": property_obj.name,
-            "address": f"{property_obj.address_line1}, {property_obj.city}, {property_obj.state}",
-            "type": property_obj.property_type,
-            "buildings_count": buildings_count,
-            "units_count": units_count,
-            "vacancy_rate": round(vacancy_rate, 1)
-        }
+        return await ai_context_builder.property_summary(property_id, db)
 
     async def _get_client_context(self, client_id: str, db: AsyncSession) -> Dict:
         """Get client context"""
@@ -172,70 +133,25 @@ class PropertyManagerAI(SomniAIAssistant):
 
     async def _get_tenant_context(self, tenant_id: str, db: AsyncSession) -> Dict:
         """Get tenant context"""
-        query = select(Tenant).where(Tenant.id == tenant_id)
-        result = await db.execute(query)
-        tenant = result.scalar_one_or_none()
-
-        if not tenant:
+        tenant_context = await ai_context_builder.tenant_context(tenant_id, db)
+        if not tenant_context:
             return {}
 
-        # Get active lease
-        lease_query = select(Lease).where(
-            and_(Lease.tenant_id == tenant_id, Lease.status == "active")
-        )
-        lease_result = await db.execute(lease_query)
-        lease = lease_result.scalar_one_or_none()
-
+        lease = tenant_context.get("lease")
         return {
-            "id": str(tenant.id),
-            "name": f"{tenant.first_name} {tenant.last_name}",
-            "email": tenant.email,
-            "phone": tenant.phone,
+            "id": str(tenant_id),
+            **tenant_context["tenant"],
             "has_active_lease": lease is not None,
-            "monthly_rent": float(lease.monthly_rent) if lease else None
+            "monthly_rent": lease["monthly_rent"] if lease else None
         }
 
     async def _get_dashboard_stats(self, db: AsyncSession) -> Dict:
         """Get key dashboard statistics"""
-        # Total properties
-        properties_query = select(func.count(Property.id))
-        properties_result = await db.execute(properties_query)
-        total_properties = properties_result.scalar()
-
-        # Total units
-        units_query = select(func.count(Unit.id))
-        units_result = await db.execute(units_query)
-        total_units = units_result.scalar()
-
-        # Active work orders
-        open_wo_query = select(func.count(WorkOrder.id)).where(
-            WorkOrder.status.in_(["pending", "in_progress"])
-        )
-        open_wo_result = await db.execute(open_wo_query)
-        open_work_orders = open_wo_result.scalar()
-
-        # Overdue payments (if payment model has due_date)
-        # overdue_payments_query = select(func.count(Payment.id)).where(...)
-
-        return {
-            "total_properties": total_properties,
-            "total_units": total_units,
-            "open_work_orders": open_work_orders
-        }
+        return (await ai_context_builder.manager_overview(db))["stats"]
 
     async def _get_recent_activity(self, db: AsyncSession) -> Dict:
         """Get recent activity for context"""
-        # Recent work orders (last 7 days)
-        week_ago = datetime.now() - timedelta(days=7)
-        recent_wo_query = select(func.count(WorkOrder.id)).where(
-            WorkOrder.created_at >= week_ago
-        )
-        recent_wo_result = await db.execute(recent_wo_query)
-        recent_work_orders = recent_wo_result.scalar()
-
-        return {
-            "work_orders_this_week": recent_work_orders
-        }
+        return (await ai_context_builder.manager_overview(db))["recent_activity"]
 
     async def _detect_manager_intent(self, message: str, context: Dict) -> Dict[str, Any]:
         """
@@ -0,0 +1,195 @@
+"""
+Unified Search Service
+
+Type-ahead search across tenants, clients, leads, quotes and HA instances.
+
+Matching stays a plain ILIKE per column so the pg_trgm GIN indexes from
+migration 036 serve both the substring search used by the list endpoints and
+the word-prefix search used for type-ahead. On PostgreSQL, candidates are
+ordered by trigram word_similarity so the per-entity LIMIT keeps the best
+rows; the merged page is then ranked and highlighted here.
+"""
+
+import html
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, or_, and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models import Tenant, Client
+from db.models_leads import Lead
+from db.models_quotes import Quote
+from db.models_ha_instance import HAInstance
+
+MIN_TERM_LENGTH = 2
+MAX_TERMS = 5
+
+
+def escape_like(term: str) -> str:
+    """Escape LIKE wildcards in user input (pair with escape="\\")"""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_terms(query: str) -> List[str]:
+    """Lower-cased search words, ignoring single characters"""
+    terms = [term for term in query.lower().split() if len(term) >= MIN_TERM_LENGTH]
+    return terms[:MAX_TERMS]
+
+
+def text_search_clause(columns: Sequence[Any], query: str, prefix: bool = False):
+    """
+    WHERE clause matching every search word in at least one of the columns
+
+    With prefix=True a word must start a word in the column ("jo" matches
+    "John" and "Mary Jones" but not "Tojo"), which is what type-ahead wants.
+    Returns None when the query has no usable words.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return None
+    per_term = []
+    for term in terms:
+        escaped = escape_like(term)
+        if prefix:
+            patterns = [f"{escaped}%", f"% {escaped}%"]
+        else:
+            patterns = [f"%{escaped}%"]
+        per_term.append(or_(*(column.ilike(pattern, escape="\\") for column in columns for pattern in patterns)))
+    return and_(*per_term)
+
+
+@dataclass(frozen=True)
+class SearchEntity:
+    """A searchable model: columns with ranking weights and how to present a hit"""
+    type: str
+    model: Any
+    fields: Tuple[Tuple[str, float], ...]
+    title: Callable[[Any], str]
+    subtitle: Callable[[Any], Optional[str]]
+
+
+SEARCH_ENTITIES: Dict[str, SearchEntity] = {
+    entity.type: entity for entity in (
+        SearchEntity(
+            "tenant", Tenant,
+            (("first_name", 1.0), ("last_name", 1.0), ("email", 0.8), ("phone", 0.6)),
+            title=lambda t: f"{t.first_name} {t.last_name}",
+            subtitle=lambda t: t.email,
+        ),
+        SearchEntity(
+            "client", Client,
+            (("name", 1.0), ("primary_contact_name", 0.9), ("email", 0.8), ("phone", 0.6)),
+            title=lambda c: c.name,
+            subtitle=lambda c: c.primary_contact_name or c.email,
+        ),
+        SearchEntity(
+            "lead", Lead,
+            (("name", 1.0), ("company", 0.9), ("email", 0.8), ("phone", 0.6)),
+            title=lambda lead: lead.name,
+            subtitle=lambda lead: lead.company or lead.email,
+        ),
+        SearchEntity(
+            "quote", Quote,
+            (("quote_number", 1.0), ("customer_name", 1.0), ("customer_email", 0.8)),
+            title=lambda q: f"{q.quote_number} - {q.customer_name}",
+            subtitle=lambda q: q.status,
+        ),
+        SearchEntity(
+            "ha_instance", HAInstance,
+            (("name", 1.0), ("location", 0.8)),
+            title=lambda h: h.name,
+            subtitle=lambda h: h.location,
+        ),
+    )
+}
+
+
+def _field_score(value: str, term: str) -> float:
+    """How well one word matches one field value (0 = no match)"""
+    if value == term:
+        return 1.0
+    if value.startswith(term):
+        return 0.9
+    if re.search(rf"(^|[\s@.\-_]){re.escape(term)}", value):
+        return 0.75
+    if term in value:
+        return 0.5
+    return 0.0
+
+
+def score_row(row: Any, fields: Sequence[Tuple[str, float]], terms: Sequence[str]) -> float:
+    """Average over search words of the best weighted field match"""
+    if not terms:
+        return 0.0
+    values = [((getattr(row, name) or "").lower(), weight) for name, weight in fields]
+    total = 0.0
+    for term in terms:
+        total += max((_field_score(value, term) * weight for value, weight in values), default=0.0)
+    return round(total / len(terms), 4)
+
+
+def highlight(value: str, terms: Sequence[str]) -> Optional[str]:
+    """HTML-escaped value with matched words wrapped in <mark>, or None if nothing matched"""
+    if not value or not terms:
+        return None
+    pattern = re.compile("|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    parts = []
+    last = 0
+    for match in pattern.finditer(value):
+        parts.append(html.escape(value[last:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group(0))}</mark>")
+        last = match.end()
+    if last == 0:
+        return None
+    parts.append(html.escape(value[last:]))
+    return "".join(parts)
+
+
+async def search_entities(
+    db: AsyncSession,
+    query: str,
+    types: Optional[Sequence[str]] = None,
+    limit: int = 20,
+    prefix: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Ranked, highlighted matches across entity types
+
+    Each type contributes at most `limit` candidates; the merged list is
+    sorted by score (ties by type order) and cut to `limit`.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    postgres = db.bind is not None and db.bind.dialect.name == "postgresql"
+
+    hits = []
+    for entity in SEARCH_ENTITIES.values():
+        if types and entity.type not in types:
+            continue
+        columns = [getattr(entity.model, name) for name, _ in entity.fields]
+        stmt = select(entity.model).where(text_search_clause(columns, query, prefix=prefix))
+        if postgres:
+            phrase = " ".join(terms)
+            stmt = stmt.order_by(func.greatest(*(func.word_similarity(phrase, column) for column in columns)).desc())
+        rows = (await db.execute(stmt.limit(limit))).scalars().all()
+
+        for row in rows:
+            highlights = {}
+            for name, _ in entity.fields:
+                marked = highlight(getattr(row, name) or "", terms)
+                if marked:
+                    highlights[name] = marked
+            hits.append({
+                "type": entity.type,
+                "id": str(row.id),
+                "title": entity.title(row),
+                "subtitle": entity.subtitle(row),
+                "score": score_row(row, entity.fields, terms),
+                "highlights": highlights,
+            })
+
+    hits.sort(key=lambda hit: hit["score"], reverse=True)
+    return hits[:limit]
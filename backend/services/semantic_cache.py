@@ -0,0 +1,269 @@
+"""
+Semantic Cache for AI Assistants
+
+Tenants and managers ask the same questions over and over ("when is rent
+due", "show open work orders"). This cache lets the assistants reuse an
+earlier intent classification or answer for a near-duplicate message
+instead of calling the LLM again:
+
+- Messages are normalized (case, punctuation, whitespace) and embedded via
+  LocalAI; embeddings are memoized per normalized text
+- Entries are partitioned by scope (tenant / user) and a fingerprint of the
+  context the answer was generated from, so one tenant never sees another
+  tenant's answer and answers go stale as soon as their context changes
+- Lookup is an exact normalized match first (no embedding call), then
+  cosine similarity over the partition (NumPy when installed) above a
+  threshold
+- Bounded LRU with TTL; hit-rate metrics via get_stats()
+
+If the embedding service is unavailable the cache degrades to exact
+matching and stops calling it for a short back-off period.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from core.config import settings
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+EmbedFunction = Callable[[str], Awaitable[Optional[List[float]]]]
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_message(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", text.lower())).strip()
+
+
+def context_fingerprint(context: Any) -> str:
+    """Stable short hash of the context an answer depends on"""
+    encoded = json.dumps(context, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()[:16]
+
+
+async def _localai_embedding(text: str) -> Optional[List[float]]:
+    from services.localai_client import get_localai_client
+    return await get_localai_client().get_embedding_vector(text)
+
+
+def _unit(vector: List[float]):
+    """Vector scaled to unit length (so cosine similarity is a dot product)"""
+    if NUMPY_AVAILABLE:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(array))
+        return array / norm if norm else array
+    norm = math.sqrt(sum(v * v for v in vector))
+    return [v / norm for v in vector] if norm else list(vector)
+
+
+@dataclass
+class _Entry:
+    vector: Any  # unit vector, or None when embedding was unavailable
+    value: Any
+    expires_at: float
+
+
+class SemanticCache:
+    """In-process semantic cache partitioned by (namespace, scope, fingerprint)"""
+
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        max_entries: int = 2000,
+        ttl: float = 3600.0,
+        max_embeddings: int = 5000,
+        embed: Optional[EmbedFunction] = None,
+        embed_backoff: float = 60.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_embeddings = max_embeddings
+        self.embed_backoff = embed_backoff
+        self._embed = embed or _localai_embedding
+        self._clock = clock
+        # partition -> normalized message -> entry; partitions kept in LRU order
+        self._partitions: "OrderedDict[Tuple[str, str, str], OrderedDict[str, _Entry]]" = OrderedDict()
+        self._size = 0
+        self._embeddings: "OrderedDict[str, Any]" = OrderedDict()
+        self._embed_disabled_until = 0.0
+        self.stats = {
+            "exact_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "embedding_calls": 0,
+            "embedding_cache_hits": 0,
+            "embedding_failures": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def get(
+        self,
+        namespace: str,
+        message: str,
+        scope: str,
+        fingerprint: str = ""
+    ) -> Optional[Any]:
+        """Cached value for this message or a near-duplicate, else None"""
+        normalized = normalize_message(message)
+        partition = self._partitions.get((namespace, scope, fingerprint))
+        if not partition or not normalized:
+            self.stats["misses"] += 1
+            return None
+        self._partitions.move_to_end((namespace, scope, fingerprint))
+        now = self._clock()
+
+        entry = partition.get(normalized)
+        if entry is not None and entry.expires_at > now:
+            partition.move_to_end(normalized)
+            self.stats["exact_hits"] += 1
+            return entry.value
+
+        vector = await self._vector(normalized)
+        if vector is not None:
+            best_key, best_score = self._nearest(partition, vector, now)
+            if best_key is not None and best_score >= self.threshold:
+                partition.move_to_end(best_key)
+                self.stats["semantic_hits"] += 1
+                logger.debug(f"Semantic cache hit ({namespace}, similarity {best_score:.3f})")
+                return partition[best_key].value
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(
+        self,
+        namespace: str,
+        message: str,
+        scope: str,
+        value: Any,
+        fingerprint: str = "",
+        ttl: Optional[float] = None
+    ):
+        """Store a value for this message"""
+        normalized = normalize_message(message)
+        if not normalized:
+            return
+        vector = await self._vector(normalized)
+
+        key = (namespace, scope, fingerprint)
+        partition = self._partitions.setdefault(key, OrderedDict())
+        self._partitions.move_to_end(key)
+        if normalized not in partition:
+            self._size += 1
+        partition[normalized] = _Entry(vector, value, self._clock() + (ttl or self.ttl))
+        partition.move_to_end(normalized)
+        self._evict()
+
+    def invalidate_scope(self, scope: str) -> int:
+        """Drop every entry for a tenant / user (all namespaces and fingerprints)"""
+        stale = [key for key in self._partitions if key[1] == scope]
+        removed = 0
+        for key in stale:
+            removed += len(self._partitions.pop(key))
+        self._size -= removed
+        return removed
+
+    def clear(self):
+        self._partitions.clear()
+        self._embeddings.clear()
+        self._size = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = self.stats["exact_hits"] + self.stats["semantic_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": self._size,
+            "partitions": len(self._partitions),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "numpy": NUMPY_AVAILABLE,
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    async def _vector(self, normalized: str):
+        """Unit embedding for a normalized message (memoized), or None"""
+        if normalized in self._embeddings:
+            self._embeddings.move_to_end(normalized)
+            self.stats["embedding_cache_hits"] += 1
+            return self._embeddings[normalized]
+        if self._clock() < self._embed_disabled_until:
+            return None
+
+        self.stats["embedding_calls"] += 1
+        try:
+            raw = await self._embed(normalized)
+        except Exception as e:
+            logger.debug(f"Embedding failed: {e}")
+            raw = None
+        if not raw:
+            self.stats["embedding_failures"] += 1
+            self._embed_disabled_until = self._clock() + self.embed_backoff
+            return None
+
+        vector = _unit(raw)
+        self._embeddings[normalized] = vector
+        if len(self._embeddings) > self.max_embeddings:
+            self._embeddings.popitem(last=False)
+        return vector
+
+    def _nearest(self, partition: "OrderedDict[str, _Entry]", vector, now: float) -> Tuple[Optional[str], float]:
+        keys, vectors = [], []
+        for key, entry in partition.items():
+            if entry.vector is not None and entry.expires_at > now and len(entry.vector) == len(vector):
+                keys.append(key)
+                vectors.append(entry.vector)
+        if not keys:
+            return None, 0.0
+
+        if NUMPY_AVAILABLE:
+            scores = np.stack(vectors) @ vector
+            best = int(np.argmax(scores))
+            return keys[best], float(scores[best])
+
+        scores = [sum(a * b for a, b in zip(candidate, vector)) for candidate in vectors]
+        best = max(range(len(scores)), key=scores.__getitem__)
+        return keys[best], scores[best]
+
+    def _evict(self):
+        now = self._clock()
+        while self._size > self.max_entries and self._partitions:
+            key, partition = next(iter(self._partitions.items()))
+            # Expired entries first, then least recently used
+            expired = [k for k, entry in partition.items() if entry.expires_at <= now]
+            for k in expired or [next(iter(partition))]:
+                del partition[k]
+                self._size -= 1
+            if not partition:
+                del self._partitions[key]
+
+
+# Shared cache for the tenant and manager assistants
+semantic_cache = SemanticCache(
+    threshold=settings.AI_SEMANTIC_CACHE_THRESHOLD,
+    max_entries=settings.AI_SEMANTIC_CACHE_MAX_ENTRIES,
+    ttl=settings.AI_SEMANTIC_CACHE_TTL_SECONDS
+)
@@ -7,7 +7,7 @@ import os
 import yaml
 import logging
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime
 from jinja2 import Environment, FileSystemLoader, TemplateNotFound
 import git
@@ -18,6 +18,9 @@ from db.models import ServiceDeployment, PropertyEdgeNode
 
 logger = logging.getLogger(__name__)
 
+# Parsed catalog YAML per path: (mtime, catalog). A service is built per request.
+_catalog_cache: Dict[Path, Tuple[float, Dict[str, Any]]] = {}
+
 
 class ServiceCatalogService:
     """Service Catalog for one-click K8s service deployment"""
@@ -41,10 +44,15 @@ class ServiceCatalogService:
         self._catalog = self._load_catalog()
 
     def _load_catalog(self) -> Dict[str, Any]:
-        """Load service catalog from YAML"""
+        """Load service catalog from YAML (parsed once per file modification)"""
         try:
+            mtime = self.catalog_path.stat().st_mtime
+            cached = _catalog_cache.get(self.catalog_path)
+            if cached and cached[0] == mtime:
+                return cached[1]
             with open(self.catalog_path, 'r') as f:
                 catalog = yaml.safe_load(f)
+            _catalog_cache[self.catalog_path] = (mtime, catalog)
             logger.info(f"Loaded service catalog with {len(catalog.get('services', []))} services")
             return catalog
         except Exception as e:
@@ -8,8 +8,12 @@ import asyncio
 import logging
 from typing import Any, Dict, List, Optional
 from datetime import datetime
-import httpx
 from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.auth import AuthUser
+from services.http_client_registry import get_http_client
+from services.mcp_tool_dispatcher import mcp_tool_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -40,11 +44,19 @@ class SomniPropertyMCPServer:
     2. Perform actions ("Create a work order for unit 101")
     3. Generate insights ("Analyze utility costs by property")
     4. Automate workflows ("Send rent reminders to overdue tenants")
+
+    Execution modes:
+    - Direct (default when a DB session is passed): read tools run in-process
+      via MCPToolDispatcher on the caller's session
+    - HTTP: everything else, and remote MCP clients without a session, go
+      through the REST API at `api_base_url`
     """
 
-    def __init__(self, api_base_url: str = "http://localhost:8000"):
+    def __init__(self, api_base_url: str = "http://localhost:8000", prefer_direct: bool = True):
         self.api_base_url = api_base_url
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.prefer_direct = prefer_direct
+        self.dispatcher = mcp_tool_dispatcher
+        self.client = get_http_client("somniproperty_api", timeout=30.0)
         self.tools = self._define_tools()
 
     def _define_tools(self) -> List[MCPTool]:
@@ -474,9 +486,48 @@ class SomniPropertyMCPServer:
                     "properties": {}
                 }
             ),
+
+            # ================================================================
+            # DOCUMENT RETRIEVAL TOOLS
+            # ================================================================
+            MCPTool(
+                name="search_documents",
+                description="Semantic search over leases, notices, invoices and other documents (title, description and OCR text); returns the best matching documents with a text snippet",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "query": {"type": "string", "description": "What to look for, in natural language"},
+                        "k": {"type": "integer", "default": 5, "maximum": 20},
+                        "document_type": {"type": "string"},
+                        "lease_id": {"type": "string"},
+                        "tenant_id": {"type": "string"},
+                        "property_id": {"type": "string"}
+                    },
+                    "required": ["query"]
+                }
+            ),
         ]
 
-    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    async def call_tool(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        db: Optional[AsyncSession] = None,
+        auth_user: Optional[AuthUser] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute an MCP tool
+
+        Runs in-process on `db` when the tool has a direct handler, otherwise
+        calls the corresponding API endpoint over HTTP. In-process calls are
+        checked against `auth_user` (refused when there is none).
+        """
+        if db is not None and self.prefer_direct and self.dispatcher.has_tool(tool_name):
+            return await self.dispatcher.dispatch(tool_name, arguments, db, auth_user)
+
+        return await self._call_tool_http(tool_name, arguments)
+
+    async def _call_tool_http(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute an MCP tool by calling the corresponding API endpoint
         """
@@ -523,6 +574,8 @@ class SomniPropertyMCPServer:
 
                 "generate_property_report": ("POST", "/api/v1/properties/{property_id}/reports"),
                 "get_dashboard_stats": ("GET", "/api/v1/dashboard/stats"),
+
+                "search_documents": ("GET", "/api/v1/documents/semantic-search"),
             }
 
             if tool_name not in endpoint_map:
@@ -530,8 +583,9 @@ class SomniPropertyMCPServer:
 
             method, endpoint = endpoint_map[tool_name]
 
-            # Replace path parameters
-            for key, value in arguments.items():
+            # Replace path parameters (without mutating the caller's dict)
+            arguments = dict(arguments or {})
+            for key, value in list(arguments.items()):
                 placeholder = f"{{{key}}}"
                 if placeholder in endpoint:
                     endpoint = endpoint.replace(placeholder, str(value))
@@ -561,8 +615,8 @@ class SomniPropertyMCPServer:
         return [tool.dict() for tool in self.tools]
 
     async def close(self):
-        """Close HTTP client"""
-        await self.client.aclose()
+        """Release HTTP client (the shared pool is closed at application shutdown)"""
+        pass
 
 
 # Singleton instance
@@ -17,9 +17,10 @@ import logging
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
-import httpx
 from pydantic import BaseModel
 
+from services.http_client_registry import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -102,11 +103,11 @@ class VikunjaClient:
         self.password = password
         self.api_token = api_token
         self.timeout = timeout
-        self.client = httpx.AsyncClient(timeout=timeout)
+        self.client = get_http_client("vikunja", timeout=timeout)
 
     async def close(self):
-        """Close HTTP client"""
-        await self.client.aclose()
+        """Release HTTP client (the shared pool is closed at application shutdown)"""
+        pass
 
     async def login(self) -> bool:
         """
@@ -593,6 +594,19 @@ class VikunjaClient:
     # Work Order Integration
     # ========================================
 
+    async def find_work_order_task(self, project_id: int, work_order_id: str) -> Optional[VikunjaTask]:
+        """
+        Find the task previously created for a work order
+
+        Lets a repeated create (e.g. after a timeout) return the existing
+        task instead of adding a duplicate.
+        """
+        prefix = f"WO-{work_order_id}:"
+        for task in await self.list_tasks(project_id):
+            if task.title.startswith(prefix):
+                return task
+        return None
+
     async def create_work_order_task(
         self,
         project_id: int,
@@ -0,0 +1,227 @@
+"""
+Workflow Engine - Concurrent Step Execution for Integration Workflows
+
+Runs a set of declared workflow steps as a dependency graph:
+- Steps without pending dependencies run concurrently
+- Each step has its own timeout and retry budget
+- Per-step latency, attempts and outcome are recorded so slow
+  integrations are visible in the workflow results
+
+Dependencies express ordering only: a step waits for its dependencies to
+finish (successfully or not) and receives their outputs, matching the
+"keep going on errors" behaviour of the sequential workflows it replaces.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Step callables receive the outputs of completed steps keyed by step name
+StepFunc = Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+# Only transient failures are retried: transport errors, and HTTP 429/5xx
+# responses. Other 4xx responses and programming errors fail immediately.
+RETRYABLE_ERRORS: Tuple[type, ...] = (asyncio.TimeoutError, ConnectionError, OSError, httpx.TransportError)
+
+# Failures where the request never reached the service, so repeating it
+# cannot duplicate a side effect
+NOT_SENT_ERRORS: Tuple[type, ...] = (ConnectionRefusedError, httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a failed attempt may succeed if repeated"""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, RETRYABLE_ERRORS)
+
+
+def is_safe_to_repeat(error: BaseException, idempotent: bool) -> bool:
+    """
+    Whether a failed call may be repeated without risking a duplicate
+
+    Idempotent calls are repeated on any transient failure. Other calls only
+    when the request was never sent or was rejected with 429: after a
+    timeout or a 5xx the first attempt may already have taken effect.
+    """
+    if not is_retryable(error):
+        return False
+    if idempotent:
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429
+    return isinstance(error, NOT_SENT_ERRORS)
+
+
+@dataclass
+class WorkflowStep:
+    """A single integration call in a workflow"""
+    name: str  # Key in results["integrations"]
+    label: str  # Prefix used for error messages (e.g. "Cal.com")
+    func: StepFunc
+    depends_on: Tuple[str, ...] = ()
+    timeout: float = 15.0
+    retries: int = 0
+    idempotent: bool = False  # Repeating the call cannot duplicate its effect
+    retry_backoff: float = 0.5
+    enabled: bool = True
+
+
+@dataclass
+class StepOutcome:
+    """Result of running a workflow step"""
+    status: str  # success | empty | failed | timeout | skipped
+    output: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    latency_ms: float = 0.0
+    started_ms: float = 0.0
+
+    def as_timing(self) -> Dict[str, Any]:
+        timing = {
+            "status": self.status,
+            "attempts": self.attempts,
+            "latency_ms": round(self.latency_ms, 1),
+            "started_ms": round(self.started_ms, 1),
+        }
+        if self.error:
+            timing["error"] = self.error
+        return timing
+
+
+class WorkflowEngine:
+    """
+    Executes WorkflowSteps concurrently while honouring dependencies
+
+    Usage:
+        engine = WorkflowEngine(steps)
+        await engine.run(results)  # fills integrations / errors / step_timings
+    """
+
+    def __init__(self, steps: List[WorkflowStep]):
+        names = [step.name for step in steps]
+        if len(names) != len(set(names)):
+            raise ValueError("Workflow step names must be unique")
+        for step in steps:
+            unknown = set(step.depends_on) - set(names)
+            if unknown:
+                raise ValueError(f"Step '{step.name}' depends on unknown steps: {sorted(unknown)}")
+        self.steps = {step.name: step for step in steps}
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        """Reject dependency cycles up front instead of deadlocking"""
+        visiting, done = set(), set()
+
+        def visit(name: str):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Workflow dependency cycle through '{name}'")
+            visiting.add(name)
+            for dep in self.steps[name].depends_on:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.steps:
+            visit(name)
+
+    async def _execute(self, step: WorkflowStep, outputs: Dict[str, Any], t0: float) -> StepOutcome:
+        """Run one step with timeout and retries"""
+        started = time.perf_counter()
+        outcome = StepOutcome(status="failed", started_ms=(started - t0) * 1000)
+
+        for attempt in range(step.retries + 1):
+            outcome.attempts = attempt + 1
+            try:
+                output = await asyncio.wait_for(step.func(outputs), timeout=step.timeout)
+                outcome.status = "success" if output else "empty"
+                outcome.output = output
+                outcome.error = None
+                break
+            except asyncio.TimeoutError as e:
+                outcome.status = "timeout"
+                outcome.error = f"timed out after {step.timeout:.0f}s"
+                if not is_safe_to_repeat(e, step.idempotent):
+                    break
+            except Exception as e:
+                outcome.status = "failed"
+                outcome.error = str(e)
+                if not is_safe_to_repeat(e, step.idempotent):
+                    break
+
+            if attempt < step.retries:
+                logger.warning(
+                    f"Workflow step {step.name} attempt {attempt + 1} failed ({outcome.error}), retrying"
+                )
+                await asyncio.sleep(step.retry_backoff * (2 ** attempt))
+
+        outcome.latency_ms = (time.perf_counter() - started) * 1000
+        return outcome
+
+    async def run(self, results: Dict[str, Any]) -> Dict[str, StepOutcome]:
+        """
+        Execute all enabled steps and merge their outcomes into `results`
+
+        Populates results["integrations"][name] for steps returning data,
+        appends "<label>: <error>" to results["errors"] for failures, and
+        records per-step timings in results["step_timings"].
+        """
+        results.setdefault("integrations", {})
+        results.setdefault("errors", [])
+        timings = results.setdefault("step_timings", {})
+
+        t0 = time.perf_counter()
+        outputs: Dict[str, Any] = {}
+        outcomes: Dict[str, StepOutcome] = {}
+        finished: Dict[str, asyncio.Event] = {name: asyncio.Event() for name in self.steps}
+
+        async def run_step(step: WorkflowStep):
+            try:
+                for dep in step.depends_on:
+                    await finished[dep].wait()
+
+                if not step.enabled:
+                    outcome = StepOutcome(status="skipped")
+                else:
+                    outcome = await self._execute(step, dict(outputs), t0)
+
+                outcomes[step.name] = outcome
+                if outcome.output:
+                    outputs[step.name] = outcome.output
+            finally:
+                finished[step.name].set()
+
+        await asyncio.gather(*(run_step(step) for step in self.steps.values()))
+
+        # Merge in declaration order so results are stable across runs
+        for name, step in self.steps.items():
+            outcome = outcomes[name]
+            timings[name] = outcome.as_timing()
+            if outcome.status == "skipped":
+                continue
+            if outcome.output:
+                results["integrations"][name] = outcome.output
+            elif outcome.error:
+                logger.error(f"Workflow step {name} failed: {outcome.error}")
+                results["errors"].append(f"{step.label}: {outcome.error}")
+
+        total_ms = (time.perf_counter() - t0) * 1000
+        results["workflow_latency_ms"] = round(total_ms, 1)
+
+        ran = [(name, o) for name, o in outcomes.items() if o.status != "skipped"]
+        if ran:
+            slowest_name, slowest = max(ran, key=lambda item: item[1].latency_ms)
+            logger.info(
+                f"Workflow finished in {total_ms:.0f}ms; slowest step {slowest_name} "
+                f"({slowest.latency_ms:.0f}ms)"
+            )
+
+        return outcomes
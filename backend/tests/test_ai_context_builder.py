@@ -0,0 +1,183 @@
+"""
+AI Context Builder Tests
+Tests for single-query tenant context, caching, commit invalidation and manager aggregates
+
+Run with: pytest tests/test_ai_context_builder.py -v
+"""
+
+import uuid
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+# Register every mapper the way application startup does
+import db.models_maintenance  # noqa: F401
+import db.models_project_phases  # noqa: F401
+import db.models  # noqa: F401
+import db.family_models  # noqa: F401
+import db.models_ai  # noqa: F401
+import db.models_approval  # noqa: F401
+import db.models_comms  # noqa: F401
+import db.models_quotes  # noqa: F401
+import db.models_leads  # noqa: F401
+import db.models_ha_instance  # noqa: F401
+import db.models_contractor_labor  # noqa: F401
+from db.models import Base, Property, Building, Unit, Tenant, Lease, SmartDevice, WorkOrder
+from services.ai_context_builder import AIContextBuilder, ai_context_builder, render_tenant_context
+
+
+@pytest.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    tables = [Base.metadata.tables[name] for name in (
+        "properties", "buildings", "units", "tenants", "leases", "smart_devices", "work_orders"
+    )]
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=tables))
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def db(engine):
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        yield session
+
+
+@pytest.fixture
+def statements(engine):
+    executed = []
+    event.listen(engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: executed.append(statement))
+    return executed
+
+
+async def seed(db):
+    prop = Property(
+        id=uuid.uuid4(), name="Maple Court", address_line1="1 Maple St",
+        city="Austin", state="TX", zip_code="78701", property_type="residential"
+    )
+    building = Building(id=uuid.uuid4(), property_id=prop.id, name="A")
+    unit = Unit(
+        id=uuid.uuid4(), building_id=building.id, unit_number="101", unit_type="1br",
+        status="occupied", bedrooms=Decimal("1"), bathrooms=Decimal("1"), floor=1, square_feet=700
+    )
+    spare = Unit(id=uuid.uuid4(), building_id=building.id, unit_number="102", unit_type="1br", status="vacant")
+    tenant = Tenant(id=uuid.uuid4(), first_name="Sam", last_name="Lee", email="sam@example.com", status="active")
+    lease = Lease(
+        id=uuid.uuid4(), unit_id=unit.id, tenant_id=tenant.id,
+        start_date=date.today() - timedelta(days=30), end_date=date.today() + timedelta(days=335),
+        rent_amount=Decimal("1500.00"), rent_due_day=1, status="active"
+    )
+    devices = [
+        SmartDevice(id=uuid.uuid4(), property_id=prop.id, client_id=tenant.id,
+                    device_type="thermostat", device_name="Hall thermostat", status="active"),
+        SmartDevice(id=uuid.uuid4(), property_id=prop.id, client_id=tenant.id,
+                    device_type="lock", device_name="Front door", status="active"),
+    ]
+    work_order = WorkOrder(id=uuid.uuid4(), unit_id=unit.id, title="Leak", description="Sink",
+                           category="plumbing", status="open")
+    db.add_all([prop, building, unit, spare, tenant, lease, *devices, work_order])
+    await db.commit()
+    return {"property": prop, "tenant": tenant, "lease": lease}
+
+
+@pytest.fixture
+async def seeded(db):
+    return await seed(db)
+
+
+@pytest.mark.asyncio
+class TestTenantContext:
+    """Tests for tenant context loading and caching"""
+
+    async def test_single_query_then_cached(self, db, seeded, statements):
+        builder = AIContextBuilder()
+        tenant_id = str(seeded["tenant"].id)
+
+        context = await builder.tenant_context(tenant_id, db, conversation_id="c1")
+        assert len(statements) == 1
+
+        await builder.tenant_context(tenant_id, db, conversation_id="c1")
+        assert len(statements) == 1
+
+        assert context["tenant"]["name"] == "Sam Lee"
+        assert context["lease"]["monthly_rent"] == 1500.0
+        assert context["unit"]["unit_number"] == "101"
+        assert sorted(d["name"] for d in context["smart_devices"]) == ["Front door", "Hall thermostat"]
+
+    async def test_lease_change_invalidates(self, db, seeded):
+        tenant_id = str(seeded["tenant"].id)
+        ai_context_builder.clear()
+        await ai_context_builder.tenant_context(tenant_id, db, conversation_id="c1")
+
+        seeded["lease"].rent_amount = Decimal("1600.00")
+        await db.commit()
+
+        context = await ai_context_builder.tenant_context(tenant_id, db, conversation_id="c1")
+        assert context["lease"]["monthly_rent"] == 1600.0
+
+    async def test_read_between_flush_and_commit_not_kept(self, tmp_path):
+        # A file database, so the reader has its own connection and sees only committed rows
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'context.db'}")
+        tables = [Base.metadata.tables[name] for name in (
+            "properties", "buildings", "units", "tenants", "leases", "smart_devices", "work_orders"
+        )]
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=tables))
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        ai_context_builder.clear()
+
+        async with factory() as writer:
+            seeded = await seed(writer)
+            tenant_id = str(seeded["tenant"].id)
+
+            seeded["lease"].rent_amount = Decimal("1600.00")
+            await writer.flush()
+            async with factory() as reader:
+                # A chat turn between flush and commit still sees the old rent
+                context = await ai_context_builder.tenant_context(tenant_id, reader, conversation_id="c1")
+                assert context["lease"]["monthly_rent"] == 1500.0
+            await writer.commit()
+
+        async with factory() as reader:
+            context = await ai_context_builder.tenant_context(tenant_id, reader, conversation_id="c1")
+            assert context["lease"]["monthly_rent"] == 1600.0
+        await engine.dispose()
+
+    async def test_unknown_tenant_and_rendering(self, db, seeded):
+        builder = AIContextBuilder()
+
+        assert await builder.tenant_context(str(uuid.uuid4()), db) == {}
+
+        context = await builder.tenant_context(str(seeded["tenant"].id), db)
+        fragment = render_tenant_context(context)
+        assert "Tenant: Sam Lee (sam@example.com)" in fragment
+        assert "rent $1,500.00 due on day 1" in fragment
+        assert "Unit 101: 1 bed, 1 bath, floor 1, 700 sq ft" in fragment
+
+
+@pytest.mark.asyncio
+class TestManagerContext:
+    """Tests for manager aggregates"""
+
+    async def test_overview_one_query_and_cached(self, db, seeded, statements):
+        builder = AIContextBuilder()
+
+        overview = await builder.manager_overview(db)
+        await builder.manager_overview(db)
+
+        assert len(statements) == 1
+        assert overview["stats"] == {"total_properties": 1, "total_units": 2, "open_work_orders": 1}
+        assert overview["recent_activity"]["work_orders_this_week"] == 1
+
+    async def test_property_summary(self, db, seeded):
+        builder = AIContextBuilder()
+
+        summary = await builder.property_summary(str(seeded["property"].id), db)
+
+        assert summary["units_count"] == 2
+        assert summary["vacancy_rate"] == 50.0
@@ -0,0 +1,268 @@
+"""
+AI Chat Streaming Tests
+Tests for provider token iterators, pre-first-token failover and streamed chat turns
+
+Run with: pytest tests/test_ai_streaming.py -v
+"""
+
+import asyncio
+import json
+import uuid
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from starlette.websockets import WebSocketDisconnect
+from unittest.mock import AsyncMock, patch
+
+# Register every mapper the way application startup does
+import db.models_maintenance  # noqa: F401
+import db.models_project_phases  # noqa: F401
+import db.models  # noqa: F401
+import db.family_models  # noqa: F401
+import db.models_ai  # noqa: F401
+import db.models_approval  # noqa: F401
+import db.models_comms  # noqa: F401
+import db.models_quotes  # noqa: F401
+import db.models_leads  # noqa: F401
+import db.models_ha_instance  # noqa: F401
+import db.models_contractor_labor  # noqa: F401
+from api.v1 import ai_chat
+from api.v1.ai_chat import ChatRequest, _authorize_chat, _authorized_tenant_id, _stream_chat_turn
+from core.auth import AuthUser, TenantIdentity
+from core.websocket_auth import WebSocketAuthManager, get_ws_auth_manager
+from db.models import Base, Tenant
+from db.models_ai import AIConversation
+from core.config import settings
+from services.ai_assistant import SomniAIAssistant
+from services.llm_providers import LLMMessage, LocalAIProvider, OllamaProvider
+from services.llm_provider_registry import FailoverLLMProvider, LLMProviderRegistry
+
+
+@pytest.fixture(autouse=True)
+def no_cloud_keys(monkeypatch):
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setattr(settings, "AI_SEMANTIC_CACHE_ENABLED", False)
+
+
+def mock_client(body: str) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, text=body)))
+
+
+async def collect(iterator):
+    return [chunk async for chunk in iterator]
+
+
+class FakeSession:
+    """Records added objects and commits"""
+
+    def __init__(self):
+        self.added = []
+        self.commits = 0
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.mark.asyncio
+class TestProviderStreams:
+    """Tests for stream_completion parsing"""
+
+    async def test_localai_sse_deltas(self):
+        provider = LocalAIProvider()
+        provider.client = mock_client(
+            'data: {"choices": [{"delta": {"role": "assistant"}}]}\n\n'
+            'data: {"choices": [{"delta": {"content": "Rent is "}}]}\n\n'
+            'data: {"choices": [{"delta": {"content": "due on the 1st"}}]}\n\n'
+            'data: [DONE]\n\n'
+        )
+
+        chunks = await collect(provider.stream_completion([LLMMessage(role="user", content="rent?")]))
+
+        assert chunks == ["Rent is ", "due on the 1st"]
+
+    async def test_ollama_ndjson_chunks(self):
+        provider = OllamaProvider()
+        provider.client = mock_client("\n".join(json.dumps(c) for c in [
+            {"response": "Hel", "done": False},
+            {"response": "lo", "done": False},
+            {"response": "", "done": True, "eval_count": 2},
+        ]))
+
+        chunks = await collect(provider.stream_completion([LLMMessage(role="user", content="hi")]))
+
+        assert chunks == ["Hel", "lo"]
+
+    async def test_assistant_stream_raises_on_http_error(self):
+        assistant = SomniAIAssistant()
+        assistant.client = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(500, text='{"error": "model not loaded"}')
+        ))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await collect(assistant._stream_ollama("system", "hi"))
+
+    async def test_failover_only_before_first_token(self):
+        registry = LLMProviderRegistry()
+        localai = registry.get_provider("localai")
+        ollama = registry.get_provider("ollama")
+        llm = FailoverLLMProvider(registry)
+
+        async def down(*args, **kwargs):
+            raise ConnectionError("down")
+            yield  # pragma: no cover
+
+        async def tokens(*args, **kwargs):
+            for chunk in ("a", "b"):
+                yield chunk
+
+        with patch.object(localai, "stream_completion", down), \
+                patch.object(ollama, "stream_completion", tokens):
+            chunks = await collect(llm.stream_completion([LLMMessage(role="user", content="x")]))
+
+        assert chunks == ["a", "b"]
+        assert llm.provider_name == "ollama"
+        assert registry.health["localai"].available is False
+
+
+@pytest.mark.asyncio
+class TestStreamedChatTurn:
+    """Tests for token forwarding and single persistence"""
+
+    async def test_tokens_forwarded_then_persisted_once(self):
+        assistant = SomniAIAssistant()
+        db = FakeSession()
+
+        async def stream(system_prompt, user_prompt):
+            for chunk in ("Your rent ", "is due ", "on the 1st."):
+                await asyncio.sleep(0)
+                yield chunk
+
+        with patch.object(assistant, "_get_conversation", AsyncMock(return_value=None)), \
+                patch.object(assistant, "_detect_intent", AsyncMock(
+                    return_value={"intent": "ask_rent_due", "confidence": 0.9, "entities": {}}
+                )), \
+                patch.object(assistant, "_stream_ollama", stream), \
+                patch.object(assistant, "_call_ollama", AsyncMock()) as call_ollama:
+            events = await collect(_stream_chat_turn(
+                lambda on_token: assistant.chat("when is rent due?", "conv-1", None, db, on_token=on_token)
+            ))
+
+        assert [e["content"] for e in events[:-1]] == ["Your rent ", "is due ", "on the 1st."]
+        response = events[-1]["response"]
+        assert response["response"] == "Your rent is due on the 1st."
+        assert "time_to_first_token" in response["metadata"]["latency_ms"]
+        call_ollama.assert_not_called()
+
+        assert db.commits == 1
+        assert [m.sender_type for m in db.added] == ["tenant", "ai"]
+        assert db.added[0].confidence_score == 0.9
+        assert db.added[1].message_text == "Your rent is due on the 1st."
+
+    async def test_turn_failure_raised_after_tokens(self):
+        async def run(on_token):
+            await on_token("partial")
+            raise RuntimeError("boom")
+
+        stream = _stream_chat_turn(run)
+
+        assert await stream.__anext__() == {"type": "token", "content": "partial"}
+        with pytest.raises(RuntimeError):
+            await stream.__anext__()
+
+
+@pytest.mark.asyncio
+class TestChatAuthorization:
+    """Tests for who may chat as which user type"""
+
+    def user(self, **roles) -> AuthUser:
+        flags = {"is_admin": False, "is_manager": False, "is_tenant": False, **roles}
+        return AuthUser(username="u1", email="u1@example.com", name="U", groups=[], **flags)
+
+    async def test_manager_chat_requires_manager(self):
+        await _authorize_chat(ChatRequest(message="hi"), "manager", self.user(is_manager=True), None)
+        with pytest.raises(HTTPException) as exc:
+            await _authorize_chat(ChatRequest(message="hi"), "manager", self.user(is_tenant=True), None)
+        assert exc.value.status_code == 403
+
+    async def test_tenant_pinned_to_own_tenant_id(self, monkeypatch):
+        own = uuid.uuid4()
+        monkeypatch.setattr(ai_chat, "get_tenant_identity", AsyncMock(return_value=TenantIdentity(own, None)))
+        tenant = self.user(is_tenant=True)
+
+        request = ChatRequest(message="hi")
+        await _authorize_chat(request, "tenant", tenant, None)
+        assert request.tenant_id == str(own)
+
+        with pytest.raises(HTTPException):
+            await _authorize_chat(ChatRequest(message="hi", tenant_id=str(uuid.uuid4())), "tenant", tenant, None)
+
+    async def test_tenant_only_in_own_conversations(self, monkeypatch):
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda sync_conn: Base.metadata.create_all(
+                sync_conn, tables=[Tenant.__table__, AIConversation.__table__]
+            ))
+        own_tenant, other_tenant = uuid.uuid4(), uuid.uuid4()
+        own, other = uuid.uuid4(), uuid.uuid4()
+        monkeypatch.setattr(ai_chat, "get_tenant_identity", AsyncMock(return_value=TenantIdentity(own_tenant, None)))
+        tenant = self.user(is_tenant=True)
+
+        async with async_sessionmaker(engine, class_=AsyncSession)() as db:
+            db.add_all([AIConversation(id=own, tenant_id=own_tenant), AIConversation(id=other, tenant_id=other_tenant)])
+            await db.commit()
+
+            assert await _authorized_tenant_id("tenant", tenant, db, conversation_id=str(own)) == str(own_tenant)
+            for conversation_id in (str(other), str(uuid.uuid4()), "not-a-uuid"):
+                with pytest.raises(HTTPException):
+                    await _authorized_tenant_id("tenant", tenant, db, conversation_id=conversation_id)
+            # Managers may open any conversation
+            assert await _authorized_tenant_id("tenant", self.user(is_manager=True), db, str(other_tenant), str(other))
+        await engine.dispose()
+
+
+class TestChatWebSocket:
+    """Tests for authentication on the chat WebSocket"""
+
+    def connect(self, monkeypatch, path, owns_conversation=True, groups=("tenants",)):
+        auth = WebSocketAuthManager(redis_client=None)
+        auth._redis_checked_at = float("inf")  # Never try to connect in tests
+        token = asyncio.run(auth.create_token("ws-tenant", groups=list(groups)))
+        monkeypatch.setattr(ai_chat, "get_tenant_identity", AsyncMock(return_value=TenantIdentity(uuid.uuid4(), None)))
+        monkeypatch.setattr(ai_chat, "_owns_conversation", AsyncMock(return_value=owns_conversation))
+        monkeypatch.setattr(ai_chat.ai_assistant, "chat", AsyncMock(return_value={"response": "ok"}))
+
+        app = FastAPI()
+        app.include_router(ai_chat.router)
+        app.dependency_overrides[get_ws_auth_manager] = lambda: auth
+        return TestClient(app).websocket_connect(path.format(token=token))
+
+    def test_token_required(self, monkeypatch):
+        with self.connect(monkeypatch, "/ws/abc") as ws:
+            with pytest.raises(WebSocketDisconnect) as exc:
+                ws.receive_json()
+        assert exc.value.code == 4401
+
+    def test_other_tenants_conversation_rejected(self, monkeypatch):
+        with self.connect(monkeypatch, "/ws/abc?token={token}", owns_conversation=False) as ws:
+            with pytest.raises(WebSocketDisconnect) as exc:
+                ws.receive_json()
+        assert exc.value.code == 4403
+
+        with self.connect(monkeypatch, f"/ws/abc?token={{token}}&tenant_id={uuid.uuid4()}") as ws:
+            with pytest.raises(WebSocketDisconnect) as exc:
+                ws.receive_json()
+        assert exc.value.code == 4403
+
+    def test_own_conversation_chats_as_caller(self, monkeypatch):
+        with self.connect(monkeypatch, "/ws/abc?token={token}") as ws:
+            ws.send_json({"message": "hi", "stream": False})
+            assert ws.receive_json()["response"] == "ok"
+        assert ai_chat.ai_assistant.chat.await_args.kwargs["tenant_id"] == str(
+            ai_chat.get_tenant_identity.return_value.tenant_id
+        )
@@ -0,0 +1,136 @@
+"""
+Auth Context Tests
+Tests for per-request auth caching, the compiled RBAC bitmap and the tenant identity cache
+
+Run with: pytest tests/test_auth_context.py -v
+"""
+
+import uuid
+import pytest
+from starlette.requests import Request
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+# Register every mapper the way application startup does
+import db.models_maintenance  # noqa: F401
+import db.models_project_phases  # noqa: F401
+import db.models  # noqa: F401
+import db.family_models  # noqa: F401
+import db.models_ai  # noqa: F401
+import db.models_approval  # noqa: F401
+import db.models_comms  # noqa: F401
+import db.models_quotes  # noqa: F401
+import db.models_leads  # noqa: F401
+import db.models_ha_instance  # noqa: F401
+import db.models_contractor_labor  # noqa: F401
+from db.models import Base, Tenant
+from core.auth import get_auth_user, get_tenant_identity, invalidate_tenant_identity
+from core.security.rbac import (
+    ROLE_PERMISSIONS, Role, get_current_user_info, get_current_user_role, has_permission
+)
+
+
+def make_request(headers=None):
+    raw = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "headers": raw, "state": {}})
+
+
+class CountingSession(AsyncSession):
+    """AsyncSession that counts executed statements"""
+    executed = 0
+
+    async def execute(self, *args, **kwargs):
+        CountingSession.executed += 1
+        return await super().execute(*args, **kwargs)
+
+
+@pytest.fixture
+async def db():
+    invalidate_tenant_identity()
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=[Tenant.__table__]))
+    factory = async_sessionmaker(engine, class_=CountingSession, expire_on_commit=False)
+    async with factory() as session:
+        yield session
+    await engine.dispose()
+    invalidate_tenant_identity()
+
+
+class TestRBACBitmap:
+    """Tests for the compiled permission matrix"""
+
+    def test_bitmap_matches_role_matrix(self):
+        resources = {r for perms in ROLE_PERMISSIONS.values() for r in perms} | {"unknown"}
+        actions = {a for perms in ROLE_PERMISSIONS.values() for acts in perms.values() for a in acts} | {"nope"}
+        for role in Role:
+            for resource in resources:
+                for action in actions:
+                    expected = action in ROLE_PERMISSIONS.get(role, {}).get(resource, [])
+                    assert has_permission(role, resource, action) is expected, (role, resource, action)
+
+    def test_role_resolved_once_per_request(self):
+        request = make_request({"X-User-Role": "OPERATOR", "X-Forwarded-User": "ops"})
+        assert get_current_user_role(request) == Role.OPERATOR
+        assert request.state.user_role == "operator"
+
+        request.state.user_role = "admin"  # Set by an auth dependency: takes precedence
+        assert get_current_user_role(request) == Role.ADMIN
+        assert get_current_user_role(make_request({"X-User-Role": "bogus"})) == Role.READ_ONLY
+
+
+@pytest.mark.asyncio
+class TestAuthContext:
+    """Tests for the per-request auth user"""
+
+    async def test_auth_user_cached_on_request_state(self):
+        request = make_request()
+        user = await get_auth_user(request, "alice", "a@example.com", "Alice", "managers, tenants")
+        assert user.is_manager and user.is_tenant and not user.is_admin
+        assert request.state.auth_user is user
+        assert await get_auth_user(request, "mallory", None, None, "admins") is user
+
+        info = get_current_user_info(request)
+        assert info["user_id"] == "alice" and info["email"] == "a@example.com"
+
+    async def test_tenant_identity_cached_and_invalidated_on_commit(self, db):
+        tenant = Tenant(id=uuid.uuid4(), first_name="T", last_name="Lee", email="t@example.com", auth_user_id="tlee")
+        db.add(tenant)
+        await db.commit()
+
+        CountingSession.executed = 0
+        identity = await get_tenant_identity(db, "tlee")
+        assert identity.tenant_id == tenant.id
+        assert await get_tenant_identity(db, "tlee") == identity
+        assert await get_tenant_identity(db, "ghost") is None
+        assert await get_tenant_identity(db, "ghost") is None  # Unknown usernames are not cached
+        assert CountingSession.executed == 3
+
+        tenant.auth_user_id = "tlee2"
+        await db.commit()
+        assert await get_tenant_identity(db, "tlee") is None
+        assert (await get_tenant_identity(db, "tlee2")).tenant_id == tenant.id
+
+    async def test_read_between_flush_and_commit_not_kept(self, tmp_path):
+        invalidate_tenant_identity()
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'auth.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=[Tenant.__table__]))
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+
+        async with factory() as writer:
+            tenant = Tenant(id=uuid.uuid4(), first_name="R", last_name="Ace", email="r@example.com",
+                            auth_user_id="race-user")
+            writer.add(tenant)
+            await writer.commit()
+
+            tenant.auth_user_id = "race-user-2"  # Access revoked
+            await writer.flush()
+            async with factory() as reader:
+                # Another request still sees (and caches) the committed link
+                assert (await get_tenant_identity(reader, "race-user")).tenant_id == tenant.id
+            await writer.commit()
+
+        async with factory() as reader:
+            assert await get_tenant_identity(reader, "race-user") is None
+        await engine.dispose()
+        invalidate_tenant_identity()
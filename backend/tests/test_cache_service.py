@@ -0,0 +1,258 @@
+"""
+Cache Service Tests
+Tests for the L1/Redis read-through cache, stampede protection and commit-driven tag invalidation
+
+Run with: pytest tests/test_cache_service.py -v
+"""
+
+import asyncio
+import json
+import uuid
+import pytest
+from decimal import Decimal
+from typing import List
+from pydantic import BaseModel
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+# Register every mapper the way application startup does
+import db.models_maintenance  # noqa: F401
+import db.models_project_phases  # noqa: F401
+import db.models  # noqa: F401
+import db.family_models  # noqa: F401
+import db.models_ai  # noqa: F401
+import db.models_approval  # noqa: F401
+import db.models_comms  # noqa: F401
+import db.models_quotes  # noqa: F401
+import db.models_leads  # noqa: F401
+import db.models_ha_instance  # noqa: F401
+import db.models_contractor_labor  # noqa: F401
+from db.models import Base
+from db.models_quotes import PricingTier
+from services import cache_service
+from services.cache_service import (
+    INSTANCE_ID, Cache, RedisHandle, cache_invalidation_subscriber, cached, get_cache
+)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+        return queue
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        return [getattr(self.redis, f"_{name}")(*args, **kwargs) for name, args, kwargs in self.calls]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio for the cache, counting round trips"""
+
+    def __init__(self):
+        self.data = {}
+        self.published = []
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def __getattr__(self, name):
+        async def call(*args, **kwargs):
+            self.round_trips += 1
+            return getattr(self, f"_{name}")(*args, **kwargs)
+        return call
+
+    def _get(self, key):
+        return self.data.get(key)
+
+    def _set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def _sadd(self, key, member):
+        self.data.setdefault(key, set()).add(member)
+
+    def _smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    def _expire(self, key, seconds):
+        return True
+
+    def _delete(self, *keys):
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    def _publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(cache_service, "_redis", RedisHandle(fake))
+    return fake
+
+
+@pytest.fixture
+def no_redis(monkeypatch):
+    monkeypatch.setattr(cache_service, "_redis", RedisHandle(enabled=False))
+
+
+@pytest.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=[PricingTier.__table__]))
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add(PricingTier(tier_name="Starter", tier_level=1, price_per_unit_monthly=Decimal("2.50")))
+        await session.commit()
+    async with factory() as session:
+        yield session
+    await engine.dispose()
+
+
+class TierResponse(BaseModel):
+    tier_name: str
+    price_per_unit_monthly: Decimal
+
+    class Config:
+        from_attributes = True
+
+
+def unique_name():
+    return f"test-{uuid.uuid4().hex[:8]}"
+
+
+@pytest.mark.asyncio
+class TestLevels:
+    """Tests for L1/L2 lookups and stampede protection"""
+
+    async def test_l1_then_redis_then_load(self, redis):
+        cache = Cache(unique_name())
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return {"price": "9.99"}
+
+        assert await cache.get_or_load("k", loader, tags=["pricing_tiers"]) == {"price": "9.99"}
+        assert await cache.get_or_load("k", loader) == {"price": "9.99"}
+
+        other_pod = Cache(cache.name)  # Empty L1, same Redis
+        assert await other_pod.get_or_load("k", loader) == {"price": "9.99"}
+        assert len(calls) == 1
+        assert cache.stats()["l1_hits"] == 1 and other_pod.stats()["l2_hits"] == 1
+
+    async def test_concurrent_misses_load_once(self, no_redis):
+        cache = Cache(unique_name())
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return [1, 2, 3]
+
+        results = await asyncio.gather(*(cache.get_or_load("k", loader) for _ in range(20)))
+        assert results == [[1, 2, 3]] * 20
+        assert len(calls) == 1
+        assert cache.stats()["stampede_waits"] == 19
+
+    async def test_waits_for_loading_peer(self, redis):
+        cache = Cache(unique_name(), stampede_wait=1.0)
+        peer = Cache(cache.name)
+        redis.data[f"cache:lock:{cache.name}:k"] = "peer"
+
+        async def peer_loads():
+            await asyncio.sleep(0.05)
+            await peer.set("k", "from-peer")
+
+        async def loader():
+            raise AssertionError("should reuse the peer's value")
+
+        _, value = await asyncio.gather(peer_loads(), cache.get_or_load("k", loader))
+        assert value == "from-peer"
+
+    async def test_failed_loads_are_not_cached(self, no_redis):
+        cache = Cache(unique_name())
+
+        async def failing():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await cache.get_or_load("k", failing)
+        assert await cache.get("k") is None
+        assert cache.stats()["load_errors"] == 1
+
+
+@pytest.mark.asyncio
+class TestInvalidation:
+    """Tests for tag invalidation from commits and other pods"""
+
+    async def test_commit_invalidates_tagged_entries(self, redis, db):
+        cache = get_cache(unique_name())
+        await cache.set("tiers", ["old"], tags=["pricing_tiers"])
+        await cache.set("rates", ["keep"], tags=["labor_rates"])
+
+        tier = (await db.execute(select(PricingTier))).scalar_one()
+        tier.price_per_unit_monthly = Decimal("3.00")
+        await db.commit()
+        await asyncio.gather(*cache_service._pending_invalidations)
+
+        assert await cache.get("tiers") is None
+        assert await cache.get("rates") == ["keep"]
+        assert f"cache:{cache.name}:tiers" not in redis.data
+        channel, message = redis.published[-1]
+        assert json.loads(message) == {"origin": INSTANCE_ID, "tags": ["pricing_tiers"]}
+
+    async def test_bulk_update_invalidates_and_rollback_does_not(self, no_redis, db):
+        cache = get_cache(unique_name())
+        await cache.set("tiers", ["old"], tags=["pricing_tiers"])
+
+        await db.execute(update(PricingTier).values(active=False))
+        await db.rollback()
+        assert await cache.get("tiers") == ["old"]
+
+        await db.execute(update(PricingTier).values(active=False))
+        await db.commit()
+        assert await cache.get("tiers") is None
+
+    async def test_subscriber_applies_other_pods_invalidations(self, no_redis):
+        cache = get_cache(unique_name())
+        await cache.set("tiers", [1], tags=["pricing_tiers"])
+
+        assert cache_invalidation_subscriber.handle(json.dumps({"origin": INSTANCE_ID, "tags": ["pricing_tiers"]})) == 0
+        assert cache_invalidation_subscriber.handle(json.dumps({"origin": "other", "tags": ["pricing_tiers"]})) == 1
+        assert await cache.get("tiers") is None
+
+
+@pytest.mark.asyncio
+class TestDecorator:
+    """Tests for the cached() decorator"""
+
+    async def test_route_results_serialized_and_keyed_by_plain_args(self, no_redis, db):
+        calls = []
+
+        @cached(unique_name(), tags=("pricing_tiers",), model=List[TierResponse])
+        async def list_tiers(active_only: bool = True, db: AsyncSession = None):
+            calls.append(active_only)
+            return (await db.execute(select(PricingTier))).scalars().all()
+
+        first = await list_tiers(active_only=True, db=db)
+        assert first == [{"tier_name": "Starter", "price_per_unit_monthly": "2.50"}]
+        assert await list_tiers(active_only=True, db=object()) == first  # Session isn't part of the key
+        await list_tiers(active_only=False, db=db)
+        assert calls == [True, False]
+        assert list_tiers.cache.stats()["misses"] == 2
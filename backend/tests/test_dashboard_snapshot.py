@@ -0,0 +1,281 @@
+"""
+Dashboard Snapshot Tests
+Tests for single-statement dashboard cards, per-scope caching and WebSocket deltas
+
+Run with: pytest tests/test_dashboard_snapshot.py -v
+"""
+
+import asyncio
+import uuid
+import pytest
+from datetime import datetime, timedelta
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock
+from sqlalchemy import Column, Table, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+# Register every mapper the way application startup does
+import db.models_maintenance  # noqa: F401
+import db.models_project_phases  # noqa: F401
+import db.models  # noqa: F401
+import db.family_models  # noqa: F401
+import db.models_ai  # noqa: F401
+import db.models_approval  # noqa: F401
+import db.models_comms  # noqa: F401
+import db.models_quotes  # noqa: F401
+import db.models_leads  # noqa: F401
+import db.models_ha_instance  # noqa: F401
+import db.models_contractor_labor  # noqa: F401
+from db.types import GUID
+from db.models import Base, Property, Building, Unit, WorkOrder, Alert, PropertyEdgeNode
+from db.models_approval import PendingAction
+from db.models_comms import EmailMessage, SMSMessage
+from api.v1 import websocket as websocket_api
+from core.websocket_auth import WebSocketAuthManager, get_ws_auth_manager
+from services.dashboard_snapshot import (
+    ALL_PROPERTIES, DashboardSnapshotService, diff_snapshot, room_for_scope, scope_for_room
+)
+from services.websocket_manager import ConnectionManager, get_ws_manager
+
+TABLES = [Property, Building, Unit, WorkOrder, Alert, PropertyEdgeNode, PendingAction, EmailMessage, SMSMessage]
+
+
+class FakeConnectionManager:
+    """Rooms plus a record of what was sent"""
+
+    def __init__(self):
+        self.rooms = {}
+        self.sent = []
+
+    async def broadcast_to_room(self, message, room):
+        self.sent.append((room, message))
+
+    async def send_personal_message(self, message, websocket):
+        self.sent.append((websocket, message))
+
+
+@pytest.fixture
+async def engine():
+    # pending_actions references a table that only exists in SQL migrations
+    if "service_contractors" not in Base.metadata.tables:
+        Table("service_contractors", Base.metadata, Column("id", GUID, primary_key=True))
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(
+            sync_conn, tables=[model.__table__ for model in TABLES]
+        ))
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def statements(engine):
+    """SQL statements executed on the engine"""
+    executed = []
+    event.listen(engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: executed.append(statement))
+    return executed
+
+
+@pytest.fixture
+def factory(engine):
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def make_property(name):
+    return Property(id=uuid.uuid4(), name=name, address_line1="1 Main St", city="Town",
+                    state="CA", zip_code="90000", property_type="residential")
+
+
+@pytest.fixture
+async def portfolio(factory):
+    """Two properties: A has a building with two units (one occupied), B has none"""
+    async with factory() as session:
+        a, b = make_property("A"), make_property("B")
+        building = Building(id=uuid.uuid4(), property_id=a.id, name="Main")
+        units = [
+            Unit(id=uuid.uuid4(), building_id=building.id, unit_number=str(i), unit_type="apartment",
+                 status="occupied" if i == 0 else "vacant")
+            for i in range(2)
+        ]
+        hub = PropertyEdgeNode(id=uuid.uuid4(), property_id=a.id, hostname="hub-a",
+                               hub_type="PROPERTY_HUB", status="online")
+        session.add_all([a, b, building, *units, hub])
+        session.add_all([
+            # Linked to A through its unit and through its building
+            WorkOrder(title="Leak", description="d", category="plumbing", priority="high",
+                      status="in_progress", unit_id=units[0].id),
+            WorkOrder(title="Door", description="d", category="general", priority="emergency",
+                      status="open", building_id=building.id),
+            WorkOrder(title="Unlinked", description="d", category="general", priority="low", status="open"),
+            Alert(severity="critical", source="mqtt", category="leak", message="m", hub_id=hub.id,
+                  occurred_at=datetime.utcnow() - timedelta(hours=1)),
+            Alert(severity="critical", source="mqtt", category="leak", message="old", hub_id=hub.id,
+                  occurred_at=datetime.utcnow() - timedelta(days=3)),
+            PendingAction(source_type="email", requester_type="tenant", action_type="repair",
+                          action_category="maintenance", action_title="t", action_description="d",
+                          action_data={}, status="pending", estimated_cost=120.5, property_id=a.id),
+        ])
+        await session.commit()
+    return a, b
+
+
+@pytest.mark.asyncio
+class TestSnapshotQueries:
+    """Tests for the aggregate queries"""
+
+    async def test_cards_are_one_statement(self, statements, factory, portfolio):
+        a, b = portfolio
+        service = DashboardSnapshotService(ws_manager=FakeConnectionManager())
+        async with factory() as session:
+            statements.clear()
+            cards = await service.cards(session)
+            assert len(statements) == 1
+
+            assert cards["property_hubs"] == {"total": 1, "online": 1, "offline": 0, "error": 0, "warning": 0}
+            assert cards["residential_hubs"]["total"] == 0
+            assert cards["work_orders"]["open_by_priority"] == {"low": 1, "medium": 0, "high": 1, "emergency": 1}
+            assert cards["work_orders"]["active"]["in_progress"] == 1
+            assert cards["work_orders"]["created_this_week"] == 3
+            assert cards["alerts"]["critical_24h"] == 1
+            assert cards["approvals"] == {"pending": 1, "estimated_cost": 120.5}
+            assert cards["communications"] == {"unread_emails": 0, "unread_sms": 0}
+
+            scoped = await service.cards(session, a.id)
+            assert scoped["work_orders"]["open_by_priority"]["low"] == 0
+            assert scoped["work_orders"]["open_by_priority"]["emergency"] == 1
+            empty = await service.cards(session, str(b.id))
+            assert empty["property_hubs"]["total"] == 0 and empty["approvals"]["pending"] == 0
+
+    async def test_portfolio_replaces_per_property_loop(self, statements, factory, portfolio):
+        a, b = portfolio
+        service = DashboardSnapshotService(ws_manager=FakeConnectionManager())
+        async with factory() as session:
+            statements.clear()
+            summary = await service.portfolio(session)
+            assert len(statements) == 1
+
+        assert summary["pending_approvals"] == 1
+        assert list(summary["properties"]) == [str(a.id), str(b.id)]
+        assert summary["properties"][str(a.id)]["total_units"] == 2
+        assert summary["properties"][str(a.id)]["occupied_units"] == 1
+        assert summary["properties"][str(b.id)]["total_units"] == 0
+
+    async def test_endpoints_read_from_snapshots(self, factory, portfolio):
+        from api.v1.dashboard import get_dashboard_stats
+        from api.v1.intelligent_summary import get_multi_property_summary
+        from services.dashboard_snapshot import dashboard_snapshots
+
+        a, _ = portfolio
+        dashboard_snapshots.invalidate()
+        async with factory() as session:
+            stats = await get_dashboard_stats(db=session)
+            summary = await get_multi_property_summary(db=session)
+        dashboard_snapshots.invalidate()
+
+        assert stats.property_hubs.healthy == 1 and stats.critical_alerts_24h == 1
+        assert stats.open_work_orders["emergency"] == 1
+        assert summary.total_properties == 2 and summary.total_units == 2
+        assert summary.overall_occupancy_rate == 50.0
+        assert summary.properties[0].property_id == str(a.id)
+
+
+@pytest.mark.asyncio
+class TestSnapshotCacheAndPush:
+    """Tests for caching and WebSocket deltas"""
+
+    async def test_cached_per_scope_until_ttl(self, statements, factory, portfolio):
+        a, _ = portfolio
+        service = DashboardSnapshotService(ttl_seconds=60, ws_manager=FakeConnectionManager())
+        async with factory() as session:
+            statements.clear()
+            first = await service.cards(session)
+            assert await service.cards(session) is first
+            await service.cards(session, a.id)
+            assert len(statements) == 2
+
+            service.invalidate(a.id)
+            assert await service.cards(session) is not first
+            assert service.stats == {"hits": 1, "misses": 3, "deltas_pushed": 0}
+
+    async def test_deltas_only_for_watched_changed_scopes(self, factory, portfolio):
+        ws = FakeConnectionManager()
+        # A long TTL: the publisher must not reuse snapshots cached from (replica) endpoint reads
+        service = DashboardSnapshotService(ttl_seconds=60, session_factory=factory, ws_manager=ws)
+        assert await service.publish_once() == 0
+
+        ws.rooms = {room_for_scope(ALL_PROPERTIES): {"client"}, "property:x": {"other"}}
+        await service.send_snapshot("client", "dashboard")
+        assert ws.sent[-1][1]["type"] == "dashboard_snapshot"
+        assert await service.publish_once() == 0  # Nothing changed since the snapshot
+
+        async with factory() as session:
+            session.add(SMSMessage(sms_number_id=uuid.uuid4(), direction="incoming", from_number="1",
+                                   to_number="2", message_body="hi"))
+            await session.commit()
+
+        assert await service.publish_once() == 1
+        room, message = ws.sent[-1]
+        assert room == "dashboard" and message["type"] == "dashboard_delta"
+        assert message["changes"] == {"communications": {"unread_sms": 1}}
+
+
+class TestHelpers:
+    """Tests for rooms and diffs"""
+
+    def test_rooms_map_to_scopes(self):
+        pid = uuid.uuid4()
+        assert scope_for_room(room_for_scope(str(pid))) == str(pid)
+        assert scope_for_room("dashboard") == ALL_PROPERTIES
+        assert scope_for_room("dashboard:not-a-uuid") is None
+        assert scope_for_room("property:abc") is None
+
+    def test_diff_snapshot(self):
+        old = {"a": {"x": 1, "y": 2}, "b": 3, "gone": 1}
+        new = {"a": {"x": 1, "y": 5}, "b": 3, "c": {"z": 0}}
+        assert diff_snapshot(old, new) == {"a": {"y": 5}, "c": {"z": 0}, "gone": None}
+        assert diff_snapshot(new, new) == {}
+
+
+class TestJoinRoom:
+    """Tests for joining dashboard rooms over the WebSocket"""
+
+    def connect(self, monkeypatch, ws_manager, groups=("managers",)):
+        auth = WebSocketAuthManager(redis_client=None)
+        auth._redis_checked_at = float("inf")  # Never try to connect in tests
+        token = asyncio.run(auth.create_token("ws-manager", groups=list(groups)))
+        monkeypatch.setattr(websocket_api.dashboard_snapshots, "send_snapshot", AsyncMock())
+
+        app = FastAPI()
+        app.include_router(websocket_api.router)
+        app.dependency_overrides[get_ws_auth_manager] = lambda: auth
+        app.dependency_overrides[get_ws_manager] = lambda: ws_manager
+        return TestClient(app).websocket_connect(f"/ws?token={token}")
+
+    def test_non_canonical_room_joins_the_broadcast_room(self, monkeypatch):
+        pid = uuid.uuid4()
+        ws_manager = ConnectionManager()
+        with self.connect(monkeypatch, ws_manager) as ws:
+            assert ws.receive_json()["type"] == "connection"
+            ws.send_json({"action": "join_room", "room": f"dashboard:{pid.hex.upper()}"})
+            joined = ws.receive_json()
+            assert joined == {**joined, "type": "room_joined", "room": room_for_scope(str(pid))}
+            assert set(ws_manager.rooms) == {room_for_scope(str(pid))}
+            snapshot_room = websocket_api.dashboard_snapshots.send_snapshot.await_args.args[1]
+            assert snapshot_room == room_for_scope(str(pid))
+
+            ws.send_json({"action": "leave_room", "room": f"dashboard:{str(pid).upper()}"})
+            ws.send_json({"action": "ping"})
+            assert ws.receive_json()["type"] == "pong"  # leave_room has no reply
+            assert not ws_manager.rooms.get(room_for_scope(str(pid)))
+
+    def test_unparseable_dashboard_room_rejected(self, monkeypatch):
+        ws_manager = ConnectionManager()
+        with self.connect(monkeypatch, ws_manager) as ws:
+            ws.receive_json()
+            ws.send_json({"action": "join_room", "room": "dashboard:not-a-uuid"})
+            assert ws.receive_json()["type"] == "error"
+        assert not ws_manager.rooms
+        websocket_api.dashboard_snapshots.send_snapshot.assert_not_awaited()
@@ -0,0 +1,116 @@
+"""
+Database Routing Tests
+Tests for read-replica routing, per-transaction settings and pool metrics
+
+Run with: pytest tests/test_database_routing.py -v
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from db import database
+from db.database import InstrumentedQueuePool, ReplicaRouter, read_session, transaction_settings
+
+
+class FakeLagRouter(ReplicaRouter):
+    """Router whose lag probe returns scripted values per replica"""
+
+    def __init__(self, *args, lags, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.scripted = lags
+
+    async def measure_lag(self, replica):
+        result = self.scripted[self.replicas.index(replica)]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.fixture
+async def engines(tmp_path):
+    created = [
+        create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db", poolclass=InstrumentedQueuePool,
+                            pool_size=2, max_overflow=1)
+        for name in ("primary", "replica0", "replica1")
+    ]
+    yield created
+    for engine in created:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+class TestReplicaRouter:
+    """Tests for lag-aware engine selection"""
+
+    async def test_round_robin_over_fresh_replicas(self, engines):
+        primary, r0, r1 = engines
+        router = FakeLagRouter(primary, [r0, r1], max_lag_seconds=5, lags=[0.5, 1.0])
+        assert router.read_engine() is primary  # Not probed yet
+        await router.check_once()
+        assert [router.read_engine() for _ in range(4)] == [r0, r1, r0, r1]
+
+    async def test_lagging_and_failing_replicas_fall_back_to_primary(self, engines):
+        primary, r0, r1 = engines
+        router = FakeLagRouter(primary, [r0, r1], max_lag_seconds=5, lags=[30.0, ConnectionError("down")])
+        await router.check_once()
+        assert router.read_engine() is primary
+        stats = router.stats()
+        assert stats["primary_fallbacks"] == 1
+        assert stats["replicas"][0] == {"lag_seconds": 30.0, "in_rotation": False, "error": None}
+        assert stats["replicas"][1]["error"] == "down"
+
+        router.scripted = [2.0, ConnectionError("down")]
+        await router.check_once()
+        assert router.read_engine() is r0
+
+    async def test_without_replicas_reads_use_primary(self, engines):
+        primary = engines[0]
+        router = ReplicaRouter(primary, [])
+        await router.start()
+        assert not router.running and router.read_engine() is primary
+
+    async def test_read_session_bound_to_routed_engine(self, engines, monkeypatch):
+        primary, r0, _ = engines
+        router = FakeLagRouter(primary, [r0], lags=[0.0])
+        await router.check_once()
+        monkeypatch.setattr(database, "replica_router", router)
+
+        async with read_session(statement_timeout_ms=1500) as session:
+            assert session.bind is r0
+            assert session.info == {"read_only": True, "statement_timeout_ms": 1500}
+            assert (await session.execute(text("SELECT 1"))).scalar() == 1  # No settings SQL off PostgreSQL
+
+
+class TestTransactionSettings:
+    """Tests for the per-transaction SET emitted on PostgreSQL"""
+
+    def test_settings_sql(self):
+        sql, params = transaction_settings({"read_only": True, "statement_timeout_ms": 1500})
+        assert sql == ("SELECT set_config('statement_timeout', :statement_timeout, true), "
+                       "set_config('transaction_read_only', 'on', true)")
+        assert params == {"statement_timeout": "1500"}
+        assert transaction_settings({"statement_timeout_ms": 0})[1] == {"statement_timeout": "0"}
+        assert transaction_settings({}) is None
+
+
+@pytest.mark.asyncio
+class TestPoolMetrics:
+    """Tests for checkout wait and usage metrics"""
+
+    async def test_pool_stats(self, engines):
+        primary = engines[0]
+        async with primary.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            busy = primary.pool.stats()
+            assert busy["checked_out"] == 1 and busy["checkouts"] == 1
+
+        idle = primary.pool.stats()
+        assert idle["checked_out"] == 0 and idle["checked_in"] == 1
+        assert idle["size"] == 2 and idle["max_overflow"] == 1 and idle["timeouts"] == 0
+        assert idle["wait_max_ms"] >= idle["wait_avg_ms"] >= 0
+
+    def test_health_payload_covers_every_role(self):
+        stats = database.pool_stats()
+        assert set(stats["pools"]) == {"primary"} | {f"replica-{i}" for i in range(len(database.replica_engines))}
+        assert "primary_fallbacks" in stats["routing"]
@@ -0,0 +1,214 @@
+"""
+Document Vector Index Tests
+Tests for chunking, incremental indexing, filtered top-k search and persistence
+
+Run with: pytest tests/test_document_vector_index.py -v
+"""
+
+import uuid
+import pytest
+from unittest.mock import patch
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+# Register every mapper the way application startup does
+import db.models_maintenance  # noqa: F401
+import db.models_project_phases  # noqa: F401
+import db.models  # noqa: F401
+import db.family_models  # noqa: F401
+import db.models_ai  # noqa: F401
+import db.models_approval  # noqa: F401
+import db.models_comms  # noqa: F401
+import db.models_quotes  # noqa: F401
+import db.models_leads  # noqa: F401
+import db.models_ha_instance  # noqa: F401
+import db.models_contractor_labor  # noqa: F401
+from db.models import Base, Document
+from core.auth import AuthUser
+from services.document_vector_index import DocumentVectorIndex, DocumentVectorStore, chunk_text
+from services.mcp_tool_dispatcher import mcp_tool_dispatcher
+
+# Tiny deterministic "embeddings": bag of known words
+VOCABULARY = ["pet", "deposit", "dog", "parking", "garage", "roof", "invoice", "lease"]
+
+
+class FakeEmbedder:
+    def __init__(self):
+        self.batches = []
+
+    async def __call__(self, texts):
+        self.batches.append(list(texts))
+        vectors = []
+        for text in texts:
+            words = text.lower().replace(".", " ").split()
+            vectors.append([float(words.count(word)) + 0.01 for word in VOCABULARY])
+        return vectors
+
+
+class FakePaperless:
+    def __init__(self, texts):
+        self.texts = texts
+        self.calls = []
+
+    async def __call__(self, paperless_document_id):
+        self.calls.append(paperless_document_id)
+        return self.texts.get(paperless_document_id)
+
+
+@pytest.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(
+            sync_conn, tables=[Base.metadata.tables["documents"]]
+        ))
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def documents(session_factory):
+    lease_id = uuid.uuid4()
+    docs = {
+        "lease": Document(id=uuid.uuid4(), title="Lease agreement", document_type="lease",
+                          lease_id=lease_id, paperless_document_id=1),
+        "invoice": Document(id=uuid.uuid4(), title="Roof invoice", document_type="receipt",
+                            description="Roof repair invoice", paperless_document_id=2),
+        "notice": Document(id=uuid.uuid4(), title="Garage notice", document_type="notice",
+                           description="Parking garage closed for cleaning"),
+    }
+    async with session_factory() as db:
+        db.add_all(docs.values())
+        await db.commit()
+    return docs
+
+
+def make_index(session_factory, texts=None, **kwargs):
+    embedder = FakeEmbedder()
+    paperless = FakePaperless(texts if texts is not None else {
+        1: "Tenants may keep one dog. A pet deposit of $300 is due at signing.",
+        2: "Invoice for roof repair.",
+    })
+    index = DocumentVectorIndex(
+        embed_batch=embedder, fetch_text=paperless, session_factory=session_factory, **kwargs
+    )
+    return index, embedder, paperless
+
+
+def test_chunk_text_overlaps():
+    words = " ".join(str(i) for i in range(10))
+
+    chunks = chunk_text(words, size=4, overlap=1)
+
+    assert chunks == ["0 1 2 3", "3 4 5 6", "6 7 8 9"]
+    assert chunk_text("   ") == []
+
+
+@pytest.mark.asyncio
+class TestIndexing:
+    """Tests for the background indexing pass"""
+
+    async def test_indexes_once_and_searches_ocr_text(self, session_factory, documents):
+        index, embedder, paperless = make_index(session_factory)
+
+        assert await index.run_once() == 3
+        assert await index.run_once() == 0
+        assert sorted(paperless.calls) == [1, 2]
+
+        results = await index.search("pet deposit for a dog", k=2)
+        assert results[0]["document_id"] == str(documents["lease"].id)
+        assert "pet deposit" in results[0]["snippet"]
+        assert len(results) == 2
+
+    async def test_filters_and_one_hit_per_document(self, session_factory, documents):
+        index, _, _ = make_index(session_factory)
+        await index.run_once()
+
+        results = await index.search("garage parking", k=5, document_type="notice")
+        assert [r["document_id"] for r in results] == [str(documents["notice"].id)]
+
+        results = await index.search("lease", k=5, lease_id=documents["lease"].lease_id)
+        assert [r["document_id"] for r in results] == [str(documents["lease"].id)]
+
+        ids = [r["document_id"] for r in await index.search("lease pet dog", k=5)]
+        assert len(ids) == len(set(ids)) == 3
+
+    async def test_changes_and_deletes_are_incremental(self, session_factory, documents):
+        index, embedder, _ = make_index(session_factory)
+        await index.run_once()
+        embedder.batches.clear()
+
+        async with session_factory() as db:
+            notice = await db.get(Document, documents["notice"].id)
+            notice.description = "Dog park opening"
+            invoice = await db.get(Document, documents["invoice"].id)
+            await db.delete(invoice)
+            await db.commit()
+
+        assert await index.run_once() == 1
+        assert embedder.batches == [["Garage notice\nType: notice\nDog park opening"]]
+        assert str(documents["invoice"].id) not in index.store.documents
+        assert index.get_stats()["removed"] == 1
+
+    async def test_pending_ocr_rechecked_after_retry_interval(self, session_factory, documents):
+        index, _, paperless = make_index(session_factory, texts={}, ocr_retry_seconds=0)
+        await index.run_once()
+        assert index.store.documents[str(documents["lease"].id)]["has_text"] is False
+
+        paperless.texts[1] = "Pet deposit addendum"
+        await index.run_once()
+
+        assert index.store.documents[str(documents["lease"].id)]["has_text"] is True
+
+    async def test_embedding_outage_keeps_documents_due(self, session_factory, documents):
+        async def unavailable(texts):
+            return None
+
+        index = DocumentVectorIndex(
+            embed_batch=unavailable, fetch_text=FakePaperless({}), session_factory=session_factory
+        )
+
+        assert await index.run_once() == 0
+        assert index.get_stats()["failed"] == 3
+        assert await index.search("roof") is None
+
+
+@pytest.mark.asyncio
+class TestPersistence:
+    """Tests for saving and reloading the index files"""
+
+    async def test_saved_index_reloads(self, session_factory, documents, tmp_path):
+        index, _, _ = make_index(session_factory, directory=str(tmp_path))
+        await index.run_once()
+
+        reloaded, embedder, paperless = make_index(session_factory, directory=str(tmp_path))
+
+        assert (await reloaded.search("roof invoice", k=1))[0]["document_id"] == str(documents["invoice"].id)
+        assert await reloaded.run_once() == 0
+        assert paperless.calls == []
+
+    async def test_inconsistent_files_are_ignored(self, tmp_path):
+        store = DocumentVectorStore(str(tmp_path))
+        store.upsert("d1", [{"text": "a"}], [[1.0, 0.0]], {"stamp": "x"})
+        store.save()
+        (tmp_path / "vectors.f32").write_bytes(b"\x00" * 4)
+
+        assert DocumentVectorStore(str(tmp_path)).load() is False
+
+
+@pytest.mark.asyncio
+class TestSearchDocumentsTool:
+    """Tests for the search_documents MCP tool"""
+
+    async def test_tool_uses_local_index(self, session_factory, documents):
+        index, _, _ = make_index(session_factory)
+        await index.run_once()
+
+        with patch("services.document_vector_index.document_vector_index", index):
+            result = await mcp_tool_dispatcher.dispatch(
+                "search_documents", {"query": "roof repair", "k": 1}, db=None,
+                auth_user=AuthUser(username="pm", email="pm@example.com", name="PM", groups=[],
+                                   is_admin=False, is_manager=True, is_tenant=False)
+            )
+
+        assert result["total"] == 1
+        assert result["items"][0]["title"] == "Roof invoice"
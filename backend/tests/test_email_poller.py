@@ -0,0 +1,238 @@
+"""
+Email Poller Tests
+Tests for per-mailbox IMAP watchers, UID tracking, IDLE push and the worker pool
+
+Run with: pytest tests/test_email_poller.py -v
+"""
+
+import asyncio
+import threading
+import uuid
+import pytest
+from sqlalchemy import Column, Table, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+# Register every mapper the way application startup does
+import db.models_maintenance  # noqa: F401
+import db.models_project_phases  # noqa: F401
+import db.models  # noqa: F401
+import db.family_models  # noqa: F401
+import db.models_ai  # noqa: F401
+import db.models_approval  # noqa: F401
+import db.models_comms  # noqa: F401
+import db.models_quotes  # noqa: F401
+import db.models_leads  # noqa: F401
+import db.models_ha_instance  # noqa: F401
+import db.models_contractor_labor  # noqa: F401
+from db.models import Base
+from db.types import GUID
+from db.models_comms import EmailAccount, EmailMessage
+from core.encryption import encrypt_value
+from services.email_service import EmailPoller, _parse_uid_fetch
+
+
+def raw_email(message_id: str, subject: str) -> bytes:
+    return (
+        f"Message-ID: <{message_id}@example.com>\r\n"
+        f"From: Sam Lee <sam@example.com>\r\n"
+        f"To: support@example.com\r\n"
+        f"Subject: {subject}\r\n\r\n"
+        f"Body of {subject}\r\n"
+    ).encode()
+
+
+class FakeServer:
+    """In-memory IMAP folder shared by the FakeMailbox connections of one account"""
+
+    def __init__(self, uidvalidity=1):
+        self.uidvalidity = uidvalidity
+        self.messages = {}
+        self.unseen = set()
+        self.connections = 0
+        self.arrived = threading.Event()
+        self._next_uid = 1
+
+    def deliver(self, message_id, subject, seen=False):
+        uid = self._next_uid
+        self._next_uid += 1
+        self.messages[uid] = raw_email(message_id, subject)
+        if not seen:
+            self.unseen.add(uid)
+        self.arrived.set()
+        return uid
+
+
+class FakeMailbox:
+    def __init__(self, server, **config):
+        self.server = server
+        self.config = config
+        self.uidvalidity = None
+        self.uidnext = None
+        self.supports_idle = True
+
+    def connect(self):
+        self.server.connections += 1
+        self.uidvalidity = self.server.uidvalidity
+        self.uidnext = self.server._next_uid
+
+    def search_uids(self, criteria):
+        assert criteria == 'UNSEEN'
+        return sorted(self.server.unseen)
+
+    def new_uids(self, last_uid):
+        return sorted(uid for uid in self.server.messages if uid > last_uid)
+
+    def fetch(self, uids):
+        self.server.unseen -= set(uids)
+        return [(uid, self.server.messages[uid]) for uid in uids]
+
+    def idle(self, timeout, stop):
+        while not stop.is_set():
+            if self.server.arrived.wait(0.01):
+                self.server.arrived.clear()
+                return True
+        return False
+
+    def noop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    # email_messages.contractor_id references a table that has no model in this tree
+    if "service_contractors" not in Base.metadata.tables:
+        Table("service_contractors", Base.metadata, Column("id", GUID, primary_key=True))
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/mail.db")
+    tables = [Base.metadata.tables[name] for name in ("email_accounts", "email_messages")]
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=tables))
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def add_account(session_factory, username, **fields):
+    account = EmailAccount(
+        id=uuid.uuid4(), account_type="tenant_support", email_address=f"{username}@example.com",
+        display_name=username, imap_host="imap.example.com", imap_username=username,
+        imap_password_encrypted=encrypt_value("secret"), smtp_host="smtp.example.com",
+        smtp_username=username, smtp_password_encrypted=encrypt_value("secret"), **fields
+    )
+    async with session_factory() as db:
+        db.add(account)
+        await db.commit()
+    return account
+
+
+def make_poller(session_factory, servers):
+    processed = []
+    sessions = set()
+
+    async def process(message, db):
+        processed.append(message.subject)
+        sessions.add(id(db))
+
+    poller = EmailPoller(
+        session_factory,
+        workers=2,
+        refresh_interval=3600,
+        mailbox_factory=lambda **config: FakeMailbox(servers[config["username"]], **config),
+        process=process
+    )
+    return poller, processed, sessions
+
+
+async def wait_for(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+def test_parse_uid_fetch():
+    data = [
+        (b'1 (UID 41 RFC822 {5}', b'hello'),
+        b')',
+        (b'2 (FLAGS (\\Seen) UID 42 RFC822 {5}', b'world'),
+        b')',
+    ]
+
+    assert _parse_uid_fetch(data) == [(41, b'hello'), (42, b'world')]
+
+
+@pytest.mark.asyncio
+class TestEmailPoller:
+    """Tests for the mailbox supervisor"""
+
+    async def test_unseen_backlog_then_idle_push(self, session_factory):
+        server = FakeServer()
+        server.deliver("old", "Already read", seen=True)
+        server.deliver("backlog", "Leaky faucet")
+        account = await add_account(session_factory, "support")
+        poller, processed, sessions = make_poller(session_factory, {"support": server})
+
+        await poller.start()
+        try:
+            await wait_for(lambda: processed == ["Leaky faucet"])
+            server.deliver("new", "Broken heater")
+            await wait_for(lambda: processed == ["Leaky faucet", "Broken heater"])
+        finally:
+            await poller.stop()
+
+        assert server.connections == 1
+        assert len(sessions) == 2
+        async with session_factory() as db:
+            stored = await db.get(EmailAccount, account.id)
+            assert (stored.imap_uidvalidity, stored.imap_last_uid) == (1, 3)
+            assert stored.total_emails_processed == 2
+
+    async def test_uidvalidity_change_rescans_without_duplicates(self, session_factory):
+        server = FakeServer(uidvalidity=7)
+        server.deliver("stored", "Seen before")
+        server.deliver("fresh", "Rent question")
+        account = await add_account(session_factory, "support", imap_uidvalidity=3, imap_last_uid=99)
+        async with session_factory() as db:
+            db.add(EmailMessage(
+                email_account_id=account.id, message_id="<stored@example.com>", direction="incoming",
+                from_address="sam@example.com", to_addresses="support@example.com", subject="Seen before"
+            ))
+            await db.commit()
+        poller, processed, _ = make_poller(session_factory, {"support": server})
+
+        await poller.start()
+        try:
+            await wait_for(lambda: processed == ["Rent question"])
+        finally:
+            await poller.stop()
+
+        async with session_factory() as db:
+            count = len((await db.execute(select(EmailMessage.id))).all())
+            stored = await db.get(EmailAccount, account.id)
+        assert count == 2
+        assert (stored.imap_uidvalidity, stored.imap_last_uid) == (7, 2)
+
+    async def test_accounts_watched_concurrently_and_reconciled(self, session_factory):
+        quiet, busy = FakeServer(), FakeServer()
+        await add_account(session_factory, "quiet")
+        busy_account = await add_account(session_factory, "busy")
+        poller, processed, _ = make_poller(session_factory, {"quiet": quiet, "busy": busy})
+
+        await poller.start()
+        try:
+            await wait_for(lambda: poller.get_stats()["connected"] == 2)
+            busy.deliver("b1", "Gate code")
+            await wait_for(lambda: processed == ["Gate code"])
+
+            async with session_factory() as db:
+                (await db.get(EmailAccount, busy_account.id)).is_active = False
+                await db.commit()
+            await poller.refresh_accounts()
+            assert poller.get_stats()["mailboxes"] == 1
+        finally:
+            await poller.stop()
+
+        assert poller.get_stats()["running"] is False
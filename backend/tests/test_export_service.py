@@ -0,0 +1,113 @@
+"""
+Export Service Tests
+Tests for column projection and streamed NDJSON/CSV/gzip exports
+
+Run with: pytest tests/test_export_service.py -v
+"""
+
+import csv
+import gzip
+import io
+import json
+import uuid
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+# Register every mapper the way application startup does
+import db.models_maintenance  # noqa: F401
+import db.models_project_phases  # noqa: F401
+import db.models  # noqa: F401
+import db.family_models  # noqa: F401
+import db.models_ai  # noqa: F401
+import db.models_approval  # noqa: F401
+import db.models_comms  # noqa: F401
+import db.models_quotes  # noqa: F401
+import db.models_leads  # noqa: F401
+import db.models_ha_instance  # noqa: F401
+import db.models_contractor_labor  # noqa: F401
+from db.models import Base, RentPayment, Tenant
+from api.v1.exports import TENANT_EXCLUDED_FIELDS, TENANT_SENSITIVE_FIELDS
+from services.export_service import ExportError, export_columns, stream_export
+
+PAYMENT_COUNT = 1203
+
+
+@pytest.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=[RentPayment.__table__]))
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    lease_id, tenant_id, unit_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    async with factory() as db:
+        db.add_all([
+            RentPayment(
+                id=uuid.uuid4(), lease_id=lease_id, tenant_id=tenant_id, unit_id=unit_id,
+                amount=Decimal("1250.50"), due_date=date(2026, 1, 1) + timedelta(days=i),
+                status="paid" if i % 3 else "pending"
+            )
+            for i in range(PAYMENT_COUNT)
+        ])
+        await db.commit()
+    yield factory
+    await engine.dispose()
+
+
+async def collect(factory, fields, fmt="ndjson", compress=False, status=None):
+    columns = export_columns(RentPayment, fields)
+    query = select(RentPayment).order_by(RentPayment.due_date)
+    if status:
+        query = query.where(RentPayment.status == status)
+    chunks = [chunk async for chunk in stream_export(
+        query, columns, fmt, compress=compress,
+        session_factory=factory, batch_rows=500
+    )]
+    data = b"".join(chunks)
+    return (gzip.decompress(data) if compress else data).decode(), len(chunks)
+
+
+@pytest.mark.asyncio
+class TestExportStream:
+    """Tests for streamed exports"""
+
+    async def test_ndjson_streams_projected_rows_in_batches(self, session_factory):
+        body, chunks = await collect(session_factory, "due_date,amount,status")
+        lines = body.splitlines()
+        assert len(lines) == PAYMENT_COUNT and chunks == 3
+        assert json.loads(lines[0]) == {"due_date": "2026-01-01", "amount": 1250.5, "status": "pending"}
+
+    async def test_csv_with_filter_and_gzip(self, session_factory):
+        body, _ = await collect(session_factory, "due_date,status", fmt="csv", compress=True, status="pending")
+        rows = list(csv.reader(io.StringIO(body)))
+        assert rows[0] == ["due_date", "status"]
+        assert len(rows) - 1 == len(range(0, PAYMENT_COUNT, 3))
+        assert rows[1] == ["2026-01-01", "pending"]
+
+
+class TestExportColumns:
+    """Tests for column projection"""
+
+    def test_default_all_columns_and_exclusions(self):
+        names = [name for name, _ in export_columns(RentPayment, exclude=("stripe_customer_id",))]
+        assert names[:3] == ["id", "lease_id", "tenant_id"]
+        assert "stripe_customer_id" not in names
+
+    def test_unknown_or_excluded_field_rejected(self):
+        with pytest.raises(ExportError):
+            export_columns(RentPayment, "amount,password")
+        with pytest.raises(ExportError):
+            export_columns(RentPayment, "stripe_customer_id", exclude=("stripe_customer_id",))
+
+    def test_sensitive_tenant_fields_only_when_requested(self):
+        options = dict(exclude=TENANT_EXCLUDED_FIELDS, opt_in=TENANT_SENSITIVE_FIELDS)
+        names = [name for name, _ in export_columns(Tenant, **options)]
+        assert "email" in names
+        assert not {"date_of_birth", "annual_income", "auth_user_id"} & set(names)
+
+        requested = export_columns(Tenant, "email,date_of_birth,annual_income", **options)
+        assert [name for name, _ in requested] == ["email", "date_of_birth", "annual_income"]
+        with pytest.raises(ExportError):
+            export_columns(Tenant, "auth_user_id", **options)
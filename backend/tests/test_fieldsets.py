@@ -0,0 +1,93 @@
+"""
+Sparse Fieldset Tests
+Tests for ?fields= column-restricted loading and per-request response models
+
+Run with: pytest tests/test_fieldsets.py -v
+"""
+
+import json
+import uuid
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+# Register every mapper the way application startup does
+import db.models_maintenance  # noqa: F401
+import db.models_project_phases  # noqa: F401
+import db.models  # noqa: F401
+import db.family_models  # noqa: F401
+import db.models_ai  # noqa: F401
+import db.models_approval  # noqa: F401
+import db.models_comms  # noqa: F401
+import db.models_quotes  # noqa: F401
+import db.models_leads  # noqa: F401
+import db.models_ha_instance  # noqa: F401
+import db.models_contractor_labor  # noqa: F401
+from db.models import Base, Tenant, WorkOrder
+from db.models_quotes import Quote as QuoteModel
+from api.schemas import TenantResponse, WorkOrderResponse
+from api.schemas_quotes import Quote
+from api.fieldsets import SparseFields, load_options, sparse_model, sparse_response
+from api.pagination import PageOptions, paginate
+
+
+@pytest.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=[Tenant.__table__]))
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        for i in range(3):
+            session.add(Tenant(
+                id=uuid.uuid4(), first_name=f"T{i}", last_name="Lee", email=f"t{i}@example.com",
+                notes="long free-text notes " * 50
+            ))
+        await session.commit()
+    async with factory() as session:
+        yield session
+    await engine.dispose()
+
+
+class TestResolve:
+    """Tests for field parsing and generated models"""
+
+    def test_resolve_adds_id_and_rejects_unknown(self):
+        assert SparseFields("email, first_name,email").resolve(TenantResponse) == ("id", "email", "first_name")
+        assert SparseFields(None).resolve(TenantResponse) is None
+        with pytest.raises(HTTPException) as exc:
+            SparseFields("email,password").resolve(TenantResponse)
+        assert exc.value.status_code == 400
+
+    def test_sparse_models_are_cached_and_narrow(self):
+        fields = ("id", "quote_number", "status", "monthly_total")
+        model = sparse_model(Quote, fields)
+        assert sparse_model(Quote, fields) is model
+        assert set(model.model_fields) == set(fields)
+        assert set(sparse_model(WorkOrderResponse, ("id", "tasks")).model_fields) == {"id", "tasks"}
+
+    def test_load_options_skip_unrequested_relationships(self):
+        options = load_options(QuoteModel, ("id", "status"), always=[QuoteModel.created_at])
+        assert len(options) == 1 + len(inspect(QuoteModel).relationships)
+        assert load_options(QuoteModel, None) == []
+        assert load_options(WorkOrder, ("id", "title")) != []
+
+
+@pytest.mark.asyncio
+class TestSparseList:
+    """Tests for sparse list responses"""
+
+    async def test_only_requested_columns_are_loaded_and_returned(self, db):
+        fields = SparseFields("first_name,email").resolve(TenantResponse)
+        query = select(Tenant).options(*load_options(Tenant, fields, always=[Tenant.created_at]))
+        page = await paginate(db, query, Tenant.created_at, Tenant.id, skip=0, limit=2,
+                              options=PageOptions(cursor=None, count=None))
+
+        state = inspect(page.items[0])
+        assert "notes" in state.unloaded and "first_name" not in state.unloaded
+        assert page.next_cursor  # sort key was loaded for the cursor
+
+        body = json.loads(sparse_response(page.envelope(), TenantResponse, fields).body)
+        assert set(body["items"][0]) == {"id", "first_name", "email"}
+        assert body["total"] == 3 and body["has_more"] is True
@@ -0,0 +1,123 @@
+"""
+Fleet Rollout Tests
+Tests for wave planning, canary halting and rollback in FleetDeploymentService
+
+Run with: pytest tests/test_fleet_rollout.py -v
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from services.fleet_deployment_service import FleetDeploymentService, RolloutPolicy
+
+
+def make_hubs(count: int):
+    """Build lightweight hub stand-ins with the attributes the rollout reads"""
+    return [
+        SimpleNamespace(id=f"hub-{i}", hostname=f"hub-{i}.local", manifest_version="v1")
+        for i in range(count)
+    ]
+
+
+def deploy_result(status: str = "success"):
+    return {"deployment_id": "dep", "status": status, "message": "", "duration_seconds": 0.1}
+
+
+class TestRolloutPolicy:
+    """Tests for RolloutPolicy validation"""
+
+    def test_defaults(self):
+        policy = RolloutPolicy()
+        assert policy.canary_count == 1
+        assert policy.rollback_on_halt is True
+
+    def test_invalid_threshold(self):
+        with pytest.raises(ValueError):
+            RolloutPolicy(failure_threshold=1.5)
+
+    def test_invalid_parallelism(self):
+        with pytest.raises(ValueError):
+            RolloutPolicy(max_parallel=0)
+
+
+class TestWavePlanning:
+    """Tests for FleetDeploymentService._plan_waves"""
+
+    def test_canary_then_batches(self):
+        service = FleetDeploymentService()
+        waves = service._plan_waves(make_hubs(8), RolloutPolicy(canary_count=2, batch_size=3))
+
+        assert [len(w) for w in waves] == [2, 3, 3]
+
+    def test_no_canary(self):
+        service = FleetDeploymentService()
+        waves = service._plan_waves(make_hubs(5), RolloutPolicy(canary_count=0, batch_size=2))
+
+        assert [len(w) for w in waves] == [2, 2, 1]
+
+    def test_canary_larger_than_fleet(self):
+        service = FleetDeploymentService()
+        waves = service._plan_waves(make_hubs(2), RolloutPolicy(canary_count=5))
+
+        assert [len(w) for w in waves] == [2]
+
+
+@pytest.mark.asyncio
+class TestRunRollout:
+    """Tests for FleetDeploymentService._run_rollout"""
+
+    async def run(self, service, hubs, policy):
+        with patch('services.fleet_deployment_service.ws_manager') as ws:
+            ws.broadcast_to_room = AsyncMock()
+            return await service._run_rollout(
+                target_hubs=hubs,
+                service_package_id="pkg",
+                manifest_version="v2",
+                initiated_by="admin",
+                policy=policy
+            )
+
+    async def test_all_waves_succeed(self):
+        service = FleetDeploymentService()
+        service.deploy_to_hub = AsyncMock(return_value=deploy_result())
+
+        result = await self.run(service, make_hubs(7), RolloutPolicy(canary_count=1, batch_size=3))
+
+        assert result["successful"] == 7
+        assert result["halted"] is False
+        assert result["waves_completed"] == 3
+        assert service.deploy_to_hub.await_count == 7
+
+    async def test_canary_failure_halts_and_skips_rest(self):
+        service = FleetDeploymentService()
+        service.deploy_to_hub = AsyncMock(side_effect=RuntimeError("git unreachable"))
+        service.rollback_deployment = AsyncMock()
+
+        result = await self.run(service, make_hubs(6), RolloutPolicy(canary_count=1, batch_size=5))
+
+        assert result["halted"] is True
+        assert result["failed"] == 1
+        assert result["skipped"] == 5
+        assert service.deploy_to_hub.await_count == 1
+        service.rollback_deployment.assert_not_awaited()
+
+    async def test_threshold_halt_rolls_back_updated_hubs(self):
+        service = FleetDeploymentService()
+        outcomes = iter(["success", "success", "failed", "failed", "success"])
+        service.deploy_to_hub = AsyncMock(side_effect=lambda **_: deploy_result(next(outcomes)))
+        service.rollback_deployment = AsyncMock(return_value=deploy_result())
+
+        result = await self.run(
+            service,
+            make_hubs(9),
+            RolloutPolicy(canary_count=1, batch_size=4, failure_threshold=0.3)
+        )
+
+        assert result["halted"] is True
+        assert result["skipped"] == 4
+        assert result["rolled_back"] == 3
+        rolled_back = [d for d in result["deployments"] if d["status"] == "rolled_back"]
+        assert len(rolled_back) == 3
+        for call in service.rollback_deployment.await_args_list:
+            assert call.kwargs["previous_manifest_version"] == "v1"
@@ -0,0 +1,141 @@
+"""
+Git Catalog Index Tests
+Tests for the per-commit component catalog maintained by GitService
+
+Run with: pytest tests/test_git_catalog.py -v
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+import pytest
+from git import Repo
+
+from services.git_service import GitCatalogRefresher, GitService
+
+
+def commit_component(repo: Repo, name: str, version: str):
+    """Write a component manifest into the working tree and commit it"""
+    component_dir = os.path.join(repo.working_dir, "custom_components", name)
+    os.makedirs(component_dir, exist_ok=True)
+    with open(f"{component_dir}/manifest.json", "w") as f:
+        json.dump({"domain": name, "version": version, "name": name.title()}, f)
+    repo.index.add([f"custom_components/{name}/manifest.json"])
+    repo.index.commit(f"{name} {version}")
+
+
+@pytest.fixture
+def upstream(tmp_path):
+    """A local 'remote' components repository"""
+    repo = Repo.init(tmp_path / "upstream")
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "test")
+        config.set_value("user", "email", "test@example.com")
+    commit_component(repo, "somni_lights", "1.0.0")
+    return repo
+
+
+@pytest.fixture
+def git_service(tmp_path, upstream):
+    service = GitService(cache_dir=str(tmp_path / "cache"))
+    service.repos["components"] = upstream.working_dir
+    return service
+
+
+class TestGitCatalog:
+    """Tests for catalog building, persistence and refresh"""
+
+    def test_catalog_built_once_per_sha(self, git_service, upstream):
+        components = git_service.list_components()
+
+        assert [c["name"] for c in components] == ["somni_lights"]
+        assert components[0]["version"] == "1.0.0"
+
+        catalog = git_service.get_cached_catalog("components")
+        assert catalog["sha"] == upstream.head.commit.hexsha
+        assert catalog["entries"]["somni_lights"]["checksum"]
+
+        # Persisted next to the clone
+        assert git_service._get_index_path("components").exists()
+
+    def test_persisted_index_reused(self, git_service, tmp_path):
+        git_service.list_components()
+
+        fresh = GitService(cache_dir=str(tmp_path / "cache"))
+        fresh.repos["components"] = git_service.repos["components"]
+        fresh._build_catalog = None  # Must not walk the tree again
+
+        assert [c["name"] for c in fresh.list_components()] == ["somni_lights"]
+
+    def test_refresh_unchanged_skips_reindex(self, git_service):
+        git_service.list_components()
+
+        result = git_service.refresh_repo("components")
+
+        assert result["changed"] is False
+
+    def test_refresh_picks_up_new_commit(self, git_service, upstream):
+        git_service.list_components()
+        old_checksum = git_service.get_cached_catalog("components")["entries"]["somni_lights"]["checksum"]
+
+        commit_component(upstream, "somni_lights", "1.1.0")
+        commit_component(upstream, "somni_climate", "0.1.0")
+
+        assert git_service.refresh_all(["components"]) == {"components": "updated"}
+
+        catalog = git_service.get_cached_catalog("components")
+        assert set(catalog["entries"]) == {"somni_lights", "somni_climate"}
+        assert catalog["entries"]["somni_lights"]["checksum"] != old_checksum
+        assert git_service.get_component_manifest("somni_lights")["version"] == "1.1.0"
+
+    def test_refresh_on_detached_head(self, git_service, upstream):
+        git_service.list_components()
+        clone = Repo(git_service._get_repo_path("components"))
+        clone.git.checkout(clone.head.commit.hexsha)  # Detach HEAD
+        assert clone.head.is_detached
+
+        commit_component(upstream, "somni_lights", "1.2.0")
+
+        result = git_service.refresh_repo("components")
+        assert result["changed"] is True and result["sha"] == upstream.head.commit.hexsha
+        assert git_service.get_component_manifest("somni_lights")["version"] == "1.2.0"
+        assert git_service.get_repo_info("components")["branch"] is None
+
+    def test_component_path_from_index(self, git_service):
+        path = git_service.get_component_path("somni_lights")
+
+        assert path is not None and path.name == "somni_lights"
+        assert git_service.get_component_path("missing") is None
+
+
+@pytest.mark.asyncio
+class TestCatalogRefresher:
+    """Tests for the background refresher"""
+
+    async def test_refreshes_of_one_repo_do_not_overlap(self, git_service):
+        active, overlaps = {}, []
+        guard = threading.Lock()
+
+        def refresh_all(repo_names):
+            repo_name, = repo_names
+            with guard:
+                active[repo_name] = active.get(repo_name, 0) + 1
+                if active[repo_name] > 1:
+                    overlaps.append(repo_name)
+            time.sleep(0.05)
+            with guard:
+                active[repo_name] -= 1
+            return {repo_name: "unchanged"}
+
+        git_service.refresh_all = refresh_all
+        refresher = GitCatalogRefresher(git_service)
+
+        results = await asyncio.gather(
+            refresher.refresh_now(["components"]),
+            refresher.refresh_now(["components", "configs"]),
+        )
+
+        assert overlaps == []
+        assert results[1] == {"components": "unchanged", "configs": "unchanged"}
@@ -0,0 +1,250 @@
+"""
+HTTP Caching Tests
+Tests for conditional GETs (ETag/Last-Modified, 304) and response compression
+
+Run with: pytest tests/test_http_caching.py -v
+"""
+
+import gzip
+import uuid
+from datetime import datetime, timedelta, timezone
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+# Register every mapper the way application startup does
+import db.models_maintenance  # noqa: F401
+import db.models_project_phases  # noqa: F401
+import db.models  # noqa: F401
+import db.family_models  # noqa: F401
+import db.models_ai  # noqa: F401
+import db.models_approval  # noqa: F401
+import db.models_comms  # noqa: F401
+import db.models_quotes  # noqa: F401
+import db.models_leads  # noqa: F401
+import db.models_ha_instance  # noqa: F401
+import db.models_contractor_labor  # noqa: F401
+from db.database import get_db
+from db.models import Base, Property, Building
+from core.auth import require_manager
+from api.v1 import buildings
+from api.conditional import row_validators, version_columns
+from services import cache_service
+from services.cache_service import RedisHandle
+from middleware import CompressionMiddleware, ConditionalGetMiddleware
+from middleware.compression import BROTLI_AVAILABLE, choose_encoding
+from middleware.conditional_get import etag_matches
+
+BIG = {"items": [{"id": i, "name": f"Building {i}"} for i in range(200)]}
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ConditionalGetMiddleware)
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/big")
+    async def big():
+        return BIG
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/pdf")
+    async def pdf():
+        return Response(b"%PDF" + b"0" * 4000, media_type="application/pdf")
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(50):
+                yield f"line {i} ".encode() * 20
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.post("/big")
+    async def post_big():
+        return JSONResponse(BIG)
+
+    return app
+
+
+@pytest.fixture
+async def client():
+    async with httpx.AsyncClient(app=make_app(), base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.asyncio
+class TestCompression:
+    """Tests for CompressionMiddleware"""
+
+    async def test_large_json_compressed_small_and_excluded_are_not(self, client):
+        response = await client.get("/big", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) < len(response.content)
+        assert response.json() == BIG
+
+        assert "content-encoding" not in (await client.get("/small", headers={"Accept-Encoding": "gzip"})).headers
+        assert "content-encoding" not in (await client.get("/pdf", headers={"Accept-Encoding": "gzip"})).headers
+        assert "content-encoding" not in (await client.get("/big", headers={"Accept-Encoding": "identity"})).headers
+
+    async def test_streams_compressed_incrementally(self, client):
+        async with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert gzip.decompress(raw) == b"".join(f"line {i} ".encode() * 20 for i in range(50))
+
+    def test_choose_encoding(self):
+        assert choose_encoding("gzip, deflate, br") == ("br" if BROTLI_AVAILABLE else "gzip")
+        assert choose_encoding("br;q=0, gzip;q=0.5") == "gzip"
+        assert choose_encoding("*") == ("br" if BROTLI_AVAILABLE else "gzip")
+        assert choose_encoding("identity") is None and choose_encoding(None) is None
+
+
+@pytest.mark.asyncio
+class TestConditionalMiddleware:
+    """Tests for body-derived ETags"""
+
+    async def test_body_etag_and_304(self, client):
+        first = await client.get("/big")
+        etag = first.headers["etag"]
+        assert etag.startswith('W/"')
+
+        again = await client.get("/big", headers={"If-None-Match": etag, "Accept-Encoding": "gzip"})
+        assert again.status_code == 304 and again.content == b""
+        assert again.headers["etag"] == etag and "content-encoding" not in again.headers
+
+        assert (await client.get("/big", headers={"If-None-Match": 'W/"other"'})).status_code == 200
+        assert "etag" not in (await client.post("/big")).headers
+
+    def test_weak_comparison(self):
+        assert etag_matches('"a", W/"b"', 'W/"b"')
+        assert etag_matches('"b"', 'W/"b"')
+        assert etag_matches("*", 'W/"b"')
+        assert not etag_matches('W/"c"', 'W/"b"')
+
+
+@pytest.fixture
+async def factory(monkeypatch):
+    monkeypatch.setattr(cache_service, "_redis", RedisHandle(enabled=False))
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(
+            sync_conn, tables=[Property.__table__, Building.__table__]
+        ))
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+class TestConditionalRoutes:
+    """Tests for @conditional on the buildings endpoints"""
+
+    async def test_304_from_row_versions_without_running_the_endpoint(self, factory):
+        async with factory() as session:
+            prop = Property(id=uuid.uuid4(), name="P", address_line1="1 Main St", city="Town",
+                            state="CA", zip_code="90000", property_type="residential")
+            building = Building(id=uuid.uuid4(), property_id=prop.id, name="Main")
+            session.add_all([prop, building])
+            await session.commit()
+
+        statements = []
+        event.listen(factory.kw["bind"].sync_engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        async def override_db():
+            async with factory() as session:
+                yield session
+                await session.commit()
+
+        app = FastAPI()
+        app.add_middleware(ConditionalGetMiddleware)
+        app.include_router(buildings.router, prefix="/buildings")
+        app.dependency_overrides[get_db] = override_db
+        app.dependency_overrides[require_manager] = lambda: None
+
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            url = f"/buildings/{building.id}"
+            first = await client.get(url)
+            assert first.status_code == 200 and first.json()["name"] == "Main"
+            etag = first.headers["etag"]
+            assert first.headers["cache-control"] == "private, no-cache"
+            assert "last-modified" in first.headers
+
+            statements.clear()
+            again = await client.get(url, headers={"If-None-Match": etag})
+            assert again.status_code == 304 and again.headers["etag"] == etag
+            assert len(statements) == 1  # Only the validator query, a primary-key lookup
+            assert "count(" not in statements[0].lower() and "max(" not in statements[0].lower()
+
+            since = await client.get(url, headers={"If-Modified-Since": first.headers["last-modified"]})
+            assert since.status_code == 304
+
+            listing = await client.get("/buildings", params={"property_id": str(prop.id)})
+            assert listing.headers["etag"] != etag  # Validators are per URL
+            other = await client.get("/buildings", params={"property_id": str(uuid.uuid4())})
+            assert other.json()["total"] == 0
+
+            async with factory() as session:
+                session.add(Building(property_id=prop.id, name="Annex"))
+                await session.commit()
+
+            # Another row changed: the item is still current, the filtered list is not
+            unchanged = await client.get(url, headers={"If-None-Match": etag})
+            assert unchanged.status_code == 304
+            relisted = await client.get(
+                "/buildings", params={"property_id": str(prop.id)},
+                headers={"If-None-Match": listing.headers["etag"]},
+            )
+            assert relisted.status_code == 200 and relisted.json()["total"] == 2
+            still_empty = await client.get(
+                "/buildings", params={"property_id": other.url.params["property_id"]},
+                headers={"If-None-Match": other.headers["etag"]},
+            )
+            assert still_empty.status_code == 304
+
+            async with factory() as session:
+                row = await session.get(Building, building.id)
+                row.name = "Main Hall"
+                row.updated_at = datetime.now(timezone.utc) + timedelta(minutes=1)
+                await session.commit()
+
+            changed = await client.get(url, headers={"If-None-Match": etag})
+            assert changed.status_code == 200 and changed.headers["etag"] != etag
+            assert changed.json()["name"] == "Main Hall"
+
+    def test_postgres_validators_include_row_versions(self):
+        sql = str(select(*version_columns(Building, "postgresql")).compile(dialect=postgresql.dialect()))
+        # updated_at is the transaction start time; xmin also changes for late commits of early transactions
+        assert "sum(CAST(CAST(xmin AS TEXT) AS BIGINT))" in sql
+        assert "xmin" not in str(select(*version_columns(Building, "sqlite")))
+
+    async def test_postgres_item_validators_read_one_row(self):
+        executed = []
+
+        class Connection:
+            dialect = postgresql.dialect()
+
+        class Result:
+            def first(self):
+                return None
+
+        class Session:
+            async def connection(self):
+                return Connection()
+
+            async def execute(self, statement):
+                executed.append(str(statement.compile(dialect=postgresql.dialect())))
+                return Result()
+
+        assert await row_validators(Session(), Building, uuid.uuid4()) == (None, None)
+        sql = executed[0]
+        assert "CAST(CAST(xmin AS TEXT) AS BIGINT)" in sql and "buildings.id =" in sql
+        assert "sum(" not in sql and "count(" not in sql
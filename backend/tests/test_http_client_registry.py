@@ -0,0 +1,103 @@
+"""
+HTTP Client Registry Tests
+Tests for shared pooled integration HTTP clients, retries and metrics
+
+Run with: pytest tests/test_http_client_registry.py -v
+"""
+
+import httpx
+import pytest
+
+from services.http_client_registry import (
+    HttpClientPolicy, HttpClientRegistry, InstrumentedTransport, ServiceHttpMetrics
+)
+
+
+def make_client(handler, retries: int = 2):
+    metrics = ServiceHttpMetrics()
+    transport = InstrumentedTransport(
+        httpx.MockTransport(handler),
+        HttpClientPolicy(retries=retries, retry_backoff=0),
+        metrics
+    )
+    return httpx.AsyncClient(transport=transport), metrics
+
+
+class TestRegistry:
+    """Tests for client sharing"""
+
+    def test_same_client_per_service(self):
+        registry = HttpClientRegistry()
+
+        assert registry.get_client("vikunja") is registry.get_client("vikunja")
+        assert registry.get_client("vikunja") is not registry.get_client("novu")
+
+    @pytest.mark.asyncio
+    async def test_close_all_then_recreate(self):
+        registry = HttpClientRegistry()
+        client = registry.get_client("novu")
+
+        await registry.close_all()
+
+        assert client.is_closed
+        assert registry.get_client("novu") is not client
+
+
+@pytest.mark.asyncio
+class TestRetryPolicy:
+    """Tests for InstrumentedTransport retries and metrics"""
+
+    async def test_idempotent_request_retried_on_503(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request.method)
+            return httpx.Response(503 if len(calls) < 2 else 200)
+
+        client, metrics = make_client(handler)
+        response = await client.get("http://svc/items")
+
+        assert response.status_code == 200
+        assert len(calls) == 2
+        assert metrics.retries == 1
+        assert metrics.requests == 2
+        assert metrics.errors == 1
+
+    async def test_post_not_retried_on_503(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request.method)
+            return httpx.Response(503)
+
+        client, metrics = make_client(handler)
+        response = await client.post("http://svc/items", json={"a": 1})
+
+        assert response.status_code == 503
+        assert calls == ["POST"]
+
+    async def test_connect_error_retried_for_post(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request.method)
+            if len(calls) < 3:
+                raise httpx.ConnectError("refused", request=request)
+            return httpx.Response(201)
+
+        client, metrics = make_client(handler)
+        response = await client.post("http://svc/items", json={"a": 1})
+
+        assert response.status_code == 201
+        assert metrics.retries == 2
+        assert metrics.snapshot()["status_classes"] == {"2xx": 1}
+
+    async def test_retries_exhausted_raises(self):
+        def handler(request):
+            raise httpx.ConnectError("refused", request=request)
+
+        client, metrics = make_client(handler, retries=1)
+
+        with pytest.raises(httpx.ConnectError):
+            await client.get("http://svc/items")
+        assert metrics.errors == 2
@@ -0,0 +1,98 @@
+"""
+LLM Provider Registry Tests
+Tests for cached provider selection, health probes and mid-request failover
+
+Run with: pytest tests/test_llm_provider_registry.py -v
+"""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from services.llm_providers import LLMFactory, LLMMessage, LLMResponse
+from services.llm_provider_registry import FailoverLLMProvider, LLMProviderRegistry
+
+
+@pytest.fixture(autouse=True)
+def no_cloud_keys(monkeypatch):
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+
+def ok_response(model="m"):
+    return LLMResponse(content="hi", model=model)
+
+
+class TestSelection:
+    """Tests for provider ordering from cached health"""
+
+    def test_cascade_order(self):
+        registry = LLMProviderRegistry()
+
+        assert registry.cascade() == ["localai", "ollama"]
+        assert registry.cascade("anthropic", api_key="k") == ["anthropic", "localai", "ollama", "openai"]
+
+    def test_down_providers_sorted_last(self):
+        registry = LLMProviderRegistry()
+        registry.record_failure("localai", ConnectionError("refused"))
+
+        assert registry.select() == "ollama"
+        assert registry.candidates() == ["ollama", "localai"]
+
+    def test_instances_reused(self):
+        registry = LLMProviderRegistry()
+
+        assert registry.get_provider("ollama") is registry.get_provider("ollama")
+        assert registry.get_provider("ollama") is not registry.get_provider("ollama", model="llama3")
+
+
+@pytest.mark.asyncio
+class TestProbesAndFailover:
+    """Tests for health probes and FailoverLLMProvider"""
+
+    async def test_probe_uses_health_check_not_completion(self):
+        registry = LLMProviderRegistry()
+        provider = registry.get_provider("localai")
+
+        with patch.object(provider, "health_check", AsyncMock()) as health_check, \
+                patch.object(provider, "chat_completion", AsyncMock()) as completion:
+            assert await registry.probe("localai") is True
+
+        health_check.assert_awaited_once()
+        completion.assert_not_called()
+        assert registry.get_status()["localai"]["available"] is True
+
+    async def test_failover_mid_request(self):
+        registry = LLMProviderRegistry()
+        localai = registry.get_provider("localai")
+        ollama = registry.get_provider("ollama")
+        llm = FailoverLLMProvider(registry)
+
+        with patch.object(localai, "chat_completion", AsyncMock(side_effect=ConnectionError("down"))), \
+                patch.object(ollama, "chat_completion", AsyncMock(return_value=ok_response("tiny"))):
+            response = await llm.chat_completion([LLMMessage(role="user", content="hello")])
+
+        assert response.model == "tiny"
+        assert llm.provider_name == "ollama"
+        assert registry.health["localai"].available is False
+        assert registry.health["ollama"].available is True
+
+    async def test_rejected_request_does_not_mark_provider_down(self):
+        registry = LLMProviderRegistry()
+        localai = registry.get_provider("localai")
+        ollama = registry.get_provider("ollama")
+        llm = FailoverLLMProvider(registry)
+
+        with patch.object(localai, "chat_completion", AsyncMock(side_effect=ValueError("bad tools"))), \
+                patch.object(ollama, "chat_completion", AsyncMock(side_effect=ConnectionError("down"))):
+            with pytest.raises(ConnectionError):
+                await llm.chat_completion([LLMMessage(role="user", content="hello")])
+
+        assert registry.health["localai"].available is None
+        assert registry.health["ollama"].available is False
+
+    async def test_create_with_fallback_sends_no_probe_completion(self):
+        with patch("services.llm_providers.LocalAIProvider.chat_completion", AsyncMock()) as completion:
+            provider = await LLMFactory.create_with_fallback()
+
+        assert isinstance(provider, FailoverLLMProvider)
+        completion.assert_not_called()
@@ -0,0 +1,176 @@
+"""
+MCP Tool Dispatcher Tests
+Tests for in-process MCP tool execution and the HTTP fallback
+
+Run with: pytest tests/test_mcp_tool_dispatcher.py -v
+"""
+
+import uuid
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+# Register every mapper the way application startup does
+import db.models_maintenance  # noqa: F401
+import db.models_project_phases  # noqa: F401
+import db.models  # noqa: F401
+import db.family_models  # noqa: F401
+import db.models_ai  # noqa: F401
+import db.models_approval  # noqa: F401
+import db.models_comms  # noqa: F401
+import db.models_quotes  # noqa: F401
+import db.models_leads  # noqa: F401
+import db.models_ha_instance  # noqa: F401
+import db.models_contractor_labor  # noqa: F401
+from db.models import Base, Property, Building, Unit, Tenant, Lease, WorkOrder
+from core.auth import AuthUser
+from services.mcp_tool_dispatcher import mcp_tool_dispatcher
+from services.somniproperty_mcp_server import SomniPropertyMCPServer
+
+MANAGER = AuthUser(username="pm", email="pm@example.com", name="PM", groups=["managers"],
+                   is_admin=False, is_manager=True, is_tenant=False)
+
+
+def tenant_user(username: str) -> AuthUser:
+    return AuthUser(username=username, email=f"{username}@example.com", name=username, groups=["tenants"],
+                    is_admin=False, is_manager=False, is_tenant=True)
+
+
+@pytest.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    tables = [Base.metadata.tables[name] for name in (
+        "properties", "buildings", "units", "tenants", "leases", "work_orders"
+    )]
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=tables))
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+async def seeded(db):
+    prop = Property(
+        id=uuid.uuid4(), name="Maple Court", address_line1="1 Maple St",
+        city="Austin", state="TX", zip_code="78701", property_type="residential"
+    )
+    building = Building(id=uuid.uuid4(), property_id=prop.id, name="A")
+    occupied = Unit(id=uuid.uuid4(), building_id=building.id, unit_number="101", unit_type="1br", status="occupied")
+    vacant = Unit(id=uuid.uuid4(), building_id=building.id, unit_number="102", unit_type="1br", status="vacant")
+    tenant = Tenant(id=uuid.uuid4(), first_name="Sam", last_name="Lee", email="sam@example.com", status="active",
+                    auth_user_id=f"sam-{uuid.uuid4().hex[:8]}")
+    other = Tenant(id=uuid.uuid4(), first_name="Kim", last_name="Park", email="kim@example.com", status="active")
+    lease = Lease(
+        id=uuid.uuid4(), unit_id=occupied.id, tenant_id=tenant.id,
+        start_date=date.today() - timedelta(days=300), end_date=date.today() + timedelta(days=20),
+        rent_amount=Decimal("1500.00"), status="active"
+    )
+    work_order = WorkOrder(
+        id=uuid.uuid4(), unit_id=occupied.id, title="Leaking faucet",
+        description="Kitchen sink", category="plumbing", status="open"
+    )
+    db.add_all([prop, building, occupied, vacant, tenant, other, lease, work_order])
+    await db.commit()
+    return {"property": prop, "lease": lease, "tenant": tenant, "other": other}
+
+
+@pytest.mark.asyncio
+class TestDirectTools:
+    """Tests for in-process tool handlers"""
+
+    async def test_expiring_leases_projected_with_names(self, db, seeded):
+        result = await mcp_tool_dispatcher.dispatch("list_leases", {"status": "expiring"}, db, MANAGER)
+
+        assert result["total"] == 1
+        item = result["items"][0]
+        assert item["tenant_name"] == "Sam Lee"
+        assert item["unit_number"] == "101"
+        assert item["rent_amount"] == 1500.0
+        assert item["id"] == str(seeded["lease"].id)
+        assert "notes" not in item
+
+    async def test_property_detail_includes_occupancy(self, db, seeded):
+        result = await mcp_tool_dispatcher.dispatch(
+            "get_property", {"property_id": str(seeded["property"].id)}, db, MANAGER
+        )
+
+        assert result["units"] == 2
+        assert result["occupancy_rate"] == 50.0
+
+    async def test_list_filters_and_extra_arguments(self, db, seeded):
+        result = await mcp_tool_dispatcher.dispatch(
+            "list_work_orders", {"status": "open", "unexpected": "ignored"}, db, MANAGER
+        )
+        vacant = await mcp_tool_dispatcher.dispatch("get_vacant_units", {}, db, MANAGER)
+
+        assert result["total"] == 1
+        assert [u["unit_number"] for u in vacant["items"]] == ["102"]
+
+    async def test_invalid_arguments_reported(self, db):
+        result = await mcp_tool_dispatcher.dispatch("get_property", {"property_id": "not-a-uuid"}, db, MANAGER)
+
+        assert result["error"] == "Invalid arguments"
+        assert result["details"][0]["field"] == "property_id"
+
+
+@pytest.mark.asyncio
+class TestToolAuthorization:
+    """Tests for caller RBAC and tenant scoping"""
+
+    async def test_unauthenticated_calls_refused(self, db, seeded):
+        result = await mcp_tool_dispatcher.dispatch("list_tenants", {}, db)
+
+        assert result == {"error": "Not permitted", "tool": "list_tenants"}
+
+    async def test_tenant_pinned_to_own_records(self, db, seeded):
+        user = tenant_user(seeded["tenant"].auth_user_id)
+
+        own = await mcp_tool_dispatcher.dispatch("list_leases", {}, db, user)
+        other = await mcp_tool_dispatcher.dispatch(
+            "get_tenant", {"tenant_id": str(seeded["other"].id)}, db, user
+        )
+        self_detail = await mcp_tool_dispatcher.dispatch(
+            "get_tenant", {"tenant_id": str(seeded["tenant"].id)}, db, user
+        )
+
+        assert [item["id"] for item in own["items"]] == [str(seeded["lease"].id)]
+        assert other["error"] == "Not permitted"
+        assert self_detail["first_name"] == "Sam"
+
+    async def test_tenant_denied_unscoped_tools(self, db, seeded):
+        user = tenant_user(seeded["tenant"].auth_user_id)
+
+        for name in ("list_tenants", "list_properties", "list_work_orders"):
+            assert (await mcp_tool_dispatcher.dispatch(name, {}, db, user))["error"] == "Not permitted"
+
+    async def test_unlinked_tenant_refused(self, db, seeded):
+        result = await mcp_tool_dispatcher.dispatch("list_leases", {}, db, tenant_user("nobody"))
+
+        assert result["error"] == "Not permitted"
+
+
+@pytest.mark.asyncio
+class TestCallToolRouting:
+    """Tests for SomniPropertyMCPServer execution mode selection"""
+
+    async def test_direct_when_session_given(self, db, seeded):
+        server = SomniPropertyMCPServer()
+        server._call_tool_http = AsyncMock()
+
+        result = await server.call_tool("list_properties", {}, db=db, auth_user=MANAGER)
+
+        assert result["items"][0]["name"] == "Maple Court"
+        server._call_tool_http.assert_not_called()
+
+    async def test_http_fallback_for_writes_and_remote_clients(self, db):
+        server = SomniPropertyMCPServer()
+        server._call_tool_http = AsyncMock(return_value={"id": "new"})
+
+        await server.call_tool("create_work_order", {"title": "x"}, db=db)
+        await server.call_tool("list_properties", {})
+
+        assert server._call_tool_http.await_count == 2
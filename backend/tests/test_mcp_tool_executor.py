@@ -0,0 +1,177 @@
+"""
+MCP Tool Executor Tests
+Tests for concurrent read tools, result caching and prompt truncation
+
+Run with: pytest tests/test_mcp_tool_executor.py -v
+"""
+
+import asyncio
+import time
+import uuid
+import pytest
+from contextlib import asynccontextmanager
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+# Register every mapper the way application startup does
+import db.models_maintenance  # noqa: F401
+import db.models_project_phases  # noqa: F401
+import db.models  # noqa: F401
+import db.family_models  # noqa: F401
+import db.models_ai  # noqa: F401
+import db.models_approval  # noqa: F401
+import db.models_comms  # noqa: F401
+import db.models_quotes  # noqa: F401
+import db.models_leads  # noqa: F401
+import db.models_ha_instance  # noqa: F401
+import db.models_contractor_labor  # noqa: F401
+from db.models import Base, Property
+from core.auth import AuthUser
+from services import cache_service
+from services.cache_service import RedisHandle
+from services.mcp_powered_ai import MCPPoweredAI
+from services.mcp_tool_executor import MCPToolExecutor, ToolResultCache, tool_result_cache, truncate_for_prompt
+
+
+class FakeMCPServer:
+    """Records tool calls; reads sleep to expose concurrency"""
+
+    def __init__(self, delay: float = 0.1):
+        self.delay = delay
+        self.calls = []
+
+    async def call_tool(self, tool_name, arguments, db=None, auth_user=None):
+        self.calls.append((tool_name, arguments, db))
+        await asyncio.sleep(self.delay)
+        if tool_name == "broken_tool":
+            return {"error": "boom"}
+        return {"items": [tool_name], "total": 1}
+
+
+@asynccontextmanager
+async def fake_session():
+    yield "own-session"
+
+
+def make_executor(server, clock=time.monotonic):
+    return MCPToolExecutor(server, cache=ToolResultCache(clock=clock), session_factory=fake_session)
+
+
+@pytest.mark.asyncio
+class TestMCPToolExecutor:
+    """Tests for MCPToolExecutor.execute"""
+
+    async def test_reads_run_concurrently_in_plan_order(self):
+        server = FakeMCPServer(delay=0.1)
+        executor = make_executor(server)
+        calls = [
+            {"name": "list_properties", "arguments": {}},
+            {"name": "get_dashboard_stats", "arguments": {}},
+            {"name": "list_work_orders", "arguments": {"status": "open"}},
+        ]
+
+        start = time.perf_counter()
+        results, timings = await executor.execute(calls, db="request-session")
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.25
+        assert [r["tool"] for r in results] == [c["name"] for c in calls]
+        # Concurrent reads must not share the request session
+        assert all(db == "own-session" for _, _, db in server.calls)
+        assert all(not t["cached"] for t in timings)
+
+    async def test_repeat_reads_served_from_cache_per_scope(self):
+        server = FakeMCPServer(delay=0)
+        executor = make_executor(server)
+        calls = [{"name": "list_properties", "arguments": {"limit": 5}}]
+
+        await executor.execute(calls, db="s", scope="user-1")
+        results, timings = await executor.execute(calls, db="s", scope="user-1")
+        await executor.execute(calls, db="s", scope="user-2")
+
+        assert timings[0]["cached"] is True
+        assert results[0]["result"]["total"] == 1
+        assert len(server.calls) == 2
+
+    async def test_cache_expires_and_errors_not_cached(self):
+        now = [0.0]
+        server = FakeMCPServer(delay=0)
+        executor = make_executor(server, clock=lambda: now[0])
+        calls = [{"name": "get_device_status", "arguments": {"device_id": "d1"}}]
+
+        await executor.execute(calls, db="s")
+        now[0] = 60.0
+        await executor.execute(calls, db="s")
+        await executor.execute([{"name": "broken_tool", "arguments": {}}], db="s")
+
+        assert len(server.calls) == 3
+        assert ("broken_tool", {}, "s") in server.calls
+
+    async def test_write_invalidates_related_reads(self):
+        server = FakeMCPServer(delay=0)
+        executor = make_executor(server)
+        read = [{"name": "list_work_orders", "arguments": {}}]
+
+        await executor.execute(read, db="s")
+        await executor.execute([{"name": "create_work_order", "arguments": {"title": "x"}}], db="s")
+        _, timings = await executor.execute(read, db="s")
+
+        assert timings[0]["cached"] is False
+        assert server.calls[1][2] == "s"  # writes use the request session
+
+
+@pytest.mark.asyncio
+class TestCommitInvalidation:
+    """Tests for invalidation by committed ORM writes"""
+
+    async def test_commit_drops_reads_of_written_tables(self, monkeypatch):
+        monkeypatch.setattr(cache_service, "_redis", RedisHandle(enabled=False))
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=[Property.__table__]))
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        properties = ToolResultCache.make_key("list_properties", {}, "user:pm")
+        clients = ToolResultCache.make_key("list_clients", {}, "user:pm")
+        tool_result_cache.set(properties, {"total": 0}, 60)
+        tool_result_cache.set(clients, {"total": 3}, 60)
+        try:
+            async with factory() as session:
+                session.add(Property(id=uuid.uuid4(), name="P", address_line1="1 Main St", city="Town",
+                                     state="CA", zip_code="90000", property_type="residential"))
+                await session.flush()
+                assert tool_result_cache.get(properties) is not None  # Not until commit
+                await session.commit()
+
+            assert tool_result_cache.get(properties) is None
+            assert tool_result_cache.get(clients) == {"total": 3}
+        finally:
+            tool_result_cache.clear()
+            await engine.dispose()
+
+    def test_cache_scope_from_authenticated_user(self):
+        user = AuthUser(username="pm", email="pm@example.com", name="PM", groups=[],
+                        is_admin=False, is_manager=True, is_tenant=False)
+
+        assert MCPPoweredAI._cache_scope(user) == "user:pm"
+        assert MCPPoweredAI._cache_scope(None) is None
+
+
+class TestTruncateForPrompt:
+    """Tests for prompt-size trimming"""
+
+    def test_long_lists_and_strings_trimmed(self):
+        result = {"items": [{"note": "x" * 1000}] * 40, "total": 40}
+
+        trimmed = truncate_for_prompt(result, max_items=10, max_string=50)
+
+        assert len(trimmed["items"]) == 10
+        assert trimmed["items_omitted"] == 30
+        assert len(trimmed["items"][0]["note"]) == 51
+        assert trimmed["total"] == 40
+
+    def test_oversized_result_summarized(self):
+        result = {"items": [{"a": "y" * 200}] * 10, "total": 10}
+
+        trimmed = truncate_for_prompt(result, max_chars=500)
+
+        assert trimmed == {"items": "<10 items>", "total": 10}
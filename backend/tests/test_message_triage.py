@@ -0,0 +1,209 @@
+"""
+Message Triage Tests
+Tests for rule-first classification, de-duplication, the embedding classifier and LLM batching
+
+Run with: pytest tests/test_message_triage.py -v
+"""
+
+import asyncio
+import json
+import re
+import pytest
+
+from services.message_triage import MessageTriage, INTENT_EXAMPLES
+
+# Tiny deterministic "embeddings": bag of known words
+VOCABULARY = ["sink", "leaking", "lease", "renew", "hours", "office", "packages", "parking", "spot"]
+
+
+class FakeEmbedder:
+    def __init__(self, available=True):
+        self.available = available
+        self.calls = []
+
+    async def __call__(self, text):
+        self.calls.append(text)
+        if not self.available:
+            return None
+        words = text.split()
+        return [float(words.count(word)) for word in VOCABULARY] + [0.01]
+
+
+class FakeLLM:
+    """Answers classification prompts with one entry per numbered message, reply prompts with one object"""
+
+    def __init__(self, intent="general_inquiry", reply="We will look into it.", entities=None):
+        self.prompts = []
+        self.intent = intent
+        self.reply = reply
+        self.entities = entities or {}
+
+    async def __call__(self, prompt, max_tokens):
+        self.prompts.append(prompt)
+        ids = [int(i) for i in re.findall(r"^\[(\d+)\]", prompt, re.MULTILINE)]
+        if prompt.strip().startswith("Classify"):
+            items = [{"id": i, "intent": self.intent, "confidence": 0.9, "sentiment": "neutral",
+                      "category": "general", "priority": "normal", "entities": self.entities} for i in ids]
+            return "```json\n" + json.dumps(items) + "\n```"
+        return json.dumps({"text": self.reply, "html": f"<p>{self.reply}</p>"})
+
+
+def make_triage(llm=None, embedder=None, **kwargs):
+    return MessageTriage(llm=llm or FakeLLM(), embed=embedder or FakeEmbedder(), batch_window=0.05, **kwargs)
+
+
+@pytest.mark.asyncio
+class TestRules:
+    """Tests for the compiled rule stage"""
+
+    async def test_spam_uses_channel_keywords(self):
+        triage = make_triage()
+
+        assert (await triage.triage("email", "Act now to claim free money")).is_spam is True
+        assert (await triage.triage("sms", "Act now to claim free money")).is_spam is False
+        assert (await triage.triage("sms", "You are a WINNER")).is_spam is True
+
+    async def test_single_rule_match_skips_llm(self):
+        llm = FakeLLM()
+        triage = make_triage(llm=llm)
+
+        result = await triage.triage("email", "The toilet in unit 4 is clogged", subject="Repair")
+
+        assert result.stage == "rules"
+        assert result.intent_data["intent"] == "maintenance_request"
+        assert result.intent_data["confidence"] == 0.85
+        assert llm.prompts == []
+
+    async def test_emergency_wins_over_other_matches(self):
+        triage = make_triage()
+
+        result = await triage.triage("sms", "Gas smell in the hallway and my rent is due")
+
+        assert result.intent_data["intent"] == "emergency"
+        assert result.intent_data["priority"] == "urgent"
+
+    async def test_keywords_need_context(self):
+        triage = make_triage(embedder=FakeEmbedder(available=False))
+
+        contact = triage._apply_rules("Please update my emergency contact number")
+        detector = triage._apply_rules("The smoke detector in the hallway keeps chirping")
+        spare = triage._apply_rules("Can I get a spare key for the mailbox?")
+        pickup = triage._apply_rules("When can I pick up my keys?")
+
+        assert contact is None
+        assert detector["intent"] == "maintenance_request"
+        assert spare is None
+        assert pickup["intent"] == "move_in_out"
+        assert triage._apply_rules("This is an emergency, water everywhere")["intent"] == "emergency"
+
+
+@pytest.mark.asyncio
+class TestClassifierAndDedupe:
+    """Tests for the embedding stages"""
+
+    async def test_nearest_example_classifies(self):
+        embedder = FakeEmbedder()
+        triage = make_triage(embedder=embedder)
+
+        result = await triage.triage("sms", "Office hours today?")
+        calls = len(embedder.calls)
+        again = await triage.triage("email", "Packages: where do they go")
+
+        assert result.stage == again.stage == "classifier"
+        assert result.intent_data["intent"] == again.intent_data["intent"] == "general_inquiry"
+        assert calls == 1 + sum(len(v) for v in INTENT_EXAMPLES.values())
+        assert len(embedder.calls) == calls + 1
+
+    async def test_near_duplicates_reuse_classification(self):
+        llm = FakeLLM(intent="amenity_booking")
+        triage = make_triage(llm=llm)
+
+        first = await triage.triage("sms", "Is there a spot left? parking")
+        second = await triage.triage("email", "is there a parking spot left??")
+
+        assert first.stage == "llm"
+        assert second.stage == "dedupe" and second.duplicate is True
+        assert second.intent_data["intent"] == "amenity_booking"
+        assert len(llm.prompts) == 1
+
+    async def test_duplicates_do_not_share_entities(self):
+        llm = FakeLLM(intent="payment_question", entities={"name": "Sam Lee", "unit": "4B", "amount": 1500})
+        triage = make_triage(llm=llm)
+
+        first = await triage.triage("sms", "Is there a spot left? parking")
+        first.intent_data["priority"] = "urgent"  # Callers may mutate their result
+        second = await triage.triage("email", "is there a parking spot left??")
+
+        assert first.intent_data["entities"]["name"] == "Sam Lee"
+        assert second.duplicate is True
+        assert second.intent_data["intent"] == "payment_question"
+        assert second.intent_data["entities"] == {}
+        assert second.intent_data["priority"] == "normal"
+        assert second.intent_data is not (await triage.triage("sms", "is there a parking spot left")).intent_data
+
+    async def test_embedding_outage_falls_through_to_llm(self):
+        llm = FakeLLM()
+        embedder = FakeEmbedder(available=False)
+        triage = make_triage(llm=llm, embedder=embedder)
+
+        await triage.triage("sms", "Question about the mailbox")
+        await triage.triage("sms", "Question about the elevator")
+
+        assert len(embedder.calls) == 1
+        assert len(llm.prompts) == 2
+
+
+@pytest.mark.asyncio
+class TestBatching:
+    """Tests for combined LLM requests"""
+
+    async def test_concurrent_messages_share_one_request(self):
+        llm = FakeLLM()
+        triage = make_triage(llm=llm, embedder=FakeEmbedder(available=False))
+
+        results = await asyncio.gather(*(
+            triage.triage("sms", f"Question number {i} about the mailbox") for i in range(5)
+        ))
+
+        assert [r.stage for r in results] == ["llm"] * 5
+        assert len(llm.prompts) == 1
+        assert triage.get_stats()["stages"]["llm"]["messages"] == 5
+
+    async def test_identical_in_flight_messages_are_sent_once(self):
+        llm = FakeLLM()
+        triage = make_triage(llm=llm, embedder=FakeEmbedder(available=False))
+
+        results = await asyncio.gather(*(triage.triage("sms", "Who do I call about the mailbox?") for _ in range(3)))
+
+        assert sorted(r.stage for r in results) == ["dedupe", "dedupe", "llm"]
+        assert llm.prompts[0].count("mailbox") == 1
+        assert len({id(r.intent_data) for r in results}) == 3
+
+    async def test_bad_llm_output_falls_back_per_message(self):
+        async def broken(prompt, max_tokens):
+            return "not json"
+
+        triage = make_triage(llm=broken, embedder=FakeEmbedder(available=False))
+
+        result = await triage.triage("sms", "Question about the mailbox")
+        reply = await triage.generate_reply("sms", "Question about the mailbox", {}, result.intent_data)
+
+        assert result.intent_data["intent"] == "general_inquiry"
+        assert result.intent_data["confidence"] == 0.5
+        assert reply is None
+
+    async def test_replies_per_sender_and_sms_truncated(self):
+        llm = FakeLLM(reply="x" * 200)
+        triage = make_triage(llm=llm)
+
+        sms, email = await asyncio.gather(
+            triage.generate_reply("sms", "Hi", {"tenant": "Ana"}, {"intent": "general_inquiry"}),
+            triage.generate_reply("email", "Hi", {"tenant": "Ben"}, {"intent": "general_inquiry"}),
+        )
+
+        # Each sender's context stays in its own prompt
+        assert len(llm.prompts) == 2
+        assert ["Ana" in p for p in llm.prompts] == [True, False]
+        assert len(sms["text"]) == 160
+        assert email["html"].startswith("<p>")
+        assert triage.get_stats()["stages"]["reply"]["messages"] == 2
@@ -0,0 +1,222 @@
+"""
+Mobile Sync Tests
+Tests for the change-log listener, cursor pull, versioned push and conflict resolution
+
+Run with: pytest tests/test_mobile_sync.py -v
+"""
+
+import uuid
+import pytest
+from decimal import Decimal
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+# Register every mapper the way application startup does
+import db.models_maintenance  # noqa: F401
+import db.models_project_phases  # noqa: F401
+import db.models  # noqa: F401
+import db.family_models  # noqa: F401
+import db.models_ai  # noqa: F401
+import db.models_approval  # noqa: F401
+import db.models_comms  # noqa: F401
+import db.models_quotes  # noqa: F401
+import db.models_leads  # noqa: F401
+import db.models_ha_instance  # noqa: F401
+import db.models_contractor_labor  # noqa: F401
+from db.models import Base, Property, Tenant, SupportTicket
+from db.models_mobile_sync import MobileSyncDevice, SyncChangeLog, SyncConflict
+from services import mobile_sync_service
+from services.mobile_sync_service import (
+    START, FeedPosition, decode_cursor, encode_cursor, pull_changes, push_changes, resolve_conflict
+)
+
+SYNC_TABLES = ("properties", "tenants", "support_tickets", "sync_change_log", "mobile_sync_devices", "sync_conflicts")
+
+
+@pytest.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    tables = [Base.metadata.tables[name] for name in SYNC_TABLES]
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=tables))
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def seeded(session_factory):
+    tenant = Tenant(id=uuid.uuid4(), first_name="Ana", last_name="Ruiz", email="ana@example.com")
+    prop = Property(
+        id=uuid.uuid4(), name="Elm Court", address_line1="1 Elm St", city="Madison",
+        state="WI", zip_code="53703", property_type="residential", purchase_price=Decimal("250000.00")
+    )
+    device = MobileSyncDevice(device_id="phone-1", device_name="Pixel")
+    async with session_factory() as db:
+        db.add_all([tenant, prop, device])
+        await db.commit()
+    return {"tenant": tenant, "property": prop}
+
+
+async def pull_all(db, after=START, limit=500, entity_types=None):
+    changes, next_position, has_more = await pull_changes(db, after, limit=limit, entity_types=entity_types)
+    return changes, next_position, has_more
+
+
+async def get_device(db):
+    return (await db.execute(select(MobileSyncDevice))).scalar_one()
+
+
+@pytest.mark.asyncio
+class TestChangeFeed:
+    """Tests for change capture and cursor pull"""
+
+    async def test_flush_records_changes_for_synced_entities_only(self, session_factory, seeded):
+        async with session_factory() as db:
+            tenant = await db.get(Tenant, seeded["tenant"].id)
+            tenant.phone = "555-0100"
+            await db.commit()
+            log = (await db.execute(select(SyncChangeLog).order_by(SyncChangeLog.seq))).scalars().all()
+
+        assert [(e.entity_type, e.operation) for e in log] == [
+            ("tenants", "CREATE"), ("properties", "CREATE"), ("tenants", "UPDATE")
+        ]
+        assert log[-1].changed_fields == ["phone"]
+
+    async def test_pull_returns_latest_change_per_entity_and_pages(self, session_factory, seeded):
+        async with session_factory() as db:
+            first, cursor, has_more = await pull_all(db, limit=1)
+            assert [c["entity_type"] for c in first] == ["tenants"] and has_more
+
+            # Tenant edited between pages: skipped at its old seq, returned at the new one
+            tenant = await db.get(Tenant, seeded["tenant"].id)
+            tenant.last_name = "Ruiz-Ortega"
+            await db.commit()
+
+            rest, cursor, has_more = await pull_all(db, after=cursor)
+            assert [c["entity_type"] for c in rest] == ["properties", "tenants"]
+            assert rest[1]["data"]["last_name"] == "Ruiz-Ortega"
+            assert rest[1]["data"]["version"] == rest[1]["version"]
+            assert rest[0]["data"]["purchase_price"] == 250000.0
+            assert not has_more
+
+            assert (await pull_all(db, after=cursor))[0] == []
+
+    async def test_deletes_and_type_filter(self, session_factory, seeded):
+        async with session_factory() as db:
+            ticket = SupportTicket(id=uuid.uuid4(), title="Leak", description="Water under sink")
+            db.add(ticket)
+            await db.commit()
+            _, cursor, _ = await pull_all(db)
+            await db.delete(ticket)
+            await db.commit()
+
+            changes, _, _ = await pull_all(db, after=cursor)
+            assert [(c["entity_type"], c["operation"], c["data"]) for c in changes] == [
+                ("support_tickets", "DELETE", None)
+            ]
+            assert (await pull_all(db, after=cursor, entity_types=["tenants"]))[0] == []
+
+    async def test_late_commit_with_lower_seq_is_not_skipped(self, session_factory, seeded, monkeypatch):
+        horizon = {"xmin": None}
+
+        async def fake_horizon(db):
+            return horizon["xmin"]
+
+        monkeypatch.setattr(mobile_sync_service, "visible_horizon", fake_horizon)
+
+        async def log(seq, txid, entity_type, entity_id):
+            await db.execute(insert(SyncChangeLog).values(
+                seq=seq, txid=txid, entity_type=entity_type, entity_id=str(entity_id), operation="UPDATE"
+            ))
+            await db.commit()
+
+        async with session_factory() as db:
+            _, cursor, _ = await pull_all(db)
+
+            # Transaction 101 took seq 100 but is still open; transaction 100 wrote seq 101 and committed
+            horizon["xmin"] = 101
+            await log(101, 100, "properties", seeded["property"].id)
+            changes, cursor, _ = await pull_all(db, after=cursor)
+            assert [c["version"] for c in changes] == [101]
+            assert cursor == FeedPosition(100, 101)
+
+            # Transaction 101 commits: its lower seq still sorts after the cursor
+            horizon["xmin"] = 102
+            await log(100, 101, "tenants", seeded["tenant"].id)
+            changes, cursor, _ = await pull_all(db, after=cursor)
+            assert [(c["entity_type"], c["version"]) for c in changes] == [("tenants", 100)]
+
+            # Visible, but from a transaction at or above the horizon: held back until it is final
+            await log(102, 105, "properties", seeded["property"].id)
+            assert (await pull_all(db, after=cursor))[0] == []
+            horizon["xmin"] = 106
+            assert [c["version"] for c in (await pull_all(db, after=cursor))[0]] == [102]
+
+    def test_cursor_round_trip(self):
+        assert decode_cursor(encode_cursor(FeedPosition(812, 44))) == FeedPosition(812, 44)
+        assert decode_cursor("44") == FeedPosition(0, 44)
+        assert decode_cursor(None) == START
+        with pytest.raises(mobile_sync_service.SyncError):
+            decode_cursor("x.1")
+
+
+@pytest.mark.asyncio
+class TestPush:
+    """Tests for versioned push and conflicts"""
+
+    async def test_create_update_and_retry_are_applied(self, session_factory, seeded):
+        new_id = str(uuid.uuid4())
+        async with session_factory() as db:
+            device = await get_device(db)
+            device.last_pulled_seq = (await pull_all(db))[1].seq
+            results = await push_changes(db, device, [
+                {"entity_type": "tenants", "entity_id": new_id, "operation": "CREATE", "local_id": "l1",
+                 "data": {"first_name": "Bo", "last_name": "Li", "email": "bo@example.com", "version": 99}},
+                {"entity_type": "tenants", "entity_id": str(seeded["tenant"].id), "operation": "UPDATE",
+                 "data": {"phone": "555-0199"}},
+                {"entity_type": "tenants", "entity_id": new_id, "operation": "CREATE",
+                 "data": {"first_name": "Bo", "last_name": "Li", "email": "bo@example.com"}},
+                {"entity_type": "gadgets", "entity_id": new_id, "operation": "UPDATE", "data": {}},
+            ], user_id="manager1")
+            await db.commit()
+
+            assert [r["status"] for r in results] == ["success", "success", "success", "error"]
+            assert results[0]["local_id"] == "l1" and results[0]["entity_id"] == new_id
+            assert results[0]["version"] and results[1]["version"] > results[0]["version"]
+            assert (await db.get(Tenant, seeded["tenant"].id)).phone == "555-0199"
+            origin = (await db.execute(
+                select(SyncChangeLog).where(SyncChangeLog.entity_id == new_id)
+            )).scalars().all()
+            assert [(e.device_id, e.user_id) for e in origin] == [("phone-1", "manager1")]
+
+    async def test_stale_update_becomes_conflict_and_resolves(self, session_factory, seeded):
+        tenant_id = str(seeded["tenant"].id)
+        async with session_factory() as db:
+            device = await get_device(db)
+            changes, position, _ = await pull_all(db)
+            device.last_pulled_seq = position.seq
+            seen_version = next(c["version"] for c in changes if c["entity_id"] == tenant_id)
+
+            tenant = await db.get(Tenant, seeded["tenant"].id)
+            tenant.phone = "555-0001"  # Office edit after the device pulled
+            await db.commit()
+
+            results = await push_changes(db, device, [
+                {"entity_type": "tenants", "entity_id": tenant_id, "operation": "UPDATE",
+                 "version": seen_version, "data": {"phone": "555-0002"}},
+                {"entity_type": "tenants", "entity_id": tenant_id, "operation": "UPDATE",
+                 "version": seen_version, "data": {"phone": "555-0001"}},
+            ])
+            await db.commit()
+
+            assert [r["status"] for r in results] == ["conflict", "success"]
+            conflict = await db.get(SyncConflict, uuid.UUID(results[0]["conflict_id"]))
+            assert conflict.conflicting_fields == ["phone"]
+            assert conflict.server_data["phone"] == "555-0001"
+
+            version = await resolve_conflict(db, conflict, "client_wins")
+            await db.commit()
+
+            assert (await db.get(Tenant, seeded["tenant"].id)).phone == "555-0002"
+            assert conflict.status == "resolved"
+            assert version > conflict.server_version
@@ -0,0 +1,171 @@
+"""
+Integration Outbox Tests
+Tests for durable, retried delivery of external integration side effects
+
+Run with: pytest tests/test_outbox.py -v
+"""
+
+import asyncio
+import httpx
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+# Register every mapper the way application startup does
+import db.models_maintenance  # noqa: F401
+import db.models_project_phases  # noqa: F401
+import db.models  # noqa: F401
+import db.family_models  # noqa: F401
+import db.models_ai  # noqa: F401
+import db.models_approval  # noqa: F401
+import db.models_comms  # noqa: F401
+import db.models_quotes  # noqa: F401
+import db.models_leads  # noqa: F401
+import db.models_ha_instance  # noqa: F401
+import db.models_contractor_labor  # noqa: F401
+from db.models_outbox import IntegrationOutbox
+from services import outbox_service
+from services.outbox_service import (
+    OutboxDispatcher, enqueue, make_idempotency_key, register_outbox_handler,
+    requeue_dead_letter, _utcnow
+)
+
+
+@pytest.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(IntegrationOutbox.__table__.create)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    with patch.object(outbox_service, "AsyncSessionLocal", factory):
+        yield factory
+    await engine.dispose()
+
+
+@pytest.fixture
+def handler_calls():
+    calls = []
+    failures = {}
+
+    async def handler(db, row):
+        calls.append(row.integration)
+        if failures.get(row.integration, 0) > 0:
+            failures[row.integration] -= 1
+            raise ConnectionError("integration down")
+        return {"status": "success"}
+
+    register_outbox_handler("test_aggregate", handler, is_idempotent=lambda db, row: True)
+    yield calls, failures
+    outbox_service._handlers.pop("test_aggregate", None)
+    outbox_service._idempotency_checks.pop("test_aggregate", None)
+
+
+class TestBackoff:
+    """Tests for retry scheduling"""
+
+    def test_backoff_grows_and_caps(self):
+        dispatcher = OutboxDispatcher(base_backoff_seconds=5, max_backoff_seconds=60)
+
+        assert 4 <= dispatcher.backoff_delay(1) <= 6
+        assert 16 <= dispatcher.backoff_delay(3) <= 24
+        assert dispatcher.backoff_delay(20) <= 72
+
+    def test_idempotency_key_is_stable(self):
+        assert make_idempotency_key("work_order", "42", "novu") == "work_order:42:novu"
+
+
+@pytest.mark.asyncio
+class TestOutboxDelivery:
+    """Tests for enqueue and dispatcher delivery"""
+
+    async def test_enqueue_is_idempotent(self, session_factory):
+        async with session_factory() as db:
+            first = await enqueue(db, "test_aggregate", "1", "vikunja", {"a": 1})
+            await db.commit()
+            second = await enqueue(db, "test_aggregate", "1", "vikunja", {"a": 2})
+
+            assert second.id == first.id
+            rows = (await db.execute(select(IntegrationOutbox))).scalars().all()
+            assert len(rows) == 1
+
+    async def test_dependencies_delivered_in_order(self, session_factory, handler_calls):
+        calls, _ = handler_calls
+        async with session_factory() as db:
+            await enqueue(db, "test_aggregate", "1", "novu", {}, depends_on=["vikunja"])
+            await enqueue(db, "test_aggregate", "1", "vikunja", {})
+            await db.commit()
+
+        dispatcher = OutboxDispatcher()
+        assert await dispatcher.run_once() == 1
+        assert await dispatcher.run_once() == 1
+        assert calls == ["vikunja", "novu"]
+
+        async with session_factory() as db:
+            statuses = {r.integration: r.status for r in (await db.execute(select(IntegrationOutbox))).scalars()}
+        assert statuses == {"vikunja": "succeeded", "novu": "succeeded"}
+
+    async def test_failures_backoff_then_dead_letter(self, session_factory, handler_calls):
+        _, failures = handler_calls
+        failures["vikunja"] = 5
+        async with session_factory() as db:
+            row = await enqueue(db, "test_aggregate", "1", "vikunja", {}, max_attempts=2)
+            await db.commit()
+            row_id = row.id
+
+        dispatcher = OutboxDispatcher()
+        await dispatcher.run_once()
+
+        async with session_factory() as db:
+            row = await db.get(IntegrationOutbox, row_id)
+            assert row.status == 'pending'
+            assert row.attempts == 1
+            assert "integration down" in row.last_error
+            # Make the retry due now
+            row.next_attempt_at = _utcnow() - timedelta(seconds=1)
+            await db.commit()
+
+        await dispatcher.run_once()
+
+        async with session_factory() as db:
+            row = await db.get(IntegrationOutbox, row_id)
+            assert row.status == 'dead'
+            assert dispatcher.stats["dead"] == 1
+
+            requeued = await requeue_dead_letter(db, row_id)
+            await db.commit()
+            assert requeued.status == 'pending'
+            assert requeued.attempts == 0
+
+    async def test_ambiguous_failures_of_non_idempotent_calls_not_repeated(self, session_factory):
+        request = httpx.Request("POST", "http://grafana/api/annotations")
+        errors = {
+            "refused": httpx.ConnectError("refused", request=request),
+            "timeout": asyncio.TimeoutError(),
+            "server_error": httpx.HTTPStatusError(
+                "HTTP 502", request=request, response=httpx.Response(502, request=request)
+            ),
+            "bad_request": httpx.HTTPStatusError(
+                "HTTP 400", request=request, response=httpx.Response(400, request=request)
+            ),
+        }
+
+        async def handler(db, row):
+            raise errors[row.integration]
+
+        register_outbox_handler("creating_aggregate", handler)
+        try:
+            async with session_factory() as db:
+                for integration in errors:
+                    await enqueue(db, "creating_aggregate", "1", integration, {})
+                await db.commit()
+
+            await OutboxDispatcher().run_once()
+        finally:
+            outbox_service._handlers.pop("creating_aggregate", None)
+
+        async with session_factory() as db:
+            statuses = {r.integration: r.status for r in (await db.execute(select(IntegrationOutbox))).scalars()}
+        # Only the request that never reached the service is retried
+        assert statuses == {"refused": "pending", "timeout": "dead", "server_error": "dead", "bad_request": "dead"}
@@ -0,0 +1,118 @@
+"""
+Pagination Tests
+Tests for keyset cursors and count modes in the shared list pagination helper
+
+Run with: pytest tests/test_pagination.py -v
+"""
+
+import uuid
+import pytest
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+# Register every mapper the way application startup does
+import db.models_maintenance  # noqa: F401
+import db.models_project_phases  # noqa: F401
+import db.models  # noqa: F401
+import db.family_models  # noqa: F401
+import db.models_ai  # noqa: F401
+import db.models_approval  # noqa: F401
+import db.models_comms  # noqa: F401
+import db.models_quotes  # noqa: F401
+import db.models_leads  # noqa: F401
+import db.models_ha_instance  # noqa: F401
+import db.models_contractor_labor  # noqa: F401
+from db.models import Base, Tenant
+from api import pagination
+from api.pagination import PageOptions, count_rows, decode_cursor, encode_cursor, paginate
+
+START = datetime(2026, 1, 1, 9, 0)
+
+
+@pytest.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=[Tenant.__table__]))
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        # Seven tenants over five timestamps, so pages must tie-break on id
+        for i in range(7):
+            session.add(Tenant(
+                id=uuid.uuid4(), first_name=f"T{i}", last_name="Lee", email=f"t{i}@example.com",
+                created_at=START + timedelta(minutes=min(i, 4))
+            ))
+        await session.commit()
+        yield session
+    await engine.dispose()
+    pagination._count_cache.clear()
+
+
+def options(cursor=None, count=None):
+    return PageOptions(cursor=cursor, count=count)
+
+
+async def walk(db, query, page_size, descending=True):
+    seen, cursor = [], None
+    while True:
+        page = await paginate(db, query, Tenant.created_at, Tenant.id, skip=0, limit=page_size,
+                              options=options(cursor), descending=descending)
+        seen.extend(t.first_name for t in page.items)
+        if not page.has_more:
+            assert page.next_cursor is None
+            return seen
+        cursor = page.next_cursor
+
+
+@pytest.mark.asyncio
+class TestPaginate:
+    """Tests for keyset cursors"""
+
+    async def test_cursor_walk_matches_offset_order(self, db):
+        query = select(Tenant)
+        everything = await paginate(db, query, Tenant.created_at, Tenant.id, skip=0, limit=100, options=options())
+        assert everything.total == 7 and not everything.has_more
+
+        expected = [t.first_name for t in everything.items]
+        assert await walk(db, query, 2) == expected
+        assert await walk(db, query, 3, descending=False) == list(reversed(expected))
+
+    async def test_first_page_counts_and_cursor_pages_skip_count(self, db):
+        query = select(Tenant).where(Tenant.last_name == "Lee")
+        first = await paginate(db, query, Tenant.created_at, Tenant.id, skip=0, limit=3, options=options())
+        assert first.envelope()["total"] == 7 and first.has_more and first.next_cursor
+
+        second = await paginate(db, query, Tenant.created_at, Tenant.id, skip=5, limit=3,
+                                options=options(first.next_cursor))
+        assert second.total is None and second.skip == 0
+        assert len(second.items) == 3
+
+    async def test_offset_paging_still_supported(self, db):
+        page = await paginate(db, select(Tenant), Tenant.created_at, Tenant.id, skip=6, limit=3, options=options())
+        assert len(page.items) == 1 and not page.has_more and page.skip == 6
+
+    async def test_cursor_round_trip_and_invalid_cursor(self, db):
+        row_id = uuid.uuid4()
+        assert decode_cursor(encode_cursor(START, row_id)) == (START, row_id)
+        assert decode_cursor(encode_cursor(START.date(), 5)) == (START.date(), 5)
+        with pytest.raises(HTTPException) as exc:
+            decode_cursor("not-a-cursor")
+        assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+class TestCounts:
+    """Tests for count modes"""
+
+    async def test_estimate_serves_cached_count(self, db):
+        query = select(Tenant).where(Tenant.last_name == "Lee")
+        assert await count_rows(db, query, "estimate") == (7, False)
+
+        db.add(Tenant(id=uuid.uuid4(), first_name="T7", last_name="Lee", email="t7@example.com"))
+        await db.commit()
+
+        assert await count_rows(db, query, "estimate") == (7, True)
+        assert await count_rows(db, query, "exact") == (8, False)
+        assert await count_rows(db, query, "none") == (None, False)
@@ -0,0 +1,98 @@
+"""
+Search Service Tests
+Tests for multi-word/prefix matching, wildcard escaping, cross-entity ranking and highlights
+
+Run with: pytest tests/test_search_service.py -v
+"""
+
+import uuid
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+# Register every mapper the way application startup does
+import db.models_maintenance  # noqa: F401
+import db.models_project_phases  # noqa: F401
+import db.models  # noqa: F401
+import db.family_models  # noqa: F401
+import db.models_ai  # noqa: F401
+import db.models_approval  # noqa: F401
+import db.models_comms  # noqa: F401
+import db.models_quotes  # noqa: F401
+import db.models_leads  # noqa: F401
+import db.models_ha_instance  # noqa: F401
+import db.models_contractor_labor  # noqa: F401
+from db.models import Base, Tenant, Client
+from db.models_ha_instance import HAInstance
+from services.search_service import highlight, search_entities, text_search_clause
+
+
+@pytest.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    tables = [Base.metadata.tables[name] for name in ("tenants", "clients", "leads", "quotes", "ha_instances")]
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=tables))
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        session.add_all([
+            Tenant(id=uuid.uuid4(), first_name="John", last_name="Smith", email="jsmith@example.com"),
+            Tenant(id=uuid.uuid4(), first_name="Mary", last_name="Johnson", email="mary@example.com"),
+            Tenant(id=uuid.uuid4(), first_name="Tojo", last_name="Baker", email="tojo@example.com"),
+            Tenant(id=uuid.uuid4(), first_name="Percy", last_name="Ward", email="100%_real@example.com"),
+            Client(id=uuid.uuid4(), name="Johnston Holdings", tier="tier_1", email="ops@johnston.com"),
+            HAInstance(id=uuid.uuid4(), name="Lake House", host="100.64.0.1", location="John's cabin"),
+        ])
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+
+async def tenant_names(db, query, prefix=False):
+    stmt = select(Tenant).where(text_search_clause(
+        [Tenant.first_name, Tenant.last_name, Tenant.email], query, prefix=prefix
+    ))
+    return sorted(t.first_name for t in (await db.execute(stmt)).scalars().all())
+
+
+def test_highlight_escapes_html():
+    assert highlight("<b>John</b> Johnson", ["john"]) == "&lt;b&gt;<mark>John</mark>&lt;/b&gt; <mark>John</mark>son"
+    assert highlight("Mary", ["john"]) is None
+
+
+@pytest.mark.asyncio
+class TestTextSearchClause:
+    """Tests for the shared WHERE clause used by the list endpoints"""
+
+    async def test_every_word_must_match_some_column(self, db):
+        assert await tenant_names(db, "john smith") == ["John"]
+        assert await tenant_names(db, "jo") == ["John", "Mary", "Tojo"]
+
+    async def test_prefix_matches_word_starts_only(self, db):
+        assert await tenant_names(db, "jo", prefix=True) == ["John", "Mary"]
+
+    async def test_wildcards_are_literal(self, db):
+        assert await tenant_names(db, "0%_") == ["Percy"]
+        assert await tenant_names(db, "__") == []
+
+    async def test_too_short_query_adds_no_filter(self, db):
+        assert text_search_clause([Tenant.first_name], "j") is None
+
+
+@pytest.mark.asyncio
+class TestSearchEntities:
+    """Tests for ranked mixed-entity results"""
+
+    async def test_ranked_across_types_with_highlights(self, db):
+        hits = await search_entities(db, "john")
+
+        assert [h["title"] for h in hits] == ["John Smith", "Mary Johnson", "Johnston Holdings", "Lake House"]
+        assert [h["type"] for h in hits] == ["tenant", "tenant", "client", "ha_instance"]
+        assert hits[0]["highlights"]["first_name"] == "<mark>John</mark>"
+        assert hits[-1]["highlights"] == {"location": "<mark>John</mark>&#x27;s cabin"}
+
+    async def test_type_filter_and_limit(self, db):
+        hits = await search_entities(db, "jo", types=["tenant"], limit=1)
+
+        assert len(hits) == 1
+        assert hits[0]["type"] == "tenant"
@@ -0,0 +1,132 @@
+"""
+Semantic Cache Tests
+Tests for near-duplicate lookup, scope isolation, expiry and assistant reuse
+
+Run with: pytest tests/test_semantic_cache.py -v
+"""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+# Register every mapper the way application startup does
+import db.models_maintenance  # noqa: F401
+import db.models_project_phases  # noqa: F401
+import db.models  # noqa: F401
+import db.family_models  # noqa: F401
+import db.models_ai  # noqa: F401
+import db.models_approval  # noqa: F401
+import db.models_comms  # noqa: F401
+import db.models_quotes  # noqa: F401
+import db.models_leads  # noqa: F401
+import db.models_ha_instance  # noqa: F401
+import db.models_contractor_labor  # noqa: F401
+from services.ai_assistant import SomniAIAssistant
+from services.semantic_cache import SemanticCache, normalize_message
+
+# Tiny deterministic "embeddings": bag of known words
+VOCABULARY = ["rent", "due", "when", "is", "my", "pay", "work", "orders", "open", "show", "the"]
+
+
+class FakeEmbedder:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, text):
+        self.calls.append(text)
+        words = text.split()
+        return [float(words.count(word)) for word in VOCABULARY]
+
+
+def make_cache(**kwargs):
+    embedder = FakeEmbedder()
+    return SemanticCache(embed=embedder, **kwargs), embedder
+
+
+def test_normalize_message():
+    assert normalize_message("  When is RENT due?!  ") == "when is rent due"
+
+
+@pytest.mark.asyncio
+class TestSemanticCache:
+    """Tests for SemanticCache lookups"""
+
+    async def test_exact_match_skips_embedding(self):
+        cache, embedder = make_cache()
+        await cache.set("intent", "When is rent due?", "tenant:1", {"intent": "ask_rent_due"})
+        embedder.calls.clear()
+
+        assert await cache.get("intent", "when is rent due", "tenant:1") == {"intent": "ask_rent_due"}
+        assert embedder.calls == []
+        assert cache.get_stats()["exact_hits"] == 1
+
+    async def test_near_duplicate_hit_and_distinct_miss(self):
+        cache, _ = make_cache(threshold=0.75)
+        await cache.set("intent", "when is my rent due", "tenant:1", {"intent": "ask_rent_due"})
+
+        assert await cache.get("intent", "when is the rent due", "tenant:1") == {"intent": "ask_rent_due"}
+        assert await cache.get("intent", "show open work orders", "tenant:1") is None
+
+        stats = cache.get_stats()
+        assert stats["semantic_hits"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    async def test_scopes_and_fingerprints_isolated(self):
+        cache, _ = make_cache()
+        await cache.set("response", "when is rent due", "tenant:1", {"text": "the 1st"}, fingerprint="a")
+
+        assert await cache.get("response", "when is rent due", "tenant:2", fingerprint="a") is None
+        assert await cache.get("response", "when is rent due", "tenant:1", fingerprint="b") is None
+        assert await cache.get("intent", "when is rent due", "tenant:1", fingerprint="a") is None
+
+    async def test_ttl_and_lru_bound(self):
+        now = [0.0]
+        cache, _ = make_cache(max_entries=2, ttl=10, clock=lambda: now[0])
+        await cache.set("intent", "pay rent", "s", 1)
+        now[0] = 11.0
+        assert await cache.get("intent", "pay rent", "s") is None
+
+        for message in ("pay rent", "show open work orders", "when is rent due"):
+            await cache.set("intent", message, "s", message)
+        assert cache.get_stats()["entries"] == 2
+
+    async def test_embedding_outage_degrades_to_exact(self):
+        cache = SemanticCache(embed=AsyncMock(return_value=None), embed_backoff=60)
+        await cache.set("intent", "when is rent due", "s", "x")
+
+        assert await cache.get("intent", "when is rent due?", "s") == "x"
+        assert await cache.get("intent", "when is my rent due", "s") is None
+        assert cache.get_stats()["embedding_calls"] == 1
+
+
+@pytest.mark.asyncio
+class TestAssistantReuse:
+    """Tests for cache use in SomniAIAssistant"""
+
+    async def test_repeat_question_skips_llm(self):
+        cache, _ = make_cache()
+        assistant = SomniAIAssistant()
+        intent_json = '{"intent": "ask_rent_due", "confidence": 0.9, "entities": {}}'
+
+        with patch("services.ai_assistant.semantic_cache", cache), \
+                patch.object(assistant, "_call_ollama", AsyncMock(side_effect=[intent_json, "On the 1st."])) as llm:
+            for message in ("When is rent due?", "when is rent due"):
+                intent = await assistant._detect_intent(message, {"tenant": {"name": "Sam Lee"}}, cache_scope="tenant:1")
+                response = await assistant._generate_response(
+                    message, {"tenant": {"name": "Sam Lee"}}, intent, None, cache_scope="tenant:1"
+                )
+
+        assert llm.await_count == 2
+        assert response["text"] == "On the 1st."
+        assert response["cached"] is True
+
+    async def test_action_intents_not_reused(self):
+        cache, _ = make_cache()
+        assistant = SomniAIAssistant()
+        intent = {"intent": "report_maintenance", "confidence": 0.9, "entities": {}}
+
+        with patch("services.ai_assistant.semantic_cache", cache), \
+                patch.object(assistant, "_call_ollama", AsyncMock(return_value="A ticket was opened.")) as llm:
+            for _ in range(2):
+                await assistant._generate_response("my sink leaks", {}, intent, None, cache_scope="tenant:1")
+
+        assert llm.await_count == 2
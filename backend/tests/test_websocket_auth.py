@@ -0,0 +1,145 @@
+"""
+WebSocket Auth Tests
+Tests for Redis-backed WebSocket tokens, per-user revocation and the validation cache
+
+Run with: pytest tests/test_websocket_auth.py -v
+"""
+
+import pytest
+
+from core.websocket_auth import WebSocketAuthManager, USER_TOKENS_KEY
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+        return queue
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        return [getattr(self.redis, f"_{name}")(*args, **kwargs) for name, args, kwargs in self.calls]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio for the auth manager, counting round trips"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def __getattr__(self, name):
+        async def call(*args, **kwargs):
+            self.round_trips += 1
+            return getattr(self, f"_{name}")(*args, **kwargs)
+        return call
+
+    def _set(self, key, value, ex=None):
+        self.data[key] = value
+        self.ttls[key] = ex
+
+    def _get(self, key):
+        return self.data.get(key)
+
+    def _ttl(self, key):
+        return self.ttls.get(key, -2) if key in self.data else -2
+
+    def _sadd(self, key, member):
+        self.data.setdefault(key, set()).add(member)
+
+    def _srem(self, key, member):
+        self.data.get(key, set()).discard(member)
+
+    def _smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    def _expire(self, key, seconds):
+        self.ttls[key] = seconds
+
+    def _delete(self, key):
+        return 1 if self.data.pop(key, None) is not None else 0
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def auth(redis):
+    return WebSocketAuthManager(token_lifetime=300, redis_client=redis)
+
+
+@pytest.mark.asyncio
+class TestWebSocketAuth:
+    """Tests for token lifecycle"""
+
+    async def test_create_and_validate_one_round_trip_each(self, auth, redis):
+        token = await auth.create_token("alice", email="a@example.com", groups=["managers"])
+        assert redis.round_trips == 1
+        assert token in redis.data[USER_TOKENS_KEY.format(username="alice")]
+
+        fresh = WebSocketAuthManager(redis_client=redis)  # Another pod: no cached validation
+        session = await fresh.validate_token(token)
+        assert session.username == "alice" and session.is_manager()
+        assert redis.round_trips == 2
+
+    async def test_recent_validations_are_served_from_memory(self, auth, redis):
+        token = await auth.create_token("alice")
+        for _ in range(5):
+            assert await auth.validate_token(token)
+        assert redis.round_trips == 2
+        assert auth.get_stats()["cache_hits"] == 4
+
+        auth.cache_ttl = 0
+        auth._validated.clear()
+        assert await auth.validate_token(token)
+        assert await auth.validate_token(token)
+        assert redis.round_trips == 4
+
+    async def test_invalid_and_missing_tokens_rejected(self, auth):
+        assert await auth.validate_token(None) is None
+        assert await auth.validate_token("nope") is None
+        assert auth.get_stats()["rejected"] == 2
+
+    async def test_revoke_user_tokens_uses_user_set(self, auth, redis):
+        tokens = [await auth.create_token("alice") for _ in range(3)]
+        other = await auth.create_token("bob")
+        await auth.validate_token(tokens[0])
+
+        assert await auth.revoke_user_tokens("alice") == 3
+        assert [await auth.validate_token(t) for t in tokens] == [None, None, None]
+        assert await auth.validate_token(other)
+        assert USER_TOKENS_KEY.format(username="alice") not in redis.data
+
+    async def test_revoke_single_token(self, auth, redis):
+        token = await auth.create_token("alice")
+        keep = await auth.create_token("alice")
+        assert await auth.validate_token(token)
+
+        assert await auth.revoke_token(token) is True
+        assert await auth.revoke_token(token) is False
+        assert await auth.validate_token(token) is None
+        assert redis.data[USER_TOKENS_KEY.format(username="alice")] == {keep}
+
+    async def test_in_memory_fallback_without_redis(self):
+        auth = WebSocketAuthManager(redis_client=None)
+        auth._redis_checked_at = float("inf")  # Never try to connect in tests
+        token = await auth.create_token("carol")
+        assert (await auth.validate_token(token)).username == "carol"
+        assert await auth.revoke_user_tokens("carol") == 1
+        assert auth.get_stats()["storage"] == "memory"
@@ -0,0 +1,160 @@
+"""
+Workflow Engine Tests
+Tests for concurrent, dependency-ordered integration workflow execution
+
+Run with: pytest tests/test_workflow_engine.py -v
+"""
+
+import asyncio
+import time
+import httpx
+import pytest
+
+from services.workflow_engine import WorkflowEngine, WorkflowStep
+
+
+def step_returning(value, delay: float = 0.0, log=None, name=None):
+    async def func(outputs):
+        if log is not None:
+            log.append(("start", name, sorted(outputs)))
+        await asyncio.sleep(delay)
+        return value
+    return func
+
+
+class TestWorkflowEngineValidation:
+    """Tests for graph validation"""
+
+    def test_unknown_dependency(self):
+        with pytest.raises(ValueError):
+            WorkflowEngine([WorkflowStep("a", "A", step_returning(None), depends_on=("b",))])
+
+    def test_cycle_rejected(self):
+        with pytest.raises(ValueError):
+            WorkflowEngine([
+                WorkflowStep("a", "A", step_returning(None), depends_on=("b",)),
+                WorkflowStep("b", "B", step_returning(None), depends_on=("a",)),
+            ])
+
+
+@pytest.mark.asyncio
+class TestWorkflowEngineRun:
+    """Tests for WorkflowEngine.run"""
+
+    async def test_independent_steps_run_concurrently(self):
+        engine = WorkflowEngine([
+            WorkflowStep(name, name, step_returning({"status": "success"}, delay=0.1))
+            for name in ("a", "b", "c", "d")
+        ])
+        results = {}
+
+        start = time.perf_counter()
+        await engine.run(results)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.3
+        assert set(results["integrations"]) == {"a", "b", "c", "d"}
+        assert results["errors"] == []
+        assert results["step_timings"]["a"]["latency_ms"] >= 90
+
+    async def test_dependents_wait_and_receive_outputs(self):
+        log = []
+        engine = WorkflowEngine([
+            WorkflowStep("task", "Task", step_returning({"task_id": 1}, 0.05, log, "task")),
+            WorkflowStep("notify", "Notify", step_returning({"ok": True}, 0, log, "notify"),
+                         depends_on=("task",)),
+        ])
+        results = {}
+
+        await engine.run(results)
+
+        assert ("start", "notify", ["task"]) in log
+
+    async def test_failures_timeouts_and_skips(self):
+        async def boom(_):
+            raise RuntimeError("service down")
+
+        engine = WorkflowEngine([
+            WorkflowStep("ok", "OK", step_returning({"status": "success"})),
+            WorkflowStep("bad", "Bad", boom),
+            WorkflowStep("slow", "Slow", step_returning({"x": 1}, delay=1), timeout=0.05),
+            WorkflowStep("off", "Off", boom, enabled=False),
+        ])
+        results = {"integrations": {}, "errors": []}
+
+        await engine.run(results)
+
+        assert "ok" in results["integrations"]
+        assert "Bad: service down" in results["errors"]
+        assert any(e.startswith("Slow: timed out") for e in results["errors"])
+        assert results["step_timings"]["off"]["status"] == "skipped"
+        assert len(results["errors"]) == 2
+
+    async def test_transient_errors_retried(self):
+        calls = []
+
+        async def flaky(_):
+            calls.append(1)
+            if len(calls) < 2:
+                raise ConnectionError("reset")
+            return {"status": "success"}
+
+        async def broken(_):
+            calls.append(2)
+            raise ValueError("bad payload")
+
+        engine = WorkflowEngine([
+            WorkflowStep("flaky", "Flaky", flaky, retries=2, retry_backoff=0, idempotent=True),
+            WorkflowStep("broken", "Broken", broken, retries=2, retry_backoff=0),
+        ])
+        results = {}
+
+        await engine.run(results)
+
+        assert results["step_timings"]["flaky"]["attempts"] == 2
+        assert results["step_timings"]["broken"]["attempts"] == 1
+        assert "flaky" in results["integrations"]
+
+    async def test_only_429_and_5xx_responses_retried(self):
+        attempts = {}
+
+        def failing_with(status):
+            async def func(_):
+                attempts[status] = attempts.get(status, 0) + 1
+                request = httpx.Request("POST", "http://service/api")
+                response = httpx.Response(status, request=request)
+                raise httpx.HTTPStatusError(f"HTTP {status}", request=request, response=response)
+            return func
+
+        engine = WorkflowEngine([
+            WorkflowStep(str(status), str(status), failing_with(status), retries=2, retry_backoff=0, idempotent=True)
+            for status in (400, 404, 429, 503)
+        ])
+
+        await engine.run({})
+
+        assert attempts == {400: 1, 404: 1, 429: 3, 503: 3}
+
+    async def test_non_idempotent_steps_retried_only_when_not_sent(self):
+        attempts = {}
+
+        def failing_with(name, error):
+            async def func(_):
+                attempts[name] = attempts.get(name, 0) + 1
+                raise error
+            return func
+
+        request = httpx.Request("POST", "http://service/api")
+        engine = WorkflowEngine([
+            WorkflowStep(name, name, failing_with(name, error), retries=2, retry_backoff=0)
+            for name, error in (
+                ("refused", httpx.ConnectError("refused", request=request)),
+                ("read_timeout", httpx.ReadTimeout("no response", request=request)),
+                ("reset", ConnectionResetError("reset")),
+            )
+        ])
+
+        await engine.run({})
+
+        # A timed-out or reset request may already have created something
+        assert attempts == {"refused": 3, "read_timeout": 1, "reset": 1}